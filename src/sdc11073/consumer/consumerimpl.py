@@ -55,11 +55,13 @@ if TYPE_CHECKING:
     from sdc11073.definitions_base import AbstractDataModel, BaseDefinitions
     from sdc11073.dispatch.dispatchkey import RequestDispatcherProtocol
     from sdc11073.dispatch.request import RequestData
+    from sdc11073.httpserver.httpserverimpl_async import AsyncioHttpServerThread
     from sdc11073.mdib.consumermdib import ConsumerMdib
     from sdc11073.namespaces import PrefixNamespace
     from sdc11073.pysoap import msgreader
     from sdc11073.pysoap.msgreader import ReceivedMessage
     from sdc11073.pysoap.soapclient import SoapClientProtocol
+    from sdc11073.pysoap.validationpolicy import ValidationPolicy
     from sdc11073.wsdiscovery.service import Service
     from sdc11073.xml_types.mex_types import HostedServiceType
 
@@ -76,6 +78,7 @@ class SdcConsumerComponents:
     operations_manager_class: type[OperationsManagerProtocol]
     service_handlers: set[type[HostedServiceClient]] = dataclasses.field(default_factory=set)
     additional_schema_specs: set[PrefixNamespace] = dataclasses.field(default_factory=set)
+    http_server_class: type[HttpServerThreadBase | AsyncioHttpServerThread] | None = None  # None: HttpServerThreadBase
 
 
 def default_components_factory() -> SdcConsumerComponents:
@@ -255,7 +258,7 @@ class SdcConsumer:
         sdc_definitions: type[BaseDefinitions],
         ssl_context_container: sdc11073.certloader.SSLContextContainer | None,
         epr: str | uuid.UUID | None = None,
-        validate: bool = True,
+        validate: bool | ValidationPolicy = True,
         log_prefix: str = '',
         components: SdcConsumerComponents | None = None,
         request_chunk_size: int = 0,
@@ -270,7 +273,7 @@ class SdcConsumer:
         :param sdc_definitions: a class derived from BaseDefinitions
         :param epr: the path of this client in http server
         :param ssl_context_container: used for ssl connection to device and for own HTTP Server (notifications receiver)
-        :param validate: bool
+        :param validate: bool or a ValidationPolicy that is used by msg_reader and msg_factory
         :param log_prefix: a string used as prefix for logging
         :param components: a SdcConsumerComponents instance or None
         :param request_chunk_size: if value > 0, message is split into chunks of this size
@@ -420,6 +423,7 @@ class SdcConsumer:
         dpws_hosted: HostedServiceType,
         filter_type: eventing_types.FilterType,
         actions: Iterable[DispatchKey],
+        state_filter: eventing_types.StateFilter | None = None,
     ) -> ConsumerSubscription:
         """Create a subscription object and registers it in dispatcher.
 
@@ -427,9 +431,10 @@ class SdcConsumer:
                            This is the target for all subscribe/unsubscribe ... messages
         :param filter_type: the filter that is sent to device
         :param actions: a list of DispatchKey that this subscription shall handle.
+        :param state_filter: if provided, the device sends only these states in state reports.
         :return: a subscription object.
         """
-        subscription = self._subscription_mgr.mk_subscription(dpws_hosted, filter_type)
+        subscription = self._subscription_mgr.mk_subscription(dpws_hosted, filter_type, state_filter)
 
         def update_subscription_status(subscription_filter: str, status: bool):
             subscription_status = dict(self.subscription_status)
@@ -454,6 +459,7 @@ class SdcConsumer:
         expire_seconds: int = 60,
         any_elements: list[xml_utils.LxmlElement] | None = None,
         any_attributes: dict | None = None,
+        state_filter: eventing_types.StateFilter | None = None,
     ) -> ConsumerSubscription:
         """Send subscribe request to provider.
 
@@ -464,9 +470,10 @@ class SdcConsumer:
         :param expire_seconds: defaults to 60 seconds
         :param any_elements: optional list of lxml elements
         :param any_attributes: optional dictionary of name:str - value:str pairs
+        :param state_filter: if provided, the device sends only these states in state reports.
         :return: a subscription object that has callback already registered.
         """
-        subscription = self.mk_subscription(dpws_hosted, filter_type, actions)
+        subscription = self.mk_subscription(dpws_hosted, filter_type, actions, state_filter)
         properties.bind(subscription, notification_data=self._on_notification)
         subscription.subscribe(expire_seconds, any_elements, any_attributes)
         return subscription
@@ -800,7 +807,8 @@ class SdcConsumer:
             self._is_internal_http_server = True
             ssl_context_container = self._ssl_context_container if self.is_ssl_connection else None
             logger = loghelper.get_logger_adapter('sdc.client.notif_dispatch', self.log_prefix)
-            self._http_server = HttpServerThreadBase(
+            http_server_class = self._components.http_server_class or HttpServerThreadBase
+            self._http_server = http_server_class(
                 self.consumer_ip_address,
                 ssl_context_container.server_context if ssl_context_container else None,
                 logger=logger,
@@ -843,7 +851,7 @@ class SdcConsumer:
         cls,
         wsd_service: Service,
         ssl_context_container: sdc11073.certloader.SSLContextContainer | None,
-        validate: bool = True,
+        validate: bool | ValidationPolicy = True,
         log_prefix: str = '',
         components: SdcConsumerComponents | None = None,
     ) -> SdcConsumer:
@@ -851,7 +859,7 @@ class SdcConsumer:
 
         :param wsd_service: a wsdiscovery.Service instance
         :param ssl_context_container: a ssl context or None
-        :param validate: bool
+        :param validate: bool or a ValidationPolicy that is used by msg_reader and msg_factory
         :param log_prefix: a string
         :param components: a SdcConsumerComponents instance or None
         :return:
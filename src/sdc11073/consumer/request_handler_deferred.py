@@ -1,19 +1,54 @@
 from __future__ import annotations
 
-import queue
+import copy
 import threading
+import time
 import traceback
+from collections import deque
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from sdc11073.dispatch import RequestData, RequestDispatcher
-from sdc11073.exceptions import InvalidActionError
+from sdc11073.exceptions import ApiUsageError, InvalidActionError
+from sdc11073.flowcontrol import BackpressurePolicy, LatencyHistogram
 from sdc11073.pysoap.msgfactory import CreatedMessage
 from sdc11073.pysoap.soapenvelope import Fault, faultcodeEnum
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sdc11073.loghelper import LoggerAdapter
+
     from .manipulator import RequestManipulatorProtocol
 
 
+@dataclass(frozen=True)
+class DispatchLane:
+    """Configuration of a lane of DispatchKeyRegistryDeferred.
+
+    A lane has its own bounded queue and worker thread.
+    A lane with empty actions is the default lane, it handles all actions that are not assigned to another lane.
+    """
+
+    name: str
+    actions: frozenset[str]
+    max_queue_size: int = 1000
+    policy: BackpressurePolicy = BackpressurePolicy.BLOCK  # what happens if the queue is full
+
+
+SINGLE_LANE = (DispatchLane('default', frozenset()),)
+
+
+@dataclass
+class LaneStats:
+    """Statistics of a lane of DispatchKeyRegistryDeferred."""
+
+    queue_depth: int
+    dropped_requests: int
+    wait_times: LatencyHistogram  # time from queueing until handling started, a snapshot
+    processing_times: LatencyHistogram  # duration of handler calls, a snapshot
+
+
 class EmptyResponse(CreatedMessage):
     """EmptyResponse is a response with no content."""
 
@@ -27,19 +62,94 @@ class EmptyResponse(CreatedMessage):
         return b''
 
 
+class _Lane:
+    """A bounded queue with a worker thread."""
+
+    def __init__(self, config: DispatchLane, logger: LoggerAdapter):
+        self.config = config
+        self._logger = logger
+        self._queue: deque[tuple[Callable, RequestData, str, float]] = deque()
+        self._cond = threading.Condition()
+        self._dropped_requests = 0
+        self._wait_times = LatencyHistogram()
+        self._processing_times = LatencyHistogram()
+        self._worker = threading.Thread(target=self._read_queue, name=f'deferred_{config.name}')
+        self._worker.daemon = True
+        self._worker.start()
+
+    def put(self, func: Callable, request_data: RequestData, action: str):
+        entry = (func, request_data, action, time.perf_counter())
+        with self._cond:
+            if len(self._queue) >= self.config.max_queue_size and not self._make_room():
+                return
+            self._queue.append(entry)
+            self._cond.notify_all()
+
+    def _make_room(self) -> bool:
+        """Apply the backpressure policy of the lane.
+
+        :return: False if the new entry shall be discarded.
+        """
+        policy = self.config.policy
+        if policy == BackpressurePolicy.BLOCK:
+            while len(self._queue) >= self.config.max_queue_size:
+                self._cond.wait()
+            return True
+        self._dropped_requests += 1
+        if policy == BackpressurePolicy.DROP_NEWEST:
+            return False
+        self._queue.popleft()
+        return True
+
+    def get_stats(self) -> LaneStats:
+        with self._cond:
+            return LaneStats(len(self._queue), self._dropped_requests,
+                             copy.deepcopy(self._wait_times), copy.deepcopy(self._processing_times))
+
+    def _read_queue(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                func, request, action, enqueued = self._queue.popleft()
+                self._cond.notify_all()
+            started = time.perf_counter()
+            try:
+                func(request)
+            except Exception:  # noqa: BLE001
+                # catch all to keep thread alive
+                self._logger.error('method {} for action "{}" failed:{}',  # noqa: PLE1205
+                                   func.__name__, action, traceback.format_exc())
+            finished = time.perf_counter()
+            with self._cond:
+                self._wait_times.add(started - enqueued)
+                self._processing_times.add(finished - started)
+
+
 class DispatchKeyRegistryDeferred(RequestDispatcher):
     """A middleware that splits request processing into two parts.
 
     It writes the request to a queue and returns immediately. A worker thread is responsible for the further handling.
     This allows a faster response.
+    LANES defines the queues and worker threads, every action is handled in the lane it is assigned to.
+    By default there is one lane for all actions, that keeps the order of all notifications.
+    Notifications of different lanes can be handled in a different order than they were received.
+    A ConsumerMdib ignores reports with an older mdib version than the last handled one, therefore
+    reports that are applied to a ConsumerMdib must stay in one lane.
+    Additional lanes are meant for actions whose handlers do not depend on this order.
     """
 
+    LANES: tuple[DispatchLane, ...] = SINGLE_LANE
+
     def __init__(self, log_prefix: str):
         super().__init__(log_prefix)
-        self._queue = queue.Queue(1000)
-        self._worker = threading.Thread(target=self._read_queue)
-        self._worker.daemon = True
-        self._worker.start()
+        default_lanes = [lane for lane in self.LANES if not lane.actions]
+        if len(default_lanes) != 1:
+            msg = f'LANES must contain exactly one lane without actions, got {len(default_lanes)}'
+            raise ApiUsageError(msg)
+        self._lanes = [_Lane(config, self._logger) for config in self.LANES]
+        self._default_lane = self._lanes[self.LANES.index(default_lanes[0])]
+        self._lanes_by_action = {action: lane for lane in self._lanes for action in lane.config.actions}
 
     def on_post(self, request_data: RequestData) -> CreatedMessage:
         """See documentation in RequestHandlerProtocol."""
@@ -51,15 +161,9 @@ class DispatchKeyRegistryDeferred(RequestDispatcher):
             fault.add_reason_text(f'invalid action {action}')
 
             raise InvalidActionError(fault)
-        self._queue.put((func, request_data, action))
+        self._lanes_by_action.get(action, self._default_lane).put(func, request_data, action)
         return EmptyResponse()
 
-    def _read_queue(self):
-        while True:
-            func, request, action = self._queue.get()
-            try:
-                func(request)
-            except Exception:  # noqa: BLE001
-                # catch all to keep thread alive
-                self._logger.error('method {} for action "{}" failed:{}',  # noqa: PLE1205
-                                   func.__name__, action, traceback.format_exc())
+    def get_stats(self) -> dict[str, LaneStats]:
+        """Return queue depth, dropped requests and latencies per lane name."""
+        return {lane.config.name: lane.get_stats() for lane in self._lanes}
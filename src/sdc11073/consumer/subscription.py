@@ -28,7 +28,7 @@ if TYPE_CHECKING:
     from sdc11073.pysoap.msgfactory import CreatedMessage, MessageFactory
     from sdc11073.pysoap.msgreader import MessageReader
     from sdc11073.pysoap.soapclient import SoapClientProtocol
-    from sdc11073.xml_types.eventing_types import FilterType
+    from sdc11073.xml_types.eventing_types import FilterType, StateFilter
     from sdc11073.xml_types.mex_types import HostedServiceType
 
 
@@ -330,6 +330,17 @@ class ConsumerSubscription:
         return ', '.join(str(a) for a in self._filter_type.any)
 
 
+def _mk_filter_type(filter_type: FilterType, state_filter: StateFilter | None) -> FilterType:
+    """Return filter_type, or a copy of it with the state filter (dialect STATE_FILTER_DIALECT)."""
+    if state_filter is None:
+        return filter_type
+    filter_with_states = evt_types.FilterType()
+    filter_with_states.text = filter_type.text
+    filter_with_states.any = list(filter_type.any)
+    filter_with_states.set_state_filter(state_filter)
+    return filter_with_states
+
+
 class ConsumerSubscriptionManagerProtocol(Protocol):
     """Factory for Subscription objects."""
 
@@ -361,8 +372,18 @@ class ConsumerSubscriptionManagerProtocol(Protocol):
     def stop(self):
         """Stop the subscription manager."""
 
-    def mk_subscription(self, dpws_hosted: HostedServiceType, filter_type: FilterType) -> ConsumerSubscriptionProtocol:
-        """Create a subscription instance."""
+    def mk_subscription(
+        self,
+        dpws_hosted: HostedServiceType,
+        filter_type: FilterType,
+        state_filter: StateFilter | None = None,
+    ) -> ConsumerSubscriptionProtocol:
+        """Create a subscription instance.
+
+        :param dpws_hosted: the hosted service
+        :param filter_type: the filter that is sent to the provider
+        :param state_filter: if provided, the provider sends only these states in state reports.
+        """
 
     def on_subscription_end(self, request_data: RequestData) -> ConsumerSubscription | None:
         """Handle SubscriptionEnd message from provider."""
@@ -479,8 +500,19 @@ class ConsumerSubscriptionManager(
                 # catch all in order to keep thread running.
                 self._logger.exception('##### check loop')
 
-    def mk_subscription(self, dpws_hosted: HostedServiceType, filter_type: FilterType) -> ConsumerSubscription:
-        """Create a subscription instance."""
+    def mk_subscription(
+        self,
+        dpws_hosted: HostedServiceType,
+        filter_type: FilterType,
+        state_filter: StateFilter | None = None,
+    ) -> ConsumerSubscription:
+        """Create a subscription instance.
+
+        :param dpws_hosted: the hosted service
+        :param filter_type: the filter that is sent to the provider
+        :param state_filter: if provided, the provider sends only these states in state reports.
+        """
+        filter_type = _mk_filter_type(filter_type, state_filter)
         sep = '' if self._notification_url.endswith('/') else '/'
         notification_url = f'{self._notification_url}{sep}subscr{self._counter}'
         sep = '' if self._end_to_url.endswith('/') else '/'
@@ -551,8 +583,19 @@ class ConsumerSubscriptionManager(
 class ClientSubscriptionManagerReferenceParams(ConsumerSubscriptionManager):
     """Factory for Subscription objects. It uses reference parameters for identification of a subscription."""
 
-    def mk_subscription(self, dpws_hosted: HostedServiceType, filter_type: FilterType) -> ConsumerSubscription:
-        """Create a subscription instance."""
+    def mk_subscription(
+        self,
+        dpws_hosted: HostedServiceType,
+        filter_type: FilterType,
+        state_filter: StateFilter | None = None,
+    ) -> ConsumerSubscription:
+        """Create a subscription instance.
+
+        :param dpws_hosted: the hosted service
+        :param filter_type: the filter that is sent to the provider
+        :param state_filter: if provided, the provider sends only these states in state reports.
+        """
+        filter_type = _mk_filter_type(filter_type, state_filter)
         subscription = ConsumerSubscription(
             self._msg_factory,
             self._data_model,
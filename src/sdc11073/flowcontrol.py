@@ -0,0 +1,41 @@
+"""Building blocks for bounded queues that are shared by provider, consumer and http servers."""
+
+from __future__ import annotations
+
+import bisect
+from enum import Enum
+
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)  # upper bounds in seconds
+
+
+class BackpressurePolicy(str, Enum):
+    """Defines what happens if an entry shall be put into a full queue."""
+
+    BLOCK = 'block'  # caller waits until the queue has space again
+    DROP_OLDEST = 'drop_oldest'  # the oldest queued entry is discarded
+    DROP_NEWEST = 'drop_newest'  # the new entry is discarded
+
+
+class LatencyHistogram:
+    """Counts of durations in LATENCY_BUCKETS, the last count is for durations above the last bucket."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float):
+        """Count a duration."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.sum += duration
+        self.max = max(self.max, duration)
+
+    @property
+    def avg(self) -> float | None:
+        """Return the average duration."""
+        return self.sum / self.count if self.count else None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__} count={self.count} avg={self.avg} max={self.max} counts={self.counts}'
@@ -1,9 +1,10 @@
 """Compression module for http."""
 import contextlib
+import struct
 import zlib
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from typing import ClassVar
+from typing import ClassVar, Protocol
 
 try:
     import lz4.frame
@@ -15,6 +16,31 @@ class CompressionError(Exception):
     pass
 
 
+class DecompressError(Exception):
+    """Raised when could not de-compress stream."""
+
+
+class StreamDecompressor(Protocol):
+    """Decompresses a payload piece by piece.
+
+    Errors in the compressed data are raised as DecompressError.
+    """
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Return the decompressed data of the next piece, max. max_length bytes (no limit if max_length < 0).
+
+        If the limit is reached, the decompressor keeps the rest of the input. Call decompress(b'', max_length)
+        until needs_input is True before the next piece is passed.
+        """
+
+    @property
+    def needs_input(self) -> bool:
+        """Return False if the decompressor can return more data without new input."""
+
+    def flush(self) -> bytes:
+        """Return remaining decompressed data, raise an error if the compressed stream is incomplete."""
+
+
 class AbstractDataCompressor(ABC):
     algorithms = ()
 
@@ -28,6 +54,11 @@ class AbstractDataCompressor(ABC):
     def decompress_payload(payload):
         pass
 
+    @staticmethod
+    def mk_decompressor() -> StreamDecompressor | None:
+        """Return a StreamDecompressor, None if the handler can only decompress complete payloads."""
+        return None
+
 
 class CompressionHandler:
     """Compression handler.
@@ -68,6 +99,14 @@ class CompressionHandler:
         """
         return cls.get_handler(algorithm).decompress_payload(payload)
 
+    @classmethod
+    def mk_decompressor(cls, algorithm: str) -> StreamDecompressor | None:
+        """Return a StreamDecompressor for algorithm, None if the algorithm does not support it.
+
+        Raises CompressionException if algorithm is not supported.
+        """
+        return cls.get_handler(algorithm).mk_decompressor()
+
     @classmethod
     def get_handler(cls, algorithm: str):
         """:param algorithm: one of strings provided by registered compression handlers
@@ -104,6 +143,10 @@ class CompressionHandler:
         return [pair[0] for pair in sorted(parsed_headers.items(), key=lambda kv: kv[1], reverse=True)]
 
 
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'  # no file name, mtime=0, os=unknown
+_DEFLATE_FINAL_BLOCK = b'\x03\x00'  # empty final block of a raw deflate stream
+
+
 class GzipCompressionHandler(AbstractDataCompressor):
     algorithms = ('gzip',)
 
@@ -118,6 +161,70 @@ class GzipCompressionHandler(AbstractDataCompressor):
     def decompress_payload(payload: bytes):
         return zlib.decompress(payload, 16 + zlib.MAX_WBITS)
 
+    @staticmethod
+    def mk_decompressor() -> StreamDecompressor:
+        """Return a gzip StreamDecompressor."""
+        return _GzipStreamDecompressor()
+
+    @staticmethod
+    def compress_fragment(payload: bytes) -> bytes:
+        """Compress payload to a byte aligned raw deflate fragment.
+
+        Fragments are independent of each other and can be joined with join_fragments.
+        This allows to compress a shared part of many messages only once.
+        """
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(payload) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+    @staticmethod
+    def join_fragments(fragments) -> bytes:
+        """Build a gzip stream from fragments.
+
+        :param fragments: iterable of (payload, compressed fragment) tuples, compressed by compress_fragment.
+        @return: compressed content
+        """
+        crc = 0
+        size = 0
+        parts = [_GZIP_HEADER]
+        for payload, fragment in fragments:
+            crc = zlib.crc32(payload, crc)
+            size += len(payload)
+            parts.append(fragment)
+        parts.append(_DEFLATE_FINAL_BLOCK)
+        parts.append(struct.pack('<II', crc, size & 0xFFFFFFFF))
+        return b''.join(parts)
+
+
+class _GzipStreamDecompressor:
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._needs_input = True
+
+    @property
+    def needs_input(self) -> bool:
+        return self._needs_input
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        tail = self._decompressor.unconsumed_tail
+        if tail:
+            data = tail + data if data else tail
+        try:
+            result = self._decompressor.decompress(data, max(max_length, 0))
+        except zlib.error as ex:
+            raise DecompressError(str(ex)) from ex
+        # output of exactly max_length bytes can mean that there is more pending output
+        self._needs_input = not self._decompressor.unconsumed_tail and (max_length < 0 or len(result) < max_length)
+        return result
+
+    def flush(self) -> bytes:
+        try:
+            data = self._decompressor.flush()
+        except zlib.error as ex:
+            raise DecompressError(str(ex)) from ex
+        if not self._decompressor.eof:
+            raise DecompressError('gzip: incomplete or truncated stream')
+        return data
+
 
 CompressionHandler.register_handler(GzipCompressionHandler)
 
@@ -133,6 +240,31 @@ class Lz4CompressionHandler(AbstractDataCompressor):
     def decompress_payload(payload: bytes):
         return lz4.frame.decompress(payload)
 
+    @staticmethod
+    def mk_decompressor() -> StreamDecompressor:
+        """Return a lz4 StreamDecompressor."""
+        return _Lz4StreamDecompressor()
+
+
+class _Lz4StreamDecompressor:
+    def __init__(self):
+        self._decompressor = lz4.frame.LZ4FrameDecompressor()
+
+    @property
+    def needs_input(self) -> bool:
+        return self._decompressor.needs_input
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        try:
+            return self._decompressor.decompress(data, max_length)
+        except RuntimeError as ex:  # lz4 raises RuntimeError for invalid data
+            raise DecompressError(str(ex)) from ex
+
+    def flush(self) -> bytes:
+        if not self._decompressor.eof:
+            raise DecompressError('lz4: incomplete frame')
+        return b''
+
 
 if lz4 is not None:
     CompressionHandler.register_handler(Lz4CompressionHandler)
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from io import BytesIO
+from typing import TYPE_CHECKING
 
-from .compression import CompressionHandler
+from .compression import CompressionHandler, DecompressError
+
+if TYPE_CHECKING:
+    from .compression import StreamDecompressor
 
 """ This module handles reading http messages. It supports chunking and de-compression"""
 
@@ -11,9 +15,8 @@ class DechunkError(Exception):
     """
 
 
-class DecompressError(Exception):
-    """Raised when could not de-compress stream.
-    """
+class MessageTooLargeError(Exception):
+    """Raised when a message is larger than HTTPReader.MAX_MESSAGE_SIZE."""
 
 
 def mk_chunks(body, chunk_size=512):
@@ -36,6 +39,42 @@ def mk_chunks(body, chunk_size=512):
 
 CR_LF = b'\r\n'
 
+READ_BUFFER_SIZE = 65536  # max. size of the pieces in which bodies are read
+
+
+class _BodyWriter:
+    """Collects the (decompressed) body and checks the max. size.
+
+    The body is written into a BytesIO, its getvalue() does not copy the data.
+    """
+
+    def __init__(self, max_size: int | None, decompressor: StreamDecompressor | None):
+        self._data = BytesIO()
+        self._max_size = max_size
+        self._decompressor = decompressor
+
+    def write(self, data: bytes):
+        if self._decompressor is None:
+            self._write(data)
+            return
+        # decompress in bounded pieces, a small compressed piece can expand to a huge amount of data
+        while True:
+            self._write(self._decompressor.decompress(data, READ_BUFFER_SIZE))
+            if self._decompressor.needs_input:
+                break
+            data = b''
+
+    def _write(self, data: bytes):
+        if self._max_size is not None and self._data.tell() + len(data) > self._max_size:
+            msg = f'message is larger than {self._max_size} bytes'
+            raise MessageTooLargeError(msg)
+        self._data.write(data)
+
+    def getvalue(self) -> bytes:
+        if self._decompressor is not None:
+            self._write(self._decompressor.flush())
+        return self._data.getvalue()
+
 
 class HTTPReader:
     """ Base class that implements decoding of incoming http requests.
@@ -43,42 +82,44 @@ class HTTPReader:
     - read data by content-length
     - handle chunk-encoding
     - handle compression
+    The body is read in pieces of max. READ_BUFFER_SIZE bytes, compressed bodies are decompressed piece by piece.
+    Neither the complete compressed body nor a list of chunks is kept in memory.
+    If MAX_MESSAGE_SIZE is not None, reading stops with MessageTooLargeError as soon as the body or
+    the decompressed body exceeds this size.
     """
 
+    MAX_MESSAGE_SIZE: int | None = None  # max. size of a (decompressed) body in bytes
+
     @classmethod
-    def _read_dechunk(cls, stream):
+    def _read_dechunk(cls, stream, writer: _BodyWriter | None = None):
         """De-chunk HTTP body stream.
         :param file stream: readable file-like object.
+        :param writer: receives the de-chunked data. If None, the de-chunked data is returned.
         :rtype: bytes
         :raise: DechunkError
         """
-        body = []
+        return_body = writer is None
+        if return_body:
+            writer = _BodyWriter(cls.MAX_MESSAGE_SIZE, None)
         while True:
             chunk_header = cls._read_until(stream, CR_LF)
-            chunk_headers = chunk_header.split(b';')  # length + optional chunk-extensions (name=value pairs)
-            chunk_len, _ = chunk_headers[0], chunk_headers[1:]  # we do nothing with chunk-extensions...
-            if chunk_len is None:
+            if chunk_header is None:
                 raise DechunkError(
                     'Could not extract chunk size: unexpected end of data.')
-
+            chunk_len = chunk_header.split(b';')[0]  # length + optional chunk-extensions (we do nothing with them)
             try:
                 chunk_len = int(chunk_len.strip(), 16)
             except (ValueError, TypeError) as err:
                 raise DechunkError('Could not parse chunk size:') from err
 
-            bytes_to_read = chunk_len
-            while bytes_to_read:
-                chunk = stream.read(bytes_to_read)
-                bytes_to_read -= len(chunk)
-                body.append(chunk)
-
+            cls._read_into(stream, chunk_len, writer)
             # chunk ends with \r\n
             cr_lf = stream.read(2)
             if cr_lf != CR_LF:
                 raise DechunkError('No CR+LF at the end of chunk!')
             if chunk_len == 0:  # len == 0 indicates end of data
                 break
-        return b''.join(body)
+        return writer.getvalue() if return_body else None
 
     @staticmethod
     def _read_until(stream, delimiter, max_bytes=16):
@@ -88,6 +129,12 @@ class HTTPReader:
         :param int max_bytes: maximum bytes to read.
         :rtype: bytes|None
         """
+        if delimiter == CR_LF and hasattr(stream, 'readline'):
+            # readline of a buffered stream does not read byte by byte
+            line = stream.readline(max_bytes)
+            if line.endswith(CR_LF):
+                return line[:-2]
+            return None
         buf = bytearray()
         delim_len = len(delimiter)
 
@@ -102,6 +149,49 @@ class HTTPReader:
                 return bytes(buf[:-delim_len])
         return None
 
+    @staticmethod
+    def _read_into(stream, size: int | None, writer: _BodyWriter):
+        """Read size bytes (or until end of stream if size is None) in pieces into writer."""
+        while size is None or size > 0:
+            data = stream.read(READ_BUFFER_SIZE if size is None else min(size, READ_BUFFER_SIZE))
+            if not data:
+                if size is not None:
+                    msg = f'unexpected end of data, {size} bytes missing'
+                    raise DechunkError(msg)
+                break
+            writer.write(data)
+            if size is not None:
+                size -= len(data)
+
+    @classmethod
+    def _mk_writer(cls, content_encoding: str | None, supported_encodings: list[str] | None) -> _BodyWriter:
+        # if we get compressed content then we check against server setting
+        # if it matches continue and decompress
+        # if current server setting is any, use whatever client has provided in content-encoding header
+        decompressor = None
+        if content_encoding:
+            supported_encs = supported_encodings or CompressionHandler.available_encodings
+            if content_encoding not in supported_encs:
+                raise DecompressError(f'content-encoding "{content_encoding}" is not supported')
+            decompressor = CompressionHandler.mk_decompressor(content_encoding)
+            if decompressor is None:
+                decompressor = _CompleteDecompressor(content_encoding)
+        return _BodyWriter(cls.MAX_MESSAGE_SIZE, decompressor)
+
+    @classmethod
+    def _check_content_length(cls, content_length: int):
+        if cls.MAX_MESSAGE_SIZE is not None and content_length > cls.MAX_MESSAGE_SIZE:
+            msg = f'content-length {content_length} is larger than {cls.MAX_MESSAGE_SIZE} bytes'
+            raise MessageTooLargeError(msg)
+
+    @classmethod
+    def decompress_body(cls, content_encoding: str, body: bytes, supported_encodings=None) -> bytes:
+        """Decompress a body that was read completely, with the same checks as read_request_body."""
+        writer = cls._mk_writer(content_encoding, supported_encodings)
+        for start in range(0, len(body), READ_BUFFER_SIZE):
+            writer.write(body[start:start + READ_BUFFER_SIZE])
+        return writer.getvalue()
+
     @classmethod
     def read_request_body(cls, http_message, supported_encodings=None):
         """ checks header for content-length, chunk-encoding and compression entries.
@@ -109,30 +199,23 @@ class HTTPReader:
         @http_message: a http request or response read from network
         :return: bytes
         """
-        http_body = None
+        content_encoding = http_message.headers.get('content-encoding')
         transfer_encoding = http_message.headers.get('transfer-encoding')
         if transfer_encoding is not None and transfer_encoding.lower() == 'chunked':
-            http_body = cls._read_dechunk(http_message.rfile)
-        else:
-            cl_string = http_message.headers.get('content-length')
-            if cl_string:
-                try:
-                    content_length = int(cl_string)
-                    http_body = http_message.rfile.read(content_length)
-                except TypeError:
-                    http_body = http_message.rfile.read()
-
-        # if we get compressed content then we check against server setting
-        # if it matches continue and decompress
-        # if current server setting is any, use whatever client has provided in content-encoding header
-        actual_enc = http_message.headers.get('content-encoding')
-        if actual_enc:
-            supported_encs = supported_encodings or CompressionHandler.available_encodings
-            if actual_enc in supported_encs:
-                http_body = CompressionHandler.decompress_payload(actual_enc, http_body)
-            else:
-                raise DecompressError(f'content-encoding "{actual_enc}" is not supported', )
-        return http_body
+            writer = cls._mk_writer(content_encoding, supported_encodings)
+            cls._read_dechunk(http_message.rfile, writer)
+            return writer.getvalue()
+        cl_string = http_message.headers.get('content-length')
+        if not cl_string:
+            return None
+        content_length = int(cl_string)
+        cls._check_content_length(content_length)
+        if not content_encoding:
+            # one read creates the body without any copy
+            return http_message.rfile.read(content_length)
+        writer = cls._mk_writer(content_encoding, supported_encodings)
+        cls._read_into(http_message.rfile, content_length, writer)
+        return writer.getvalue()
 
     @classmethod
     def read_response_body(cls, http_response, supported_encodings=None):
@@ -142,35 +225,34 @@ class HTTPReader:
         :supported_encodings: if given, only these encodings may be used.
         :return: bytes
         """
-        http_body = None
+        # de-chunking is done by http client, we just need to read until no more data available
         cl_string = http_response.getheader('content-length')
+        content_encoding = http_response.getheader('content-encoding')
         if cl_string:
-            try:
-                content_length = int(cl_string)
-                http_body = http_response.read(content_length)
-            except TypeError:
-                http_body = http_response.read()
-        if http_body is None:
-            transfer_encoding = http_response.getheader('transfer-encoding')
-            if transfer_encoding is not None and transfer_encoding.lower() == 'chunked':
-                # de-chunking is done by http client. we just need to read until no more data available
-                http_body = []
-                tmp = http_response.read()
-                while tmp:
-                    http_body.append(tmp)
-                    tmp = http_response.read()
-                http_body = b''.join(http_body)
-        if http_body is None:
-            http_body = http_response.read()
+            content_length = int(cl_string)
+            cls._check_content_length(content_length)
+            if not content_encoding:
+                return http_response.read(content_length)
+        writer = cls._mk_writer(content_encoding, supported_encodings)
+        cls._read_into(http_response, None, writer)
+        return writer.getvalue()
 
-        # if we get compressed content then we check against server setting
-        # if it matches continue and decompress
-        # if current server setting is any, use whatever client has provided in content-encoding header
-        actual_enc = http_response.getheader('content-encoding')
-        if actual_enc:
-            supported_encs = supported_encodings or CompressionHandler.available_encodings
-            if actual_enc in supported_encs:
-                http_body = CompressionHandler.decompress_payload(actual_enc, http_body)
-            else:
-                raise DecompressError(f'content-encoding "{actual_enc}" is not supported')
-        return http_body
+
+class _CompleteDecompressor:
+    """Collects the compressed payload for handlers that can only decompress complete payloads.
+
+    The size of the decompressed payload can only be checked after decompression.
+    """
+
+    needs_input = True
+
+    def __init__(self, algorithm: str):
+        self._algorithm = algorithm
+        self._data = BytesIO()
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:  # noqa: ARG002
+        self._data.write(data)
+        return b''
+
+    def flush(self) -> bytes:
+        return CompressionHandler.decompress_payload(self._algorithm, self._data.getvalue())
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import time
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse
 
 from .compression import CompressionHandler
-from .httpreader import HTTPReader, mk_chunks
+from .httpreader import HTTPReader, MessageTooLargeError, mk_chunks
 from sdc11073.exceptions import InvalidPathError
 
 
@@ -17,6 +18,14 @@ class DispatchingRequestHandler(BaseHTTPRequestHandler):
     # and network efficiency is more important than short latencies.
     disable_nagle_algorithm = False
 
+    def setup(self):
+        # a timeout of the socket ends idle keep-alive connections
+        self.timeout = self.server.keep_alive_timeout
+        super().setup()
+
+    def _add_latency(self, start: float):
+        self.server.add_latency(urlparse(self.path).path, time.perf_counter() - start)
+
     def _read_request(self):
         """ checks header for content-length, chunk-encoding and compression entries.
         Handles incoming bytes correspondingly.
@@ -45,8 +54,21 @@ class DispatchingRequestHandler(BaseHTTPRequestHandler):
             return path_elements[0]
         return path_elements[1]
 
+    def _reject_too_large_request(self, ex: MessageTooLargeError):
+        # the rest of the body was not read, close this connection
+        self.close_connection = True  # pylint: disable=attribute-defined-outside-init
+        self.server.logger.error('request from {} to {} rejected: {}', self.client_address, self.path, ex)  # noqa: PLE1205
+        self.send_response(413, str(ex))  # content too large
+        self.send_header("Content-type", "text/plain; charset=utf-8")
+        self.send_header("Content-length", "0")
+        self.end_headers()
+
     def do_POST(self):  # pylint: disable=invalid-name
-        request_bytes = self._read_request()
+        try:
+            request_bytes = self._read_request()
+        except MessageTooLargeError as ex:
+            self._reject_too_large_request(ex)
+            return
         if self.server.dispatcher is None:
             # close this connection
             self.close_connection = True  # pylint: disable=attribute-defined-outside-init
@@ -72,9 +94,11 @@ class DispatchingRequestHandler(BaseHTTPRequestHandler):
             return
 
         peer_name = self.connection.getpeername()
+        start = time.perf_counter()
         try:
             result = component.do_post(self.headers, self.path, peer_name, request_bytes)
             http_status, http_reason, response_xml_string = result
+            self._add_latency(start)
         except Exception as ex:
             self.server.logger.error('exception (request from {}): {}', self.path, self.client_address, ex)
             http_reason = str(ex)
@@ -109,8 +133,10 @@ class DispatchingRequestHandler(BaseHTTPRequestHandler):
         component = self.server.dispatcher.get_instance(self.get_first_path_element())
 
         peer_name = self.connection.getpeername()
+        start = time.perf_counter()
         result = component.do_get(self.headers, self.path, peer_name)
         http_status, http_reason, response_xml_string, content_type = result
+        self._add_latency(start)
 
         self.send_response(http_status, http_reason)
         response_xml_string = self._compress_if_supported(response_xml_string)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import copy
 import logging
+import queue
 import socket
 import socketserver
 import threading
@@ -10,6 +12,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from sdc11073.dispatch import PathElementRegistry
+from sdc11073.flowcontrol import LatencyHistogram
 from sdc11073.loghelper import LoggerAdapter
 
 from .httprequesthandler import DispatchingRequestHandler
@@ -20,37 +23,74 @@ if TYPE_CHECKING:
     from sdc11073 import certloader
 
 
+@dataclass
+class HttpServerStats:
+    """Statistics of a http server."""
+
+    active_connections: int  # connections that are currently handled by a thread
+    queued_connections: int  # accepted connections that wait for a free worker thread
+    latencies: dict[str, LatencyHistogram]  # key is the path of the requests
+
+
 @dataclass(frozen=True)
-class _ThreadInfo:
-    thread: threading.Thread
+class _ConnectionInfo:
+    thread: threading.Thread | None  # None if connection is handled by a worker pool
     request: socket.socket
     client_address: tuple
 
 
 class _ThreadingHTTPServer(socketserver.TCPServer):
-    """Each request is handled in a thread."""
+    """Each connection is handled in a new thread."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         logger: LoggerAdapter,
         server_address: tuple[str, int],
         chunk_size: int,
         supported_encodings: Iterable[str],
+        *,
+        backlog: int = socketserver.TCPServer.request_queue_size,
+        keep_alive_timeout: float | None = None,
     ):
         self.daemon_threads = True
-        self.threads = []
+        self.connections: dict[socket.socket, _ConnectionInfo] = {}
+        self.connections_lock = threading.Lock()
         self.logger = logger
         self.dispatcher = PathElementRegistry()
         self.chunk_size = chunk_size
         self.supported_encodings = supported_encodings
+        self.request_queue_size = backlog  # used in server_activate
+        self.keep_alive_timeout = keep_alive_timeout  # used by request handler
+        self._active_connections = 0
+        self._latencies: dict[str, LatencyHistogram] = {}
+        self._stats_lock = threading.Lock()
         super().__init__(server_address, DispatchingRequestHandler)
 
     @property
     def server_port(self) -> int:
         return self.server_address[1]
 
+    def add_latency(self, path: str, duration: float):
+        """Count the duration of a request to path."""
+        with self._stats_lock:
+            histogram = self._latencies.get(path)
+            if histogram is None:
+                histogram = self._latencies[path] = LatencyHistogram()
+            histogram.add(duration)
+
+    def get_stats(self) -> HttpServerStats:
+        """Return a snapshot of the statistics."""
+        with self._stats_lock:
+            latencies = {path: copy.deepcopy(histogram) for path, histogram in self._latencies.items()}
+            return HttpServerStats(self._active_connections, self._queued_connections(), latencies)
+
+    def _queued_connections(self) -> int:
+        return 0
+
     def process_request_thread(self, request, client_address):  # noqa: ANN001
         """Same as in BaseServer but as a thread."""  # noqa: D401
+        with self._stats_lock:
+            self._active_connections += 1
         try:
             self.finish_request(request, client_address)
         except (ConnectionResetError, ConnectionAbortedError) as ex:
@@ -59,10 +99,11 @@ class _ThreadingHTTPServer(socketserver.TCPServer):
             self.handle_error(request, client_address)
         finally:
             self.shutdown_request(request)
-            # this thread will close after return from this method, it can already be removed from self.threads
-            for thread_info in self.threads:
-                if thread_info.request == request:
-                    self.threads.remove(thread_info)
+            with self._stats_lock:
+                self._active_connections -= 1
+            # the connection is closed, it can already be removed from self.connections
+            with self.connections_lock:
+                self.connections.pop(request, None)
 
     def process_request(self, request, client_address):  # noqa: ANN001
         """Start a new thread to process the request."""
@@ -72,7 +113,8 @@ class _ThreadingHTTPServer(socketserver.TCPServer):
             name=f'SubscrRecv{client_address}',
         )
         thread.daemon = True
-        self.threads.append(_ThreadInfo(thread, request, client_address))
+        with self.connections_lock:
+            self.connections[request] = _ConnectionInfo(thread, request, client_address)
         thread.start()
 
     def server_close(self):
@@ -80,25 +122,110 @@ class _ThreadingHTTPServer(socketserver.TCPServer):
         if self.dispatcher is not None:
             self.dispatcher.methods = {}
             self.dispatcher = None  # this leads to a '503' reaction in SOAPNotificationsHandler
-        for thread_info in self.threads:
-            if thread_info.thread.is_alive():
-                try:
-                    thread_info.request.shutdown(socket.SHUT_RDWR)
-                    thread_info.request.close()
-                    self.logger.info('closed socket for notifications from %s', thread_info.client_address)
-                except OSError:
-                    # the connection is already closed
-                    continue
-                except Exception as ex:  # noqa: BLE001
-                    self.logger.warning(
-                        'error closing socket for notifications from %s: %s',
-                        thread_info.client_address,
-                        ex,
-                    )
+        with self.connections_lock:
+            connections = list(self.connections.values())
+        for connection_info in connections:
+            self._close_connection(connection_info)
+
+    def _close_connection(self, connection_info: _ConnectionInfo):
+        try:
+            connection_info.request.shutdown(socket.SHUT_RDWR)
+            connection_info.request.close()
+            self.logger.info('closed socket for notifications from %s', connection_info.client_address)
+        except OSError:
+            # the connection is already closed
+            pass
+        except Exception as ex:  # noqa: BLE001
+            self.logger.warning(
+                'error closing socket for notifications from %s: %s',
+                connection_info.client_address,
+                ex,
+            )
+
+    def join_threads(self, timeout: float):
+        """Wait until all threads handling connections have finished."""
+        with self.connections_lock:
+            connections = list(self.connections.values())
+        for connection_info in connections:
+            if connection_info.thread is not None and connection_info.thread.is_alive():
+                connection_info.thread.join(timeout)
+                if connection_info.thread.is_alive():
+                    self.logger.warning('could not end client thread for notifications from %s',
+                                        connection_info.client_address)
+        with self.connections_lock:
+            self.connections.clear()
+
+
+class _ThreadPoolHTTPServer(_ThreadingHTTPServer):
+    """Connections are handled by a fixed number of worker threads.
+
+    Accepted connections wait in a queue until a worker is free.
+    A worker handles all requests of a keep-alive connection, therefore a keep_alive_timeout should be used,
+    otherwise idle connections block workers.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        logger: LoggerAdapter,
+        server_address: tuple[str, int],
+        chunk_size: int,
+        supported_encodings: Iterable[str],
+        *,
+        pool_size: int,
+        backlog: int = socketserver.TCPServer.request_queue_size,
+        keep_alive_timeout: float | None = None,
+    ):
+        super().__init__(logger, server_address, chunk_size, supported_encodings,
+                         backlog=backlog, keep_alive_timeout=keep_alive_timeout)
+        self._connection_queue = queue.SimpleQueue()
+        self._workers = [threading.Thread(target=self._worker_loop, name=f'HttpWorker{i}', daemon=True)
+                         for i in range(pool_size)]
+        for worker in self._workers:
+            worker.start()
+
+    def _queued_connections(self) -> int:
+        return self._connection_queue.qsize()
+
+    def _worker_loop(self):
+        while True:
+            connection = self._connection_queue.get()
+            if connection is None:
+                return
+            self.process_request_thread(*connection)
+
+    def process_request(self, request, client_address):  # noqa: ANN001
+        """Put the connection into the queue of the workers."""
+        with self.connections_lock:
+            self.connections[request] = _ConnectionInfo(None, request, client_address)
+        self._connection_queue.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()  # this closes also the queued connections
+        while not self._connection_queue.empty():
+            self._connection_queue.get()
+        for _ in self._workers:
+            self._connection_queue.put(None)
+
+    def join_threads(self, timeout: float):
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                self.logger.warning('could not end http worker thread %s', worker.name)
+        super().join_threads(timeout)
 
 
 class HttpServerThreadBase(threading.Thread):
-    """A Thread running a ThreadingHTTPServer."""
+    """A Thread running a ThreadingHTTPServer.
+
+    If WORKER_POOL_SIZE is 0, each connection is handled in a new thread.
+    Otherwise, connections are handled by WORKER_POOL_SIZE worker threads, additional connections wait in a queue.
+    ACCEPT_BACKLOG is the backlog of the listening socket.
+    If KEEP_ALIVE_TIMEOUT is not None, a keep-alive connection is closed after this idle time in seconds.
+    """
+
+    WORKER_POOL_SIZE = 0
+    ACCEPT_BACKLOG = socketserver.TCPServer.request_queue_size
+    KEEP_ALIVE_TIMEOUT = None
 
     def __init__(
         self,
@@ -144,12 +271,16 @@ class HttpServerThreadBase(threading.Thread):
         """Run the http server."""
         self._stop_requested = False
         try:
-            self.httpd = _ThreadingHTTPServer(
-                self.logger,
-                (self._my_ipaddress, 0),  # port will be selected by the OS
-                self.chunk_size,
-                self.supported_encodings,
-            )
+            server_address = (self._my_ipaddress, 0)  # port will be selected by the OS
+            if self.WORKER_POOL_SIZE > 0:
+                self.httpd = _ThreadPoolHTTPServer(self.logger, server_address, self.chunk_size,
+                                                   self.supported_encodings, pool_size=self.WORKER_POOL_SIZE,
+                                                   backlog=self.ACCEPT_BACKLOG,
+                                                   keep_alive_timeout=self.KEEP_ALIVE_TIMEOUT)
+            else:
+                self.httpd = _ThreadingHTTPServer(self.logger, server_address, self.chunk_size,
+                                                  self.supported_encodings, backlog=self.ACCEPT_BACKLOG,
+                                                  keep_alive_timeout=self.KEEP_ALIVE_TIMEOUT)
             self.logger.info('starting http server on %s:%s', self._my_ipaddress, self.server_port)
             if self._ssl_context:
                 self.httpd.socket = self._ssl_context.wrap_socket(self.httpd.socket, server_side=True)
@@ -181,10 +312,11 @@ class HttpServerThreadBase(threading.Thread):
         self._stop_requested = True
         self.httpd.shutdown()
         self.httpd.server_close()
-        for thread_info in self.httpd.threads:
-            if thread_info.thread.is_alive():
-                thread_info.thread.join(1)
-            if thread_info.thread.is_alive():
-                self.logger.warning('could not end client thread for notifications from %s', thread_info.client_address)
-        del self.httpd.threads[:]
+        self.httpd.join_threads(1)
         self.started_evt.clear()
+
+    def get_stats(self) -> HttpServerStats:
+        """Return active and queued connections and the latencies of requests per path."""
+        if not self.started_evt.is_set():
+            raise RuntimeError('http server not started yet, stats not available')
+        return self.httpd.get_stats()
@@ -0,0 +1,244 @@
+"""HTTP server implementation with an asyncio event loop and request dispatching."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+from sdc11073.dispatch import PathElementRegistry
+from sdc11073.exceptions import InvalidPathError
+from sdc11073.flowcontrol import LatencyHistogram
+from sdc11073.loghelper import LoggerAdapter
+
+from .compression import CompressionHandler
+from .httpreader import READ_BUFFER_SIZE, HTTPReader, MessageTooLargeError
+from .httpserverimpl import HttpServerStats
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from multidict import CIMultiDictProxy
+
+    from sdc11073 import certloader
+
+
+class AsyncioHttpServerThread(threading.Thread):
+    """A Thread running an asyncio http server, it can be used instead of HttpServerThreadBase.
+
+    All connections are handled by the event loop, there is no thread per connection.
+    Decompression and dispatching of requests (parsing, validation and handling of messages) run in a thread pool
+    executor with EXECUTOR_WORKERS threads, the event loop only reads and writes the http messages.
+    ACCEPT_BACKLOG is the backlog of the listening socket.
+    An idle keep-alive connection is closed after KEEP_ALIVE_TIMEOUT seconds.
+    """
+
+    EXECUTOR_WORKERS = 10
+    ACCEPT_BACKLOG = 100
+    KEEP_ALIVE_TIMEOUT = 75.0
+
+    def __init__(
+        self,
+        my_ipaddress: str,
+        ssl_context: certloader.SSLContextContainer | None,
+        supported_encodings: Iterable[str],
+        logger: logging.Logger | LoggerAdapter,
+        chunk_size: int = 0,
+    ):
+        """Run an asyncio http server in a thread, so that it can be stopped without blocking.
+
+        :param my_ipaddress: The ip address that the http server shall bind to (no port!)
+        :param ssl_context: a ssl.SslContext instance or None
+        :param supported_encodings: a list of strings
+        :param logger: a python logger
+        :param chunk_size: if value > 0, messages are split into chunks of this size.
+        """
+        super().__init__(name='Dev_SdcAsyncHttpServerThread')
+        self.daemon = True
+        self._my_ipaddress = my_ipaddress
+        self._ssl_context = ssl_context
+        self.supported_encodings = supported_encodings
+        if isinstance(logger, logging.Logger):
+            self.logger = LoggerAdapter(logger)
+        else:
+            self.logger = logger
+        self.chunk_size = chunk_size
+        self.started_evt = threading.Event()  # helps to wait until thread has initialized is variables
+        self.base_url = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._dispatcher: PathElementRegistry | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._web_server: web.Server | None = None
+        self._server: asyncio.Server | None = None
+        self._server_port = None
+        self._queued_requests = 0
+        self._latencies: dict[str, LatencyHistogram] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def server_port(self) -> int | None:
+        """Return the port that the http server was bind to."""
+        return self._server_port
+
+    @property
+    def dispatcher(self) -> PathElementRegistry:
+        """Return the dispatcher responsible for handling requests."""
+        if not self.started_evt.is_set():
+            raise RuntimeError('http server not started yet, dispatcher not available')
+        return self._dispatcher
+
+    def run(self):
+        """Run the event loop of the http server."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._dispatcher = PathElementRegistry()
+        self._executor = ThreadPoolExecutor(max_workers=self.EXECUTOR_WORKERS, thread_name_prefix='HttpDispatch')
+        try:
+            self.loop.run_until_complete(self._start_server())
+            schema = 'https' if self._ssl_context else 'http'
+            self.base_url = f'{schema}://{self._my_ipaddress}:{self.server_port}/'
+            self.logger.info('starting asyncio http server on %s:%s', self._my_ipaddress, self.server_port)
+            self.started_evt.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self._stop_server())
+        except Exception:
+            self.logger.exception('Unhandled Exception at thread runtime. Thread will abort!')
+            raise
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self.loop.close()
+            self.logger.info('http server stopped.')
+
+    async def _start_server(self):
+        self._web_server = web.Server(self._on_request,
+                                      auto_decompress=False,  # decompression is done in the executor
+                                      keepalive_timeout=self.KEEP_ALIVE_TIMEOUT,
+                                      access_log=None)
+        self._server = await self.loop.create_server(self._web_server, self._my_ipaddress, 0,
+                                                     ssl=self._ssl_context, backlog=self.ACCEPT_BACKLOG)
+        self._server_port = self._server.sockets[0].getsockname()[1]
+
+    async def _stop_server(self):
+        self._server.close()
+        await self._web_server.shutdown(1)
+        await self._server.wait_closed()
+
+    def stop(self):
+        """Stop the http server."""
+        if not self.started_evt.is_set():
+            self.logger.warning('http server was not started yet - cannot be stopped')
+            return
+        self._dispatcher.methods = {}
+        self._dispatcher = None  # this leads to a '500' reaction for new requests
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join(5)
+        self.started_evt.clear()
+
+    def get_stats(self) -> HttpServerStats:
+        """Return open connections, requests waiting for the executor and the latencies of requests per path."""
+        if not self.started_evt.is_set():
+            raise RuntimeError('http server not started yet, stats not available')
+        with self._stats_lock:
+            latencies = {path: copy.deepcopy(histogram) for path, histogram in self._latencies.items()}
+            return HttpServerStats(len(self._web_server.connections), self._queued_requests, latencies)
+
+    def _add_latency(self, path: str, duration: float):
+        with self._stats_lock:
+            histogram = self._latencies.get(path)
+            if histogram is None:
+                histogram = self._latencies[path] = LatencyHistogram()
+            histogram.add(duration)
+
+    async def _run_in_executor(self, func: Callable, *args: Any) -> Any:
+        with self._stats_lock:
+            self._queued_requests += 1
+
+        def _run() -> Any:
+            with self._stats_lock:
+                self._queued_requests -= 1
+            return func(*args)
+
+        return await self.loop.run_in_executor(self._executor, _run)
+
+    async def _on_request(self, request: web.BaseRequest) -> web.StreamResponse:
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            http_reason = f'received a {request.method} request, but have no dispatcher'
+            return web.Response(status=500, reason=http_reason, text=http_reason)
+        try:
+            path_elements = urlparse(request.raw_path).path.split('/')
+            component = dispatcher.get_instance(path_elements[0] or path_elements[1])
+        except InvalidPathError as ex:
+            self.logger.exception('invalid path %s (request from %s): %s', request.raw_path, request.remote, ex.reason)
+            return web.Response(status=ex.status, reason=ex.reason, content_type='text/plain', charset='utf-8')
+        peer_name = request.transport.get_extra_info('peername') if request.transport else None
+        start = time.perf_counter()
+        if request.method == 'POST':
+            try:
+                request_bytes = await self._read_post_body(request)
+                http_status, http_reason, response_bytes = await self._run_in_executor(
+                    self._do_post, component, request.headers, request.raw_path, peer_name, request_bytes)
+            except Exception as ex:
+                self.logger.exception('exception (request from %s)', request.remote)
+                status = 413 if isinstance(ex, MessageTooLargeError) else 500
+                return web.Response(status=status, reason=' '.join(str(ex).split()),
+                                    content_type='text/plain', charset='utf-8')
+            content_type = 'application/soap+xml; charset=utf-8'
+        elif request.method == 'GET':
+            http_status, http_reason, response_bytes, content_type = await self._run_in_executor(
+                component.do_get, request.headers, request.raw_path, peer_name)
+        else:
+            return web.Response(status=405, reason='Method Not Allowed')
+        self._add_latency(request.path, time.perf_counter() - start)
+        return await self._mk_response(request, http_status, http_reason, response_bytes, content_type)
+
+    @staticmethod
+    async def _read_post_body(request: web.BaseRequest) -> bytes:
+        max_size = HTTPReader.MAX_MESSAGE_SIZE
+        if max_size is not None and request.content_length is not None and request.content_length > max_size:
+            msg = f'content-length {request.content_length} is larger than {max_size} bytes'
+            raise MessageTooLargeError(msg)
+        # read in bounded pieces, a chunked request has no content-length
+        data = io.BytesIO()
+        while True:
+            piece = await request.content.read(READ_BUFFER_SIZE)
+            if not piece:
+                return data.getvalue()
+            if max_size is not None and data.tell() + len(piece) > max_size:
+                msg = f'message is larger than {max_size} bytes'
+                raise MessageTooLargeError(msg)
+            data.write(piece)
+
+    def _do_post(self, component: Any, headers: CIMultiDictProxy, path: str, peer_name: Any,
+                 request_bytes: bytes) -> tuple[int, str, bytes]:
+        actual_enc = headers.get('content-encoding')
+        if actual_enc:
+            request_bytes = HTTPReader.decompress_body(actual_enc, request_bytes)
+        return component.do_post(headers, path, peer_name, request_bytes)
+
+    async def _mk_response(self, request: web.BaseRequest, http_status: int, http_reason: str,
+                           response_bytes: bytes, content_type: str) -> web.StreamResponse:
+        headers = {'Content-Type': content_type}
+        for enc in CompressionHandler.parse_header(request.headers.get('accept-encoding')):
+            if enc in self.supported_encodings:
+                response_bytes = await self._run_in_executor(CompressionHandler.compress_payload, enc,
+                                                             response_bytes)
+                headers['Content-Encoding'] = enc
+                break
+        if self.chunk_size <= 0:
+            return web.Response(status=http_status, reason=http_reason, body=response_bytes, headers=headers)
+        response = web.StreamResponse(status=http_status, reason=http_reason, headers=headers)
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for i in range(0, len(response_bytes), self.chunk_size):
+            await response.write(response_bytes[i:i + self.chunk_size])
+        await response.write_eof()
+        return response
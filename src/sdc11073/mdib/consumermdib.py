@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import bisect
 import enum
 import threading
 import time
-from collections import deque
+from array import array
+from collections import defaultdict
 from dataclasses import dataclass
 from threading import Lock
 from typing import TYPE_CHECKING, Any
@@ -15,13 +17,20 @@ from sdc11073 import observableproperties as properties
 from sdc11073.exceptions import ApiUsageError
 from sdc11073.mdib import mdibbase
 from sdc11073.mdib.consumermdibxtra import ConsumerMdibMethods
+from sdc11073.xml_types.lazy_reports import LazyState, LazyStatesReport, get_lazy_states
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable
     from decimal import Decimal
     from enum import Enum
 
     from sdc11073.consumer.consumerimpl import SdcConsumer
+    from sdc11073.mdib.descriptorcontainers import AbstractDescriptorContainer
     from sdc11073.mdib.entityprotocol import EntityGetterProtocol
     from sdc11073.mdib.statecontainers import (
         AbstractContextStateContainer,
@@ -44,7 +53,7 @@ if TYPE_CHECKING:
 class RtSampleContainer:
     """RtSampleContainer contains a single value."""
 
-    value: Decimal
+    value: Decimal | float
     determination_time: float
     validity: Enum
     annotations: list
@@ -58,26 +67,199 @@ class RtSampleContainer:
         return f'RtSample value="{self.value}" validity="{self.validity}" time={self.determination_time}'
 
 
+@dataclass
+class RtSampleWindow:
+    """A zero-copy view of consecutive samples of a ConsumerRtBuffer.
+
+    The memoryviews reference the buffer of ConsumerRtBuffer, they are overwritten when the buffer wraps around.
+    Copy the data (e.g. with tolist() or numpy.array()) if it shall be kept for a longer time.
+    """
+
+    values: memoryview  # float values
+    determination_times: memoryview  # float values, seconds since epoch
+    validity_codes: memoryview  # index in validity_table
+    validity_table: list[Enum]
+    annotations: dict[int, list]  # key is index in window
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def validity(self, index: int) -> Enum:
+        """Return the validity of a sample."""
+        return self.validity_table[self.validity_codes[index]]
+
+    def to_rt_sample_containers(self) -> list[RtSampleContainer]:
+        """Create a RtSampleContainer for every sample in window."""
+        validities = [self.validity_table[code] for code in self.validity_codes]
+        return [
+            RtSampleContainer(value, determination_time, validity, self.annotations.get(i, []))
+            for i, (value, determination_time, validity) in enumerate(
+                zip(self.values.tolist(), self.determination_times.tolist(), validities, strict=True),
+            )
+        ]
+
+
 class ConsumerRtBuffer:
-    """Collects data of one real time stream."""
+    """Collects data of one real time stream.
+
+    The data is stored column wise in preallocated ring buffers (values, determination times, validities)
+    plus a sparse index of annotations. No object is created per sample.
+    Every sample is written twice (at position p and p + max_samples), therefore every window of
+    max. max_samples consecutive samples is contiguous and can be returned without copying.
+    """
 
     def __init__(self, sample_period: float, max_samples: int):
         """Construct a ConsumerRtBuffer.
 
         :param sample_period: float value, in seconds.
-                              When an incoming real time sample array is split into single RtSampleContainers,
+                              When an incoming real time sample array is split into single samples,
                               this is used to calculate the individual time stamps.
                               Value can be zero if correct value is not known.
-                              In this case all Containers will have the observation time of the sample array.
-        :param max_samples: integer, max. length of self.rt_data
+                              In this case all samples will have the observation time of the sample array.
+        :param max_samples: integer, max. number of buffered samples
         """
-        self.rt_data = deque(maxlen=max_samples)
         self.sample_period = sample_period
         self._max_samples = max_samples
+        self._values = array('d', bytes(8 * 2 * max_samples))
+        self._determination_times = array('d', bytes(8 * 2 * max_samples))
+        self._validity_codes = array('B', bytes(2 * max_samples))
+        self._validity_table = []  # all validities that were received, index is the code in _validity_codes
+        self._annotations = {}  # key is absolute sample index, value is list of annotations
+        self._end = 0  # absolute index of next sample
+        self._start = 0  # absolute index of the oldest sample that has not been consumed
         self._logger = loghelper.get_logger_adapter('sdc.client.mdib.rt')
         self._lock = Lock()
         self.last_sc = None  # last state container that was handled
 
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def rt_data(self) -> list[RtSampleContainer]:
+        """Return all buffered samples as RtSampleContainer objects.
+
+        This creates an object per sample, use window() to avoid that.
+        """
+        return self.window().to_rt_sample_containers()
+
+    @property
+    def last_determination_time(self) -> float | None:
+        """Return the determination time of the youngest sample, None if buffer is empty."""
+        with self._lock:
+            if self._end == self._start:
+                return None
+            return self._determination_times[(self._end - 1) % self._max_samples]
+
+    def add_rt_samples(self, realtime_sample_array_container: RealTimeSampleArrayMetricStateContainer) -> None:
+        """Append all samples of a RealTimeSampleArrayMetricStateContainer.
+
+        :param realtime_sample_array_container: a RealTimeSampleArrayMetricStateContainer instance
+        """
+        self.last_sc = realtime_sample_array_container
+        metric_value = realtime_sample_array_container.MetricValue
+        if metric_value is None:
+            # this can happen if metric state is not activated.
+            self._logger.debug(  # noqa: PLE1205
+                'real time sample array "{}" has no metric value, ignoring it',
+                realtime_sample_array_container.DescriptorHandle,
+            )
+            return
+        samples = metric_value.Samples
+        if samples is None or len(samples) == 0:
+            return
+        annotations = {}
+        if metric_value.ApplyAnnotation:
+            annots = metric_value.Annotation
+            for apply_annotation in metric_value.ApplyAnnotation:
+                # index is zero-based
+                annotations.setdefault(apply_annotation.SampleIndex, []).append(
+                    annots[apply_annotation.AnnotationIndex])
+        self.add_samples(samples, metric_value.DeterminationTime, metric_value.MetricQuality.Validity, annotations)
+
+    def add_samples(self, values: Any, determination_time: float, validity: Enum,
+                    annotations: dict[int, list] | None = None) -> None:
+        """Append consecutive samples.
+
+        :param values: a list of numbers or float values in a buffer, e.g. array('d') or numpy float64 array
+        :param determination_time: determination time of first value
+        :param validity: the validity of all values
+        :param annotations: optional dictionary, key is index in values, value is list of annotations
+        """
+        if isinstance(values, list):
+            values = array('d', values)
+        count = len(values)
+        if np is not None:
+            determination_times = np.arange(count) * self.sample_period + determination_time
+        else:
+            determination_times = array('d', [determination_time + i * self.sample_period for i in range(count)])
+        with self._lock:
+            try:
+                validity_code = self._validity_table.index(validity)
+            except ValueError:
+                self._validity_table.append(validity)
+                validity_code = len(self._validity_table) - 1
+            self._write(values, determination_times, bytes((validity_code,)) * count)
+            first = self._end - count
+            if annotations:
+                for index in sorted(annotations):
+                    if 0 <= index < count:
+                        self._annotations[first + index] = annotations[index]
+            # remove annotations of overwritten samples; keys are in ascending order
+            oldest = self._end - self._max_samples
+            while self._annotations:
+                index = next(iter(self._annotations))
+                if index >= oldest:
+                    break
+                del self._annotations[index]
+
+    def _write(self, values: Any, determination_times: Any, validity_codes: bytes):
+        """Write samples to the ring buffers, this must be called with locked self._lock."""
+        count = len(values)
+        offset = max(0, count - self._max_samples)  # only the youngest samples fit into buffer
+        self._end += offset
+        while offset < count:
+            pos = self._end % self._max_samples
+            length = min(count - offset, self._max_samples - pos)
+            for column, data in ((self._values, values),
+                                 (self._determination_times, determination_times),
+                                 (self._validity_codes, validity_codes)):
+                view = memoryview(column)
+                view[pos:pos + length] = memoryview(data)[offset:offset + length]
+                view[pos + self._max_samples:pos + self._max_samples + length] = view[pos:pos + length]
+            offset += length
+            self._end += length
+        self._start = max(self._start, self._end - self._max_samples)
+
+    def _mk_window(self, start: int) -> RtSampleWindow:
+        """Return a window from absolute index start to youngest sample, must be called with locked self._lock."""
+        pos = start % self._max_samples
+        end_pos = pos + self._end - start
+        annotations = {index - start: annots for index, annots in self._annotations.items() if index >= start}
+        return RtSampleWindow(memoryview(self._values)[pos:end_pos],
+                              memoryview(self._determination_times)[pos:end_pos],
+                              memoryview(self._validity_codes)[pos:end_pos],
+                              self._validity_table,
+                              annotations)
+
+    def window(self, count: int | None = None) -> RtSampleWindow:
+        """Return the youngest samples without copying.
+
+        :param count: max. number of samples, None means all buffered samples.
+        """
+        with self._lock:
+            start = self._start if count is None else max(self._start, self._end - count)
+            return self._mk_window(start)
+
+    def window_since(self, timestamp: float) -> RtSampleWindow:
+        """Return all buffered samples with a determination time >= timestamp without copying."""
+        with self._lock:
+            all_times = self._mk_window(self._start).determination_times
+            return self._mk_window(self._start + bisect.bisect_left(all_times, timestamp))
+
+    def window_last_seconds(self, seconds: float) -> RtSampleWindow:
+        """Return all buffered samples that are not older than seconds without copying."""
+        return self.window_since(time.time() - seconds)
+
     def mk_rt_sample_containers(
         self,
         realtime_sample_array_container: RealTimeSampleArrayMetricStateContainer,
@@ -100,32 +282,36 @@ class ConsumerRtBuffer:
         annots = metric_value.Annotation
         apply_annotations = metric_value.ApplyAnnotation
         rt_sample_containers = []
-        if metric_value.Samples is not None:
-            for i, sample in enumerate(metric_value.Samples):
-                applied_annotations = []
-                if apply_annotations is not None:
-                    for apply_annotation in apply_annotations:
-                        if apply_annotation.SampleIndex == i:
-                            # there is an annotation for this sample:
-                            ann_index = apply_annotation.AnnotationIndex
-                            annotation = annots[ann_index]  # index is zero-based
-                            applied_annotations.append(annotation)
+        samples = metric_value.Samples
+        if samples is not None:
+            if not isinstance(samples, list):
+                samples = samples.tolist()  # compact sample array => list of float
+            # annotations per sample index
+            applied_annotations_lookup = defaultdict(list)
+            if apply_annotations is not None:
+                for apply_annotation in apply_annotations:
+                    # index is zero-based
+                    applied_annotations_lookup[apply_annotation.SampleIndex].append(
+                        annots[apply_annotation.AnnotationIndex])
+            validity = metric_value.MetricQuality.Validity
+            for i, sample in enumerate(samples):
+                applied_annotations = applied_annotations_lookup.get(i, [])
                 rt_sample_time = determination_time + i * self.sample_period
                 rt_sample_containers.append(
-                    RtSampleContainer(sample, rt_sample_time, metric_value.MetricQuality.Validity, applied_annotations),
+                    RtSampleContainer(sample, rt_sample_time, validity, applied_annotations),
                 )
         return rt_sample_containers
 
     def add_rt_sample_containers(self, rt_sample_containers: list[RtSampleContainer]) -> None:
-        """Update self.rt_data with the new rt_sample_containers.
+        """Append the rt_sample_containers.
 
         :param rt_sample_containers: a list of RtSampleContainer
         :return: None
         """
-        if not rt_sample_containers:
-            return
-        with self._lock:
-            self.rt_data.extend(rt_sample_containers)
+        for container in rt_sample_containers:
+            annotations = {0: container.annotations} if container.annotations else None
+            self.add_samples(array('d', (container.value,)), container.determination_time, container.validity,
+                             annotations)
 
     def read_rt_data(self) -> list[RtSampleContainer]:
         """Consume all currently buffered data and return it.
@@ -133,8 +319,8 @@ class ConsumerRtBuffer:
         :return: a list of RtSampleContainer objects
         """
         with self._lock:
-            ret = list(self.rt_data)
-            self.rt_data.clear()
+            ret = self._mk_window(self._start).to_rt_sample_containers()
+            self._start = self._end
         return ret
 
 
@@ -191,6 +377,7 @@ class ConsumerMdib(mdibbase.MdibBase):
         self._buffered_notifications = []
         self._buffered_notifications_lock = Lock()
         self.entities: EntityGetterProtocol = mdibbase.EntityGetter(self)
+        self._state_handle_filter: frozenset[str] | None = None
 
     @property
     def xtra(self) -> Any:
@@ -207,6 +394,21 @@ class ConsumerMdib(mdibbase.MdibBase):
         """Returns True if everything has been set up completely."""
         return self._state == ConsumerMdibState.initialized
 
+    def set_state_handle_filter(self, handles: Iterable[str] | None):
+        """Only update states with the given handles from notifications.
+
+        States in reports that do not match the filter are not parsed and not updated in the mdib.
+        A context state matches if its Handle or its DescriptorHandle is in handles, all other states
+        match with their DescriptorHandle. New states (not yet in mdib) are always added.
+        :param handles: handles to watch, None removes the filter.
+        """
+        self._state_handle_filter = None if handles is None else frozenset(handles)
+
+    def _is_filtered_out(self, state: LazyState) -> bool:
+        if self._state_handle_filter is None:
+            return False
+        return state.DescriptorHandle not in self._state_handle_filter and state.Handle not in self._state_handle_filter
+
     def init_mdib(self):
         """Binds own notification handlers to observables of sdc client and calls GetMdib.
 
@@ -222,8 +424,14 @@ class ConsumerMdib(mdibbase.MdibBase):
         self._sdc_client.set_mdib(self)  # pylint: disable=protected-access
         self._logger.info('initializing mdib done')
 
-    def reload_all(self):
-        """Delete all data and reloads everything."""
+    def reload_all(self, differential: bool = False):
+        """Delete all data and reloads everything.
+
+        :param differential: if True, the mdib is synchronized with the GetMdib result instead (see resync).
+        """
+        if differential:
+            self.resync()
+            return
         self._logger.info('reload_all called')
         with self.mdib_lock:
             self._state = ConsumerMdibState.initializing  # notifications are now buffered
@@ -257,27 +465,166 @@ class ConsumerMdib(mdibbase.MdibBase):
             else:
                 self._logger.info('found context states in GetMdib Result, will not call getContextStates')
 
-            # process buffered notifications
+            self._process_buffered_notifications()
+            self._logger.info('reload_all done')
+
+    def _process_buffered_notifications(self):
+        """Apply notifications that were received during reload, set state to initialized.
+
+        Call this method only if mdib_lock is already acquired.
+        """
+        with self._buffered_notifications_lock:
+            self._logger.debug('got _buffered_notifications_lock')
+            for buffered_report in self._buffered_notifications:
+                # buffered data might contain notifications that do not fit.
+                if buffered_report.mdib_version_group.sequence_id != self.sequence_id:
+                    self.logger.debug(
+                        'wrong sequence id "%s"; ignore buffered report',
+                        buffered_report.mdib_version_group.sequence_id,
+                    )
+                    continue
+                if buffered_report.mdib_version_group.mdib_version <= self.mdib_version:
+                    self.logger.debug(
+                        'older mdib version "%d"; ignore buffered report',
+                        buffered_report.mdib_version_group.mdib_version,
+                    )
+                    continue
+                buffered_report.handler(buffered_report.mdib_version_group, buffered_report.data)
+            del self._buffered_notifications[:]
+            self._state = ConsumerMdibState.initialized
+
+    def resync(self):
+        """Synchronize the mdib with the provider, keep unchanged containers.
+
+        In contrast to reload_all the mdib is not cleared, and GetMdib is called without holding the mdib lock,
+        readers see the old data until the changes are applied.
+        Descriptors and states of the GetMdib result are compared to the mdib by handle and version,
+        only new, changed and deleted containers are applied, changed containers are updated in place.
+        The observables (new_descriptors_by_handle, metrics_by_handle, ...) are only set with the changed containers.
+        If sequence id or instance id changed, versions cannot be compared and all existing containers are updated.
+        Notifications that are received in the meantime are buffered and applied afterward.
+        """
+        self._logger.info('resync called')
+        with self._buffered_notifications_lock:
+            self._state = ConsumerMdibState.initializing  # notifications are now buffered
+        try:
+            response = self._sdc_client.client('Get').get_mdib()  # GetRequestResult
+            descriptor_containers, state_containers = response.result
+            if not any(state_container.is_context_state for state_container in state_containers):
+                self._logger.info('no context states in GetMdib result, requesting context states...')
+                context_response = self._sdc_client.client('Context').get_context_states()
+                state_containers = [*state_containers, *context_response.result.ContextState]
+        except Exception:
             with self._buffered_notifications_lock:
-                self._logger.debug('got _buffered_notifications_lock')
-                for buffered_report in self._buffered_notifications:
-                    # buffered data might contain notifications that do not fit.
-                    if buffered_report.mdib_version_group.sequence_id != self.sequence_id:
-                        self.logger.debug(
-                            'wrong sequence id "%s"; ignore buffered report',
-                            buffered_report.mdib_version_group.sequence_id,
-                        )
-                        continue
-                    if buffered_report.mdib_version_group.mdib_version <= self.mdib_version:
-                        self.logger.debug(
-                            'older mdib version "%d"; ignore buffered report',
-                            buffered_report.mdib_version_group.mdib_version,
-                        )
-                        continue
-                    buffered_report.handler(buffered_report.mdib_version_group, buffered_report.data)
                 del self._buffered_notifications[:]
-                self._state = ConsumerMdibState.initialized
-            self._logger.info('reload_all done')
+                self._state = ConsumerMdibState.invalid
+            raise
+        mdib_version_group = response.mdib_version_group
+        with self.mdib_lock:
+            versions_comparable = (mdib_version_group.sequence_id == self.sequence_id
+                                   and mdib_version_group.instance_id == self.instance_id)
+            self._update_from_mdib_version_group(mdib_version_group)
+            self._apply_descriptor_differences(descriptor_containers, versions_comparable)
+            self._apply_state_differences(state_containers, versions_comparable)
+            self._process_buffered_notifications()
+        self._logger.info('resync done')
+
+    def _apply_descriptor_differences(self, descriptor_containers: list[AbstractDescriptorContainer],
+                                      versions_comparable: bool):
+        """Add new, update changed and remove missing descriptors. Call only if mdib_lock is already acquired."""
+        new_descriptors = {}
+        updated_descriptors = {}
+        obsolete_descriptors = []
+        with self.descriptions.lock:
+            for descriptor_container in descriptor_containers:
+                old_container = self.descriptions.handle.get_one(descriptor_container.Handle, allow_none=True)
+                if old_container is not None and old_container.__class__ is not descriptor_container.__class__:
+                    obsolete_descriptors.append(old_container)  # a different type is a new descriptor
+                    old_container = None
+                if old_container is None:
+                    new_descriptors[descriptor_container.Handle] = descriptor_container
+                elif (not versions_comparable
+                      or old_container.DescriptorVersion != descriptor_container.DescriptorVersion
+                      or old_container.parent_handle != descriptor_container.parent_handle):
+                    old_container.update_from_other_container(descriptor_container)
+                    old_container.parent_handle = descriptor_container.parent_handle
+                    self.descriptions.update_object_no_lock(old_container)
+                    updated_descriptors[old_container.Handle] = old_container
+            handles = {descriptor_container.Handle for descriptor_container in descriptor_containers}
+            obsolete_descriptors.extend(d for d in self.descriptions.objects if d.Handle not in handles)
+        if obsolete_descriptors:
+            self.rm_descriptors_and_states(obsolete_descriptors)  # sets observables of deleted containers
+        with self.descriptions.lock:
+            self.descriptions.add_objects_no_lock(list(new_descriptors.values()))
+        if new_descriptors:
+            self.new_descriptors_by_handle = new_descriptors
+        if updated_descriptors:
+            self.updated_descriptors_by_handle = updated_descriptors
+
+    def _apply_state_differences(self, state_containers: list[AbstractStateContainer], versions_comparable: bool):
+        """Add new, update changed and remove missing states. Call only if mdib_lock is already acquired."""
+        changed_states = []
+        keys = set()
+        for state_container in state_containers:
+            if state_container.is_context_state:
+                lookup, key = self.context_states, state_container.Handle
+                old_container = lookup.handle.get_one(key, allow_none=True)
+            else:
+                lookup, key = self.states, state_container.DescriptorHandle
+                old_container = lookup.descriptor_handle.get_one(key, allow_none=True)
+            keys.add(key)
+            if old_container is None:
+                self._set_descriptor_container_reference(state_container)
+                lookup.add_object(state_container)
+                changed_states.append(state_container)
+            elif (not versions_comparable
+                  or old_container.StateVersion != state_container.StateVersion
+                  or old_container.DescriptorVersion != state_container.DescriptorVersion):
+                old_container.update_from_other_container(state_container)
+                lookup.update_object(old_container)
+                changed_states.append(old_container)
+
+        deleted_states = self._remove_missing_states(keys)
+
+        # update observables
+        for observable_name, states_by_handle in self._group_states_by_observable(changed_states).items():
+            setattr(self, observable_name, states_by_handle)
+        if deleted_states:
+            self.deleted_states_by_handle = deleted_states
+
+    def _remove_missing_states(self, keys: set[str]) -> dict[str, list[AbstractStateContainer]]:
+        """Remove states whose DescriptorHandle (context states: Handle) is not in keys, return them."""
+        deleted_states = defaultdict(list)
+        for state_container in list(self.states.objects):
+            if state_container.DescriptorHandle not in keys:
+                self.states.remove_object(state_container)
+                deleted_states[state_container.DescriptorHandle].append(state_container)
+        for state_container in list(self.context_states.objects):
+            if state_container.Handle not in keys:
+                self.context_states.remove_object(state_container)
+                deleted_states[state_container.DescriptorHandle].append(state_container)
+        return dict(deleted_states)
+
+    @staticmethod
+    def _group_states_by_observable(state_containers: list[AbstractStateContainer]) -> dict[str, dict]:
+        """Return the changed states per observable name, key in the inner dictionary is the handle of a state."""
+        result = defaultdict(dict)
+        for state_container in state_containers:
+            if state_container.is_context_state:
+                result['context_by_handle'][state_container.Handle] = state_container
+                continue
+            if state_container.is_realtime_sample_array_metric_state:
+                observable_name = 'waveform_by_handle'
+            elif state_container.is_metric_state:
+                observable_name = 'metrics_by_handle'
+            elif state_container.is_alert_state:
+                observable_name = 'alert_by_handle'
+            elif state_container.is_operational_state:
+                observable_name = 'operation_by_handle'
+            else:
+                observable_name = 'component_by_handle'
+            result[observable_name][state_container.DescriptorHandle] = state_container
+        return result
 
     def _retrieve_context_states(self):
         """Only called when context states are not included in GetMdib result."""
@@ -367,69 +714,81 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _update_from_states_report(
         self,
         report_type: str,
-        report: EpisodicMetricReport | EpisodicAlertReport | OperationInvokedReport | EpisodicComponentReport,
+        report: EpisodicMetricReport
+        | EpisodicAlertReport
+        | OperationInvokedReport
+        | EpisodicComponentReport
+        | LazyStatesReport,
     ) -> dict[str, AbstractStateContainer]:
-        """Update mdib with incoming states."""
+        """Update mdib with incoming states.
+
+        The state containers of a lazy report are only created for states that are used.
+        """
         states_by_handle = {}
-        for report_part in report.ReportPart:
-            for state_container in report_part.values_list:
-                src = self.states
-                old_state_container = src.descriptor_handle.get_one(state_container.DescriptorHandle, allow_none=True)
-                if old_state_container is not None:
-                    if self._has_new_state_usable_state_version(old_state_container, state_container, report_type):
-                        old_state_container.update_from_other_container(state_container)
-                        src.update_object(old_state_container)
-                        states_by_handle[old_state_container.DescriptorHandle] = old_state_container
-                else:
-                    self._logger.error(  # noqa: PLE1205
-                        '{}: got a new state {}',
-                        report_type,
-                        state_container.DescriptorHandle,
-                    )
-                    self._set_descriptor_container_reference(state_container)
-                    src.add_object(state_container)
-                    states_by_handle[state_container.DescriptorHandle] = state_container
+        src = self.states
+        for state in get_lazy_states(report):
+            old_state_container = src.descriptor_handle.get_one(state.DescriptorHandle, allow_none=True)
+            if old_state_container is not None:
+                if self._is_filtered_out(state):
+                    continue
+                if self._has_new_state_usable_state_version(old_state_container, state, report_type):
+                    old_state_container.update_from_other_container(state.container)
+                    src.update_object(old_state_container)
+                    states_by_handle[old_state_container.DescriptorHandle] = old_state_container
+            else:
+                self._logger.error(  # noqa: PLE1205
+                    '{}: got a new state {}',
+                    report_type,
+                    state.DescriptorHandle,
+                )
+                state_container = state.container
+                self._set_descriptor_container_reference(state_container)
+                src.add_object(state_container)
+                states_by_handle[state_container.DescriptorHandle] = state_container
         return states_by_handle
 
     def _update_from_context_states_report(
         self,
-        report: EpisodicContextReport,
+        report: EpisodicContextReport | LazyStatesReport,
     ) -> dict[str, AbstractContextStateContainer]:
         """Update mdib with incoming states."""
         states_by_handle = {}
-        for report_part in report.ReportPart:
-            for state_container in report_part.values_list:
-                src = self.context_states
-                old_state_container = src.handle.get_one(state_container.Handle, allow_none=True)
-                if old_state_container is not None:
-                    if self._has_new_state_usable_state_version(old_state_container, state_container, 'context states'):
-                        self._logger.info(  # noqa: PLE1205
-                            'updated context state: handle = {} Descriptor Handle={} Assoc={}, Validators={}',
-                            state_container.Handle,
-                            state_container.DescriptorHandle,
-                            state_container.ContextAssociation,
-                            state_container.Validator,
-                        )
-                        old_state_container.update_from_other_container(state_container)
-                        src.update_object(old_state_container)
-                        states_by_handle[old_state_container.DescriptorHandle] = old_state_container
-                else:
+        src = self.context_states
+        for state in get_lazy_states(report):
+            old_state_container = src.handle.get_one(state.Handle, allow_none=True)
+            if old_state_container is not None:
+                if self._is_filtered_out(state):
+                    continue
+                if self._has_new_state_usable_state_version(old_state_container, state, 'context states'):
+                    state_container = state.container
                     self._logger.info(  # noqa: PLE1205
-                        'new context state: handle = {} Descriptor Handle={} Assoc={}, Validators={}',
+                        'updated context state: handle = {} Descriptor Handle={} Assoc={}, Validators={}',
                         state_container.Handle,
                         state_container.DescriptorHandle,
                         state_container.ContextAssociation,
                         state_container.Validator,
                     )
-                    self._set_descriptor_container_reference(state_container)
-                    src.add_object(state_container)
-                    states_by_handle[state_container.Handle] = state_container
+                    old_state_container.update_from_other_container(state_container)
+                    src.update_object(old_state_container)
+                    states_by_handle[old_state_container.DescriptorHandle] = old_state_container
+            else:
+                state_container = state.container
+                self._logger.info(  # noqa: PLE1205
+                    'new context state: handle = {} Descriptor Handle={} Assoc={}, Validators={}',
+                    state_container.Handle,
+                    state_container.DescriptorHandle,
+                    state_container.ContextAssociation,
+                    state_container.Validator,
+                )
+                self._set_descriptor_container_reference(state_container)
+                src.add_object(state_container)
+                states_by_handle[state_container.Handle] = state_container
         return states_by_handle
 
     def _pre_check_report_ok(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: AbstractReport | list[RealTimeSampleArrayMetricStateContainer],
+        report: AbstractReport | LazyStatesReport | list[RealTimeSampleArrayMetricStateContainer],
         handler: Callable,
     ) -> bool:
         """Check if the report can be added to mdib.
@@ -453,7 +812,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_metric_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicMetricReport,
+        report: EpisodicMetricReport | LazyStatesReport,
     ):
         """Check mdib_version_group and process report it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, report, self._process_incoming_metric_states_report):
@@ -464,7 +823,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_metric_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicMetricReport,
+        report: EpisodicMetricReport | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -484,7 +843,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_alert_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicAlertReport,
+        report: EpisodicAlertReport | LazyStatesReport,
     ):
         """Check mdib_version_group and process report it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, report, self._process_incoming_alert_states_report):
@@ -495,7 +854,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_alert_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicAlertReport,
+        report: EpisodicAlertReport | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -515,7 +874,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_operational_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: OperationInvokedReport,
+        report: OperationInvokedReport | LazyStatesReport,
     ):
         """Check mdib_version_group and process report it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, report, self._process_incoming_operational_states_report):
@@ -526,7 +885,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_operational_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: OperationInvokedReport,
+        report: OperationInvokedReport | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -546,7 +905,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_context_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicContextReport,
+        report: EpisodicContextReport | LazyStatesReport,
     ):
         """Check mdib_version_group and process report it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, report, self._process_incoming_context_states_report):
@@ -557,7 +916,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_context_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicContextReport,
+        report: EpisodicContextReport | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -577,7 +936,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_component_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicComponentReport,
+        report: EpisodicComponentReport | LazyStatesReport,
     ):
         """Check mdib_version_group and process report it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, report, self._process_incoming_component_states_report):
@@ -588,7 +947,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_component_states_report(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        report: EpisodicComponentReport,
+        report: EpisodicComponentReport | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -608,7 +967,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def process_incoming_waveform_states(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        state_containers: list[RealTimeSampleArrayMetricStateContainer],
+        state_containers: list[RealTimeSampleArrayMetricStateContainer] | LazyStatesReport,
     ) -> dict[str, RealTimeSampleArrayMetricStateContainer] | None:
         """Check mdib_version_group and process state_containers it if okay."""
         if not self._pre_check_report_ok(mdib_version_group, state_containers, self._process_incoming_waveform_states):
@@ -619,7 +978,7 @@ class ConsumerMdib(mdibbase.MdibBase):
     def _process_incoming_waveform_states(
         self,
         mdib_version_group: MdibVersionGroupReader,
-        state_containers: list[RealTimeSampleArrayMetricStateContainer],
+        state_containers: list[RealTimeSampleArrayMetricStateContainer] | LazyStatesReport,
     ):
         """Check mdib version.
 
@@ -632,25 +991,28 @@ class ConsumerMdib(mdibbase.MdibBase):
         try:
             if self._can_accept_mdib_version(mdib_version_group.mdib_version, 'waveform states'):
                 self._update_from_mdib_version_group(mdib_version_group)
-                for state_container in state_containers:
+                for state in get_lazy_states(state_containers):
                     old_state_container = self.states.descriptor_handle.get_one(
-                        state_container.DescriptorHandle,
+                        state.DescriptorHandle,
                         allow_none=True,
                     )
                     if old_state_container is not None:
+                        if self._is_filtered_out(state):
+                            continue
                         if self._has_new_state_usable_state_version(
                             old_state_container,
-                            state_container,
+                            state,
                             'waveform states',
                         ):
-                            old_state_container.update_from_other_container(state_container)
+                            old_state_container.update_from_other_container(state.container)
                             self.states.update_object(old_state_container)
                             states_by_handle[old_state_container.DescriptorHandle] = old_state_container
                     else:
                         self._logger.error(  # noqa: PLE1205
                             'waveform states: got a new state {}',
-                            state_container.DescriptorHandle,
+                            state.DescriptorHandle,
                         )
+                        state_container = state.container
                         self._set_descriptor_container_reference(state_container)
                         self.states.add_object(state_container)
                         states_by_handle[state_container.DescriptorHandle] = state_container
@@ -671,8 +1033,7 @@ class ConsumerMdib(mdibbase.MdibBase):
                             max_samples=self._max_realtime_samples,
                         )
                         self.rt_buffers[d_handle] = rt_buffer
-                    rt_sample_containers = rt_buffer.mk_rt_sample_containers(state_container)
-                    rt_buffer.add_rt_sample_containers(rt_sample_containers)
+                    rt_buffer.add_rt_samples(state_container)
         finally:
             self.waveform_by_handle = states_by_handle  # update observable
 
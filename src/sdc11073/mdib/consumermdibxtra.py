@@ -11,13 +11,21 @@ from typing import TYPE_CHECKING, Callable, ClassVar
 
 from sdc11073 import observableproperties as properties
 from sdc11073.exceptions import ApiUsageError
+from sdc11073.mdib.waveformpool import OrderedWaveformPipeline
+from sdc11073.xml_types.lazy_reports import LazyStatesReport
 
 if TYPE_CHECKING:
     from sdc11073.loghelper import LoggerAdapter
     from sdc11073.pysoap.msgreader import ReceivedMessage
+    from sdc11073.xml_types.msg_types import AbstractReport
 
     from .consumermdib import ConsumerMdib
-    from .statecontainers import AbstractMetricStateContainer, AbstractStateProtocol
+    from .statecontainers import (
+        AbstractMetricStateContainer,
+        AbstractStateProtocol,
+        RealTimeSampleArrayMetricStateContainer,
+    )
+    from .waveformpool import WaveformProcessPool
 
 
 
@@ -166,6 +174,8 @@ class ConsumerMdibMethods:
     """Extra methods for consumer mdib tht are not core functionality."""
 
     DETERMINATIONTIME_WARN_LIMIT = 1.0  # in seconds
+    # if True, state reports are read as LazyStatesReport: only states that are used in the mdib are parsed
+    LAZY_REPORTS = True
 
     def __init__(self, consumer_mdib: ConsumerMdib, logger: LoggerAdapter):
         self._mdib = consumer_mdib
@@ -179,11 +189,37 @@ class ConsumerMdibMethods:
             self.prof = cProfile.Profile()
         self._age_statistics = {}
         self._calculate_wf_age_stats = False
+        self._waveform_pipeline: OrderedWaveformPipeline | None = None
 
     def set_calculate_wf_age_stats(self, shall_calculate: bool):
         """Switch calculation of statistice on or off."""
         self._calculate_wf_age_stats = shall_calculate
 
+    def set_waveform_pool(self, pool: WaveformProcessPool | None):
+        """Decode waveform streams in the worker processes of pool, or in the receiving thread if pool is None.
+
+        Decoded waveform streams are processed in the order in which they were received.
+        """
+        if self._waveform_pipeline is not None:
+            self._waveform_pipeline.stop()
+        if pool is None:
+            self._waveform_pipeline = None
+            return
+        self._waveform_pipeline = OrderedWaveformPipeline(pool,
+                                                          self._mdib.data_model.msg_types.WaveformStream,
+                                                          self._on_decoded_waveform_report,
+                                                          self._on_waveform_report_in_thread,
+                                                          self._sdc_client.log_prefix)
+
+    def flush_waveform_pool(self, timeout: float | None = None) -> bool:
+        """Wait until all waveform streams that are decoded in the waveform pool are processed.
+
+        :return: True if all waveform streams are processed, False on timeout
+        """
+        if self._waveform_pipeline is None:
+            return True
+        return self._waveform_pipeline.flush(timeout)
+
     def wait_metric_matches(self, handle: str,
                             matches_func: Callable[[AbstractMetricStateContainer], bool],
                             timeout: float) -> AbstractMetricStateContainer:
@@ -267,6 +303,12 @@ class ConsumerMdibMethods:
                 if obj.Handle not in devices_context_state_handles:
                     self._mdib.context_states.remove_object_no_lock(obj)
 
+    def _read_states_report(self, cls: type[AbstractReport],
+                            received_message_data: ReceivedMessage) -> AbstractReport | LazyStatesReport:
+        if self.LAZY_REPORTS:
+            return LazyStatesReport(cls, received_message_data.p_msg.msg_node)
+        return cls.from_node(received_message_data.p_msg.msg_node)
+
     def bind_to_client_observables(self):
         """Connect the mdib with the notifications from consumer."""
         if PROFILING:
@@ -283,7 +325,7 @@ class ConsumerMdibMethods:
     def _on_episodic_metric_report(self, received_message_data: ReceivedMessage):
         model = self._mdib.data_model
         cls = model.msg_types.EpisodicMetricReport
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
         self._mdib.process_incoming_metric_states_report(received_message_data.mdib_version_group, report)
 
         if not self._mdib.is_initialized:
@@ -292,36 +334,40 @@ class ConsumerMdibMethods:
         # generate warnings if age of states is out of accepted range
         age_logger = AgeLogger(self.metric_time_warner, self.DETERMINATIONTIME_WARN_LIMIT,
                                'EpisodicMetricReport', self._mdib.mdib_version)
-        for report_part in report.ReportPart:
-            for state_container in report_part.values_list:
-                desc_h = state_container.DescriptorHandle
-                if state_container.MetricValue is not None:
-                    # BICEPS: While Validity is "Ong" or "NA", the enclosing METRIC value SHALL not possess a
-                    # determined value.
-                    # Also ignore determination time if measurement is invalid or not active.
-                    if state_container.ActivationState == model.pm_types.ComponentActivation.ON and \
-                            state_container.MetricValue.MetricQuality.Validity not in [
-                        model.pm_types.MeasurementValidity.INVALID,
-                        model.pm_types.MeasurementValidity.NA,
-                        model.pm_types.MeasurementValidity.MEASUREMENT_ONGOING]:
-                        determination_time = state_container.MetricValue.DeterminationTime
-                        if determination_time is None:
-                            self._logger.warning(  # noqa: PLE1205
-                                'EpisodicMetricReport: metric {} version {} has no DeterminationTime',
-                                desc_h, state_container.StateVersion)
-                        else:
-                            age_logger.add_determination_time(determination_time)
+        if isinstance(report, LazyStatesReport):
+            # only the states that were used in the mdib, no need to parse the others
+            state_containers = report.parsed_containers()
+        else:
+            state_containers = [st for report_part in report.ReportPart for st in report_part.values_list]
+        for state_container in state_containers:
+            desc_h = state_container.DescriptorHandle
+            if state_container.MetricValue is not None:
+                # BICEPS: While Validity is "Ong" or "NA", the enclosing METRIC value SHALL not possess a
+                # determined value.
+                # Also ignore determination time if measurement is invalid or not active.
+                if state_container.ActivationState == model.pm_types.ComponentActivation.ON and \
+                        state_container.MetricValue.MetricQuality.Validity not in [
+                    model.pm_types.MeasurementValidity.INVALID,
+                    model.pm_types.MeasurementValidity.NA,
+                    model.pm_types.MeasurementValidity.MEASUREMENT_ONGOING]:
+                    determination_time = state_container.MetricValue.DeterminationTime
+                    if determination_time is None:
+                        self._logger.warning(  # noqa: PLE1205
+                            'EpisodicMetricReport: metric {} version {} has no DeterminationTime',
+                            desc_h, state_container.StateVersion)
+                    else:
+                        age_logger.add_determination_time(determination_time)
 
         age_logger.log_age_warnings(self._logger)
 
     def _on_episodic_alert_report(self, received_message_data: ReceivedMessage):
         cls = self._mdib.data_model.msg_types.EpisodicAlertReport
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
         self._mdib.process_incoming_alert_states_report(received_message_data.mdib_version_group, report)
 
     def _on_operational_state_report(self, received_message_data: ReceivedMessage):
         cls = self._mdib.data_model.msg_types.EpisodicOperationalStateReport
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
         self._mdib.process_incoming_operational_states_report(received_message_data.mdib_version_group, report)
 
     def _on_waveform_report_profiled(self, received_message_data: ReceivedMessage):
@@ -342,12 +388,31 @@ class ConsumerMdibMethods:
 
     def _on_waveform_report(self, received_message_data: ReceivedMessage):
         """Handle waveform report."""
+        pipeline = self._waveform_pipeline
+        if pipeline is None:
+            self._on_waveform_report_in_thread(received_message_data)
+        else:
+            pipeline.submit(received_message_data)
+
+    def _on_waveform_report_in_thread(self, received_message_data: ReceivedMessage):
         cls = self._mdib.data_model.msg_types.WaveformStream
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
+        # a lazy report is passed as it is, the mdib parses only the states that it uses
+        states = report if isinstance(report, LazyStatesReport) else report.State
         if self._calculate_wf_age_stats:
-            self._process_wf_age_statistics(report.State)
+            self._process_wf_age_statistics(report.ReportPart[0].values_list if states is report else states)
+        self._process_waveform_states(received_message_data, states)
+
+    def _on_decoded_waveform_report(self, received_message_data: ReceivedMessage,
+                                    states: list[RealTimeSampleArrayMetricStateContainer]):
+        if self._calculate_wf_age_stats:
+            self._process_wf_age_statistics(states)
+        self._process_waveform_states(received_message_data, states)
+
+    def _process_waveform_states(self, received_message_data: ReceivedMessage,
+                                 states: list[RealTimeSampleArrayMetricStateContainer] | LazyStatesReport):
         accepted_states = self._mdib.process_incoming_waveform_states(received_message_data.mdib_version_group,
-                                                                      report.State)
+                                                                      states)
 
         if accepted_states is None or len(accepted_states) == 0 or not self._mdib.is_initialized:
             return
@@ -355,9 +420,9 @@ class ConsumerMdibMethods:
         waveform_age = {}  # collect age of all waveforms in this report, and make one report if age is above warn limit (instead of multiple)
         now = time.time()
         for state_container in accepted_states.values():
-            rt_sample_containers = self._mdib.rt_buffers[state_container.DescriptorHandle].rt_data
-            if len(rt_sample_containers) > 0:
-                waveform_age[state_container.DescriptorHandle] = now - rt_sample_containers[-1].determination_time
+            last_determination_time = self._mdib.rt_buffers[state_container.DescriptorHandle].last_determination_time
+            if last_determination_time is not None:
+                waveform_age[state_container.DescriptorHandle] = now - last_determination_time
 
         if len(waveform_age) > 0:
             min_age = min(waveform_age.values())
@@ -392,7 +457,7 @@ class ConsumerMdibMethods:
     def _on_episodic_context_report(self, received_message_data: ReceivedMessage):
         """Handle episodic context report."""
         cls = self._mdib.data_model.msg_types.EpisodicContextReport
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
         self._mdib.process_incoming_context_states_report(received_message_data.mdib_version_group, report)
 
     def _on_episodic_component_report(self, received_message_data: ReceivedMessage):
@@ -403,7 +468,7 @@ class ConsumerMdibMethods:
         Components are MDSs, VMDs, Channels. Not metrics and alarms.
         """
         cls = self._mdib.data_model.msg_types.EpisodicComponentReport
-        report = cls.from_node(received_message_data.p_msg.msg_node)
+        report = self._read_states_report(cls, received_message_data)
         self._mdib.process_incoming_component_states_report(received_message_data.mdib_version_group, report)
 
     def _on_description_modification_report(self, received_message_data: ReceivedMessage):
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import copy
-import inspect
 from typing import Any
 
 from lxml import etree
@@ -11,6 +10,8 @@ from lxml import etree
 from sdc11073 import observableproperties as properties
 from sdc11073 import xml_utils
 from sdc11073.namespaces import QN_TYPE, NamespaceHelper
+from sdc11073.xml_types import xml_codec
+from sdc11073.xml_types.xml_structure import copy_mutable_values, freeze_values, get_property_table, shallow_copy
 
 
 class ContainerBase:
@@ -20,6 +21,7 @@ class ContainerBase:
     node = properties.ObservableProperty()
     is_state_container = False
     is_descriptor_container = False
+    _frozen = False  # see freeze
 
     # every class with container properties must provide a list of property names.
     # this list is needed to create sub elements in a certain order.
@@ -29,8 +31,12 @@ class ContainerBase:
 
     def __init__(self):
         self.node = None  # set in update_from_node
-        for _, cprop in self.sorted_container_properties():
-            cprop.init_instance_data(self)
+        self._cached_node = None  # (cache_key, node), see get_cached_node
+        if xml_codec.USE_COMPILED_CODECS:
+            xml_codec.get_codec(self.__class__).init(self)
+            return
+        for init_instance_data in get_property_table(self.__class__).init_plan:
+            init_instance_data(self)
 
     def get_actual_value(self, attr_name: str) -> Any:
         """Ignore default value and implied value, e.g. return None if value is not present in XML."""
@@ -75,46 +81,93 @@ class ContainerBase:
         """
         if set_xsi_type and self.NODETYPE is not None:
             node.set(QN_TYPE, ns_helper.doc_name_from_qname(self.NODETYPE))
-        for _, prop in self.sorted_container_properties():
-            prop.update_xml_value(self, node)
+        if xml_codec.USE_COMPILED_CODECS:
+            xml_codec.get_codec(self.__class__).emit(self, node)
+        else:
+            for update_xml_value in get_property_table(self.__class__).serializer_plan:
+                update_xml_value(self, node)
         return node
 
+    def get_cached_node(self, cache_key: tuple) -> xml_utils.LxmlElement | None:
+        """Return a copy of the cached node if it was cached with the same key, otherwise None.
+
+        The cache key contains the versions of the container, a changed version invalidates the cached node.
+        """
+        cached = self._cached_node
+        if cached is not None and cached[0] == cache_key:
+            return copy.deepcopy(cached[1])
+        return None
+
+    def set_cached_node(self, cache_key: tuple, node: xml_utils.LxmlElement):
+        """Keep a copy of node (including all namespaces in scope) for later calls with the same cache_key.
+
+        Nodes of containers that write the current time are not cached.
+        """
+        if get_property_table(self.__class__).is_time_dependent:
+            return
+        self._cached_node = (cache_key, xml_utils.copy_node_wo_parent(node))
+
     def update_from_node(self, node: xml_utils.LxmlElement):
         """Update members from node."""
-        for _, cprop in self.sorted_container_properties():
-            cprop.update_from_node(self, node)
+        if xml_codec.USE_COMPILED_CODECS:
+            xml_codec.get_codec(self.__class__).parse(self, node)
+        else:
+            for update_from_node in get_property_table(self.__class__).deserializer_plan:
+                update_from_node(self, node)
         self.node = node
 
     def _update_from_other(self, other_container: ContainerBase, skipped_properties: list[str] | None):
         """Update all ContainerProperties."""
         if skipped_properties is None:
             skipped_properties = []
-        for prop_name, _ in self.sorted_container_properties():
+        for prop_name in get_property_table(self.__class__).names:
             if prop_name not in skipped_properties:
                 new_value = getattr(other_container, prop_name)
                 setattr(self, prop_name, copy.copy(new_value))
 
+    def freeze(self):
+        """Make the container read-only.
+
+        A frozen container can be shared, e.g. by the mdib, notifications and periodic reports.
+        Setting a property of a frozen container or of one of its values (e.g. MetricValue.Value) raises
+        an ApiUsageError.
+        """
+        self._frozen = True
+        freeze_values(self)
+
+    @property
+    def is_frozen(self) -> bool:
+        """Return True if container is read-only."""
+        return self._frozen
+
     def mk_copy(self, copy_node: bool = False) -> ContainerBase:
-        """Make a copy of self."""
+        """Make a copy of self.
+
+        The copy shares the property values with self, except if self is frozen (copy-on-write):
+        then the copy gets its own mutable values (e.g. a MetricValue) and can be modified.
+        """
+        if self._frozen:
+            return self.mk_writable_copy(copy_node)
         copied = copy.copy(self)
         if copy_node and self.node is not None:
             copied.node = xml_utils.copy_element(self.node)
         return copied
 
-    def sorted_container_properties(self) -> list:
-        """Return a list of (name, object) tuples of all GenericProperties (and subclasses).
+    def mk_writable_copy(self, copy_node: bool = False) -> ContainerBase:
+        """Make a copy of self that does not share mutable property values with self.
+
+        This is much cheaper than copy.deepcopy, because immutable values and the descriptor are not copied.
+        """
+        copied = shallow_copy(self)
+        copied.__dict__.pop('_frozen', None)
+        copy_mutable_values(copied)
+        if copy_node and self.node is not None:
+            copied.node = xml_utils.copy_element(self.node)
+        return copied
+
+    def sorted_container_properties(self) -> tuple:
+        """Return a tuple of (name, object) tuples of all GenericProperties (and subclasses).
 
-        Base class properties are first.
+        Base class properties are first. The tuple is created once per class.
         """
-        ret = []
-        all_classes = inspect.getmro(self.__class__)
-        for cls in reversed(all_classes):
-            try:
-                names = cls.__dict__['_props']
-            except KeyError:
-                continue
-            for name in names:
-                obj = getattr(cls, name)
-                if obj is not None:
-                    ret.append((name, obj))
-        return ret
+        return get_property_table(self.__class__).properties
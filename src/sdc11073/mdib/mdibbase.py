@@ -2,18 +2,19 @@
 
 from __future__ import annotations
 
-import copy
 import traceback
 import uuid
+from collections import defaultdict
 from dataclasses import dataclass
 from threading import RLock
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from lxml import etree
 
 from sdc11073 import multikey
 from sdc11073 import observableproperties as properties
 from sdc11073.etc import apply_map
+from sdc11073.mdib.descriptorcontainers import sorted_child_data
 from sdc11073.mdib.entityprotocol import EntityGetterProtocol, EntityProtocol
 
 if TYPE_CHECKING:
@@ -64,6 +65,163 @@ class _MultikeyWithVersionLookup(multikey.MultiKeyLookup):
         super().remove_objects_no_lock(objects)
 
 
+class ChildDescriptor(NamedTuple):
+    """A child descriptor and the tag name and xsi:type flag of its element in the parent (see DescriptorTree)."""
+
+    descriptor: AbstractDescriptorContainer
+    tag: etree.QName | None  # None if node type of descriptor is not declared in parent or parent is unknown
+    set_xsi_type: bool
+
+
+class DescriptorTree:
+    """Parent-child relations of all descriptors in a DescriptorsLookup.
+
+    DescriptorsLookup updates the tree when descriptors are added, updated or removed.
+    Child lists in BICEPS schema order and ancestor chains are computed on first access and cached until
+    the tree changes at that place, children can be added before their parent.
+    """
+
+    def __init__(self, lock: RLock):
+        self._lock = lock
+        self._descriptors: dict[str, AbstractDescriptorContainer] = {}
+        self._parent_handles: dict[str, str | None] = {}
+        self._child_handles: dict[str | None, dict[str, None]] = defaultdict(dict)  # dict keeps insertion order
+        self._children: dict[str | None, list[ChildDescriptor]] = {}  # cache
+        self._ancestors: dict[str, tuple[str, ...]] = {}  # cache
+
+    def add(self, descriptor_container: AbstractDescriptorContainer):
+        """Add descriptor_container to tree."""
+        handle = descriptor_container.Handle
+        parent_handle = descriptor_container.parent_handle
+        self._descriptors[handle] = descriptor_container
+        self._parent_handles[handle] = parent_handle
+        self._child_handles[parent_handle][handle] = None
+        self._children.pop(parent_handle, None)
+        self._ancestors.pop(handle, None)
+        if handle in self._child_handles:  # children were added before, their ancestor chains are incomplete
+            self._children.pop(handle, None)
+            self._ancestors.clear()
+
+    def remove(self, descriptor_container: AbstractDescriptorContainer):
+        """Remove descriptor_container from tree, its children stay in the tree."""
+        handle = descriptor_container.Handle
+        if self._descriptors.get(handle) is not descriptor_container:
+            return
+        del self._descriptors[handle]
+        parent_handle = self._parent_handles.pop(handle)
+        siblings = self._child_handles[parent_handle]
+        del siblings[handle]
+        if not siblings:
+            del self._child_handles[parent_handle]
+        self._children.pop(parent_handle, None)
+        self._ancestors.pop(handle, None)
+        if handle in self._child_handles:
+            self._children.pop(handle, None)
+            self._ancestors.clear()
+
+    def update(self, descriptor_container: AbstractDescriptorContainer):
+        """Update tree if parent_handle of descriptor_container changed."""
+        if self._parent_handles.get(descriptor_container.Handle) != descriptor_container.parent_handle:
+            self.remove(descriptor_container)
+            self.add(descriptor_container)
+            self._ancestors.clear()  # ancestors of all descendants changed
+
+    def clear(self):
+        """Remove all descriptors from tree."""
+        self._descriptors.clear()
+        self._parent_handles.clear()
+        self._child_handles.clear()
+        self._children.clear()
+        self._ancestors.clear()
+
+    def child_descriptors(self, handle: str | None) -> list[ChildDescriptor]:
+        """Return the children of handle in BICEPS schema order, with tag name and xsi:type flag.
+
+        Children of the same tag name are in insertion order.
+        :param handle: handle of parent, None returns the root descriptors (mds)
+        """
+        with self._lock:
+            children = self._children.get(handle)
+            if children is None:
+                children = self._mk_child_descriptors(handle)
+                self._children[handle] = children
+            return children
+
+    def _mk_child_descriptors(self, handle: str | None) -> list[ChildDescriptor]:
+        descriptors = [self._descriptors[h] for h in self._child_handles.get(handle, ())]
+        parent = self._descriptors.get(handle)
+        if parent is None:
+            return [ChildDescriptor(descriptor, None, False) for descriptor in descriptors]
+        children = []
+        for descriptor in descriptors:
+            try:
+                tag, set_xsi_type = parent.tag_name_for_child_descriptor(descriptor.NODETYPE)
+            except ValueError:
+                tag, set_xsi_type = None, False
+            children.append(ChildDescriptor(descriptor, tag, set_xsi_type))
+        positions = {q_name: i for i, q_name in enumerate(sorted_child_data(parent, '_child_elements_order'))}
+        children.sort(key=lambda child: positions.get(child.tag, len(positions)))  # stable sort
+        return children
+
+    def children(self, handle: str | None) -> list[AbstractDescriptorContainer]:
+        """Return the child descriptors of handle in BICEPS schema order."""
+        return [child.descriptor for child in self.child_descriptors(handle)]
+
+    def ancestors(self, handle: str) -> tuple[str, ...]:
+        """Return the handles of parent, grandparent, ... of handle, the last one is the root (mds).
+
+        The chain ends at the first parent that is not in the tree.
+        Raises a KeyError if handle is not in the tree.
+        """
+        with self._lock:
+            ancestors = self._ancestors.get(handle)
+            if ancestors is None:
+                parent_handle = self._parent_handles[handle]
+                if parent_handle is None:
+                    ancestors = ()
+                elif parent_handle in self._parent_handles:
+                    ancestors = (parent_handle, *self.ancestors(parent_handle))
+                else:
+                    ancestors = (parent_handle,)
+                self._ancestors[handle] = ancestors
+            return ancestors
+
+    def mds_handle(self, handle: str) -> str | None:
+        """Return the handle of the mds that contains handle.
+
+        Returns None if handle is not in the tree or if the chain of ancestors is incomplete.
+        """
+        with self._lock:
+            if handle not in self._parent_handles:
+                return None
+            ancestors = self.ancestors(handle)
+            root_handle = ancestors[-1] if ancestors else handle
+            return root_handle if self._parent_handles.get(root_handle, '') is None else None
+
+    def descendants(self, handle: str, depth_first: bool = True) -> list[AbstractDescriptorContainer]:
+        """Return all descriptors below handle as a flat list.
+
+        :param handle: handle of the root descriptor
+        :param depth_first: determines order of returned list.
+               If depth_first=True result has all leaves on top, otherwise at the end.
+        :return: a list of DescriptorContainer objects.
+        """
+        result = []
+
+        def _get_children(parent_handle: str):
+            child_containers = self.children(parent_handle)
+            if not depth_first:
+                result.extend(child_containers)
+            for child in child_containers:
+                _get_children(child.Handle)
+            if depth_first:
+                result.extend(child_containers)
+
+        with self._lock:
+            _get_children(handle)
+        return result
+
+
 class DescriptorsLookup(_MultikeyWithVersionLookup):
     """DescriptorsLookup is the table-like storage for descriptors.
 
@@ -75,6 +233,7 @@ class DescriptorsLookup(_MultikeyWithVersionLookup):
        AlertDescriptor objects, not LimitAlertDescriptor!
      - condition_signaled is the index for descriptor.ConditionSignaled, it finds only AlertSignalDescriptors.
      - source is the index for descriptor.Source, it finds only AlertConditionDescriptors.
+    Additionally, tree is a DescriptorTree that provides children in schema order, ancestors and mds of a handle.
     """
 
     handle: multikey.UIndexDefinition[str, list[AbstractDescriptorContainer]]
@@ -95,6 +254,7 @@ class DescriptorsLookup(_MultikeyWithVersionLookup):
         # an index to find all alert conditions for a metric (AlertCondition is the only class that has a
         # "Source" attribute, therefore this simple approach without type testing is sufficient):
         self.add_index('source', multikey.IndexDefinition1n(lambda obj: obj.Source, index_none_values=False))
+        self.tree = DescriptorTree(self._lock)
 
     def _save_version(self, obj: AbstractDescriptorContainer):
         self.handle_version_lookup[obj.Handle] = obj.DescriptorVersion
@@ -113,6 +273,7 @@ class DescriptorsLookup(_MultikeyWithVersionLookup):
     def add_object_no_lock(self, obj: AbstractDescriptorContainer):
         """Append object without locking."""
         super().add_object_no_lock(obj)
+        self.tree.add(obj)
 
     def add_objects(self, objects: list[AbstractDescriptorContainer]):
         """Append objects with locking."""
@@ -134,6 +295,7 @@ class DescriptorsLookup(_MultikeyWithVersionLookup):
     def remove_object_no_lock(self, obj: AbstractDescriptorContainer):
         """Remove object from table without locking."""
         super().remove_object_no_lock(obj)
+        self.tree.remove(obj)
 
     def remove_objects(self, objects: list[AbstractDescriptorContainer]):
         """Remove objects from table with locking."""
@@ -144,6 +306,31 @@ class DescriptorsLookup(_MultikeyWithVersionLookup):
         """Remove objects from table without locking."""
         apply_map(self.remove_object_no_lock, objects)
 
+    def update_object(self, obj: AbstractDescriptorContainer):
+        """Update indices according to current values in obj."""
+        with self._lock:
+            self.update_object_no_lock(obj)
+
+    def update_object_no_lock(self, obj: AbstractDescriptorContainer):
+        """Update indices according to current values in obj without using lock."""
+        super().update_object_no_lock(obj)
+        self.tree.update(obj)
+
+    def update_objects(self, objects: list[AbstractDescriptorContainer]):
+        """Update indices according to current values in objects."""
+        with self._lock:
+            self.update_objects_no_lock(objects)
+
+    def update_objects_no_lock(self, objects: list[AbstractDescriptorContainer]):
+        """Update indices according to current values in objects without using lock."""
+        apply_map(self.update_object_no_lock, objects)
+
+    def clear(self):
+        """Remove all objects from table."""
+        with self._lock:
+            super().clear()
+            self.tree.clear()
+
 
 class StatesLookup(_MultikeyWithVersionLookup):
     """StatesLookup is the table-like storage for states.
@@ -326,11 +513,23 @@ class EntityGetter(EntityGetterProtocol):
             return [self._mk_entity(d) for d in descriptors]
 
     def _mk_entity(self, descriptor: AbstractDescriptorContainer) -> Entity | MultiStateEntity:
+        # the entity gets copies that do not share mutable data with the mdib
+        descriptor_copy = descriptor.mk_writable_copy()
         if descriptor.is_context_descriptor:
             states = self._mdib.context_states.descriptor_handle.get(descriptor.Handle, [])
-            return MultiStateEntity(self._mdib, copy.deepcopy(descriptor), copy.deepcopy(states))
+            return MultiStateEntity(self._mdib, descriptor_copy,
+                                    [self._mk_entity_state(state, descriptor_copy) for state in states])
         state = self._mdib.states.descriptor_handle.get_one(descriptor.Handle)
-        return Entity(self._mdib, copy.deepcopy(descriptor), copy.deepcopy(state))
+        return Entity(self._mdib, descriptor_copy, self._mk_entity_state(state, descriptor_copy))
+
+    @staticmethod
+    def _mk_entity_state(state: AbstractStateContainer | None,
+                         descriptor: AbstractDescriptorContainer) -> AbstractStateContainer | None:
+        if state is None:
+            return None
+        copied = state.mk_writable_copy()
+        copied.descriptor_container = descriptor
+        return copied
 
     def items(self) -> Sequence[tuple[str, Entity | MultiStateEntity]]:
         """Return the items of a dictionary."""
@@ -343,7 +542,13 @@ class EntityGetter(EntityGetterProtocol):
 
 
 class MdibBase:
-    """Base class with common functionality of provider mdib and consumer mdib."""
+    """Base class with common functionality of provider mdib and consumer mdib.
+
+    If CACHE_CONTAINER_NODES is True, the reconstruct methods keep the node of every container and reuse a copy
+    of it as long as DescriptorVersion and StateVersion of the container are unchanged.
+    """
+
+    CACHE_CONTAINER_NODES = True
 
     # these observables can be used to watch any change of data in the mdib.
     # They contain lists of containers that were changed.
@@ -479,7 +684,7 @@ class MdibBase:
         """Build dom tree of descriptors from current data."""
         pm = self.data_model.pm_names
         doc_nsmap = self.nsmapper.ns_map
-        root_containers = self.descriptions.parent_handle.get(None) or []
+        root_containers = self.descriptions.tree.children(None)
         md_description_node = etree.Element(
             pm.MdDescription,
             attrib={'DescriptionVersion': str(self.mddescription_version)},
@@ -509,13 +714,20 @@ class MdibBase:
             if set_xsi_type
             else self.nsmapper.partial_map(self.nsmapper.PM)
         )
-        node = etree.SubElement(parent_node, tag, attrib={'Handle': descriptor_container.Handle}, nsmap=ns_map)
-        descriptor_container.update_node(node, self.nsmapper, set_xsi_type)  # create all
-        child_list = self.descriptions.parent_handle.get(descriptor_container.Handle, [])
+        cache_key = (tag, set_xsi_type, descriptor_container.DescriptorVersion)
+        node = descriptor_container.get_cached_node(cache_key) if self.CACHE_CONTAINER_NODES else None
+        if node is None:
+            node = etree.SubElement(parent_node, tag, attrib={'Handle': descriptor_container.Handle}, nsmap=ns_map)
+            descriptor_container.update_node(node, self.nsmapper, set_xsi_type)  # create all
+            if self.CACHE_CONTAINER_NODES:
+                descriptor_container.set_cached_node(cache_key, node)
+        else:
+            parent_node.append(node)
         # append all child containers, then bring all child elements in correct order
-        for child in child_list:
-            child_tag, set_xsi = descriptor_container.tag_name_for_child_descriptor(child.NODETYPE)
-            self.make_descriptor_node(child, node, child_tag, set_xsi)
+        for child in self.descriptions.tree.child_descriptors(descriptor_container.Handle):
+            if child.tag is None:  # node type is not declared in parent, this raises a ValueError
+                descriptor_container.tag_name_for_child_descriptor(child.descriptor.NODETYPE)
+            self.make_descriptor_node(child.descriptor, node, child.tag, child.set_xsi_type)
         descriptor_container.sort_child_nodes(node)
         return node
 
@@ -544,12 +756,22 @@ class MdibBase:
         )
         tag = pm.State
         for state_container in self.states.objects:
-            md_state_node.append(state_container.mk_state_node(tag, self.nsmapper))
+            md_state_node.append(self._mk_state_node(state_container, tag))
         if add_context_states:
             for state_container in self.context_states.objects:
-                md_state_node.append(state_container.mk_state_node(tag, self.nsmapper))
+                md_state_node.append(self._mk_state_node(state_container, tag))
         return mdib_node
 
+    def _mk_state_node(self, state_container: AbstractStateContainer, tag: etree.QName) -> xml_utils.LxmlElement:
+        if not self.CACHE_CONTAINER_NODES:
+            return state_container.mk_state_node(tag, self.nsmapper)
+        cache_key = (tag, state_container.StateVersion, state_container.DescriptorVersion)
+        node = state_container.get_cached_node(cache_key)
+        if node is None:
+            node = state_container.mk_state_node(tag, self.nsmapper)
+            state_container.set_cached_node(cache_key, node)
+        return node
+
     def reconstruct_md_description(self) -> (xml_utils.LxmlElement, MdibVersionGroup):
         """Build dom tree of descriptors from current data."""
         with self.mdib_lock:
@@ -586,21 +808,12 @@ class MdibBase:
         :param include_root: if True descriptor_container itself is also part of returned list
         :return: a list of DescriptorContainer objects.
         """
-        result = []
-
-        def _getchildren(parent: AbstractDescriptorContainer):
-            child_containers = self.descriptions.parent_handle.get(parent.Handle, [])
-            if not depth_first:
-                result.extend(child_containers)
-            apply_map(_getchildren, child_containers)
+        result = self.descriptions.tree.descendants(root_descriptor_container.Handle, depth_first)
+        if include_root:
             if depth_first:
-                result.extend(child_containers)
-
-        if include_root and not depth_first:
-            result.append(root_descriptor_container)
-        _getchildren(root_descriptor_container)
-        if include_root and depth_first:
-            result.append(root_descriptor_container)
+                result.append(root_descriptor_container)
+            else:
+                result.insert(0, root_descriptor_container)
         return result
 
     def rm_descriptors_and_states(self, descriptor_containers: list[AbstractDescriptorContainer]):
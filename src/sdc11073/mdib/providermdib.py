@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import copy
+import time
 import uuid
 from collections import defaultdict
 from collections.abc import Callable
 from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from threading import Lock
+from threading import Condition, Lock
 from typing import TYPE_CHECKING, Any
 
 from sdc11073 import loghelper
@@ -35,6 +38,47 @@ if TYPE_CHECKING:
 TransactionFactory = Callable[[mdibbase.MdibBase, TransactionType, LoggerAdapter], AnyTransactionManagerProtocol]
 
 
+@dataclass
+class LockHoldTime:
+    """Statistics of the time that transactions of one type held the mdib lock."""
+
+    count: int = 0
+    total: float = 0.0  # seconds
+    max: float = 0.0  # seconds
+
+    @property
+    def avg(self) -> float:
+        """Return the average lock hold time in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+
+class _PublishSequencer:
+    """Lets threads publish their transactions in the order of their tickets."""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._next_ticket = 0
+        self._current_ticket = 0
+
+    def mk_ticket(self) -> int:
+        """Return the next ticket, must be called while the transaction lock is held."""
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        return ticket
+
+    @contextmanager
+    def turn(self, ticket: int) -> AbstractContextManager[None]:
+        """Wait until all transactions with lower tickets are published."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._current_ticket == ticket)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._current_ticket += 1
+                self._condition.notify_all()
+
+
 class ProviderEntityGetter(mdibbase.EntityGetter):
     """Implementation of ProviderEntityGetterProtocol."""
 
@@ -73,8 +117,13 @@ class ProviderMdib(mdibbase.MdibBase):
 
     Do not modify containers directly, use transactions for that purpose.
     Transactions keep track of changes and initiate sending of update notifications to clients.
+    If PUBLISH_OUTSIDE_LOCK is True, a transaction is committed while the mdib lock is held, and the observables
+    (that send the notifications) are updated after the lock is released. Transactions are still published
+    in the order of their commits.
     """
 
+    PUBLISH_OUTSIDE_LOCK = True
+
     transaction: TransactionResultProtocol | None = ObservableProperty(fire_only_on_changed_value=False)
     rt_updates = ObservableProperty(fire_only_on_changed_value=False)  # different observable for performance
 
@@ -105,6 +154,8 @@ class ProviderMdib(mdibbase.MdibBase):
             extra_functionality = ProviderMdibMethods
         self._xtra = extra_functionality(self)
         self._tr_lock = Lock()  # transaction lock
+        self._publish_sequencer = _PublishSequencer()  # keeps the order of published transactions
+        self._lock_hold_times: dict[TransactionType, LockHoldTime] = defaultdict(LockHoldTime)
 
         self.sequence_id = uuid.uuid4().urn  # this uuid identifies this mdib instance
 
@@ -124,13 +175,16 @@ class ProviderMdib(mdibbase.MdibBase):
         return self._xtra
 
     @contextmanager
-    def _transaction_manager(  # noqa: C901, PLR0912
+    def _transaction_manager(
         self,
         transaction_type: TransactionType,
         set_determination_time: bool = True,
     ) -> AbstractContextManager[AnyTransactionManagerProtocol]:
         """Start a transaction, return a new transaction manager."""
+        transaction_result = None
+        ticket = None
         with self._tr_lock, self.mdib_lock:
+            start = time.perf_counter()
             try:
                 self.current_transaction = self._transaction_factory(self, transaction_type, self.logger)
                 yield self.current_transaction
@@ -140,39 +194,63 @@ class ProviderMdib(mdibbase.MdibBase):
                 if self.current_transaction.error:
                     self._logger.info('transaction_manager: transaction without updates!')
                 else:
-                    # update observables
                     transaction_result = self.current_transaction.process_transaction(set_determination_time)
-                    self.transaction = transaction_result
-
-                    if transaction_result.alert_updates:
-                        self.alert_by_handle = {st.DescriptorHandle: st for st in transaction_result.alert_updates}
-                    if transaction_result.comp_updates:
-                        self.component_by_handle = {st.DescriptorHandle: st for st in transaction_result.comp_updates}
-                    if transaction_result.ctxt_updates:
-                        self.context_by_handle = {st.Handle: st for st in transaction_result.ctxt_updates}
-                    if transaction_result.descr_created:
-                        self.new_descriptors_by_handle = {
-                            descr.Handle: descr for descr in transaction_result.descr_created
-                        }
-                    if transaction_result.descr_deleted:
-                        self.deleted_descriptors_by_handle = {
-                            descr.Handle: descr for descr in transaction_result.descr_deleted
-                        }
-                    if transaction_result.descr_updated:
-                        self.updated_descriptors_by_handle = {
-                            descr.Handle: descr for descr in transaction_result.descr_updated
-                        }
-                    if transaction_result.metric_updates:
-                        self.metrics_by_handle = {st.DescriptorHandle: st for st in transaction_result.metric_updates}
-                    if transaction_result.op_updates:
-                        self.operation_by_handle = {st.DescriptorHandle: st for st in transaction_result.op_updates}
-                    if transaction_result.rt_updates:
-                        self.waveform_by_handle = {st.DescriptorHandle: st for st in transaction_result.rt_updates}
-
-                    if callable(self.post_commit_handler):
-                        self.post_commit_handler(self, self.current_transaction)
+                    transaction_result.mdib_version_group = self.mdib_version_group
+                    if self.PUBLISH_OUTSIDE_LOCK:
+                        if callable(self.post_commit_handler):
+                            self.post_commit_handler(self, self.current_transaction)
+                        ticket = self._publish_sequencer.mk_ticket()
+                    else:
+                        self._publish_transaction_result(transaction_result)
+                        if callable(self.post_commit_handler):
+                            self.post_commit_handler(self, self.current_transaction)
             finally:
                 self.current_transaction = None
+                self._add_lock_hold_time(transaction_type, time.perf_counter() - start)
+        if ticket is not None:
+            with self._publish_sequencer.turn(ticket):
+                self._publish_transaction_result(transaction_result)
+
+    def _publish_transaction_result(self, transaction_result: TransactionResultProtocol):
+        """Update observables."""
+        self.transaction = transaction_result
+
+        if transaction_result.alert_updates:
+            self.alert_by_handle = {st.DescriptorHandle: st for st in transaction_result.alert_updates}
+        if transaction_result.comp_updates:
+            self.component_by_handle = {st.DescriptorHandle: st for st in transaction_result.comp_updates}
+        if transaction_result.ctxt_updates:
+            self.context_by_handle = {st.Handle: st for st in transaction_result.ctxt_updates}
+        if transaction_result.descr_created:
+            self.new_descriptors_by_handle = {
+                descr.Handle: descr for descr in transaction_result.descr_created
+            }
+        if transaction_result.descr_deleted:
+            self.deleted_descriptors_by_handle = {
+                descr.Handle: descr for descr in transaction_result.descr_deleted
+            }
+        if transaction_result.descr_updated:
+            self.updated_descriptors_by_handle = {
+                descr.Handle: descr for descr in transaction_result.descr_updated
+            }
+        if transaction_result.metric_updates:
+            self.metrics_by_handle = {st.DescriptorHandle: st for st in transaction_result.metric_updates}
+        if transaction_result.op_updates:
+            self.operation_by_handle = {st.DescriptorHandle: st for st in transaction_result.op_updates}
+        if transaction_result.rt_updates:
+            self.waveform_by_handle = {st.DescriptorHandle: st for st in transaction_result.rt_updates}
+
+    def _add_lock_hold_time(self, transaction_type: TransactionType, duration: float):
+        # called while _tr_lock is held, no extra lock needed
+        hold_time = self._lock_hold_times[transaction_type]
+        hold_time.count += 1
+        hold_time.total += duration
+        hold_time.max = max(hold_time.max, duration)
+
+    def get_lock_hold_times(self) -> dict[TransactionType, LockHoldTime]:
+        """Return the time that transactions held the mdib lock, per transaction type."""
+        with self._tr_lock:
+            return copy.deepcopy(dict(self._lock_hold_times))
 
     @contextmanager
     def context_state_transaction(self) -> AbstractContextManager[ContextStateTransactionManagerProtocol]:
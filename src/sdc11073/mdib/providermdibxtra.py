@@ -186,11 +186,9 @@ class ProviderMdibMethods:
 
         This makes handling of SourceMds separation in messages less demanding on CPU.
         """
-        pm_qnames = self._mdib.data_model.pm_names
-        all_mds_descriptors = self._mdib.descriptions.NODETYPE.get(pm_qnames.MdsDescriptor)
-        for mds_descriptor in all_mds_descriptors:
-            for descr in self._mdib.get_all_descriptors_in_subtree(mds_descriptor):
-                descr.set_source_mds(mds_descriptor.Handle)
+        tree = self._mdib.descriptions.tree
+        for descr in self._mdib.descriptions.objects:
+            descr.set_source_mds(tree.mds_handle(descr.Handle))
 
     def get_mds_descriptor(self, container: AbstractDescriptorProtocol | AbstractStateProtocol) \
             -> AbstractDescriptorProtocol | None:
@@ -198,11 +196,16 @@ class ProviderMdibMethods:
         tmp = container
         if tmp.is_state_container:
             tmp = self._mdib.descriptions.handle.get_one(tmp.DescriptorHandle)
-        mds_descr = None
+        tree = self._mdib.descriptions.tree
         expected_type = self._mdib.data_model.pm_names.MdsDescriptor
-        while mds_descr is None:
+        while True:
             if tmp.NODETYPE == expected_type:  # noqa: SIM300
                 return tmp
+            # descriptors of the mdib are found in the tree, descriptors that are created in the current
+            # transaction are not, for them walk up until a parent is found in mdib.
+            mds_handle = tree.mds_handle(tmp.Handle)
+            if mds_handle is not None:
+                return self._mdib.descriptions.handle.get_one(mds_handle)
             parent_handle = tmp.parent_handle
             tmp = self._mdib.descriptions.handle.get_one(parent_handle, allow_none=True)
             if tmp is None:
@@ -211,7 +214,6 @@ class ProviderMdibMethods:
             if tmp is None:
                 msg = f'could not find mds descriptor for handle {container.Handle}'
                 raise KeyError(msg)
-        return None
 
     def set_source_mds(self, descriptor_container: AbstractDescriptorProtocol):
         """Find the parent mds for descriptor_container and set source mds of descriptor_container."""
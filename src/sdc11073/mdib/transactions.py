@@ -1,7 +1,6 @@
 """The module contains the implementations of transactions for ProviderMdib."""
 from __future__ import annotations
 
-import copy
 import time
 import uuid
 from typing import TYPE_CHECKING, cast
@@ -20,7 +19,7 @@ if TYPE_CHECKING:
     from sdc11073.loghelper import LoggerAdapter
 
     from .descriptorcontainers import AbstractDescriptorProtocol
-    from .mdibbase import Entity, MultiStateEntity
+    from .mdibbase import Entity, MdibVersionGroup, MultiStateEntity
     from .providermdib import ProviderMdib
     from .statecontainers import AbstractStateProtocol
 
@@ -42,7 +41,10 @@ class _TransactionBase:
         self._error = False
 
     def _handle_state_updates(self, state_updates_dict: dict) -> list[TransactionItem]:
-        """Update mdib table and return a list of states to be sent in notifications."""
+        """Update mdib table and return a list of states to be sent in notifications.
+
+        The new states are frozen, mdib table and notifications share the same objects.
+        """
         updates_list = []
         for transaction_item in state_updates_dict.values():
             if transaction_item.old is not None:
@@ -50,8 +52,9 @@ class _TransactionBase:
                 table.remove_object_no_lock(transaction_item.old)
             else:
                 table = self._mdib.context_states if transaction_item.new.is_context_state else self._mdib.states
+            transaction_item.new.freeze()
             table.add_object_no_lock(transaction_item.new)
-            updates_list.append(transaction_item.new.mk_copy(copy_node=False))
+            updates_list.append(transaction_item.new)
         return updates_list
 
     def get_state_transaction_item(self, handle: str) -> TransactionItem | None:
@@ -213,7 +216,7 @@ class DescriptorTransaction(_TransactionBase):
             msg = f'Entity {descriptor_handle} already in updated set!'
             raise ValueError(msg)
 
-        tmp_descriptor = copy.deepcopy(entity.descriptor)
+        tmp_descriptor = entity.descriptor.mk_writable_copy()
         orig_descriptor_container = self._mdib.descriptions.handle.get_one(descriptor_handle, allow_none=True)
 
         if adjust_version_counter:
@@ -231,7 +234,7 @@ class DescriptorTransaction(_TransactionBase):
             old_states = self._mdib.context_states.descriptor_handle.get(descriptor_handle, [])
             old_states_dict = {s.Handle: s for s in old_states}
             for state_container in entity.states.values():
-                tmp_state = copy.deepcopy(state_container)
+                tmp_state = state_container.mk_writable_copy()
                 old_state = old_states_dict.get(tmp_state.Handle) # can be None => new state
                 if adjust_version_counter:
                     tmp_state.DescriptorVersion = tmp_descriptor.DescriptorVersion
@@ -246,7 +249,7 @@ class DescriptorTransaction(_TransactionBase):
                 del_state = old_states_dict[handle]
                 self.context_state_updates[handle] = TransactionItem(del_state, None)
         else:
-            tmp_state = copy.deepcopy(entity.state)
+            tmp_state = entity.state.mk_writable_copy()
             tmp_state.descriptor_container = tmp_descriptor
             old_state = self._mdib.states.descriptor_handle.get_one(descriptor_handle, allow_none=True)
             if adjust_version_counter:
@@ -471,7 +474,7 @@ class StateTransactionBase(_TransactionBase):
 
         descriptor_handle = entity.state.DescriptorHandle
         old_state = self._mdib.states.descriptor_handle.get_one(entity.handle, allow_none=True)
-        tmp_state = copy.deepcopy(entity.state)
+        tmp_state = entity.state.mk_writable_copy()
         if adjust_version_counter:
             descriptor_container = self._mdib.descriptions.handle.get_one(descriptor_handle)
             tmp_state.DescriptorVersion = descriptor_container.DescriptorVersion
@@ -758,7 +761,7 @@ class ContextStateTransaction(_TransactionBase):
             if not state_container.is_context_state:
                 raise ApiUsageError('Transaction only handles context states!')
 
-            tmp = copy.deepcopy(state_container)
+            tmp = state_container.mk_writable_copy()
 
             if old_state is None:
                 # this is a new state
@@ -802,6 +805,7 @@ class TransactionResult:
         self.ctxt_updates = []
         self.op_updates = []
         self.rt_updates = []
+        self.mdib_version_group: MdibVersionGroup | None = None  # set when the transaction is committed
 
     @property
     def has_descriptor_updates(self) -> bool:
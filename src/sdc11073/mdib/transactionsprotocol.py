@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 
     from .descriptorcontainers import AbstractDescriptorProtocol
     from .entityprotocol import EntityProtocol, EntityTypeProtocol, MultiStateEntityProtocol
+    from .mdibbase import MdibVersionGroup
 
 class TransactionType(Enum):
     """The different kinds of transactions.
@@ -48,6 +49,7 @@ class TransactionResultProtocol(Protocol): # pragma: no cover
 
     has_descriptor_updates: bool
     new_mdib_version: int
+    mdib_version_group: MdibVersionGroup | None
 
     def all_states(self) -> list[AbstractStateProtocol]:
         """Return all states in this transaction."""
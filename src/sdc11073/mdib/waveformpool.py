@@ -0,0 +1,256 @@
+"""Decode waveform streams in worker processes.
+
+Parsing the samples of a WaveformStream is the most expensive part of waveform handling in a consumer,
+and it runs in the thread that received the notification.
+With a WaveformProcessPool the samples are parsed in worker processes instead:
+A worker reads the complete soap message, converts the Samples attributes of all states to float64 values
+and writes them into one shared memory block. It returns the report without the Samples attributes,
+which is small and fast to parse, and the number of samples per state.
+The consumer process copies the samples from shared memory into compact sample arrays (see SampleListConverter)
+of the state containers.
+
+A WaveformProcessPool can be shared by many consumers. Every consumer mdib has its own OrderedWaveformPipeline,
+it hands over the decoded reports in the order in which they were received, that keeps the order of mdib versions.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from threading import Condition, Thread
+from typing import TYPE_CHECKING
+
+from lxml import etree
+
+from sdc11073 import loghelper
+from sdc11073.namespaces import default_ns_helper
+from sdc11073.xml_types.dataconverters import SampleListConverter
+from sdc11073.xml_types.lazy_reports import LazyStatesReport
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sdc11073.mdib.statecontainers import RealTimeSampleArrayMetricStateContainer
+    from sdc11073.pysoap.msgreader import ReceivedMessage
+    from sdc11073.xml_types.msg_types import WaveformStream
+
+_SAMPLE_SIZE = array('d').itemsize
+_BODY = default_ns_helper.S12.tag('Body')
+_METRIC_VALUE = default_ns_helper.PM.tag('MetricValue')
+_SAMPLES = 'Samples'
+
+
+@dataclass(frozen=True)
+class DecodedWaveformStream:
+    """Result of decode_waveform_stream.
+
+    report_xml is the WaveformStream without Samples attributes.
+    sample_counts contains the number of samples of every state in document order, -1 if a state has no samples.
+    The samples of all states are in shared memory block shm_name (None if there are no samples).
+    """
+
+    report_xml: bytes
+    sample_counts: tuple[int, ...]
+    shm_name: str | None
+
+
+def decode_waveform_stream(message: bytes) -> DecodedWaveformStream:
+    """Decode the samples of a WaveformStream soap message, this runs in a worker process.
+
+    :param message: the received soap message
+    :return: DecodedWaveformStream
+    """
+    doc_root = etree.fromstring(message, parser=etree.XMLParser(resolve_entities=False))
+    report_node = doc_root.find(_BODY)[0]
+    converter = SampleListConverter()
+    sample_arrays = []
+    sample_counts = []
+    for state_node in report_node:
+        metric_value_node = state_node.find(_METRIC_VALUE)
+        samples = None if metric_value_node is None else metric_value_node.attrib.pop(_SAMPLES, None)
+        if samples is None:
+            sample_counts.append(-1)
+        else:
+            sample_array = converter.list_to_py(samples)
+            sample_arrays.append(sample_array)
+            sample_counts.append(len(sample_array))
+    report_xml = etree.tostring(report_node)
+    total_count = sum(len(sample_array) for sample_array in sample_arrays)
+    if total_count == 0:
+        return DecodedWaveformStream(report_xml, tuple(sample_counts), None)
+    shm = shared_memory.SharedMemory(create=True, size=total_count * _SAMPLE_SIZE)
+    # the consumer process unlinks the memory, the resource tracker of this process shall not do it.
+    resource_tracker.unregister(shm._name, 'shared_memory')  # noqa: SLF001
+    offset = 0
+    for sample_array in sample_arrays:
+        size = len(sample_array) * _SAMPLE_SIZE
+        shm.buf[offset:offset + size] = sample_array.tobytes()
+        offset += size
+    shm.close()
+    return DecodedWaveformStream(report_xml, tuple(sample_counts), shm.name)
+
+
+def _copy_samples(buffer: memoryview, offset: int, count: int) -> array:
+    samples = array('d')
+    samples.frombytes(buffer[offset * _SAMPLE_SIZE:(offset + count) * _SAMPLE_SIZE])
+    if SampleListConverter.USE_NUMPY:
+        return SampleListConverter.mk_sample_array(samples)
+    return samples
+
+
+def read_decoded_waveform_stream(
+    report_class: type[WaveformStream],
+    decoded: DecodedWaveformStream,
+) -> list[RealTimeSampleArrayMetricStateContainer]:
+    """Create the state containers of a decoded WaveformStream and release the shared memory.
+
+    :param report_class: the WaveformStream class of the data model
+    :param decoded: result of decode_waveform_stream
+    :return: list of state containers, samples are compact sample arrays.
+    """
+    if decoded.shm_name is None:
+        return [state.container for state in
+                LazyStatesReport(report_class, etree.fromstring(decoded.report_xml)).states()]
+    shm = shared_memory.SharedMemory(name=decoded.shm_name)
+    try:
+        # inside try: the shared memory must also be released if the report cannot be read
+        states = LazyStatesReport(report_class, etree.fromstring(decoded.report_xml)).states()
+        containers = []
+        offset = 0
+        for state, count in zip(states, decoded.sample_counts, strict=True):
+            container = state.container
+            if count >= 0:
+                container.MetricValue.Samples = _copy_samples(shm.buf, offset, count)
+                offset += count
+            containers.append(container)
+        return containers
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class WaveformProcessPool:
+    """A pool of worker processes that decode waveform streams, it can be shared by many consumers."""
+
+    def __init__(self, max_workers: int | None = None, mp_context: multiprocessing.context.BaseContext | None = None):
+        """Construct a WaveformProcessPool.
+
+        :param max_workers: number of worker processes, default is number of cpus
+        :param mp_context: multiprocessing context, default is 'spawn'
+                           (forking a process with running threads is not safe).
+        """
+        if mp_context is None:
+            mp_context = multiprocessing.get_context('spawn')
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+
+    def submit(self, message: bytes) -> Future:
+        """Decode message in a worker process, result of the future is a DecodedWaveformStream."""
+        return self._executor.submit(decode_waveform_stream, message)
+
+    def shutdown(self, wait: bool = True):
+        """Stop all worker processes."""
+        self._executor.shutdown(wait=wait)
+
+
+class OrderedWaveformPipeline:
+    """Decode waveform streams of one provider in a WaveformProcessPool, keep the order of received messages.
+
+    Decoded reports are handed over to the handler in the same order as they were submitted,
+    even if workers finish in a different order.
+    If decoding fails in the worker, the message is handed over to the fallback handler instead.
+    Handlers are called in a thread of the pipeline, so that a slow handler does not delay the result handling
+    of the (shared) pool.
+    """
+
+    def __init__(self,
+                 pool: WaveformProcessPool,
+                 report_class: type[WaveformStream],
+                 handler: Callable[[ReceivedMessage, list[RealTimeSampleArrayMetricStateContainer]], None],
+                 fallback_handler: Callable[[ReceivedMessage], None],
+                 log_prefix: str = ''):
+        """Construct an OrderedWaveformPipeline.
+
+        :param pool: the WaveformProcessPool
+        :param report_class: the WaveformStream class of the data model
+        :param handler: called with received message and decoded state containers
+        :param fallback_handler: called with received message if decoding in the worker failed
+        :param log_prefix: prefix for log messages
+        """
+        self._pool = pool
+        self._report_class = report_class
+        self._handler = handler
+        self._fallback_handler = fallback_handler
+        self._pending: deque[tuple[ReceivedMessage, Future]] = deque()
+        self._condition = Condition()
+        self._is_running = True
+        self._logger = loghelper.get_logger_adapter('sdc.client.mdib.wf_pool', log_prefix)
+        self._thread = Thread(target=self._run, name='wf_pipeline', daemon=True)
+        self._thread.start()
+
+    def submit(self, received_message_data: ReceivedMessage):
+        """Decode the waveform stream in the pool."""
+        future = self._pool.submit(received_message_data.p_msg.raw_data)
+        with self._condition:
+            self._pending.append((received_message_data, future))
+        future.add_done_callback(self._on_done)
+
+    def pending_count(self) -> int:
+        """Return the number of submitted messages that have not been handled yet."""
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until all submitted messages have been handled.
+
+        :return: True if all messages are handled, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+
+    def stop(self):
+        """Stop the thread of the pipeline after all submitted messages have been handled."""
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+
+    def _on_done(self, _: Future):
+        # runs in the result handling thread of the pool, only wake up the thread of the pipeline
+        with self._condition:
+            self._condition.notify_all()
+
+    def _has_work(self) -> bool:
+        if self._pending:
+            return self._pending[0][1].done()
+        return not self._is_running
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(self._has_work)
+                if not self._pending:  # stopped
+                    return
+                received_message_data, future = self._pending[0]
+            self._handle(received_message_data, future)  # does not raise
+            with self._condition:
+                self._pending.popleft()
+                self._condition.notify_all()
+
+    def _handle(self, received_message_data: ReceivedMessage, future: Future):
+        try:
+            state_containers = read_decoded_waveform_stream(self._report_class, future.result())
+        except Exception as ex:  # noqa: BLE001
+            self._logger.warning('decoding of waveform stream failed: {}, parsing it in this process',  # noqa: PLE1205
+                                 ex)
+            try:
+                self._fallback_handler(received_message_data)
+            except Exception:
+                self._logger.exception('waveform fallback handler failed')
+            return
+        try:
+            self._handler(received_message_data, state_containers)
+        except Exception:
+            self._logger.exception('waveform handler failed')
@@ -36,11 +36,43 @@ if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
 
 
+class _Bucket:
+    """All objects of an index that have the same key.
+
+    Objects are kept in insertion order and are identified by id, adding and removing is O(1).
+    The list representation is created on demand and cached until the bucket changes.
+    """
+
+    __slots__ = ('_list', '_objects')
+
+    def __init__(self, obj: Any):
+        self._objects = {id(obj): obj}
+        self._list = None
+
+    def add(self, obj: Any):
+        self._objects[id(obj)] = obj
+        self._list = None
+
+    def discard(self, obj: Any):
+        if self._objects.pop(id(obj), None) is not None:
+            self._list = None
+
+    def as_list(self) -> list[Any]:
+        if self._list is None:
+            self._list = list(self._objects.values())
+        return self._list
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+
 class IndexDefinition(dict):
     """An index allows to group objects by values.
 
     This is a dictionary that has lists of objects as value.
     Each list contains objects that have the same key member.
+    Internally the objects are kept in buckets that allow O(1) removal;
+    get, __getitem__, values and items return lists.
     """
 
     def __init__(self, get_key_func: Callable[[Any], Any], index_none_values: bool = True):
@@ -76,40 +108,56 @@ class IndexDefinition(dict):
                 raise ValueError(msg)
             return result[0]
 
-    def get(self, *args: Any, **kwargs: Any) -> list[Any] | None:
+    def get(self, key: Any, default: Any = None) -> list[Any] | None:
         """Overwritten get method that uses lock."""
         with self._lock:
-            return super().get(*args, **kwargs)
+            bucket = super().get(key)
+            if bucket is None:
+                return default
+            return bucket.as_list()
 
     def __getitem__(self, key: Any) -> list[Any] | None:
         """Overwritten __getitem__ method that uses lock."""
         with self._lock:
-            return super().__getitem__(key)
+            return super().__getitem__(key).as_list()
+
+    def values(self) -> list[list[Any]]:
+        """Overwritten values method that uses lock."""
+        with self._lock:
+            return [bucket.as_list() for bucket in super().values()]
+
+    def items(self) -> list[tuple[Any, list[Any]]]:
+        """Overwritten items method that uses lock."""
+        with self._lock:
+            return [(key, bucket.as_list()) for key, bucket in super().items()]
 
     def set_lock(self, lock: RLock):
         """Set the lock to be used."""
         self._lock = lock
 
+    def _add(self, key: Any, obj: Any):
+        bucket = super().get(key)
+        if bucket is None:
+            super().__setitem__(key, _Bucket(obj))
+        else:
+            bucket.add(obj)
+
     def mk_keys(self, obj: Any) -> list[Any] | None:
         """Determine key for obj and add it to list in self[key]."""
         key = self._get_key_func(obj)
         if not self._index_none_values and key is None:
             return None
-        try:
-            self[key].append(obj)
-        except KeyError:
-            self[key] = [obj]
+        self._add(key, obj)
         return [key]
 
     def rm_key(self, key: Any, obj: Any):
         """Remove obj from list self[key]."""
-        try:
-            obj_list = self[key]
-            obj_list.remove(obj)
-            if len(obj_list) == 0:
-                del self[key]
-        except (KeyError, ValueError):
-            pass
+        bucket = super().get(key)
+        if bucket is None:
+            return
+        bucket.discard(obj)
+        if len(bucket) == 0:
+            super().__delitem__(key)
 
 
 class UIndexDefinition(IndexDefinition):
@@ -131,7 +179,7 @@ class UIndexDefinition(IndexDefinition):
             if k in self:
                 msg = f'key "{k}" in already in this UIndex'
                 raise KeyError(msg)
-            self[k] = [obj]
+            self._add(k, obj)
         return keys
 
 
@@ -144,10 +192,7 @@ class IndexDefinition1n(IndexDefinition):
         if not self._index_none_values and keys is None:
             return None
         for k in keys:
-            try:
-                self[k].append(obj)
-            except KeyError:  # noqa: PERF203
-                self[k] = [obj]
+            self._add(k, obj)
         return keys
 
 
@@ -0,0 +1,147 @@
+"""Parallel delivery of notifications with a bounded worker pool and one outbound queue per subscription."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from sdc11073.flowcontrol import BackpressurePolicy
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sdc11073.loghelper import LoggerAdapter
+
+
+class NotificationDeliveryEngine:
+    """Deliver notifications in a bounded pool of worker threads.
+
+    Every subscription has its own outbound queue. A queue is processed by at most one worker at a time,
+    therefore the order of notifications per subscription is kept.
+    A worker sends one notification and then re-schedules the queue, so that a slow subscriber
+    can not starve the other subscribers as long as there are free workers.
+    """
+
+    def __init__(
+        self,
+        send_notification: Callable[[Any, Any, str], None],
+        max_workers: int,
+        max_queue_size: int,
+        policy: BackpressurePolicy,
+        logger: LoggerAdapter,
+    ):
+        """Construct a NotificationDeliveryEngine.
+
+        :param send_notification: called by workers with (subscription, body, action)
+        :param max_workers: max. number of parallel send operations
+        :param max_queue_size: max. number of queued notifications per subscription
+        :param policy: what to do if a queue is full
+        :param logger: a logger
+        """
+        self._send_notification = send_notification
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._logger = logger
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='notification_delivery')
+        self._queues: dict[Any, deque] = {}  # key is subscription; an entry exists while a worker is scheduled.
+        self._cond = threading.Condition()
+        self._running = True
+
+    def enqueue(self, subscription: Any, body: Any, action: str):
+        """Add a notification to the outbound queue of the subscription."""
+        entry = (body, action, time.perf_counter())
+        with self._cond:
+            if not self._running:
+                return
+            queue = self._queues.get(subscription)
+            if queue is None:
+                self._queues[subscription] = deque((entry,))
+                subscription.queue_depth = 1
+                self._executor.submit(self._process_queue, subscription)
+                return
+            if len(queue) >= self._max_queue_size:
+                queue = self._make_room(subscription, queue)
+                if queue is None:
+                    return
+            queue.append(entry)
+            subscription.queue_depth = len(queue)
+
+    def _make_room(self, subscription: Any, queue: deque) -> deque | None:
+        """Apply backpressure policy.
+
+        :return: the queue where the new entry shall be appended, None if the new entry shall be discarded.
+        """
+        if self._policy == BackpressurePolicy.BLOCK:
+            while True:
+                self._cond.wait()
+                if not self._running:
+                    return None
+                # while waiting, a worker can have removed the empty queue and another producer can have
+                # created a new one, always use the current queue.
+                queue = self._queues.get(subscription)
+                if queue is None:
+                    queue = deque()
+                    self._queues[subscription] = queue
+                    self._executor.submit(self._process_queue, subscription)
+                    return queue
+                if len(queue) < self._max_queue_size:
+                    return queue
+        if self._policy == BackpressurePolicy.DROP_NEWEST:
+            subscription.dropped_notifications += 1
+            return None
+        queue.popleft()
+        subscription.dropped_notifications += 1
+        return queue
+
+    def _process_queue(self, subscription: Any):
+        """Send the oldest notification of the subscription's queue, re-schedule if there are more."""
+        with self._cond:
+            queue = self._queues.get(subscription)
+            if not queue:
+                self._queues.pop(subscription, None)
+                subscription.queue_depth = 0
+                return
+            body, action, enqueued = queue.popleft()
+            subscription.queue_depth = len(queue)
+            self._cond.notify_all()
+        if subscription.is_closed() or not subscription.is_valid:
+            with self._cond:
+                queue.clear()
+                self._queues.pop(subscription, None)
+                subscription.queue_depth = 0
+                self._cond.notify_all()
+            return
+        try:
+            self._send_notification(subscription, body, action)
+        except Exception as ex:  # noqa: BLE001
+            # details are already logged by send_notification, the worker must survive.
+            self._logger.warning('notification {} not delivered to {}: {!r}', action, subscription, ex)  # noqa: PLE1205
+        subscription.add_delivery_latency(time.perf_counter() - enqueued)
+        with self._cond:
+            if not self._running:
+                return
+            if queue:
+                self._executor.submit(self._process_queue, subscription)
+            else:
+                self._queues.pop(subscription, None)
+                self._cond.notify_all()
+
+    def queued_notifications_count(self) -> int:
+        """Return the sum of all queued notifications."""
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def stop(self):
+        """Discard all queued notifications and wait until running send operations are finished."""
+        with self._cond:
+            self._running = False
+            for subscription, queue in self._queues.items():
+                queue.clear()
+                subscription.queue_depth = 0
+            self._queues.clear()
+            self._cond.notify_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._logger.info('notification delivery stopped')
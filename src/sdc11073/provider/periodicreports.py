@@ -9,6 +9,11 @@ from sdc11073.loghelper import get_logger_adapter
 PeriodicStates = namedtuple('PeriodicStates', 'mdib_version states')
 
 
+def _mk_snapshot(state):
+    """Frozen states are shared, other states are copied."""
+    return state if state.is_frozen else state.mk_copy()
+
+
 class PeriodicReportsNullHandler:
     def __init__(self):
         """Do nothing"""
@@ -93,7 +98,7 @@ class PeriodicReportsHandler:
         self._store_for_periodic_report(mdib_version, state_updates, self._periodic_operational_state_reports)
 
     def _store_for_periodic_report(self, mdib_version, state_updates, destination_list):
-        copied_updates = [s.mk_copy() for s in state_updates]
+        copied_updates = [_mk_snapshot(s) for s in state_updates]
         with self._periodic_reports_lock:
             destination_list.append(PeriodicStates(mdib_version, copied_updates))
 
@@ -167,16 +172,17 @@ class PeriodicReportsHandler:
 
             with self._mdib.mdib_lock:
                 mdib_version = self._mdib.mdib_version
-                metric_states = [self._mdib.states.descriptor_handle.get_one(h).mk_copy() for h in metrics]
-                component_states = [self._mdib.states.descriptor_handle.get_one(h).mk_copy() for h in components]
-                alert_states = [self._mdib.states.descriptor_handle.get_one(h).mk_copy() for h in alerts]
-                operational_states = [self._mdib.states.descriptor_handle.get_one(h).mk_copy() for h in operationals]
+                states_by_handle = self._mdib.states.descriptor_handle
+                metric_states = [_mk_snapshot(states_by_handle.get_one(h)) for h in metrics]
+                component_states = [_mk_snapshot(states_by_handle.get_one(h)) for h in components]
+                alert_states = [_mk_snapshot(states_by_handle.get_one(h)) for h in alerts]
+                operational_states = [_mk_snapshot(states_by_handle.get_one(h)) for h in operationals]
                 context_states = []
                 for context in contexts:
                     print(
                         f'context.Handle {context} = {len(self._mdib.context_states.descriptor_handle.get(context, []))} states')
                     context_states.extend(
-                        [st.mk_copy() for st in self._mdib.context_states.descriptor_handle.get(context, [])])
+                        [_mk_snapshot(st) for st in self._mdib.context_states.descriptor_handle.get(context, [])])
             self._logger.debug('   _periodic_reports_send_loop {} metric_states', len(metric_states))
             self._logger.debug('   _periodic_reports_send_loop {} component_states', len(component_states))
             self._logger.debug('   _periodic_reports_send_loop {} alert_states', len(alert_states))
@@ -1,3 +1,6 @@
+import time
+from threading import Lock
+
 from .porttypebase import DPWSPortTypeBase, WSDLMessageDescription, WSDLOperationBinding, mk_wsdl_two_way_operation
 from .porttypebase import msg_prefix
 from sdc11073.dispatch import DispatchKey
@@ -22,6 +25,15 @@ class GetService(DPWSPortTypeBase):
     WSDLOperationBindings = (WSDLOperationBinding('GetMdState', 'literal', 'literal'),
                              WSDLOperationBinding('GetMdib', 'literal', 'literal'),
                              WSDLOperationBinding('GetMdDescription', 'literal', 'literal'),)
+    # if True, the serialized body of a GetMdibResponse is reused for all requests at the same mdib version,
+    # but not longer than MDIB_RESPONSE_MAX_AGE seconds (the body contains the current time of clock states).
+    SHARE_MDIB_RESPONSE = True
+    MDIB_RESPONSE_MAX_AGE = 1.0
+
+    def __init__(self, sdc_device, log_prefix=None):
+        super().__init__(sdc_device, log_prefix)
+        self._mdib_response_lock = Lock()
+        self._mdib_response_cache = None  # tuple(cache_key, SerializedBody, creation time)
 
     def register_hosting_service(self, hosting_service):
         super().register_hosting_service(hosting_service)
@@ -80,6 +92,27 @@ class GetService(DPWSPortTypeBase):
 
     def _on_get_mdib(self, request_data):
         self._logger.debug('_on_get_mdib')
+        if not self.SHARE_MDIB_RESPONSE:
+            response, _ = self._mk_get_mdib_response()
+            return self._sdc_device.msg_factory.mk_reply_soap_message(request_data, response)
+        with self._mdib_response_lock:
+            # identical requests at the same mdib version share one serialized response body
+            cache_key = self._mk_mdib_response_cache_key(self._mdib.mdib_version_group)
+            if (self._mdib_response_cache is None
+                    or self._mdib_response_cache[0] != cache_key
+                    or time.monotonic() - self._mdib_response_cache[2] > self.MDIB_RESPONSE_MAX_AGE):
+                response, mdib_version_group = self._mk_get_mdib_response()
+                nsh = self._data_model.ns_helper
+                ns_map = nsh.partial_map(nsh.MSG, nsh.PM, *response.additional_namespaces)
+                body = self._sdc_device.msg_factory.serialize_body(response.as_etree_node(response.NODETYPE, ns_map),
+                                                                   action=response.action)
+                self._mdib_response_cache = (self._mk_mdib_response_cache_key(mdib_version_group), body,
+                                             time.monotonic())
+            body = self._mdib_response_cache[1]
+        action = self._data_model.msg_types.GetMdibResponse.action
+        return self._sdc_device.msg_factory.mk_reply_spliced_message(request_data, action, body)
+
+    def _mk_get_mdib_response(self):
         if self._sdc_device.contextstates_in_getmdib:
             mdib_node, mdib_version_group = self._mdib.reconstruct_mdib_with_context_states()
         else:
@@ -87,8 +120,13 @@ class GetService(DPWSPortTypeBase):
         response = self._data_model.msg_types.GetMdibResponse()
         response.set_mdib_version_group(mdib_version_group)
         response.Mdib = mdib_node
-        response = self._sdc_device.msg_factory.mk_reply_soap_message(request_data, response)
-        return response
+        return response, mdib_version_group
+
+    def _mk_mdib_response_cache_key(self, mdib_version_group) -> tuple:
+        return (mdib_version_group.mdib_version,
+                mdib_version_group.sequence_id,
+                mdib_version_group.instance_id,
+                self._sdc_device.contextstates_in_getmdib)
 
     def _on_get_md_description(self, request_data):
         """
@@ -60,6 +60,7 @@ if TYPE_CHECKING:
 
     from lxml import etree
 
+    from sdc11073.httpserver.httpserverimpl_async import AsyncioHttpServerThread
     from sdc11073.location import SdcLocation
     from sdc11073.mdib.providermdibprotocol import ProviderMdibProtocol
     from sdc11073.mdib.statecontainers import AbstractStateProtocol
@@ -73,6 +74,7 @@ if TYPE_CHECKING:
     from sdc11073.provider.subscriptionmgr_base import SubscriptionManagerProtocol
     from sdc11073.pysoap.msgfactory import CreatedMessage
     from sdc11073.pysoap.soapenvelope import ReceivedSoapMessage
+    from sdc11073.pysoap.validationpolicy import ValidationPolicy
     from sdc11073.wsdiscovery.wsdiscoveryprotocols import WsDiscoveryProtocol
     from sdc11073.xml_types.msg_types import AbstractSet
     from sdc11073.xml_types.pm_types import InstanceIdentifier
@@ -100,6 +102,7 @@ class SdcProviderComponents:
     scopes_factory: Callable[[ProviderMdibProtocol], ScopesType]
     hosted_services: MutableMapping[str, Sequence[type[DPWSPortTypeBase]]]
     additional_schema_specs: set[PrefixNamespace] = dataclasses.field(default_factory=set)
+    http_server_class: type[HttpServerThreadBase | AsyncioHttpServerThread] | None = None  # None: HttpServerThreadBase
 
 
 @dataclasses.dataclass
@@ -191,7 +194,7 @@ class SdcProvider:
         this_device: ThisDeviceType,
         device_mdib_container: ProviderMdibProtocol,
         epr: str | uuid.UUID | None = None,
-        validate: bool = True,
+        validate: bool | ValidationPolicy = True,
         ssl_context_container: sdc11073.certloader.SSLContextContainer | None = None,
         max_subscription_duration: int = 15,
         socket_timeout: int | float | None = None,  # noqa: PYI041
@@ -209,7 +212,7 @@ class SdcProvider:
         :param device_mdib_container: a ProviderMdibProtocol instance
         :param epr: something that serves as a unique identifier of this device for discovery.
                     If epr is a string, it must be usable as a path element in an url (no spaces, ...)
-        :param validate: bool
+        :param validate: bool or a ValidationPolicy that is used by msg_reader and msg_factory
         :param ssl_context_container: if not None, the contexts are used and an https url is used, otherwise http
         :param max_subscription_duration: max. possible duration of a subscription
         :param socket_timeout: timeout for tcp sockets that send notifications.
@@ -579,7 +582,8 @@ class SdcProvider:
                     )
                     raise ValueError(msg)
 
-            self._http_server = HttpServerThreadBase(
+            http_server_class = self._components.http_server_class or HttpServerThreadBase
+            self._http_server = http_server_class(
                 my_ipaddress=self._wsdiscovery.active_address,
                 ssl_context=self._ssl_context_container.server_context if self._ssl_context_container else None,
                 supported_encodings=self._compression_methods,
@@ -650,7 +654,8 @@ class SdcProvider:
         return [f'{self._urlschema}://{addr}:{self._http_server.server_port}/{self.path_prefix}']
 
     def _send_episodic_reports(self, transaction_result: TransactionResultProtocol):
-        mdib_version_group = self._mdib.mdib_version_group
+        # the mdib version of the commit, the mdib can already have a newer version when reports are sent
+        mdib_version_group = transaction_result.mdib_version_group or self._mdib.mdib_version_group
         if transaction_result.has_descriptor_updates:
             port_type_impl = self.hosted_services.description_event_service
             updated = transaction_result.descr_updated
@@ -2,31 +2,41 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from sdc11073.flowcontrol import BackpressurePolicy
 from sdc11073.xml_types.addressing_types import HeaderInformationBlock
-from .subscriptionmgr_base import ActionBasedSubscription, SubscriptionsManagerBase
+from .notificationdelivery import NotificationDeliveryEngine
+from .subscriptionmgr_base import ActionBasedSubscription, DeliveryStats, SubscriptionsManagerBase
 from sdc11073 import observableproperties
 from sdc11073.httpserver.compression import CompressionHandler
+from sdc11073.pysoap.msgfactory import SerializedBody
 from sdc11073.pysoap.soapclient import HTTPReturnCodeError
 from sdc11073.xml_types import eventing_types as evt_types
 from sdc11073.xml_types.dpws_types import DeviceEventingFilterDialectURI
+from sdc11073.xml_types.eventing_types import STATE_FILTER_DIALECT
 
 if TYPE_CHECKING:
+    from sdc11073.definitions_base import BaseDefinitions
     from sdc11073.dispatch import RequestData
     from sdc11073 import xml_utils
+    from sdc11073.pysoap.msgfactory import MessageFactory
+    from sdc11073.pysoap.soapclientpool import SoapClientPool
 
 
 class BicepsSubscription(ActionBasedSubscription):
     """ This extends ActionBasedSubscription with the ability to send notifications.
     The class is used by ActionBasedSubscriptionsManager."""
 
-    def send_notification_report(self, body_node: xml_utils.LxmlElement, action: str):
+    def send_notification_report(self, body_node: xml_utils.LxmlElement | SerializedBody, action: str):
         if not self.is_valid:
             return
-        inf = HeaderInformationBlock(addr_to=self.notify_to_address,
-                                     action=action,
-                                     addr_from=None,
-                                     reference_parameters=self.notify_ref_params)
-        message = self._mk_notification_message(inf, body_node)
+        if isinstance(body_node, SerializedBody):
+            message = self._mk_spliced_notification_message(action, body_node)
+        else:
+            inf = HeaderInformationBlock(addr_to=self.notify_to_address,
+                                         action=action,
+                                         addr_from=None,
+                                         reference_parameters=self.notify_ref_params)
+            message = self._mk_notification_message(inf, body_node)
         try:
             soap_client = self._get_soap_client()
             roundtrip_timer = observableproperties.SingleValueCollector(soap_client, 'roundtrip_time')
@@ -51,24 +61,85 @@ class BicepsSubscription(ActionBasedSubscription):
 
 
 class ActionBasedSubscriptionsManager(SubscriptionsManagerBase):
-    """This is the synchronous version of the subscription manager for all BICEPS subscriptions."""
-    supported_filter_dialect = DeviceEventingFilterDialectURI.ACTION
+    """This is the synchronous version of the subscription manager for all BICEPS subscriptions.
+
+    If SERIALIZE_BODY_ONCE is True, the body of a notification is validated and serialized only once.
+    The resulting bytes are spliced into a pre-serialized envelope of each subscription.
+
+    If DELIVERY_WORKERS is > 0, notifications are not sent in the calling thread.
+    They are put into an outbound queue per subscription and sent by a pool of DELIVERY_WORKERS threads.
+    The order of notifications per subscription is kept, a slow subscriber does not delay the others.
+    DELIVERY_QUEUE_SIZE and DELIVERY_BACKPRESSURE define what happens if a subscriber is too slow.
+
+    With dialect STATE_FILTER_DIALECT a subscriber receives state reports only with the states of its StateFilter.
+    """
+    supported_filter_dialect = DeviceEventingFilterDialectURI.ACTION  # deprecated, use supported_filter_dialects
+    supported_filter_dialects = (DeviceEventingFilterDialectURI.ACTION, STATE_FILTER_DIALECT)
     subscription_cls = BicepsSubscription
+    SERIALIZE_BODY_ONCE = True
+    DELIVERY_WORKERS = 0  # 0 means notifications are sent in the calling thread, one subscriber after the other
+    DELIVERY_QUEUE_SIZE = 100
+    DELIVERY_BACKPRESSURE = BackpressurePolicy.DROP_OLDEST
+
+    def __init__(
+        self,
+        sdc_definitions: BaseDefinitions,
+        msg_factory: MessageFactory,
+        soap_client_pool: SoapClientPool,
+        max_subscription_duration: float | None = None,
+        log_prefix: str | None = None,
+    ):
+        super().__init__(sdc_definitions, msg_factory, soap_client_pool, max_subscription_duration, log_prefix)
+        self._delivery_engine = None
+        if self.DELIVERY_WORKERS > 0:
+            self._delivery_engine = NotificationDeliveryEngine(self._send_notification_report,
+                                                               self.DELIVERY_WORKERS,
+                                                               self.DELIVERY_QUEUE_SIZE,
+                                                               self.DELIVERY_BACKPRESSURE,
+                                                               self._logger)
 
     def _mk_subscription_instance(self, request_data: RequestData) -> ActionBasedSubscription:
         subscribe_request = evt_types.Subscribe.from_node(request_data.message_data.p_msg.msg_node)
         filter_type = subscribe_request.Filter
         if filter_type is None:
             raise ValueError(f'No filter provided for {self.__class__.__name__}')
-        if filter_type.Dialect != self.supported_filter_dialect:
+        if filter_type.Dialect not in self.supported_filter_dialects:
             raise ValueError(
-                f'Invalid filter dialect, got {filter_type.Dialect}, expect {self.supported_filter_dialect}')
+                f'Invalid filter dialect, got {filter_type.Dialect}, expect one of {self.supported_filter_dialects}')
 
         accepted_encodings = CompressionHandler.parse_header(request_data.http_header.get('Accept-Encoding'))
         return self.subscription_cls(self, subscribe_request, accepted_encodings, self.base_urls,
                                      self._max_subscription_duration, self._soap_client_pool,
                                      msg_factory=self._msg_factory, log_prefix=self._logger.log_prefix)
 
+    def _mk_notification_body(self, body_node: xml_utils.LxmlElement,
+                              action: str) -> xml_utils.LxmlElement | SerializedBody:
+        # queued delivery always needs the serialized body, a body node can not be shared between threads.
+        if self.SERIALIZE_BODY_ONCE or self._delivery_engine is not None:
+            return self._msg_factory.serialize_body(body_node, action=action)
+        return body_node
+
+    def _deliver_notification_report(self, subscription: BicepsSubscription,
+                                     body: xml_utils.LxmlElement | SerializedBody, action: str):
+        if self._delivery_engine is None:
+            self._send_notification_report(subscription, body, action)
+        else:
+            self._delivery_engine.enqueue(subscription, body, action)
+
+    def _end_all_subscriptions(self, send_subscription_end: bool):
+        if self._delivery_engine is not None:
+            self._delivery_engine.stop()
+        super()._end_all_subscriptions(send_subscription_end)
+
+    def get_subscription_delivery_stats(self) -> dict[tuple[str, tuple[str]], DeliveryStats]:
+        """Get queue depth, dropped notifications and delivery latencies of all subscriptions.
+
+        :return: a dictionary with key=(<notify_to_address>, (subscription_names)), value = DeliveryStats
+        """
+        with self._subscriptions.lock:
+            return {(s.notify_to_address, tuple(s.short_filter_names())): s.get_delivery_stats()
+                    for s in self._subscriptions.objects}
+
 
 class PathDispatchingSubscriptionsManager(ActionBasedSubscriptionsManager):
     """This implementation uses path dispatching to identify subscriptions."""
@@ -246,8 +246,17 @@ class BICEPSSubscriptionsManagerBaseAsync(SubscriptionsManagerBase):
 
             self.sent_to_subscribers = (action, mdib_version_group, body_node)  # update observable
             tasks = []
+            body_nodes = {}  # one body node per distinct state filter
+            receivers = []
             for subscriber in subscribers:
-                tasks.append(self._async_send_notification_report(subscriber, body_node, action))  # noqa: PERF401
+                state_filter = self._get_state_filter(subscriber, action)
+                if state_filter not in body_nodes:
+                    body_nodes[state_filter] = (body_node if state_filter is None
+                                                else state_filter.filter_report(body_node))
+                if body_nodes[state_filter] is not None:
+                    receivers.append(subscriber)
+                    tasks.append(self._async_send_notification_report(subscriber, body_nodes[state_filter], action))
+            subscribers = receivers
 
             self._logger.debug('sending report %s to %r', action, [s.notify_to_address for s in subscribers])
             result = self._async_send_thread.run_coro(self._coro_send_to_subscribers(tasks))
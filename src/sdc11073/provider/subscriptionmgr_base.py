@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import copy
 import http.client
 import time
 import uuid
 from collections import deque
+from dataclasses import dataclass
 from threading import Thread
 from typing import TYPE_CHECKING, Any, Protocol
 from urllib.parse import urlparse
@@ -14,10 +16,13 @@ from lxml import etree
 
 from sdc11073 import loghelper, multikey, observableproperties, xml_utils
 from sdc11073.etc import apply_map
+from sdc11073.namespaces import QN_TYPE
+from sdc11073.pysoap.msgfactory import SerializedBody
 from sdc11073.pysoap.soapclient import HTTPReturnCodeError, SoapClientProtocol
 from sdc11073.pysoap.soapenvelope import Fault, faultcodeEnum
 from sdc11073.xml_types import eventing_types as evt_types
 from sdc11073.xml_types import isoduration
+from sdc11073.xml_types.actions import state_report_actions
 from sdc11073.xml_types.addressing_types import HeaderInformationBlock
 from sdc11073.xml_types.basetypes import MessageType
 
@@ -29,7 +34,7 @@ if TYPE_CHECKING:
     from sdc11073.definitions_base import BaseDefinitions
     from sdc11073.dispatch import RequestData
     from sdc11073.mdib.mdibbase import MdibVersionGroup
-    from sdc11073.pysoap.msgfactory import CreatedMessage, MessageFactory
+    from sdc11073.pysoap.msgfactory import CreatedMessage, MessageFactory, SplicedMessage
     from sdc11073.pysoap.soapclientpool import SoapClientPool
 
 MAX_ROUNDTRIP_VALUES = 20
@@ -56,6 +61,73 @@ class RoundTripData:
         return f'min={self.min:.4f} max={self.max:.4f} avg={self.avg:.4f} absmax={self.abs_max:.4f}'
 
 
+@dataclass
+class DeliveryStats:
+    """Delivery statistics of a subscription with an outbound queue."""
+
+    queue_depth: int
+    dropped_notifications: int
+    latency: RoundTripData  # time from queueing until the notification was sent
+
+
+@dataclass(frozen=True)
+class ReportStateFilter:
+    """The states that a subscription wants to receive in state reports.
+
+    It is created from the StateFilter of the subscribe request (dialect STATE_FILTER_DIALECT).
+    Instances are hashable, subscriptions with equal filters share one filtered report.
+    """
+
+    handles: frozenset[str]
+    node_types: frozenset[str]
+
+    @classmethod
+    def from_filter_type(cls, filter_type: evt_types.FilterType) -> ReportStateFilter | None:
+        """Return a ReportStateFilter if the filter has a StateFilter, else None."""
+        state_filter = filter_type.get_state_filter()
+        if state_filter is None:
+            return None
+        return cls(frozenset(state_filter.Handles), frozenset(state_filter.NodeTypes))
+
+    def matches(self, state_node: xml_utils.LxmlElement) -> bool:
+        """Check if the state node matches the handles or node types."""
+        if state_node.get('DescriptorHandle') in self.handles or state_node.get('Handle') in self.handles:
+            return True
+        type_name = state_node.get(QN_TYPE)
+        local_name = etree.QName(state_node).localname if type_name is None else type_name.split(':')[-1]
+        return local_name in self.node_types
+
+    def filter_report(self, report_node: xml_utils.LxmlElement) -> xml_utils.LxmlElement | None:
+        """Return a copy of report_node with only the matching states.
+
+        States are the elements with a DescriptorHandle, either children of the report (WaveformStream)
+        or children of a report part. Report parts without matching states are removed.
+        :return: the new report node, None if no state matches.
+        """
+        filtered_report = etree.Element(report_node.tag, attrib=report_node.attrib, nsmap=report_node.nsmap)
+        state_count = 0
+        for child in report_node:
+            if child.get('DescriptorHandle') is not None:
+                if self.matches(child):
+                    filtered_report.append(copy.deepcopy(child))
+                    state_count += 1
+            elif any(sub_node.get('DescriptorHandle') is not None for sub_node in child):
+                report_part = etree.Element(child.tag, attrib=child.attrib, nsmap=child.nsmap)
+                part_state_count = 0
+                for sub_node in child:
+                    if sub_node.get('DescriptorHandle') is None:
+                        report_part.append(copy.deepcopy(sub_node))  # SourceMds, Extension
+                    elif self.matches(sub_node):
+                        report_part.append(copy.deepcopy(sub_node))
+                        part_state_count += 1
+                if part_state_count:
+                    filtered_report.append(report_part)
+                    state_count += part_state_count
+            else:
+                filtered_report.append(copy.deepcopy(child))
+        return filtered_report if state_count else None
+
+
 def _mk_dispatch_identifier(reference_parameters: list, path_suffix: str) -> tuple[str | None, str | None]:
     # this is always our own reference parameter. We know that is has max. one element,
     # and the text is the identifier of the subscription
@@ -101,6 +173,7 @@ class SubscriptionBase:
         if self.filter_type is None:
             msg = f'No filter provided for {self.__class__.__name__}'
             raise ValueError(msg)
+        self.state_filter = ReportStateFilter.from_filter_type(self.filter_type)
 
         self.mode = subscribe_request.Delivery.Mode
         self.notify_to_address = subscribe_request.Delivery.NotifyTo.Address
@@ -132,7 +205,13 @@ class SubscriptionBase:
             maxlen=MAX_ROUNDTRIP_VALUES,
         )  # a list of last n roundtrip times for notifications
         self.max_roundtrip_time = 0
+        # delivery statistics, only used if notifications are queued
+        self.queue_depth = 0
+        self.dropped_notifications = 0
+        self.last_delivery_latencies = deque(maxlen=MAX_ROUNDTRIP_VALUES)
+        self.max_delivery_latency = 0
         self.unsubscribed_at: float | None = None  # for housekeeping
+        self._envelope_template = None  # created on demand by _mk_spliced_notification_message
 
     def set_reference_parameter(self):
         """Create a ReferenceParameters instance with a reference parameter."""
@@ -258,13 +337,37 @@ class SubscriptionBase:
             return RoundTripData(self.last_roundtrip_times, self.max_roundtrip_time)
         return RoundTripData(None, None)
 
+    def add_delivery_latency(self, latency: float):
+        """Store the time between queueing and sending of a notification."""
+        self.last_delivery_latencies.append(latency)
+        self.max_delivery_latency = max(self.max_delivery_latency, latency)
+
+    def get_delivery_stats(self) -> DeliveryStats:
+        """Get queue depth, dropped notifications and delivery latencies."""
+        if len(self.last_delivery_latencies) > 0:
+            latency = RoundTripData(self.last_delivery_latencies, self.max_delivery_latency)
+        else:
+            latency = RoundTripData(None, None)
+        return DeliveryStats(self.queue_depth, self.dropped_notifications, latency)
+
     def _mk_notification_message(
         self,
         header_info: HeaderInformationBlock,
-        body_node: xml_utils.LxmlElement,
+        body_node: xml_utils.LxmlElement | SerializedBody,
     ) -> CreatedMessage:
+        if isinstance(body_node, SerializedBody):
+            body_node = body_node.body_node
         return self._msg_factory.mk_soap_message_etree_payload(header_info, body_node)
 
+    def _mk_spliced_notification_message(self, action: str, body: SerializedBody) -> SplicedMessage:
+        # To and ReferenceParameters never change, the envelope is serialized only once per subscription.
+        if self._envelope_template is None:
+            self._envelope_template = self._msg_factory.mk_envelope_template(
+                self.notify_to_address,
+                self.notify_ref_params,
+            )
+        return self._envelope_template.mk_message(action, body)
+
 
 class ActionBasedSubscription(SubscriptionBase):
     """Subscription for specific actions.
@@ -509,13 +612,61 @@ class SubscriptionsManagerBase:
             body_node = payload
 
         self.sent_to_subscribers = (action, mdib_version_group, body_node)  # update observable
+        if not subscribers:
+            return
+        bodies = {}  # one body per distinct state filter, None is the complete report
         for subscriber in subscribers:
+            state_filter = self._get_state_filter(subscriber, action)
+            if state_filter not in bodies:
+                bodies[state_filter] = self._mk_filtered_notification_body(body_node, action, state_filter)
+            body = bodies[state_filter]
+            if body is None:
+                continue  # no state for this subscriber
             self._logger.debug('{}: sending report to {}', action, subscriber.notify_to_address)  # noqa: PLE1205
-            self._send_notification_report(subscriber, body_node, action)
+            self._deliver_notification_report(subscriber, body, action)
 
-    def _send_notification_report(self, subscription, body_node: xml_utils.LxmlElement, action: str):  # noqa: ANN001
+    @staticmethod
+    def _get_state_filter(subscription: SubscriptionBase, action: str) -> ReportStateFilter | None:
+        """Return the state filter of the subscription if it applies to the action."""
+        if action in state_report_actions:
+            return subscription.state_filter
+        return None
+
+    def _mk_filtered_notification_body(
+        self,
+        body_node: xml_utils.LxmlElement,
+        action: str,
+        state_filter: ReportStateFilter | None,
+    ) -> xml_utils.LxmlElement | SerializedBody | None:
+        """Return the notification body with the states that match state_filter, None if no state matches."""
+        if state_filter is not None:
+            body_node = state_filter.filter_report(body_node)
+            if body_node is None:
+                return None
+        return self._mk_notification_body(body_node, action)
+
+    def _mk_notification_body(self, body_node: xml_utils.LxmlElement,
+                              action: str) -> xml_utils.LxmlElement | SerializedBody:  # noqa: ARG002
+        """Return what is passed to send_notification_report of every subscription."""
+        return body_node
+
+    def _deliver_notification_report(
+        self,
+        subscription,  # noqa: ANN001
+        body: xml_utils.LxmlElement | SerializedBody,
+        action: str,
+    ):
+        """Send the notification now. Derived classes can defer sending."""
+        self._send_notification_report(subscription, body, action)
+
+    def _send_notification_report(
+        self,
+        subscription,  # noqa: ANN001
+        body: xml_utils.LxmlElement | SerializedBody,
+        action: str,
+    ):
         try:
-            subscription.send_notification_report(body_node, action)
+            subscription.send_notification_report(body, action)
         except ConnectionRefusedError as ex:
             self._logger.error('could not send notification report: {!r}:  subscr = {}', ex, subscription)  # noqa: PLE1205, TRY400
         except HTTPReturnCodeError as ex:
@@ -534,6 +685,7 @@ class SubscriptionsManagerBase:
             self._logger.error('could not send notification report error= {!r}: {}', ex, subscription)  # noqa: PLE1205, TRY400
         except etree.DocumentInvalid as ex:
             # this is an error related to the document, it cannot be sent to any subscriber => re-raise
+            body_node = getattr(body, 'body_node', body)
             self._logger.error('Invalid Document: {!r}\n{}', ex, etree.tostring(body_node))  # noqa: PLE1205, TRY400
             raise
         except Exception:
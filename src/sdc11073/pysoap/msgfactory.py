@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import time
+import uuid
 from io import BytesIO
+from threading import Lock
 from typing import Optional, Union, List, Type, TYPE_CHECKING
+from xml.sax.saxutils import escape
 
 from lxml import etree
 
 from .msgreader import validate_node
 from .soapenvelope import Soap12Envelope
+from .validationpolicy import ValidationPolicy
+from sdc11073.httpserver.compression import CompressionHandler
 from sdc11073.schema_resolver import mk_schema_validator
+from sdc11073.xml_types.addressing_types import HeaderInformationBlock
 
 if TYPE_CHECKING:
-    from sdc11073.xml_types.addressing_types import HeaderInformationBlock
     from sdc11073.xml_types.msg_types import MessageType
     from sdc11073.definitions_base import BaseDefinitions
     from sdc11073.namespaces import PrefixNamespace
@@ -25,6 +31,96 @@ class CreatedMessage:
     def serialize(self, pretty=False, request_manipulator=None, validate=True):
         return self.msg_factory.serialize_message(self, pretty, request_manipulator, validate)
 
+    @property
+    def header_info_block(self) -> HeaderInformationBlock | None:
+        """Return the header information block of the message."""
+        return self.p_msg.header_info_block
+
+
+class SerializedBody:
+    """A validated and serialized message body that can be sent to many receivers.
+
+    Compressed fragments of the body are cached per encoding, so that each encoding is compressed only once.
+    """
+
+    def __init__(self, body_node: xml_utils.LxmlElement, data: bytes):
+        self.body_node = body_node
+        self.data = data
+        self._compressed_fragments = {}
+        self._lock = Lock()
+
+    def get_compressed_fragment(self, encoding: str) -> bytes:
+        with self._lock:
+            fragment = self._compressed_fragments.get(encoding)
+            if fragment is None:
+                fragment = CompressionHandler.get_handler(encoding).compress_fragment(self.data)
+                self._compressed_fragments[encoding] = fragment
+            return fragment
+
+
+class SplicedMessage:
+    """A serialized soap message, consisting of an individual envelope and a shared SerializedBody.
+
+    It can be used instead of a CreatedMessage in soap clients.
+    """
+
+    def __init__(self, prefix: bytes, body: SerializedBody, suffix: bytes,
+                 header_info_block: HeaderInformationBlock | None = None):
+        self.prefix = prefix
+        self.body = body
+        self.suffix = suffix
+        self.header_info_block = header_info_block  # informative, e.g. for logging
+
+    def serialize(self, pretty=False, request_manipulator=None, validate=True) -> bytes:  # noqa: ARG002
+        return b''.join((self.prefix, self.body.data, self.suffix))
+
+    def compress(self, encoding: str) -> bytes:
+        """Compress the message. The compressed body is reused if the compression algorithm allows it."""
+        handler = CompressionHandler.get_handler(encoding)
+        if not hasattr(handler, 'compress_fragment'):
+            return handler.compress_payload(self.serialize())
+        return handler.join_fragments(((self.prefix, handler.compress_fragment(self.prefix)),
+                                       (self.body.data, self.body.get_compressed_fragment(encoding)),
+                                       (self.suffix, handler.compress_fragment(self.suffix))))
+
+
+def split_envelope(data: bytes, body_tag: str) -> tuple[bytes, bytes]:
+    """Split a serialized envelope with an empty body element into the parts before and after the body content.
+
+    :param data: serialized envelope with an empty body element
+    :param body_tag: prefixed name of the body element, e.g. "s12:Body"
+    :return: tuple(prefix, suffix)
+    """
+    prefix, suffix = data.split(f'<{body_tag}/>'.encode())
+    return prefix + f'<{body_tag}>'.encode(), f'</{body_tag}>'.encode() + suffix
+
+
+class EnvelopeTemplate:
+    """A serialized soap envelope with placeholders for action, message id and body.
+
+    The template is created (and validated) once per receiver, e.g. per subscription.
+    Creating a message from a template does not need any xml handling.
+    """
+
+    ACTION_PLACEHOLDER = 'urn:sdc11073:template:action'
+    MESSAGE_ID_PLACEHOLDER = 'urn:sdc11073:template:messageid'
+
+    def __init__(self, data: bytes, body_tag: str):
+        """Split the serialized envelope at the empty body element.
+
+        :param data: serialized envelope with an empty body element
+        :param body_tag: prefixed name of the body element, e.g. "s12:Body"
+        """
+        self._prefix, self._suffix = split_envelope(data, body_tag)
+        self._action_placeholder = self.ACTION_PLACEHOLDER.encode('utf-8')
+        self._message_id_placeholder = self.MESSAGE_ID_PLACEHOLDER.encode('utf-8')
+
+    def mk_message(self, action: str, body: SerializedBody) -> SplicedMessage:
+        """Create a message with a new message id."""
+        prefix = self._prefix.replace(self._action_placeholder, escape(action).encode('utf-8'), 1)
+        prefix = prefix.replace(self._message_id_placeholder, uuid.uuid4().urn.encode('utf-8'), 1)
+        return SplicedMessage(prefix, body, self._suffix)
+
 
 # pylint: disable=no-self-use
 
@@ -33,18 +129,20 @@ class MessageFactory:
     """This class creates soap messages. It is used in two phases:
      1) call one of the mk_xxx methods. All return a CreatedMessage instance that contains the data provided in the call
      2) call the serialize method of the CreatedMessage instance to get the xml representation
+    validate can be a bool or a ValidationPolicy instance that decides per action which messages are validated.
      """
 
     def __init__(self, sdc_definitions: Type[BaseDefinitions],
                  additional_schema_specs: Union[List[PrefixNamespace], None],
                  logger,
-                 validate=True):
+                 validate: Union[bool, ValidationPolicy] = True):
         self.schema_specs = [entry.value for entry in sdc_definitions.data_model.ns_helper.prefix_enum]
         if additional_schema_specs is not None:
             self.schema_specs.extend(additional_schema_specs)
         self._logger = logger
         self.ns_hlp = sdc_definitions.data_model.ns_helper
-        self._validate = validate
+        self._validate = validate is not False
+        self.validation_policy = validate if isinstance(validate, ValidationPolicy) else ValidationPolicy()
         self._xml_schema: etree.XMLSchema = mk_schema_validator(self.schema_specs, self.ns_hlp)
 
     def serialize_message(self, message: CreatedMessage, pretty=False,
@@ -68,12 +166,12 @@ class MessageFactory:
             header_node.extend(info_node[:])
         header_node.extend(p_msg.header_nodes)
         body_node = etree.SubElement(root, nsh.S12.tag('Body'), nsmap=p_msg.nsmap)
-        if validate:
-            self._validate_node(root)
         if p_msg.payload_element is not None:
-            if validate:
-                self._validate_node(p_msg.payload_element)
             body_node.append(p_msg.payload_element)
+        if validate:
+            # the schema of the soap body processes its content lax, this validates the payload as well
+            action = p_msg.header_info_block.Action if p_msg.header_info_block else None
+            self._validate_node(root, action)
 
         doc = etree.ElementTree(element=root)
         if hasattr(request_manipulator, 'manipulate_domtree'):
@@ -83,6 +181,82 @@ class MessageFactory:
         doc.write(tmp, encoding='UTF-8', xml_declaration=True, pretty_print=pretty)
         return tmp.getvalue()
 
+    def serialize_body(self, body_node: xml_utils.LxmlElement, validate=True,
+                       action: str | None = None) -> SerializedBody:
+        """Validate and serialize a body node once, e.g. for sending it to many subscribers.
+
+        :param body_node: the payload element
+        :param validate: if False, no validation is performed, independent of constructor setting
+        :param action: action of the messages, used by the validation policy
+        :return: SerializedBody
+        """
+        if validate:
+            self._validate_node(body_node, action)
+        return SerializedBody(body_node, etree.tostring(body_node, encoding='UTF-8', xml_declaration=False,
+                                                         with_tail=False))
+
+    def mk_envelope_template(self, addr_to: str | None, reference_parameters: list | None,
+                             validate=True) -> EnvelopeTemplate:
+        """Create a serialized envelope with placeholders for action, message id and body.
+
+        :param addr_to: wsa:To of all messages
+        :param reference_parameters: reference parameters of all messages
+        :param validate: if False, no validation is performed, independent of constructor setting
+        :return: EnvelopeTemplate
+        """
+        header_info = HeaderInformationBlock(action=EnvelopeTemplate.ACTION_PLACEHOLDER,
+                                             message_id=EnvelopeTemplate.MESSAGE_ID_PLACEHOLDER,
+                                             addr_to=addr_to,
+                                             reference_parameters=reference_parameters)
+        data = self._serialize_empty_envelope(header_info, validate)
+        return EnvelopeTemplate(data, f'{self.ns_hlp.S12.prefix}:Body')
+
+    def mk_reply_spliced_message(self, request, action: str, body: SerializedBody,
+                                 validate=True) -> SplicedMessage:
+        """Create a reply to request with an already serialized body.
+
+        :param request: the request data
+        :param action: action of the reply
+        :param body: the SerializedBody, it can be shared by many replies
+        :param validate: if False, no validation of the envelope is performed, independent of constructor setting
+        :return: SplicedMessage
+        """
+        header_info = request.message_data.p_msg.header_info_block.mk_reply_header_block(action=action)
+        data = self._serialize_empty_envelope(header_info, validate)
+        prefix, suffix = split_envelope(data, f'{self.ns_hlp.S12.prefix}:Body')
+        return SplicedMessage(prefix, body, suffix)
+
+    def mk_spliced_message(self, header_info: HeaderInformationBlock, body: SerializedBody,
+                           header_nodes: list | None = None, ns_list: list | None = None,
+                           validate: bool = True) -> SplicedMessage:
+        """Create a message with an already serialized body.
+
+        :param header_info: the header information block
+        :param body: the SerializedBody, it can be shared by many messages
+        :param header_nodes: additional header elements
+        :param ns_list: namespaces of the envelope, default is S12, WSE and WSA
+        :param validate: if False, no validation of the envelope is performed, independent of constructor setting
+        :return: SplicedMessage
+        """
+        data = self._serialize_empty_envelope(header_info, validate, header_nodes, ns_list)
+        prefix, suffix = split_envelope(data, f'{self.ns_hlp.S12.prefix}:Body')
+        return SplicedMessage(prefix, body, suffix, header_info)
+
+    def _serialize_empty_envelope(self, header_info: HeaderInformationBlock, validate: bool,
+                                  header_nodes: list | None = None, ns_list: list | None = None) -> bytes:
+        nsh = self.ns_hlp
+        ns_map = nsh.partial_map(*ns_list) if ns_list else nsh.partial_map(nsh.S12, nsh.WSE, nsh.WSA)
+        root = etree.Element(nsh.S12.tag('Envelope'), nsmap=ns_map)
+        header_node = etree.SubElement(root, nsh.S12.tag('Header'))
+        info_node = header_info.as_etree_node('tmp', {})
+        header_node.extend(info_node[:])
+        if header_nodes:
+            header_node.extend(header_nodes)
+        etree.SubElement(root, nsh.S12.tag('Body'))
+        if validate:
+            self._validate_node(root)
+        return etree.tostring(root, encoding='UTF-8', xml_declaration=True)
+
     def mk_soap_message(self,
                         header_info: HeaderInformationBlock,
                         payload: MessageType,
@@ -129,6 +303,10 @@ class MessageFactory:
         soap_envelope.payload_element = response_payload.as_etree_node(response_payload.NODETYPE, my_ns_map)
         return CreatedMessage(soap_envelope, self)
 
-    def _validate_node(self, node):
-        if self._validate:
-            validate_node(node, self._xml_schema, self._logger)
+    def _validate_node(self, node, action: str | None = None):
+        if self._validate and self.validation_policy.should_validate(action):
+            start = time.perf_counter()
+            try:
+                validate_node(node, self._xml_schema, self._logger)
+            finally:
+                self.validation_policy.add_duration(action, time.perf_counter() - start)
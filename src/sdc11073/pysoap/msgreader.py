@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import copy
+import time
 import traceback
 from collections import namedtuple
 from dataclasses import dataclass
 from io import BytesIO
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING
 
 from lxml import etree
 
@@ -16,8 +17,11 @@ from sdc11073.schema_resolver import mk_schema_validator
 from sdc11073.xml_types.addressing_types import HeaderInformationBlock
 
 from .soapenvelope import Fault, ReceivedSoapMessage, faultcodeEnum
+from .validationpolicy import ValidationPolicy
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from os import PathLike
     from types import ModuleType
 
     from sdc11073 import xml_utils
@@ -90,20 +94,25 @@ class ReceivedMessage:
 
 
 class MessageReader:
-    """MessageReader does all the conversions from DOM trees (body of SOAP messages) to MDIB objects."""
+    """MessageReader does all the conversions from DOM trees (body of SOAP messages) to MDIB objects.
+
+    validate can be a bool or a ValidationPolicy instance that decides per action which messages are validated.
+    """
 
     def __init__(self, sdc_definitions: type[BaseDefinitions],
                  additional_schema_specs: list[PrefixNamespace] | None,
                  logger: LoggerAdapter,
-                 validate: bool = True):
+                 validate: bool | ValidationPolicy = True):
         self.schema_specs = [entry.value for entry in sdc_definitions.data_model.ns_helper.prefix_enum]
         if additional_schema_specs is not None:
             self.schema_specs.extend(additional_schema_specs)
         self._logger = logger
         self._data_model = sdc_definitions.data_model
         self.ns_hlp = sdc_definitions.data_model.ns_helper
-        self._validate = validate
+        self._validate = validate is not False
+        self.validation_policy = validate if isinstance(validate, ValidationPolicy) else ValidationPolicy()
         self._xml_schema: etree.XMLSchema = mk_schema_validator(self.schema_specs, self.ns_hlp)
+        self._action_path = f'{self.ns_hlp.S12.tag("Header")}/{self.ns_hlp.WSA.tag("Action")}'
 
     @property
     def msg_names(self) -> ModuleType:
@@ -142,11 +151,11 @@ class MessageReader:
             self._logger.warning('Error reading response ex=%r xml=%s', ex, xml_text.decode('utf-8'))
             raise
         if validate:
-            self._validate_node(doc_root)
+            # the schema of the soap body processes its content lax, this validates the message body as well
+            action_node = doc_root.find(self._action_path)
+            self._validate_node(doc_root, None if action_node is None else action_node.text)
 
         message = ReceivedSoapMessage(xml_text, doc_root)
-        if message.msg_node is not None and validate:
-            self._validate_node(message.msg_node)
         message.header_info_block = HeaderInformationBlock.from_node(message.header_node)
 
         mdib_version_group = None
@@ -178,12 +187,76 @@ class MessageReader:
         return descriptors, states
 
     def read_mdib_xml(self, xml_text: bytes) -> tuple[list[AbstractDescriptorProtocol], list[AbstractStateProtocol]]:
-        """Return list of all descriptors and states in mdib."""
-        payload = self.read_xml_text(xml_text)
-        q_name = etree.QName(payload.tag)
-        if q_name == self.msg_names.GetMdibResponse:
-            return self.read_get_mdib_payload(payload[0])
-        return self.read_get_mdib_payload(payload)
+        """Return list of all descriptors and states in mdib.
+
+        xml_text is read with iter_mdib_containers, the complete tree is never built.
+        """
+        descriptors = []
+        states = []
+        for container in self.iter_mdib_containers(xml_text):
+            if container.is_descriptor_container:
+                descriptors.append(container)
+            else:
+                states.append(container)
+        return descriptors, states
+
+    def iter_mdib_containers(self, source: bytes | str | PathLike | IO[bytes],
+                             ) -> Iterator[AbstractDescriptorProtocol | AbstractStateProtocol]:
+        """Read a Mdib or GetMdibResponse incrementally, yield descriptor and state containers.
+
+        The descriptors of a Mds are yielded when the Mds element is closed (parents before children),
+        every state when its element is closed. Processed elements are cleared, so that the memory
+        of the parsed tree stays small, independent of the size of the mdib.
+        The containers do not reference xml nodes (container.node is None).
+        If validation is enabled, the document is validated while parsing.
+
+        :param source: xml text, a file path or a binary file object
+        """
+        if isinstance(source, bytes):
+            source = BytesIO(source)
+        schema = self._xml_schema if self._validate and self.validation_policy.should_validate(None) else None
+        md_description = self.pm_names.MdDescription
+        md_state = self.pm_names.MdState
+        extension_tag = self.ns_hlp.EXT.tag('Extension')
+        context = etree.iterparse(source, events=('end',), tag=(self.pm_names.Mds, self.pm_names.State),
+                                  schema=schema, resolve_entities=False, remove_comments=True, remove_pis=True)
+        try:
+            for _, element in context:
+                parent = element.getparent()
+                if parent is None:
+                    continue
+                if parent.tag == md_description:
+                    containers = self._read_mds_node(element)
+                elif parent.tag == md_state:
+                    containers = [self._mk_state_container_from_node(element)]
+                else:
+                    continue  # a State or Mds element somewhere else, it is part of a parent element
+                for container in containers:
+                    container.node = None
+                self._clear_processed_element(element, parent, extension_tag)
+                yield from containers
+        except etree.XMLSyntaxError as ex:
+            last_error = ex.error_log.last_error
+            if last_error is None or last_error.domain != etree.ErrorDomains.SCHEMASV:
+                raise  # not a validation error
+            self._logger.warning('mdib document invalid: %s', ex)
+            fault = Fault()
+            fault.Code.Value = faultcodeEnum.SENDER
+            fault.set_sub_code(default_ns_helper.WSE.tag('InvalidMessage'))
+            fault.add_reason_text(f'validation error: {ex}')
+            raise ValidationError(reason='document invalid', soap_fault=fault) from ex
+
+    @staticmethod
+    def _clear_processed_element(element: xml_utils.LxmlElement, parent: xml_utils.LxmlElement,
+                                 extension_tag: etree.QName):
+        """Free the memory of element and of its previous siblings."""
+        # extension values of the containers reference the child elements of ext:Extension nodes.
+        # Detach them, otherwise they keep the complete subtree of their ancestors alive.
+        for extension_node in list(element.iter(extension_tag)):
+            del extension_node[:]
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
 
     def read_xml_text(self, xml_text: bytes) -> xml_utils.LxmlElement:
         """Parse imput, return a node."""
@@ -198,6 +271,14 @@ class MessageReader:
 
     def _read_md_description_node(self, md_description_node: xml_utils.LxmlElement) -> list[AbstractDescriptorProtocol]:
         descriptions = []
+        # iterate over tree, collect all handles of vmds, channels and metric descriptors
+        for mds_node in md_description_node.findall(self.pm_names.Mds):
+            descriptions.extend(self._read_mds_node(mds_node))
+        return descriptions
+
+    def _read_mds_node(self, mds_node: xml_utils.LxmlElement) -> list[AbstractDescriptorProtocol]:
+        """Return the mds descriptor and all its descendant descriptors, parents before children."""
+        descriptions = [self._mk_descriptor_container_from_node(mds_node, None)]
 
         def add_children(parent_node: xml_utils.LxmlElement):
             p_handle = parent_node.get('Handle')
@@ -207,12 +288,7 @@ class MessageReader:
                     descriptions.append(container)
                     add_children(child_node)
 
-        # iterate over tree, collect all handles of vmds, channels and metric descriptors
-        all_mds = md_description_node.findall(self.pm_names.Mds)
-        for mds_node in all_mds:
-            mds = self._mk_descriptor_container_from_node(mds_node, None)
-            descriptions.append(mds)
-            add_children(mds_node)
+        add_children(mds_node)
         return descriptions
 
     def _read_md_state_node(self, md_state_node: xml_utils.LxmlElement) -> list[AbstractStateProtocol]:
@@ -258,9 +334,13 @@ class MessageReader:
         state.node = node
         return state
 
-    def _validate_node(self, node: xml_utils.LxmlElement):
-        if self._validate:
-            validate_node(node, self._xml_schema, self._logger)
+    def _validate_node(self, node: xml_utils.LxmlElement, action: str | None = None):
+        if self._validate and self.validation_policy.should_validate(action):
+            start = time.perf_counter()
+            try:
+                validate_node(node, self._xml_schema, self._logger)
+            finally:
+                self.validation_policy.add_duration(action, time.perf_counter() - start)
 
     @staticmethod
     def read_wsdl(wsdl_text: bytes) -> etree.ElementTree:
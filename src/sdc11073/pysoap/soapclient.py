@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import logging
+import select
 import socket
 import time
 import traceback
+from collections import deque
+from dataclasses import dataclass
 from http.client import (
     HTTPConnection,
     HTTPException,
@@ -14,7 +17,7 @@ from http.client import (
     NotConnected,
     UnknownTransferEncoding,
 )
-from threading import Lock
+from threading import Condition, Lock
 from typing import TYPE_CHECKING, Protocol
 
 from lxml import etree
@@ -23,6 +26,7 @@ from sdc11073 import commlog, observableproperties
 from sdc11073.httpserver.compression import CompressionHandler
 from sdc11073.httpserver.httpreader import HTTPReader, mk_chunks
 from sdc11073.namespaces import default_ns_helper as ns_hlp
+from sdc11073.pysoap.msgfactory import SplicedMessage
 from sdc11073.pysoap.soapenvelope import Fault
 
 if TYPE_CHECKING:
@@ -67,6 +71,29 @@ class HTTPReturnCodeError(HTTPException):
         return f'HTTPReturnCodeError(status={self.status}, reason={self.reason} fault={self.soap_fault}'
 
 
+@dataclass(frozen=True)
+class ConnectionPoolStats:
+    """Statistics of the http connections of a SoapClient."""
+
+    max_connections: int
+    open_connections: int  # idle and in use
+    idle_connections: int
+    connections_in_use: int
+    created_connections: int  # connections that were created in addition to the first one
+    reused_connections: int  # requests that used an already established connection
+    evicted_connections: int  # closed because they were idle longer than IDLE_TIMEOUT
+    failed_health_checks: int  # idle connections that were closed by the peer
+
+
+class _PooledConnection:
+    """An additional http connection of a SoapClient."""
+
+    def __init__(self, connection: HTTPConnection, generation: int):
+        self.connection = connection
+        self.generation = generation  # connections of an older generation are closed on release
+        self.idle_since = 0.0
+
+
 class SoapClientProtocol(Protocol):
     """The expected interface of a soap client."""
 
@@ -115,10 +142,21 @@ class SoapClientProtocol(Protocol):
 
 
 class SoapClient(SoapClientProtocol):
-    """SOAP Client wraps an http connection. It can send / receive SoapEnvelopes."""
+    """SOAP Client wraps http connections to one netloc. It can send / receive SoapEnvelopes.
+
+    With MAX_CONNECTIONS > 1 the client keeps a bounded pool of keep-alive connections:
+    concurrent requests (e.g. from different threads) are sent in parallel, each on its own connection.
+    A thread that sends its messages one after the other still gets the responses in order.
+    The first connection is created by connect() and stays open until close() is called or an error occurs.
+    Additional connections are created on demand and closed when they were idle longer than IDLE_TIMEOUT.
+    Before an idle connection is reused, it is checked that the peer did not close it.
+    """
 
     _used_soap_clients = 0
 
+    MAX_CONNECTIONS = 1  # max. number of parallel http connections to netloc
+    IDLE_TIMEOUT = 30.0  # seconds, additional idle connections are closed after this time
+
     roundtrip_time = observableproperties.ObservableProperty()
 
     def __init__(  # noqa: PLR0913
@@ -166,6 +204,15 @@ class SoapClient(SoapClientProtocol):
         self.request_encodings = request_encodings if request_encodings is not None else []
         self._get_headers = self._make_get_headers()
         self._lock = Lock()
+        self._pool_condition = Condition(self._lock)
+        self._is_first_connection_in_use = False
+        self._idle_connections: deque[_PooledConnection] = deque()
+        self._additional_connections_count = 0  # idle and in use
+        self._generation = 0  # incremented when all connections are closed
+        self._created_connections = 0
+        self._reused_connections = 0
+        self._evicted_connections = 0
+        self._failed_health_checks = 0
         self._chunk_size = chunk_size
         self._has_connection_error = False  # used to avoid implicit connects after an error
         self.sock_name: tuple[str, int] | None = None
@@ -206,16 +253,122 @@ class SoapClient(SoapClientProtocol):
         )
 
     def close(self):
-        """Close connection."""
-        with self._lock:
+        """Close all connections, waits until running requests are finished."""
+        with self._pool_condition:
+            self._pool_condition.wait_for(self._no_connection_in_use)
             self._close_without_lock()
 
+    def _no_connection_in_use(self) -> bool:
+        if self._is_first_connection_in_use:
+            return False
+        return len(self._idle_connections) == self._additional_connections_count
+
     def _close_without_lock(self):
         self.sock_name = None
         if self._http_connection is not None:
             self._log.info('closing soapClientNo {} for {}', self._client_number, self._netloc)
             self._http_connection.close()
             self._http_connection = None
+        # additional connections that are in use are closed when they are released
+        self._generation += 1
+        while self._idle_connections:
+            self._idle_connections.pop().connection.close()
+            self._additional_connections_count -= 1
+
+    def _close_after_error(self):
+        with self._lock:
+            self._has_connection_error = True
+            self._close_without_lock()
+
+    def get_stats(self) -> ConnectionPoolStats:
+        """Return statistics of the http connections."""
+        with self._lock:
+            first_connection_count = 0 if self._http_connection is None else 1
+            idle_count = len(self._idle_connections)
+            if self._http_connection is not None and not self._is_first_connection_in_use:
+                idle_count += 1
+            open_count = first_connection_count + self._additional_connections_count
+            return ConnectionPoolStats(max_connections=self.MAX_CONNECTIONS,
+                                       open_connections=open_count,
+                                       idle_connections=idle_count,
+                                       connections_in_use=open_count - idle_count,
+                                       created_connections=self._created_connections,
+                                       reused_connections=self._reused_connections,
+                                       evicted_connections=self._evicted_connections,
+                                       failed_health_checks=self._failed_health_checks)
+
+    def _acquire_connection(self) -> tuple[HTTPConnection, _PooledConnection | None]:
+        """Return a connection for one request and its pool entry (None for the first connection).
+
+        Waits until a connection is available if MAX_CONNECTIONS connections are in use.
+        """
+        with self._pool_condition:
+            while True:
+                if self._http_connection is None:
+                    raise NotConnected
+                if not self._is_first_connection_in_use:
+                    self._is_first_connection_in_use = True
+                    self._check_idle_connection(self._http_connection)
+                    return self._http_connection, None
+                self._evict_idle_connections()
+                if self._idle_connections:
+                    entry = self._idle_connections.pop()  # the most recently used one
+                    self._check_idle_connection(entry.connection)
+                    return entry.connection, entry
+                if 1 + self._additional_connections_count < self.MAX_CONNECTIONS:
+                    self._additional_connections_count += 1
+                    self._created_connections += 1
+                    # the connection connects itself when the first request is sent
+                    connection = self._mk_http_connection()
+                    return connection, _PooledConnection(connection, self._generation)
+                self._pool_condition.wait()
+
+    def _release_connection(self, entry: _PooledConnection | None, discard: bool = False):
+        """Give back a connection that was returned by _acquire_connection.
+
+        :param entry: the pool entry, None for the first connection
+        :param discard: if True, an additional connection is closed (e.g. after an error)
+        """
+        with self._pool_condition:
+            if entry is None:
+                self._is_first_connection_in_use = False
+            elif discard or entry.generation != self._generation:
+                entry.connection.close()
+                self._additional_connections_count -= 1
+            else:
+                entry.idle_since = time.monotonic()
+                self._idle_connections.append(entry)
+            self._pool_condition.notify_all()
+
+    def _evict_idle_connections(self):
+        deadline = time.monotonic() - self.IDLE_TIMEOUT
+        while self._idle_connections and self._idle_connections[0].idle_since < deadline:
+            self._idle_connections.popleft().connection.close()
+            self._additional_connections_count -= 1
+            self._evicted_connections += 1
+
+    def _check_idle_connection(self, connection: HTTPConnection):
+        """Close an idle connection if the peer has closed it, http.client connects again on next request."""
+        sock = connection.sock
+        if sock is None:
+            return
+        # ssl sockets can be readable without application data (e.g. tls 1.3 session tickets), do not check them
+        if type(sock) is not socket.socket:
+            self._reused_connections += 1
+            return
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            # an idle connection never receives data, readable means that the peer closed the connection
+            is_healthy = not readable
+        except (OSError, ValueError):
+            is_healthy = False
+        if not is_healthy:
+            self._log.info('soap client No. {}: idle connection to {} was closed by peer, reconnect',
+                           self._client_number, self._netloc)
+            self._failed_health_checks += 1
+            connection.close()
+        else:
+            self._reused_connections += 1
 
     def is_closed(self) -> bool:
         """Return True if connection is closed."""
@@ -223,10 +376,13 @@ class SoapClient(SoapClientProtocol):
 
     @staticmethod
     def _prepare_message(
-        created_message: CreatedMessage,
+        created_message: CreatedMessage | SplicedMessage,
         request_manipulator: RequestManipulatorProtocol | None,
         validate: bool,
-    ) -> bytes:
+    ) -> bytes | SplicedMessage:
+        if isinstance(created_message, SplicedMessage):
+            # already serialized, keep it as it is in order to reuse its compressed body.
+            return created_message
         if hasattr(request_manipulator, 'manipulate_soapenvelope'):
             tmp = request_manipulator.manipulate_soapenvelope(created_message.p_msg)
             if tmp:
@@ -244,7 +400,7 @@ class SoapClient(SoapClientProtocol):
     def post_message_to(
         self,
         path: str,
-        created_message: CreatedMessage,
+        created_message: CreatedMessage | SplicedMessage,
         msg: str = '',
         request_manipulator: RequestManipulatorProtocol | None = None,
         validate: bool = True,
@@ -252,7 +408,8 @@ class SoapClient(SoapClientProtocol):
         """Post created message to netloc/path.
 
         :param path: url path component
-        :param created_message: The message that shall be sent
+        :param created_message: The message that shall be sent.
+                                A SplicedMessage is sent as it is, request_manipulator and validate are not used.
         :param msg: used in logs, helps to identify the context in which the method was called
         :param request_manipulator: see documentation of RequestManipulatorProtocol
         :param validate: set to False if no schema validation shall be done
@@ -264,10 +421,11 @@ class SoapClient(SoapClientProtocol):
             raise NotConnected
         xml_request = self._prepare_message(created_message, request_manipulator, validate)
         started = time.perf_counter()
+        connection, entry = self._acquire_connection()
         try:
-            with self._lock:
-                http_response, xml_response = self._send_soap_request(path, xml_request, msg)
+            http_response, xml_response = self._send_soap_request(connection, path, xml_request, msg)
         finally:
+            self._release_connection(entry)
             self.roundtrip_time = time.perf_counter() - started  # set roundtrip time even if method raises an exception
         if not xml_response:  # empty response
             return None
@@ -278,8 +436,18 @@ class SoapClient(SoapClientProtocol):
             raise HTTPReturnCodeError(http_response.status, http_response.reason, soap_fault)
         return message_data
 
-    def _send_soap_request(self, path: str, xml: bytes, log_msg: str) -> tuple[HTTPResponse, bytes]:  # noqa: PLR0915, PLR0912, C901
+    def _send_soap_request(  # noqa: PLR0915, PLR0912, C901
+        self,
+        connection: HTTPConnection,
+        path: str,
+        xml: bytes | SplicedMessage,
+        log_msg: str,
+    ) -> tuple[HTTPResponse, bytes]:
         """Send SOAP request."""
+        spliced_message = None
+        if isinstance(xml, SplicedMessage):
+            spliced_message = xml
+            xml = spliced_message.serialize()
         logging.getLogger(commlog.SOAP_REQUEST_OUT).debug(xml, extra={'http_method': 'POST'})
         self._log.debug("{}:POST to netloc='{}' path='{}'", log_msg, self._netloc, path)
 
@@ -295,7 +463,10 @@ class SoapClient(SoapClientProtocol):
         if self.request_encodings:
             for compr in self.request_encodings:
                 if compr in self.supported_encodings:
-                    xml = CompressionHandler.compress_payload(compr, xml)
+                    if spliced_message is not None:
+                        xml = spliced_message.compress(compr)
+                    else:
+                        xml = CompressionHandler.compress_payload(compr, xml)
                     headers['Content-Encoding'] = compr
                     break
         # split message into chunks?
@@ -307,11 +478,10 @@ class SoapClient(SoapClientProtocol):
 
         # send the request
         try:
-            self._http_connection.request('POST', path, body=xml, headers=headers)
+            connection.request('POST', path, body=xml, headers=headers)
         except HTTPException as ex:
             self._log.warn('{}: could not send request, http exception = {!r}', log_msg, ex)
-            self._close_without_lock()
-            self._has_connection_error = True
+            self._close_after_error()
             raise NotConnected from ex
         except OSError as ex:
             if ex.errno in (10053, 10054):
@@ -323,8 +493,7 @@ class SoapClient(SoapClientProtocol):
                     self.netloc,
                     traceback.format_exc(),
                 )
-            self._has_connection_error = True
-            self._close_without_lock()
+            self._close_after_error()
             raise NotConnected from ex
         except Exception as ex:
             self._log.warn(
@@ -335,17 +504,15 @@ class SoapClient(SoapClientProtocol):
                 ex,
                 traceback.format_exc(),
             )
-            self._has_connection_error = True
-            self._close_without_lock()
+            self._close_after_error()
             raise NotConnected from ex
 
         # read the response
         try:
-            response = self._http_connection.getresponse()
+            response = connection.getresponse()
         except HTTPException as ex:
             self._log.warn('{}: could not receive response, http exception = {!r} ', log_msg, ex)
-            self._has_connection_error = True
-            self._close_without_lock()
+            self._close_after_error()
             raise NotConnected from ex
         except OSError as ex:
             if ex.errno in (10053, 10054):
@@ -358,8 +525,7 @@ class SoapClient(SoapClientProtocol):
                     ex,
                     traceback.format_exc(),
                 )
-            self._has_connection_error = True
-            self._close_without_lock()
+            self._close_after_error()
             raise NotConnected from ex
         except Exception as ex:
             self._log.warn(
@@ -370,8 +536,7 @@ class SoapClient(SoapClientProtocol):
                 ex,
                 traceback.format_exc(),
             )
-            self._has_connection_error = True
-            self._close_without_lock()
+            self._close_after_error()
             raise NotConnected from ex
 
         content = HTTPReader.read_response_body(response)
@@ -419,18 +584,23 @@ class SoapClient(SoapClientProtocol):
         if not url.startswith('/'):
             url = '/' + url
         self._log.debug('{} Get {}/{}', msg, self._netloc, url)
-        with self._lock:
-            self._http_connection.request('GET', url, headers=self._get_headers)
-            response = self._http_connection.getresponse()
+        connection, entry = self._acquire_connection()
+        try:
+            connection.request('GET', url, headers=self._get_headers)
+            response = connection.getresponse()
             headers = {k.lower(): v for k, v in response.getheaders()}
             _content = response.read()
-            if 'content-encoding' in headers:
-                enc = headers['content-encoding']
-                if enc in self.supported_encodings:
-                    content = CompressionHandler.decompress_payload(enc, _content)
-                else:
-                    self._log.warn('{}: unsupported compression ', headers['content-encoding'])
-                    raise UnknownTransferEncoding
+        except Exception:
+            self._release_connection(entry, discard=True)
+            raise
+        self._release_connection(entry)
+        if 'content-encoding' in headers:
+            enc = headers['content-encoding']
+            if enc in self.supported_encodings:
+                content = CompressionHandler.decompress_payload(enc, _content)
             else:
-                content = _content
+                self._log.warn('{}: unsupported compression ', headers['content-encoding'])
+                raise UnknownTransferEncoding
+        else:
+            content = _content
         return content
@@ -8,13 +8,13 @@ from aiohttp.client import ClientSession, ClientTimeout, TCPConnector
 
 from sdc11073 import commlog, observableproperties
 from sdc11073.httpserver.compression import CompressionHandler
-from sdc11073.httpserver.httpreader import mk_chunks
 from sdc11073.namespaces import default_ns_helper as ns_hlp
 from sdc11073.pysoap.soapenvelope import Fault
 
 from .soapclient import HTTPReturnCodeError
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
     from ssl import SSLContext
 
     from sdc11073.consumer.manipulator import RequestManipulatorProtocol
@@ -24,6 +24,11 @@ if TYPE_CHECKING:
     from sdc11073.pysoap.msgreader import MessageReader, ReceivedMessage
 
 
+async def _iter_parts(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
 class SoapClientAsync:
     """SOAP Client wraps an http connection. It can send / receive SoapEnvelopes."""
 
@@ -138,8 +143,9 @@ class SoapClientAsync:
                         headers['Content-Encoding'] = compr
                         break
             if self._chunk_size > 0:
-                headers['transfer-encoding'] = "chunked"
-                xml_request = mk_chunks(xml_request, chunk_size=self._chunk_size)
+                # aiohttp sends each part of an async iterable as a chunk and sets the transfer-encoding header.
+                # Pre-chunked bytes would be sent with an additional Content-Length header, which is invalid.
+                xml_request = _iter_parts(xml_request, self._chunk_size)
             else:
                 headers['Content-Length'] = str(len(xml_request))
 
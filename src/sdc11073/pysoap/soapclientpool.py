@@ -69,6 +69,13 @@ class SoapClientPool:
                         self.async_loop_subscr_mgr.run_coro(entry.soap_client.async_close())
                 self._soap_clients.pop(netloc)
 
+    def get_stats(self) -> dict[str, Any]:
+        """Return the connection statistics of all soap clients that provide them, key is netloc."""
+        with self._lock:
+            entries = list(self._soap_clients.items())
+        return {netloc: entry.soap_client.get_stats() for netloc, entry in entries
+                if hasattr(entry.soap_client, 'get_stats')}
+
     def close_all(self):
         """Close all connections."""
         with self._lock:
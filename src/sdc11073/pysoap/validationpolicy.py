@@ -0,0 +1,85 @@
+"""Validation policy: decides which messages are validated against the schema and records validation times."""
+from __future__ import annotations
+
+import copy
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+@dataclass
+class ValidationStats:
+    """Counters and validation times of one action."""
+
+    messages: int = 0  # number of messages that were checked by the policy
+    validated: int = 0  # number of messages that were validated
+    duration: float = 0.0  # sum of validation times in seconds
+    max_duration: float = 0.0
+
+    @property
+    def avg_duration(self) -> float:
+        """Return the average validation time in seconds."""
+        return self.duration / self.validated if self.validated else 0.0
+
+
+class ValidationPolicy:
+    """Decide per action if a message is validated, and record the validation times per action.
+
+    The first first_n messages of each action are validated, after that only sample_percentage percent of them.
+    Sampling is deterministic, e.g. with sample_percentage=10 every 10th message is validated.
+    Messages without an action (e.g. an xml text that is not a soap envelope) and messages with an action
+    that is not in known_actions are always validated. If known_actions is None, all actions are known.
+    The default instance validates every message.
+    """
+
+    def __init__(self, first_n: int = 0, sample_percentage: float = 100.0,
+                 known_actions: Iterable[str] | None = None):
+        """Construct a policy.
+
+        :param first_n: number of messages per action that are always validated
+        :param sample_percentage: 0...100, percentage of messages that are validated after the first_n messages
+        :param known_actions: if given, messages with other actions are always validated
+        """
+        if not 0.0 <= sample_percentage <= 100.0:  # noqa: PLR2004
+            msg = f'sample_percentage must be in range 0...100, got {sample_percentage}'
+            raise ValueError(msg)
+        self.first_n = first_n
+        self.sample_percentage = sample_percentage
+        self.known_actions = None if known_actions is None else frozenset(known_actions)
+        self._stats: dict[str | None, ValidationStats] = {}
+        self._lock = threading.Lock()
+
+    def should_validate(self, action: str | None) -> bool:
+        """Count the message and decide if it shall be validated."""
+        with self._lock:
+            stats = self._get_stats(action)
+            count = stats.messages
+            stats.messages += 1
+        if action is None or (self.known_actions is not None and action not in self.known_actions):
+            return True
+        if count < self.first_n:
+            return True
+        sampled = count - self.first_n
+        return int((sampled + 1) * self.sample_percentage / 100) > int(sampled * self.sample_percentage / 100)
+
+    def add_duration(self, action: str | None, duration: float):
+        """Record the validation time of a message."""
+        with self._lock:
+            stats = self._get_stats(action)
+            stats.validated += 1
+            stats.duration += duration
+            stats.max_duration = max(stats.max_duration, duration)
+
+    def get_stats(self) -> dict[str | None, ValidationStats]:
+        """Return a copy of the statistics per action."""
+        with self._lock:
+            return copy.deepcopy(self._stats)
+
+    def _get_stats(self, action: str | None) -> ValidationStats:
+        stats = self._stats.get(action)
+        if stats is None:
+            stats = self._stats[action] = ValidationStats()
+        return stats
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import collections
 import dataclasses
+import functools
+import io
 import logging
 import platform
 import queue
@@ -20,16 +22,19 @@ from lxml import etree
 
 from sdc11073 import commlog
 from sdc11073.exceptions import ValidationError
+from sdc11073.namespaces import default_ns_helper
 from sdc11073.wsdiscovery.common import MULTICAST_IPV4_ADDRESS, message_reader
 
 if TYPE_CHECKING:
     from logging import Logger
 
-    from sdc11073.pysoap.msgfactory import CreatedMessage
+    from sdc11073.pysoap.msgfactory import CreatedMessage, SplicedMessage
     from sdc11073.wsdiscovery.wsdimpl import WSDiscovery
 
 BUFFER_SIZE = 0xffff
 
+_MESSAGE_ID_TAG = default_ns_helper.WSA.tag('MessageID')
+
 
 @dataclasses.dataclass(frozen=True)
 class _UdpRepeatParams:
@@ -51,21 +56,78 @@ SEND_LOOP_IDLE_SLEEP = 0.1
 SEND_LOOP_BUSY_SLEEP = 0.01
 
 
+@dataclasses.dataclass(frozen=True)
+class ReceiveStats:
+    """Counters of received datagrams, see NetworkingThread.get_receive_stats."""
+
+    received: int  # all received datagrams
+    duplicates: int  # datagrams with a known MessageID, they are dropped before validation
+    invalid: int  # datagrams that are not well-formed or fail schema validation
+
+
+class _LruSet:
+    """A set with a maximum size, if it is full, the least recently seen key is removed."""
+
+    def __init__(self, max_size: int):
+        self._keys = collections.OrderedDict()
+        self._max_size = max_size
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str):
+        """Add key, remove the least recently seen key if set is full."""
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        if len(self._keys) > self._max_size:
+            self._keys.popitem(last=False)
+
+
+def get_message_id(data: bytes) -> str | None:
+    """Return the text of the first wsa:MessageID element in data, or None if there is none.
+
+    Parsing stops at the end of the MessageID element, which is in the soap header at the start of the message.
+    Raises etree.XMLSyntaxError if data is not well-formed up to that point.
+    """
+    parser = etree.iterparse(io.BytesIO(data), events=('end',), tag=_MESSAGE_ID_TAG,
+                             resolve_entities=False, no_network=True)
+    for _, element in parser:
+        return element.text
+    return None
+
+
 @dataclasses.dataclass(frozen=True)
 class OutgoingMessage:
     """OutgoingMessage instances contain a soap envelope, destination address and multicast / unicast information."""
 
-    created_message: CreatedMessage
+    created_message: CreatedMessage | SplicedMessage
     addr: str
     port: int
 
+    @functools.cached_property
+    def data(self) -> bytes:
+        """Serialize the message once, all repetitions send the same bytes."""
+        return self.created_message.serialize()
+
     def __repr__(self):
         return (f"{self.__class__.__name__}(addr={self.addr}, port={self.port}, "
-                f"created_message={self.created_message.serialize()})")
+                f"created_message={self.data})")
 
 
 class NetworkingThread:
-    """Has one thread for sending and one for receiving."""
+    """Has one thread for sending and one for receiving.
+
+    Discovery messages are repeated, received datagrams with a known MessageID are dropped before the
+    expensive parsing and validation. MAX_KNOWN_MESSAGE_IDS is the number of remembered message ids.
+    """
+
+    MAX_KNOWN_MESSAGE_IDS = 1000
 
     @dataclasses.dataclass(order=True)
     class _EnqueuedMessage:
@@ -90,7 +152,11 @@ class NetworkingThread:
         self._quit_send_event = threading.Event()
         self._send_queue = queue.PriorityQueue(10000)
         self._read_queue = queue.Queue(10000)
-        self._known_message_ids = collections.deque(maxlen=200)
+        self._known_message_ids = _LruSet(self.MAX_KNOWN_MESSAGE_IDS)
+        self._known_message_ids_lock = threading.Lock()  # add_outbound_message is called by other threads
+        self._received_count = 0
+        self._duplicates_count = 0
+        self._invalid_count = 0
         self._inbound_selector = selectors.DefaultSelector()
         self._outbound_selector = selectors.DefaultSelector()
         self.multi_in = self._create_multicast_in_socket(my_ip_address, multicast_port)
@@ -128,11 +194,13 @@ class NetworkingThread:
         self._register_inbound_socket(sock)
         return sock
 
-    def add_outbound_message(self, msg: CreatedMessage, addr: str, port: int, repeat_params: _UdpRepeatParams):
+    def add_outbound_message(self, msg: CreatedMessage | SplicedMessage, addr: str, port: int,
+                             repeat_params: _UdpRepeatParams):
         """Add a message to the sending queue."""
         self._logger.debug('adding outbound message with Id "%s" to sending queue',
-                           msg.p_msg.header_info_block.MessageID)
-        self._known_message_ids.appendleft(msg.p_msg.header_info_block.MessageID)
+                           msg.header_info_block.MessageID)
+        with self._known_message_ids_lock:
+            self._known_message_ids.add(msg.header_info_block.MessageID)
         self._repeated_enqueue_msg(OutgoingMessage(msg, addr, port), repeat_params)
 
     def _repeated_enqueue_msg(self, msg: OutgoingMessage, delay_params: _UdpRepeatParams):
@@ -196,37 +264,62 @@ class NetworkingThread:
                 pass
             else:
                 addr, data = incoming
+                self._received_count += 1
                 if b"http://schemas.xmlsoap.org/ws/2005/04/discovery" in data:
                     continue  # older version of discovery standard, ignore completely.
                 logging.getLogger(commlog.DISCOVERY_IN).debug(data, extra={'ip_address': addr[0]})
                 try:
-                    try:
-                        received_message = message_reader.read_received_message(data, validate=True)
-                    except (etree.XMLSyntaxError, ValidationError) as ex:
-                        self._logger.info('_run_q_read: received invalid message from %r, ignoring it (error=%s)', addr,
-                                          ex)
-                    else:
-                        mid = received_message.p_msg.header_info_block.MessageID
-                        if mid in self._known_message_ids:
-                            self._logger.debug('incoming message already known: %s (from %r, Id %s).',
-                                               received_message.action, addr, mid)
-                            continue
-                        self._logger.debug('new incoming message: %s (from %r, Id %s).',
-                                           received_message.action, addr, mid)
-                        self._known_message_ids.appendleft(mid)
-                        self._wsd.handle_received_message(received_message, addr)
+                    self._process_received_data(addr, data)
                 except Exception:  # noqa: BLE001
                     self._logger.error('_run_q_read: %s', traceback.format_exc())  # noqa: TRY400
 
+    def _process_received_data(self, addr: tuple[str, int], data: bytes):
+        """Drop duplicates, validate and handle new messages."""
+        try:
+            mid = get_message_id(data)
+        except etree.XMLSyntaxError as ex:
+            self._invalid_count += 1
+            self._logger.info('_run_q_read: received invalid message from %r, ignoring it (error=%s)', addr, ex)
+            return
+        with self._known_message_ids_lock:
+            is_known = mid is not None and mid in self._known_message_ids
+        if is_known:
+            self._duplicates_count += 1
+            self._logger.debug('incoming message already known: (from %r, Id %s).', addr, mid)
+            return
+        try:
+            received_message = message_reader.read_received_message(data, validate=True)
+        except (etree.XMLSyntaxError, ValidationError) as ex:
+            self._invalid_count += 1
+            self._logger.info('_run_q_read: received invalid message from %r, ignoring it (error=%s)', addr, ex)
+            return
+        mid = received_message.p_msg.header_info_block.MessageID
+        with self._known_message_ids_lock:
+            if mid in self._known_message_ids:  # pre-filter did not find the MessageID
+                is_known = True
+            else:
+                self._known_message_ids.add(mid)
+        if is_known:
+            self._duplicates_count += 1
+            self._logger.debug('incoming message already known: %s (from %r, Id %s).',
+                               received_message.action, addr, mid)
+            return
+        self._logger.debug('new incoming message: %s (from %r, Id %s).', received_message.action, addr, mid)
+        self._wsd.handle_received_message(received_message, addr)
+
+    def get_receive_stats(self) -> ReceiveStats:
+        """Return counters of received datagrams."""
+        return ReceiveStats(self._received_count, self._duplicates_count, self._invalid_count)
+
     def _send_msg(self, q_msg: _EnqueuedMessage, s: socket.socket):
         msg = q_msg.msg
-        data = msg.created_message.serialize()
+        data = msg.data
         self._logger.debug('send message %d bytes (%d) action=%s: to=%s:%r id=%s',
                            len(data),
                            q_msg.repeat,
-                           msg.created_message.p_msg.header_info_block.Action,
+                           msg.created_message.header_info_block.Action,
                            msg.addr, msg.port,
-                           msg.created_message.p_msg.header_info_block.MessageID)
+                           msg.created_message.header_info_block.MessageID)
         try:
             s.sendto(data, (msg.addr, msg.port))
         except:  # noqa: E722 use bare except here, this is a catch-all that keeps thread running.
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
+from urllib.parse import unquote, urlsplit
 
 if TYPE_CHECKING:
     from lxml import etree
@@ -10,6 +12,27 @@ if TYPE_CHECKING:
     from sdc11073.xml_types import wsd_types
 
 
+@dataclass(frozen=True)
+class ParsedScope:
+    """A scope URI, split into the parts that are compared when scopes are matched (see wsdimpl.match_scope)."""
+
+    text: str
+    scheme: str  # lower case
+    netloc: str  # lower case
+    path: str
+    path_elements: tuple[str, ...]  # unquoted
+
+    @classmethod
+    def from_text(cls, text: str) -> ParsedScope:
+        """Parse a scope URI."""
+        split_result = urlsplit(text)
+        return cls(text,
+                   split_result.scheme.lower(),
+                   split_result.netloc.lower(),
+                   split_result.path,
+                   tuple(unquote(elem) for elem in split_result.path.split('/')))
+
+
 class Service:
     """Service objects contain discovery relevant data of a service.
 
@@ -27,6 +50,7 @@ class Service:
     ):
         self.types = types
         self.scopes = scopes
+        self._parsed_scopes: tuple[tuple[str, ...], tuple[ParsedScope, ...]] = ((), ())  # cache
         self._x_addrs = x_addrs
         self.epr = epr
         self.instance_id = instance_id
@@ -43,6 +67,17 @@ class Service:
         """Set the addresses of the service."""
         self._x_addrs = x_addrs
 
+    @property
+    def parsed_scopes(self) -> tuple[ParsedScope, ...]:
+        """Get the scopes of the service as ParsedScope objects.
+
+        They are parsed only once, and again if the scopes change.
+        """
+        texts = () if self.scopes is None else tuple(self.scopes.text)
+        if texts != self._parsed_scopes[0]:
+            self._parsed_scopes = (texts, tuple(ParsedScope.from_text(text) for text in texts))
+        return self._parsed_scopes[1]
+
     def increment_message_number(self) -> None:
         """Add one."""
         self.message_number += 1
@@ -0,0 +1,226 @@
+"""Registry of remote services that were found by WS-Discovery."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, defaultdict
+from threading import RLock
+from typing import TYPE_CHECKING
+
+from sdc11073.location import SdcLocation, UrlSchemeError
+from sdc11073.namespaces import default_ns_helper as nsh
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from lxml import etree
+
+    from sdc11073.wsdiscovery.service import ParsedScope, Service
+
+_NS_D = nsh.WSD.namespace
+# match_by values that compare scheme, netloc and path elements of scopes (see wsdimpl.match_scope)
+_PATH_MATCH_BY = (None, '', _NS_D + '/ldap', _NS_D + '/rfc3986', _NS_D + '/uuid')
+_STRCMP_MATCH_BY = _NS_D + '/strcmp0'
+
+
+def _type_key(q_name: etree.QName) -> tuple[str | None, str]:
+    return q_name.namespace, q_name.localname
+
+
+def _path_key(scope: ParsedScope, path_elements: tuple[str, ...]) -> tuple[str, str, tuple[str, ...]]:
+    return scope.scheme, scope.netloc, path_elements
+
+
+class RemoteServiceRegistry:
+    """The remote services of a WSDiscovery instance, with indices for fast lookup.
+
+    Services are indexed by type, by every prefix of the path of their scopes (that is what a scope in a probe
+    must be to match with rfc3986 rules), by scope text (strcmp0 rules) and by the elements of sdc location scopes.
+    Lookups by type, scope or location do not iterate over all services.
+
+    Eviction policy:
+     - ttl: a service that has not been added or updated for ttl seconds is removed.
+     - max_size: if more than max_size services are known, the one that was not added or updated for the
+       longest time is removed.
+    None means no limit. Expired services are removed on the next access of the registry.
+    """
+
+    def __init__(self, ttl: float | None = None, max_size: int | None = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._services: OrderedDict[str, Service] = OrderedDict()  # order is time of last add
+        self._last_seen: dict[str, float] = {}
+        self._sequence_numbers: dict[str, int] = {}  # results are sorted by time of first add
+        self._next_sequence_number = 0
+        self._by_type: defaultdict[tuple, set[str]] = defaultdict(set)
+        self._by_scope_path: defaultdict[tuple, set[str]] = defaultdict(set)
+        self._by_scope_text: defaultdict[str, set[str]] = defaultdict(set)
+        # location index refers to single scopes, because one scope must match all elements of a location
+        self._by_location: defaultdict[tuple[str, str], set[tuple[str, int]]] = defaultdict(set)
+        self._index_keys: dict[str, list[tuple[dict, object, object]]] = {}
+        self._lock = RLock()
+
+    def add(self, service: Service):
+        """Add service, replace a service with the same epr.
+
+        Call this method also after a service was modified, this updates the indices.
+        """
+        with self._lock:
+            epr = service.epr
+            self._rm_indices(epr)
+            if epr not in self._sequence_numbers:
+                self._sequence_numbers[epr] = self._next_sequence_number
+                self._next_sequence_number += 1
+            self._services[epr] = service
+            self._services.move_to_end(epr)
+            self._last_seen[epr] = time.monotonic()
+            self._mk_indices(service)
+            self.evict()
+
+    def get(self, epr: str) -> Service | None:
+        """Return the service with the given epr, None if it is unknown."""
+        with self._lock:
+            self.evict()
+            return self._services.get(epr)
+
+    def remove(self, epr: str) -> Service | None:
+        """Remove the service with the given epr and return it, None if it is unknown."""
+        with self._lock:
+            service = self._services.pop(epr, None)
+            if service is not None:
+                self._rm_indices(epr)
+                del self._last_seen[epr]
+                del self._sequence_numbers[epr]
+            return service
+
+    def clear(self):
+        """Remove all services."""
+        with self._lock:
+            self._services.clear()
+            self._last_seen.clear()
+            self._sequence_numbers.clear()
+            self._by_type.clear()
+            self._by_scope_path.clear()
+            self._by_scope_text.clear()
+            self._by_location.clear()
+            self._index_keys.clear()
+
+    def evict(self) -> list[Service]:
+        """Remove expired services and services that exceed max_size, return them."""
+        with self._lock:
+            evicted_eprs = []
+            if self.ttl is not None:
+                expired = time.monotonic() - self.ttl
+                for epr in self._services:  # oldest first
+                    if self._last_seen[epr] > expired:
+                        break
+                    evicted_eprs.append(epr)
+            if self.max_size is not None:
+                surplus = len(self._services) - len(evicted_eprs) - self.max_size
+                if surplus > 0:
+                    eprs = iter(self._services)
+                    for _ in evicted_eprs:
+                        next(eprs)
+                    evicted_eprs.extend(next(eprs) for _ in range(surplus))
+            return [self.remove(epr) for epr in evicted_eprs]
+
+    def services(self) -> list[Service]:
+        """Return all services."""
+        with self._lock:
+            self.evict()
+            return self._sorted(self._services)
+
+    def find(self,
+             types: Iterable[etree.QName] | None = None,
+             scopes: Iterable[ParsedScope] | None = None,
+             match_by: str | None = None) -> list[Service]:
+        """Return services that have all types and that match all scopes.
+
+        :param types: list of types that a service must have (all of them), no filtering if value is None
+        :param scopes: parsed scopes, each must match a scope of the service (see wsdimpl.match_scope).
+                       No filtering if value is None.
+        :param match_by: the matching rule for scopes
+        :return: list of services
+        """
+        with self._lock:
+            self.evict()
+            candidates = None
+            for q_name in types or ():
+                candidates = self._intersect(candidates, self._by_type.get(_type_key(q_name), set()))
+            for scope in scopes or ():
+                if match_by in _PATH_MATCH_BY:
+                    eprs = self._by_scope_path.get(_path_key(scope, scope.path_elements), set())
+                elif match_by == _STRCMP_MATCH_BY:
+                    eprs = self._by_scope_text.get(scope.text, set())
+                else:
+                    eprs = set()
+                candidates = self._intersect(candidates, eprs)
+            return self._sorted(self._services if candidates is None else candidates)
+
+    def find_in_location(self, sdc_location: SdcLocation,
+                         types: Iterable[etree.QName] | None = None) -> list[Service]:
+        """Return services that have a location scope 'inside' sdc_location (see SdcLocation) and all types."""
+        with self._lock:
+            self.evict()
+            scope_ids = self._by_location.get(('root', sdc_location.root), set())
+            for attr_name in SdcLocation.url_elements:
+                value = getattr(sdc_location, attr_name)
+                if value is not None:
+                    scope_ids = scope_ids & self._by_location.get((attr_name, value), set())
+            candidates = {epr for epr, _ in scope_ids}
+            for q_name in types or ():
+                candidates = candidates & self._by_type.get(_type_key(q_name), set())
+            return self._sorted(candidates)
+
+    @staticmethod
+    def _intersect(candidates: set[str] | None, eprs: set[str]) -> set[str]:
+        return set(eprs) if candidates is None else candidates & eprs
+
+    def _sorted(self, eprs: Iterable[str]) -> list[Service]:
+        return [self._services[epr] for epr in sorted(eprs, key=self._sequence_numbers.__getitem__)]
+
+    def _mk_indices(self, service: Service):
+        epr = service.epr
+        index_keys = []
+
+        def _add(index: dict, key: object, value: object):
+            index[key].add(value)
+            index_keys.append((index, key, value))
+
+        for q_name in service.types or ():
+            _add(self._by_type, _type_key(q_name), epr)
+        for i, scope in enumerate(service.parsed_scopes):
+            _add(self._by_scope_text, scope.text, epr)
+            for length in range(1, len(scope.path_elements) + 1):
+                _add(self._by_scope_path, _path_key(scope, scope.path_elements[:length]), epr)
+            try:
+                location = SdcLocation.from_scope_string(scope.text)
+            except (UrlSchemeError, ValueError):  # not a location or malformed
+                continue
+            _add(self._by_location, ('root', scope.path_elements[1]), (epr, i))  # same as location.root
+            for attr_name in SdcLocation.url_elements:
+                value = getattr(location, attr_name)
+                if value is not None:
+                    _add(self._by_location, (attr_name, value), (epr, i))
+        self._index_keys[epr] = index_keys
+
+    def _rm_indices(self, epr: str):
+        for index, key, value in self._index_keys.pop(epr, ()):
+            values = index.get(key)
+            if values is not None:
+                values.discard(value)
+                if not values:
+                    del index[key]
+
+    def __contains__(self, epr: str) -> bool:
+        with self._lock:
+            self.evict()
+            return epr in self._services
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([service.epr for service in self.services()])
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.evict()
+            return len(self._services)
@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import logging
 import random
+import threading
 import time
 from enum import Enum
 from typing import TYPE_CHECKING
-from urllib.parse import unquote, urlsplit
 
 from sdc11073 import network
 from sdc11073.definitions_sdc import SdcV1Definitions
@@ -18,7 +18,8 @@ from sdc11073.xml_types import wsd_types
 from sdc11073.xml_types.addressing_types import HeaderInformationBlock
 
 from .common import MULTICAST_IPV4_ADDRESS, MULTICAST_PORT, message_factory
-from .service import Service
+from .service import ParsedScope, Service
+from .serviceregistry import RemoteServiceRegistry
 
 if TYPE_CHECKING:
     import ipaddress
@@ -28,7 +29,7 @@ if TYPE_CHECKING:
     from lxml import etree
 
     from sdc11073.location import SdcLocation
-    from sdc11073.pysoap.msgfactory import CreatedMessage
+    from sdc11073.pysoap.msgfactory import CreatedMessage, SerializedBody, SplicedMessage
     from sdc11073.pysoap.msgreader import ReceivedMessage
     from sdc11073.xml_types.msg_types import MessageType
 
@@ -63,25 +64,23 @@ def match_scope(my_scope: str, other_scope: str, match_by: MatchBy | str | None)
 
     match_scope correctly handles "%2F" (== '/') encoded values.
     """
+    return match_parsed_scope(ParsedScope.from_text(my_scope), ParsedScope.from_text(other_scope), match_by)
+
+
+def match_parsed_scope(my_scope: ParsedScope, other_scope: ParsedScope, match_by: MatchBy | str | None) -> bool:
+    """Like match_scope, but with already parsed scopes."""
     if match_by in (MatchBy.ldap, MatchBy.uri, MatchBy.uuid, '', None):
-        my_scope = urlsplit(my_scope)
-        other_scope = urlsplit(other_scope)
-        if (
-            my_scope.scheme.lower() != other_scope.scheme.lower()
-            or my_scope.netloc.lower() != other_scope.netloc.lower()
-        ):
+        if my_scope.scheme != other_scope.scheme or my_scope.netloc != other_scope.netloc:
             return False
         if my_scope.path == other_scope.path:
             return True
-        src_path_elements = my_scope.path.split('/')
-        target_path_elements = other_scope.path.split('/')
-        src_path_elements = [unquote(elem) for elem in src_path_elements]
-        target_path_elements = [unquote(elem) for elem in target_path_elements]
+        src_path_elements = my_scope.path_elements
+        target_path_elements = other_scope.path_elements
         if len(src_path_elements) > len(target_path_elements):
             return False
-        return all(target_path_elements[i] == elem for i, elem in enumerate(src_path_elements))
+        return target_path_elements[:len(src_path_elements)] == src_path_elements
     if match_by == MatchBy.strcmp:
-        return my_scope == other_scope
+        return my_scope.text == other_scope.text
     return False
 
 
@@ -94,34 +93,45 @@ def _is_type_in_list(ttype: etree.QName, types: list[etree.QName]) -> bool:
     return any(match_type(ttype, entry) for entry in types)
 
 
-def _is_scope_in_list(uri: str, match_by: str, srv_sc: wsd_types.ScopesType) -> bool:
-    # returns True if every entry in scope.text is also found in srv_sc.text
-    # all entries are URIs
-    if srv_sc is None:
-        return False
-    return any(match_scope(uri, entry, match_by) for entry in srv_sc.text)
+def _is_scope_in_list(scope: ParsedScope, match_by: str, service_scopes: tuple[ParsedScope, ...]) -> bool:
+    # returns True if scope matches one of the service scopes
+    return any(match_parsed_scope(scope, entry, match_by) for entry in service_scopes)
 
 
-def matches_filter(service: Service, types: Iterable[etree.QName] | None, scopes: wsd_types.ScopesType | None) -> bool:
-    """Check if service matches the types and scopes."""
+def _matches_filter(service: Service,
+                    types: Iterable[etree.QName] | None,
+                    scopes: tuple[ParsedScope, ...] | None,
+                    match_by: str | None) -> bool:
     if types is not None:
         for ttype in types:
             if not _is_type_in_list(ttype, service.types):
                 return False
     if scopes is not None:
-        for uri in scopes.text:
-            if not _is_scope_in_list(uri, scopes.MatchBy, service.scopes):
+        service_scopes = service.parsed_scopes
+        for scope in scopes:
+            if not _is_scope_in_list(scope, match_by, service_scopes):
                 return False
     return True
 
 
+def _parse_scopes(scopes: wsd_types.ScopesType | None) -> tuple[ParsedScope, ...] | None:
+    return None if scopes is None else tuple(ParsedScope.from_text(text) for text in scopes.text)
+
+
+def matches_filter(service: Service, types: Iterable[etree.QName] | None, scopes: wsd_types.ScopesType | None) -> bool:
+    """Check if service matches the types and scopes."""
+    return _matches_filter(service, types, _parse_scopes(scopes), None if scopes is None else scopes.MatchBy)
+
+
 def filter_services(
     services: Iterable[Service],
     types: Iterable[etree.QName] | None,
     scopes: wsd_types.ScopesType | None,
 ) -> Sequence[Service]:
     """Filter services that match types and scopes."""
-    return [service for service in services if matches_filter(service, types, scopes)]
+    parsed_scopes = _parse_scopes(scopes)
+    match_by = None if scopes is None else scopes.MatchBy
+    return [service for service in services if _matches_filter(service, types, parsed_scopes, match_by)]
 
 
 def _mk_wsd_soap_message(header_info: HeaderInformationBlock, payload: MessageType) -> CreatedMessage:
@@ -134,6 +144,23 @@ def _mk_wsd_soap_message(header_info: HeaderInformationBlock, payload: MessageTy
     )
 
 
+def _mk_wsd_spliced_message(header_info: HeaderInformationBlock,
+                            body: SerializedBody,
+                            app_sequence: wsd_types.AppSequenceType) -> SplicedMessage:
+    # use discovery specific namespaces
+    return message_factory.mk_spliced_message(
+        header_info,
+        body,
+        header_nodes=[app_sequence.as_etree_node(nsh.WSD.tag('AppSequence'), ns_map=nsh.partial_map(nsh.WSD))],
+        ns_list=[nsh.S12, nsh.WSA, nsh.WSD],
+    )
+
+
+def _serialize_wsd_payload(payload: MessageType) -> SerializedBody:
+    ns_map = nsh.partial_map(nsh.WSA, nsh.WSD, *payload.additional_namespaces)
+    return message_factory.serialize_body(payload.as_etree_node(payload.NODETYPE, ns_map), action=payload.action)
+
+
 class WSDiscovery:
     """UDP based discovery."""
 
@@ -143,6 +170,10 @@ class WSDiscovery:
     PROBEMATCH_SCOPES = True
     PROBEMATCH_XADDRS = True
 
+    # eviction of remote services, see RemoteServiceRegistry. None means no limit.
+    REMOTE_SERVICE_TTL: float | None = None  # seconds since last Hello / ProbeMatch / ResolveMatch
+    MAX_REMOTE_SERVICES: int | None = None
+
     def __init__(
         self,
         ip_address: str | ipaddress.IPv4Address,
@@ -163,8 +194,11 @@ class WSDiscovery:
         self._networking_thread = None
         self._addrs_monitor_thread = None
         self._server_started = False
-        self._remote_services = {}
+        self._remote_services = RemoteServiceRegistry(self.REMOTE_SERVICE_TTL, self.MAX_REMOTE_SERVICES)
         self._local_services = {}
+        # serialized ProbeMatches and ResolveMatches bodies of local services, key is (action, epr)
+        self._match_bodies: dict[tuple[str, str], tuple[tuple, SerializedBody]] = {}
+        self._match_bodies_lock = threading.Lock()  # the receiving thread adds bodies, the application clears them
         self._remote_service_hello_callback = None
         self._remote_service_hello_callback_types_filter = None
         self._remote_service_hello_callback_scopes_filter = None
@@ -192,6 +226,12 @@ class WSDiscovery:
             self._stop_threads()
             self._server_started = False
 
+    def get_receive_stats(self) -> networkingthread.ReceiveStats | None:
+        """Return counters of received datagrams, None if discovery is not started."""
+        if self._networking_thread is None:
+            return None
+        return self._networking_thread.get_receive_stats()
+
     def __enter__(self):
         self.start()
         return self
@@ -228,7 +268,7 @@ class WSDiscovery:
             elif now < end:
                 time.sleep(end - now)
             now = time.monotonic()
-        return filter_services(list(self._remote_services.values()), types, scopes)
+        return self.get_found_remote_services(types, scopes)
 
     def get_found_remote_services(
         self,
@@ -236,7 +276,17 @@ class WSDiscovery:
         scopes: wsd_types.ScopesType | None = None,
     ) -> Sequence[Service]:
         """Get currently known remote services that match given types and scopes."""
-        return filter_services(list(self._remote_services.values()), types, scopes)
+        if scopes is None:
+            return self._remote_services.find(types)
+        return self._remote_services.find(types, _parse_scopes(scopes), scopes.MatchBy)
+
+    def get_found_remote_services_in_location(
+        self,
+        sdc_location: SdcLocation,
+        types: Iterable[etree.QName] | None = None,
+    ) -> list[Service]:
+        """Get currently known remote services that are inside sdc_location and have the given types."""
+        return self._remote_services.find_in_location(sdc_location, types)
 
     def search_sdc_services(
         self,
@@ -286,15 +336,15 @@ class WSDiscovery:
         # prevent possible duplicates by adding them to a dictionary by epr
         result = {}
         for _type in types_list:
-            tmp = filter_services(list(self._remote_services.values()), _type, scopes)
+            tmp = self.get_found_remote_services(_type, scopes)
             for srv in tmp:
                 result[srv.epr] = srv
         return list(result.values())
 
     def search_sdc_device_services_in_location(self, sdc_location: SdcLocation, timeout: int = 3) -> list[Service]:
         """Search for all sdc devices (no scopes filter applied), then filter locally for location."""
-        services = self.search_sdc_services(timeout=timeout)
-        return sdc_location.filter_services_inside(services)
+        self.search_sdc_services(timeout=timeout)
+        return self.get_found_remote_services_in_location(sdc_location, SdcV1Definitions.MedicalDeviceTypesFilter)
 
     def publish_service(self, epr: str, types: list[etree.QName], scopes: wsd_types.ScopesType, x_addrs: list[str]):
         """Publish a service with the given TYPES, SCOPES and XAddrs (service addresses).
@@ -320,12 +370,17 @@ class WSDiscovery:
         for service in self._local_services.values():
             self._send_bye(service)
         self._local_services.clear()
+        with self._match_bodies_lock:
+            self._match_bodies.clear()
 
     def clear_service(self, epr: str):
         """Clear local service with given epr."""
         service = self._local_services[epr]
         self._send_bye(service)
         del self._local_services[epr]
+        with self._match_bodies_lock:
+            for key in [key for key in self._match_bodies if key[1] == epr]:
+                del self._match_bodies[key]
 
     @property
     def active_address(self) -> str:
@@ -381,7 +436,7 @@ class WSDiscovery:
             return
         already_known_service = self._remote_services.get(service.epr)
         if not already_known_service:
-            self._remote_services[service.epr] = service
+            self._remote_services.add(service)
             self._logger.info('new remote epr="%s" x_addrs=%r', service.epr, service.x_addrs)
             return
 
@@ -397,6 +452,7 @@ class WSDiscovery:
                 already_known_service.scopes = service.scopes
             if service.types is not None:
                 already_known_service.types = service.types
+            self._remote_services.add(already_known_service)  # update indices and time of last update
         elif service.metadata_version > already_known_service.metadata_version:
             self._logger.info(
                 'remote Service %s:\n    updated MetadataVersion\n      updated: %d\n      existing: %d',
@@ -404,7 +460,7 @@ class WSDiscovery:
                 service.metadata_version,
                 already_known_service.metadata_version,
             )
-            self._remote_services[service.epr] = service
+            self._remote_services.add(service)
         else:
             self._logger.debug(
                 '_add_remote_service: remote Service %s:\n    outdated MetadataVersion\n      '
@@ -415,8 +471,7 @@ class WSDiscovery:
             )
 
     def _remove_remote_service(self, epr: str):
-        if epr in self._remote_services:
-            del self._remote_services[epr]
+        self._remote_services.remove(epr)
 
     def _handle_received_hello(self, received_message: ReceivedMessage, addr_from: str):
         app_sequence_node = received_message.p_msg.header_node.find(nsh.WSD.tag('AppSequence'))
@@ -546,9 +601,32 @@ class WSDiscovery:
         else:
             func(received_message, addr_from)
 
-    def _send_resolve_match(self, service: Service, relates_to: str, addr: str):
-        self._logger.info('sending resolve match to %s', addr)
-        service.increment_message_number()
+    def _get_match_body(self, service: Service, payload_class: type[MessageType]) -> SerializedBody:
+        """Return the serialized ProbeMatches or ResolveMatches body for service.
+
+        The body is validated and serialized once and reused until types, scopes, x_addrs or metadata version
+        of the service change.
+        """
+        scopes = None if service.scopes is None else (tuple(service.scopes.text), service.scopes.MatchBy)
+        version_key = (tuple(service.types or ()), scopes, tuple(service.x_addrs), service.metadata_version,
+                       self.PROBEMATCH_EPR, self.PROBEMATCH_TYPES, self.PROBEMATCH_SCOPES, self.PROBEMATCH_XADDRS)
+        cache_key = (payload_class.action, service.epr)
+        with self._match_bodies_lock:
+            cached = self._match_bodies.get(cache_key)
+        if cached is not None and cached[0] == version_key:
+            return cached[1]
+        if payload_class is wsd_types.ResolveMatchesType:
+            payload = self._mk_resolve_matches(service)
+        else:
+            payload = self._mk_probe_matches(service)
+        body = _serialize_wsd_payload(payload)
+        with self._match_bodies_lock:
+            if service.epr in self._local_services:  # do not re-add a body of a service that was cleared meanwhile
+                self._match_bodies[cache_key] = (version_key, body)
+        return body
+
+    @staticmethod
+    def _mk_resolve_matches(service: Service) -> wsd_types.ResolveMatchesType:
         payload = wsd_types.ResolveMatchesType()
         payload.ResolveMatch = wsd_types.ResolveMatchType()
         payload.ResolveMatch.EndpointReference.Address = service.epr
@@ -556,17 +634,38 @@ class WSDiscovery:
         payload.ResolveMatch.Types = service.types
         payload.ResolveMatch.Scopes = service.scopes
         payload.ResolveMatch.XAddrs.extend(service.x_addrs)
-        inf = HeaderInformationBlock(action=payload.action, addr_to=WSA_ANONYMOUS, relates_to=relates_to)
+        return payload
+
+    def _mk_probe_matches(self, service: Service) -> wsd_types.ProbeMatchesType:
+        payload = wsd_types.ProbeMatchesType()
+
+        # add values to ProbeResponse acc. to flags
+        epr = service.epr if self.PROBEMATCH_EPR else ''
+        types = service.types if self.PROBEMATCH_TYPES else []
+        scopes = service.scopes if self.PROBEMATCH_SCOPES else None
+        xaddrs = service.x_addrs if self.PROBEMATCH_XADDRS else []
+
+        probe_match = wsd_types.ProbeMatchType()
+        probe_match.EndpointReference.Address = epr
+        probe_match.MetadataVersion = service.metadata_version
+        probe_match.Types = types
+        probe_match.Scopes = scopes
+        probe_match.XAddrs.extend(xaddrs)
+        payload.ProbeMatch.append(probe_match)
+        return payload
+
+    def _send_resolve_match(self, service: Service, relates_to: str, addr: str):
+        self._logger.info('sending resolve match to %s', addr)
+        service.increment_message_number()
+        body = self._get_match_body(service, wsd_types.ResolveMatchesType)
+        inf = HeaderInformationBlock(action=wsd_types.ResolveMatchesType.action, addr_to=WSA_ANONYMOUS,
+                                     relates_to=relates_to)
         app_sequence = wsd_types.AppSequenceType()
         app_sequence.InstanceId = int(service.instance_id)
         app_sequence.MessageNumber = service.message_number
 
-        created_message = _mk_wsd_soap_message(inf, payload)
-        created_message.p_msg.add_header_element(
-            app_sequence.as_etree_node(nsh.WSD.tag('AppSequence'), ns_map=nsh.partial_map(nsh.WSD)),
-        )
         self._networking_thread.add_outbound_message(
-            created_message,
+            _mk_wsd_spliced_message(inf, body, app_sequence),
             addr[0],
             addr[1],
             networkingthread.UNICAST_REPEAT_PARAMS,
@@ -578,32 +677,15 @@ class WSDiscovery:
         # send one match response for every service.
         # dpws explorer can't handle telegram otherwise if too many devices reported
         for service in services:
-            payload = wsd_types.ProbeMatchesType()
-
-            # add values to ProbeResponse acc. to flags
-            epr = service.epr if self.PROBEMATCH_EPR else ''
-            types = service.types if self.PROBEMATCH_TYPES else []
-            scopes = service.scopes if self.PROBEMATCH_SCOPES else None
-            xaddrs = service.x_addrs if self.PROBEMATCH_XADDRS else []
-
-            probe_match = wsd_types.ProbeMatchType()
-            probe_match.EndpointReference.Address = epr
-            probe_match.MetadataVersion = service.metadata_version
-            probe_match.Types = types
-            probe_match.Scopes = scopes
-            probe_match.XAddrs.extend(xaddrs)
-            payload.ProbeMatch.append(probe_match)
-            inf = HeaderInformationBlock(action=payload.action, addr_to=WSA_ANONYMOUS, relates_to=relates_to)
+            body = self._get_match_body(service, wsd_types.ProbeMatchesType)
+            inf = HeaderInformationBlock(action=wsd_types.ProbeMatchesType.action, addr_to=WSA_ANONYMOUS,
+                                         relates_to=relates_to)
             app_sequence = wsd_types.AppSequenceType()
             app_sequence.InstanceId = int(service.instance_id)
             app_sequence.MessageNumber = msg_number
 
-            created_message = _mk_wsd_soap_message(inf, payload)
-            created_message.p_msg.add_header_element(
-                app_sequence.as_etree_node(nsh.WSD.tag('AppSequence'), ns_map=nsh.partial_map(nsh.WSD)),
-            )
             self._networking_thread.add_outbound_message(
-                created_message,
+                _mk_wsd_spliced_message(inf, body, app_sequence),
                 addr[0],
                 addr[1],
                 networkingthread.UNICAST_REPEAT_PARAMS,
@@ -68,3 +68,13 @@ periodic_actions = {Actions.PeriodicContextReport,
                     }
 
 periodic_actions_and_system_error_report = set(periodic_actions).add(Actions.SystemErrorReport)
+
+# actions of reports that contain states, a StateFilter of a subscription applies to these reports.
+state_report_actions = {Actions.EpisodicContextReport,
+                        Actions.EpisodicMetricReport,
+                        Actions.EpisodicOperationalStateReport,
+                        Actions.EpisodicAlertReport,
+                        Actions.EpisodicComponentReport,
+                        Actions.Waveform,
+                        *periodic_actions,
+                        }
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import enum
-import inspect
 import traceback
 from math import isclose
 from typing import TYPE_CHECKING
 
 from lxml import etree
 
-from .xml_structure import NodeStringProperty, NodeTextListProperty
+from . import xml_codec
+from .dataconverters import SAMPLE_ARRAY_TYPES, SampleListConverter
+from .xml_structure import NodeStringProperty, NodeTextListProperty, get_property_table
 
 if TYPE_CHECKING:
     from sdc11073 import xml_utils
@@ -32,8 +33,11 @@ class XMLTypeBase:
     """
 
     def __init__(self):
-        for _, prop in self.sorted_container_properties():
-            prop.init_instance_data(self)
+        if xml_codec.USE_COMPILED_CODECS:
+            xml_codec.get_codec(self.__class__).init(self)
+            return
+        for init_instance_data in get_property_table(self.__class__).init_plan:
+            init_instance_data(self)
 
     def as_etree_node(self, q_name: etree.QName, ns_map: dict, parent_node: etree.Element | None = None):
         if parent_node is not None:
@@ -44,42 +48,51 @@ class XMLTypeBase:
         return node
 
     def update_node(self, node: xml_utils.LxmlElement):
+        if xml_codec.USE_COMPILED_CODECS:
+            try:
+                xml_codec.get_codec(self.__class__).emit(self, node)
+            except Exception:
+                # the compiled codec does not know the failing property, repeat the update property by property
+                # on a scratch node to raise an error with the property name
+                self._update_node_by_properties(etree.Element(node.tag, nsmap=node.nsmap))
+                raise
+            return
+        self._update_node_by_properties(node)
+
+    def _update_node_by_properties(self, node: xml_utils.LxmlElement):
         for prop_name, prop in self.sorted_container_properties():
             try:
                 prop.update_xml_value(self, node)
             except Exception as ex:
                 # re-raise with some information about the data
-                raise ValueError(
-                    f'In {self.__class__.__name__}.{prop_name}, {prop!s} could not update: {traceback.format_exc()}') from ex
+                msg = f'In {self.__class__.__name__}.{prop_name}, {prop!s} could not update: {traceback.format_exc()}'
+                raise ValueError(msg) from ex
 
     def update_from_node(self, node: xml_utils.LxmlElement):
-        for dummy, prop in self.sorted_container_properties():
-            prop.update_from_node(self, node)
+        if xml_codec.USE_COMPILED_CODECS:
+            xml_codec.get_codec(self.__class__).parse(self, node)
+            return
+        for update_from_node in get_property_table(self.__class__).deserializer_plan:
+            update_from_node(self, node)
 
     def sorted_container_properties(self):
         """
-        @return: a list of (name, object) tuples of all GenericProperties ( and subclasses)
-        list is created based on _props lists of classes
+        @return: a tuple of (name, object) tuples of all GenericProperties ( and subclasses)
+        tuple is created once per class based on _props lists of classes
         """
-        ret = []
-        classes = inspect.getmro(self.__class__)
-        for cls in reversed(classes):
-            try:
-                names = cls.__dict__['_props']  # this checks only current class, not parent
-            except (AttributeError, KeyError):
-                continue
-            for name in names:
-                obj = getattr(cls, name)
-                if obj is not None:
-                    ret.append((name, obj))
-        return ret
+        return get_property_table(self.__class__).properties
 
     def __eq__(self, other):
         """ compares all properties"""
         try:
-            for name, dummy in self.sorted_container_properties():
+            for name in get_property_table(self.__class__).names:
                 my_value = getattr(self, name)
                 other_value = getattr(other, name)
+                if isinstance(my_value, SAMPLE_ARRAY_TYPES) or isinstance(other_value, SAMPLE_ARRAY_TYPES):
+                    # arrays do not compare to a single boolean
+                    if SampleListConverter.values_equal(my_value, other_value):
+                        continue
+                    return False
                 if my_value == other_value:
                     continue
                 if (isinstance(my_value, float) or isinstance(other_value, float)) and isclose(my_value, other_value):
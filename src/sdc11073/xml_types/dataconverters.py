@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+from array import array
 from decimal import Decimal
-from typing import Protocol, Any
+from math import isclose
+from typing import TYPE_CHECKING, Protocol, Any
 
 from . import isoduration
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
 STRICT_VALUE_CHECK = True
 
 
@@ -206,6 +216,99 @@ class DecimalConverter(NullConverter):
                 raise ValueError(f'expected a decimal, got {type(py_value)}')
 
 
+SAMPLE_ARRAY_TYPES = (array,) if np is None else (array, np.ndarray)
+
+
+class SampleListConverter(ListConverter):
+    """Converts a space separated list of decimals, e.g. the samples of a SampleArrayValue.
+
+    The python value can be a list of Decimal (same behavior as ListConverter(DecimalConverter)),
+    or a compact sample array of floats: a numpy float64 array if numpy is installed and USE_NUMPY is True,
+    otherwise an array('d').
+    Compact sample arrays are parsed and formatted as a whole, no python object is created per sample.
+    Formatting rounds floats like DecimalConverter does.
+    """
+
+    USE_NUMPY = np is not None
+
+    def __init__(self):
+        super().__init__(DecimalConverter)
+
+    @classmethod
+    def mk_sample_array(cls, values: Sequence[float] = ()) -> array | np.ndarray:
+        """Create a compact sample array from float values."""
+        if cls.USE_NUMPY:
+            return np.asarray(values, dtype=np.float64)
+        return array('d', values)
+
+    def check_valid(self, py_value):
+        if isinstance(py_value, SAMPLE_ARRAY_TYPES):
+            return
+        super().check_valid(py_value)
+
+    def list_to_py(self, xml_value: str) -> array | np.ndarray:
+        """Parse the space separated list into a compact sample array."""
+        if self.USE_NUMPY:
+            return np.array(xml_value.split(), dtype=np.float64)
+        return array('d', map(float, xml_value.split()))
+
+    def list_to_xml(self, py_value: list | array | np.ndarray) -> str:
+        """Format a list or a compact sample array as space separated list."""
+        if isinstance(py_value, list):
+            return ' '.join([self.elem_to_xml(v) for v in py_value])
+        if np is not None and isinstance(py_value, np.ndarray):
+            rounded = self._round_ndarray(py_value)
+        else:
+            # "+ 0.0" turns a negative zero into zero
+            rounded = [self._round(v) + 0.0 for v in py_value]
+        # repr of a rounded float is the shortest representation, only a trailing ".0" must be removed.
+        xml_value = (' '.join(map(repr, rounded)) + ' ').replace('.0 ', ' ')[:-1]
+        if 'e' in xml_value or 'n' in xml_value:
+            # exponent form, nan or inf: use the slow path that handles all corner cases
+            return ' '.join([DecimalConverter.to_xml(v) for v in rounded])
+        return xml_value
+
+    @staticmethod
+    def _round(value: float) -> float:
+        """Round like DecimalConverter does."""
+        if abs(value) >= 100:
+            return round(value, 1)
+        if abs(value) >= 10:
+            return round(value, 2)
+        return round(value, 3)
+
+    @classmethod
+    def _round_ndarray(cls, py_value: np.ndarray) -> list[float]:
+        """Round all values like _round does.
+
+        np.round rounds the scaled value half to even, round() rounds the exact binary value of the float.
+        The results only differ for values whose scaled value is (almost) exactly half-way, they are rounded
+        with _round.
+        """
+        abs_values = np.abs(py_value)
+        decimals = np.where(abs_values >= 100, 1, np.where(abs_values >= 10, 2, 3))
+        rounded = np.where(decimals == 1, np.round(py_value, 1),
+                           np.where(decimals == 2, np.round(py_value, 2), np.round(py_value, 3)))
+        with np.errstate(invalid='ignore'):  # nan and inf
+            scaled = np.abs(py_value * 10.0 ** decimals)
+            half_way = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(scaled, 1)
+        for i in np.flatnonzero(half_way):
+            rounded[i] = cls._round(float(py_value[i]))
+        rounded += 0.0  # turns negative zeros into zeros
+        return rounded.tolist()
+
+    @staticmethod
+    def values_equal(left: Any, right: Any) -> bool:
+        """Compare two sample lists, floats are compared almost equal."""
+        try:
+            if len(left) != len(right):
+                return False
+        except TypeError:  # len of one value cannot be determined, e.g. None
+            return left is right
+        return all(l_val == r_val or isclose(float(l_val), float(r_val))
+                   for l_val, r_val in zip(left, right, strict=True))
+
+
 class IntegerConverter(NullConverter):
     @staticmethod
     def to_py(xml_value: str) -> int:
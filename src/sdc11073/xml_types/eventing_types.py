@@ -1,3 +1,5 @@
+from lxml import etree
+
 from . import xml_structure
 from . import xml_structure as cp
 from .addressing_types import EndpointReferenceType
@@ -9,6 +11,10 @@ from sdc11073.namespaces import default_ns_helper
 
 wse_tag = default_ns_helper.WSE.tag
 xml_tag = default_ns_helper.XML.tag
+
+# sdc11073 specific filter dialect: the filter text is a list of actions (same as dpws action dialect),
+# a StateFilter element in the filter limits the states in state reports.
+STATE_FILTER_DIALECT = 'urn:sdc11073:eventing:ActionAndStateFilter'
 ### classes that correspond to types in eventing standard
 
 
@@ -21,11 +27,39 @@ class DeliveryType(XMLTypeBase):
     _props = ('Mode', 'NotifyTo')
 
 
+class StateFilter(XMLTypeBase):
+    """States that a subscriber wants to receive in state reports (dialect STATE_FILTER_DIALECT).
+
+    A state matches if its DescriptorHandle (or Handle for context states) is in Handles,
+    or if the local name of its type (e.g. "AlertConditionState") is in NodeTypes.
+    """
+
+    NODETYPE = etree.QName(STATE_FILTER_DIALECT, 'StateFilter')
+    Handles = cp.HandleRefListAttributeProperty('Handles')
+    NodeTypes = cp.StringListAttributeProperty('NodeTypes')
+    _props = ('Handles', 'NodeTypes')
+
+
 class FilterType(ElementWithText):
     Dialect = cp.AnyURIAttributeProperty('Dialect')
     any = xml_structure.AnyEtreeNodeListProperty(None, is_optional=True)  # noqa: A003
     _props = ('Dialect', 'any')
 
+    def set_state_filter(self, state_filter: StateFilter):
+        """Change the dialect to STATE_FILTER_DIALECT and add the state filter."""
+        self.Dialect = STATE_FILTER_DIALECT
+        self.any = [node for node in self.any if node.tag != StateFilter.NODETYPE]
+        self.any.append(state_filter.as_etree_node(StateFilter.NODETYPE, {'sf': STATE_FILTER_DIALECT}))
+
+    def get_state_filter(self) -> StateFilter | None:
+        """Return the state filter if dialect is STATE_FILTER_DIALECT, else None."""
+        if self.Dialect != STATE_FILTER_DIALECT:
+            return None
+        for node in self.any:
+            if node.tag == StateFilter.NODETYPE:
+                return StateFilter.from_node(node)
+        return None
+
 
 class Subscribe(MessageType):
     NODETYPE = wse_tag('Subscribe')
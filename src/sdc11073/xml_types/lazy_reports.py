@@ -0,0 +1,149 @@
+"""Lazy views of state reports, states are parsed on demand.
+
+Parsing a report with from_node creates all state containers with all their values (metric values, annotations,...).
+A consumer often does not need all of them, e.g. if the report has an outdated mdib version,
+or if a state is not newer than the state in the consumer mdib.
+LazyStatesReport only reads the DescriptorHandle, Handle and StateVersion attributes of every state;
+the state container is created when it is accessed.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sdc11073.xml_types import xml_structure
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sdc11073 import xml_utils
+    from sdc11073.mdib.statecontainers import AbstractStateContainer
+    from sdc11073.xml_types.msg_types import AbstractReport
+
+
+class LazyState:
+    """A state in a report, the state container is created on first access."""
+
+    __slots__ = ('DescriptorHandle', 'Handle', 'StateVersion', '_container', '_container_class', 'node')
+
+    def __init__(self, node: xml_utils.LxmlElement | None, container_class: type | None,
+                 container: AbstractStateContainer | None = None):
+        """Construct a LazyState.
+
+        :param node: the state node in the report
+        :param container_class: the class that is instantiated from node
+        :param container: an already existing state container, node and container_class are not used then.
+        """
+        self.node = node
+        self._container_class = container_class
+        self._container = container
+        if container is None:
+            self.DescriptorHandle: str = node.get('DescriptorHandle')
+            self.Handle: str | None = node.get('Handle')  # only context states have a handle
+            self.StateVersion = int(node.get('StateVersion', '0'))
+        else:
+            self.DescriptorHandle = container.DescriptorHandle
+            self.Handle = getattr(container, 'Handle', None)
+            self.StateVersion = container.StateVersion
+
+    @classmethod
+    def from_container(cls, container: AbstractStateContainer) -> LazyState:
+        """Wrap an existing state container."""
+        return cls(None, None, container)
+
+    @property
+    def container(self) -> AbstractStateContainer:
+        """Return the state container, it is created from node on first access."""
+        if self._container is None:
+            self._container = self._container_class.from_node(self.node)
+        return self._container
+
+    @property
+    def is_parsed(self) -> bool:
+        """Return True if the state container exists."""
+        return self._container is not None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__} DescriptorHandle="{self.DescriptorHandle}" StateVersion={self.StateVersion}'
+
+
+class LazyReportPart:
+    """A report part with lazy states."""
+
+    def __init__(self, source_mds: str | None, states: list[LazyState]):
+        self.SourceMds = source_mds
+        self.states = states
+
+    @property
+    def values_list(self) -> list[AbstractStateContainer]:
+        """Return the state containers of all states, same as values_list of a report part."""
+        return [state.container for state in self.states]
+
+
+class LazyStatesReport:
+    """A read only view of a report with states (EpisodicMetricReport, ..., WaveformStream).
+
+    The view has the same ReportPart / values_list interface as the report,
+    but the states of a report part are also available as LazyState instances.
+    WaveformStream has no report parts, its states are in one LazyReportPart.
+    """
+
+    def __init__(self, report_class: type[AbstractReport], node: xml_utils.LxmlElement):
+        """Read the report parts and the handles and versions of all states.
+
+        :param report_class: the class of the report, e.g. EpisodicMetricReport
+        :param node: the report node
+        """
+        self.report_class = report_class
+        self.node = node
+        self.MdibVersion = int(node.get('MdibVersion', '0'))
+        self.SequenceId = node.get('SequenceId')
+        instance_id = node.get('InstanceId')
+        self.InstanceId = None if instance_id is None else int(instance_id)
+        report_part_property = getattr(report_class, 'ReportPart', None)
+        if report_part_property is None:
+            self.ReportPart = [LazyReportPart(None, _read_states(report_class, node))]
+        else:
+            part_class = report_part_property.value_class
+            source_mds_name = part_class.SourceMds.sub_element_name
+            self.ReportPart = []
+            for part_node in node.iterfind(report_part_property.sub_element_name):
+                source_mds_node = part_node.find(source_mds_name)
+                source_mds = None if source_mds_node is None else source_mds_node.text or ''
+                self.ReportPart.append(LazyReportPart(source_mds, _read_states(part_class, part_node)))
+
+    def states(self) -> list[LazyState]:
+        """Return the states of all report parts."""
+        return [state for report_part in self.ReportPart for state in report_part.states]
+
+    def parsed_containers(self) -> list[AbstractStateContainer]:
+        """Return the state containers of all states that were accessed."""
+        return [state.container for state in self.states() if state.is_parsed]
+
+    def to_report(self) -> AbstractReport:
+        """Parse the complete report."""
+        return self.report_class.from_node(self.node)
+
+
+def _get_state_list_property(cls: type) -> xml_structure.ContainerListProperty:
+    for _, prop in xml_structure.get_property_table(cls).properties:
+        if isinstance(prop, xml_structure.ContainerListProperty):
+            return prop
+    raise TypeError(f'{cls.__name__} has no list of containers')  # noqa: EM102
+
+
+def _read_states(cls: type, node: xml_utils.LxmlElement) -> list[LazyState]:
+    state_list_property = _get_state_list_property(cls)
+    return [LazyState(state_node, state_list_property.get_value_class(state_node))
+            for state_node in node.iterfind(state_list_property.sub_element_name)]
+
+
+def get_lazy_states(report: AbstractReport | LazyStatesReport | Iterable) -> list[LazyState]:
+    """Return the states of a report (parsed or lazy) or of a list of states (containers or lazy) as LazyStates."""
+    if isinstance(report, LazyStatesReport):
+        return report.states()
+    if hasattr(report, 'ReportPart'):
+        states = [state for report_part in report.ReportPart for state in report_part.values_list]
+    else:
+        states = report
+    return [state if isinstance(state, LazyState) else LazyState.from_container(state) for state in states]
@@ -0,0 +1,170 @@
+"""Compiled xml codecs: generated init, emit and parse functions per class.
+
+The generic way to (de)serialize a container or a XMLTypeBase instance is to call the update_xml_value /
+update_from_node methods of all its properties, see xml_structure.PropertyTable.
+A codec does the same in one function that is generated for the class: attributes are read and written inline,
+without a method call per property, without getattr and without try / except.
+Empty extensions and empty lists of sub elements are skipped inline. All other properties (sub elements, ...)
+still call the methods of the property.
+A third generated function sets the default values of a new instance (instead of PropertyTable.init_plan),
+immutable default values are not deep-copied.
+The generated functions produce the same xml and the same python values as the generic property walk.
+
+Codecs are opt-in: set USE_COMPILED_CODECS = True to use them in __init__, update_node and update_from_node
+of ContainerBase and XMLTypeBase. A codec is compiled on first use of a class.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Any
+
+from sdc11073.xml_types import xml_structure
+from sdc11073.xml_types.dataconverters import NullConverter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sdc11073 import xml_utils
+
+USE_COMPILED_CODECS = False  # if True, __init__, update_node and update_from_node use compiled codecs
+
+
+class XmlCodec:
+    """The compiled init, emit and parse functions of a class."""
+
+    __slots__ = ('emit', 'emit_source', 'init', 'init_source', 'parse', 'parse_source')
+
+    def __init__(self, cls: type):
+        properties = xml_structure.get_property_table(cls).properties
+        self.init_source, init_namespace = _mk_init_source(properties)
+        self.init: Callable[[Any], None] = _compile(self.init_source, init_namespace, 'init', cls)
+        self.emit_source, emit_namespace = _mk_emit_source(properties)
+        self.parse_source, parse_namespace = _mk_parse_source(properties)
+        self.emit: Callable[[Any, xml_utils.LxmlElement], None] = _compile(
+            self.emit_source, emit_namespace, 'emit', cls)
+        self.parse: Callable[[Any, xml_utils.LxmlElement], None] = _compile(
+            self.parse_source, parse_namespace, 'parse', cls)
+
+
+def get_codec(cls: type) -> XmlCodec:
+    """Return the codec of cls, it is compiled on first call."""
+    codec = cls.__dict__.get('_xml_codec')
+    if codec is None:
+        codec = XmlCodec(cls)
+        cls._xml_codec = codec
+    return codec
+
+
+_INIT_EMPTY_LIST = (xml_structure._AttributeListBase.init_instance_data,  # noqa: SLF001
+                    xml_structure._ElementListProperty.init_instance_data)  # noqa: SLF001
+
+
+def _is_simple_attribute(prop: xml_structure._XmlStructureBaseProperty) -> bool:
+    """Return True if prop uses the generic attribute implementation, which can be inlined."""
+    cls = prop.__class__
+    return (isinstance(prop, xml_structure._AttributeBase)  # noqa: SLF001
+            and cls.update_xml_value is xml_structure._AttributeBase.update_xml_value  # noqa: SLF001
+            and cls.get_py_value_from_node is xml_structure._AttributeBase.get_py_value_from_node  # noqa: SLF001
+            and cls.update_from_node is xml_structure._XmlStructureBaseProperty.update_from_node)  # noqa: SLF001
+
+
+def _is_simple_extension(prop: xml_structure._XmlStructureBaseProperty) -> bool:
+    return (prop.__class__ is xml_structure.ExtensionNodeProperty
+            and prop._sub_element_name is not None)  # noqa: SLF001
+
+
+def _is_simple_element_list(prop: xml_structure._XmlStructureBaseProperty) -> bool:
+    return prop.__class__ is xml_structure.SubElementListProperty and prop._sub_element_name is not None  # noqa: SLF001
+
+
+def _mk_init_source(properties: tuple) -> tuple[str, dict]:
+    lines = ['def init(instance):', '    data = instance.__dict__']
+    namespace: dict[str, Any] = {'deepcopy': copy.deepcopy}
+    for i, (_, prop) in enumerate(properties):
+        local_var_name = prop._local_var_name  # noqa: SLF001
+        init_instance_data = prop.__class__.init_instance_data
+        if init_instance_data in _INIT_EMPTY_LIST:
+            lines.append(f'    data[{local_var_name!r}] = []')
+        elif init_instance_data is xml_structure._XmlStructureBaseProperty.init_instance_data:  # noqa: SLF001
+            default_py_value = prop._default_py_value  # noqa: SLF001
+            if default_py_value is None:
+                continue
+            namespace[f'default_{i}'] = default_py_value
+            if isinstance(default_py_value, xml_structure._IMMUTABLE_TYPES):  # noqa: SLF001
+                lines.append(f'    data[{local_var_name!r}] = default_{i}')
+            else:
+                lines.append(f'    data[{local_var_name!r}] = deepcopy(default_{i})')
+        else:
+            namespace[f'init_{i}'] = prop.init_instance_data
+            lines.append(f'    init_{i}(instance)')
+    return '\n'.join(lines), namespace
+
+
+def _mk_emit_source(properties: tuple) -> tuple[str, dict]:
+    lines = ['def emit(instance, node):', '    data = instance.__dict__']
+    namespace: dict[str, Any] = {'xml_structure': xml_structure}
+    for i, (_, prop) in enumerate(properties):
+        local_var_name = prop._local_var_name  # noqa: SLF001
+        if _is_simple_attribute(prop):
+            namespace[f'name_{i}'] = prop._attribute_name  # noqa: SLF001
+            lines.append(f'    value = data.get({local_var_name!r})')
+            lines.append('    if value is None:')
+            if not prop.is_optional:
+                namespace[f'missing_{i}'] = f'mandatory value {prop._attribute_name} missing'  # noqa: SLF001
+                lines.append('        if xml_structure.MANDATORY_VALUE_CHECKING:')
+                lines.append(f'            raise ValueError(missing_{i})')
+            lines.append(f'        if name_{i} in node.attrib:')
+            lines.append(f'            del node.attrib[name_{i}]')
+            lines.append('    else:')
+            if prop._converter.to_xml is NullConverter.to_xml:  # noqa: SLF001
+                lines.append(f'        node.set(name_{i}, value)')
+            else:
+                namespace[f'to_xml_{i}'] = prop._converter.to_xml  # noqa: SLF001
+                lines.append(f'        node.set(name_{i}, to_xml_{i}(value))')
+        elif _is_simple_extension(prop) or _is_simple_element_list(prop):
+            # most extensions and lists are empty, only call the property if there is something to write
+            namespace[f'update_{i}'] = prop.update_xml_value
+            lines.append(f'    if data.get({local_var_name!r}):')
+            lines.append(f'        update_{i}(instance, node)')
+        else:
+            namespace[f'update_{i}'] = prop.update_xml_value
+            lines.append(f'    update_{i}(instance, node)')
+    return '\n'.join(lines), namespace
+
+
+def _mk_parse_source(properties: tuple) -> tuple[str, dict]:
+    lines = ['def parse(instance, node):', '    data = instance.__dict__', '    attrib_get = node.attrib.get']
+    namespace: dict[str, Any] = {'ExtensionLocalValue': xml_structure.ExtensionLocalValue}
+    for i, (_, prop) in enumerate(properties):
+        local_var_name = prop._local_var_name  # noqa: SLF001
+        if _is_simple_attribute(prop):
+            namespace[f'name_{i}'] = prop._attribute_name  # noqa: SLF001
+            if prop._converter.to_py is NullConverter.to_py:  # noqa: SLF001
+                lines.append(f'    data[{local_var_name!r}] = attrib_get(name_{i})')
+            else:
+                namespace[f'to_py_{i}'] = prop._converter.to_py  # noqa: SLF001
+                lines.append(f'    value = attrib_get(name_{i})')
+                lines.append(f'    data[{local_var_name!r}] = None if value is None else to_py_{i}(value)')
+        elif _is_simple_extension(prop):
+            namespace[f'name_{i}'] = prop._sub_element_name  # noqa: SLF001
+            lines.append(f'    sub_node = node.find(name_{i})')
+            lines.append(f'    data[{local_var_name!r}] = '
+                         f'ExtensionLocalValue() if sub_node is None else ExtensionLocalValue(sub_node[:])')
+        elif _is_simple_element_list(prop):
+            namespace[f'name_{i}'] = prop._sub_element_name  # noqa: SLF001
+            namespace[f'update_{i}'] = prop.update_from_node
+            lines.append(f'    if node.find(name_{i}) is None:')
+            lines.append(f'        data[{local_var_name!r}] = []')
+            lines.append('    else:')
+            lines.append(f'        update_{i}(instance, node)')
+        else:
+            namespace[f'update_{i}'] = prop.update_from_node
+            lines.append(f'    update_{i}(instance, node)')
+    return '\n'.join(lines), namespace
+
+
+def _compile(source: str, namespace: dict, name: str, cls: type) -> Callable[[Any, xml_utils.LxmlElement], None]:
+    code = compile(source, f'<{name} {cls.__module__}.{cls.__qualname__}>', 'exec')
+    exec(code, namespace)  # noqa: S102
+    return namespace[name]
@@ -10,8 +10,11 @@ Container properties represent values in xml nodes.
 from __future__ import annotations
 
 import copy
+import enum
+import inspect
 import time
 from abc import ABC, abstractmethod
+from decimal import Decimal
 from typing import TYPE_CHECKING, Any
 
 from lxml import etree
@@ -29,13 +32,13 @@ from sdc11073.xml_types.dataconverters import (
     IntegerConverter,
     ListConverter,
     NullConverter,
+    SampleListConverter,
     StringConverter,
     TimestampConverter,
 )
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable, Sequence
-    from decimal import Decimal
 
     from sdc11073.mdib.containerbase import ContainerBase
     from sdc11073.namespaces import NamespaceHelper
@@ -148,6 +151,8 @@ class _XmlStructureBaseProperty(ABC):
         """Value is the representation on the program side, e.g a float."""
         if STRICT_TYPES:
             self._converter.check_valid(py_value)
+        if getattr(instance, '_frozen', False):
+            raise ApiUsageError(f'{instance.__class__.__name__} is frozen, modify a copy of it')  # noqa: EM102
         setattr(instance, self._local_var_name, py_value)
 
     def init_instance_data(self, instance: Any):
@@ -281,6 +286,11 @@ class _ElementBase(_XmlStructureBaseProperty, ABC):
         super().__init__(local_var_name, value_converter, default_py_value, implied_py_value, is_optional)
         self._sub_element_name = sub_element_name
 
+    @property
+    def sub_element_name(self) -> etree.QName | None:
+        """Return the name of the sub element, None if the property represents the node itself."""
+        return self._sub_element_name
+
     @staticmethod
     def _get_element_by_child_name(
         node: xml_utils.LxmlElement,
@@ -602,13 +612,17 @@ class _AttributeListBase(_AttributeBase):
             return [self._converter.elem_to_py(val) for val in split_result if val]
         return []
 
+    def _list_to_xml(self, py_value: Sequence[Any]) -> str:
+        return ' '.join([self._converter.elem_to_xml(v) for v in py_value])
+
     def update_xml_value(self, instance: Any, node: xml_utils.LxmlElement):
         try:
             py_value = getattr(instance, self._local_var_name)
         except AttributeError:
             # set to None (it is in the responsibility of the called method to do the right thing)
             py_value = None
-        if not py_value and self.is_optional:  # is None:
+        # len() instead of truth value, because the value can also be an array
+        if (py_value is None or len(py_value) == 0) and self.is_optional:
             if self._attribute_name in node.attrib:
                 del node.attrib[self._attribute_name]
         else:
@@ -617,7 +631,7 @@ class _AttributeListBase(_AttributeBase):
                     raise ValueError(f'mandatory value {self._attribute_name} missing')  # noqa: EM102
                 xml_value = ''
             else:
-                xml_value = ' '.join([self._converter.elem_to_xml(v) for v in py_value])
+                xml_value = self._list_to_xml(py_value)
             node.set(self._attribute_name, xml_value)
 
 
@@ -633,6 +647,10 @@ class _StringAttributeListBase(_AttributeListBase):
         super().__init__(attribute_name, converter)
 
 
+class StringListAttributeProperty(_StringAttributeListBase):
+    """Represents a list of strings attribute."""
+
+
 class HandleRefListAttributeProperty(_StringAttributeListBase):
     """Represents a list of HandleRef attribute."""
 
@@ -654,10 +672,30 @@ class DecimalListAttributeProperty(_AttributeListBase):
 
     XML representation: an attribute string that represents 0...n decimals, separated with spaces.
     Python representation: List of Decimal if attribute is set (can be an empty list!), otherwise None.
+
+    If USE_COMPACT_SAMPLES is True, values read from xml are compact sample arrays of floats instead
+    (see SampleListConverter). This avoids creating a Decimal object per value, e.g. for waveforms.
+    Compact sample arrays can always be assigned, independent of USE_COMPACT_SAMPLES.
     """
 
+    USE_COMPACT_SAMPLES = False
+    _converter: SampleListConverter
+
     def __init__(self, attribute_name: str):
-        super().__init__(attribute_name, ListConverter(DecimalConverter))
+        super().__init__(attribute_name, SampleListConverter())
+
+    def get_py_value_from_node(
+        self,
+        instance: Any,
+        node: xml_utils.LxmlElement | None,
+    ) -> list[Decimal] | Sequence[float]:
+        if not self.USE_COMPACT_SAMPLES:
+            return super().get_py_value_from_node(instance, node)
+        xml_value = None if node is None else node.attrib.get(self._attribute_name)
+        return self._converter.list_to_py(xml_value or '')
+
+    def _list_to_xml(self, py_value: Sequence[Any]) -> str:
+        return self._converter.list_to_xml(py_value)
 
 
 class NodeTextProperty(_ElementBase):
@@ -1288,18 +1326,19 @@ class ContainerListProperty(_ElementListProperty):
         try:
             nodes = node.findall(self._sub_element_name)
             for _node in nodes:
-                node_type_str = _node.get(QN_TYPE)
-                if node_type_str is not None:
-                    node_type = text_to_qname(node_type_str, _node.nsmap)
-                    value_class = self._cls_getter(node_type)
-                else:
-                    value_class = self.value_class
-                value = value_class.from_node(_node)
+                value = self.get_value_class(_node).from_node(_node)
                 objects.append(value)
         except ElementNotFoundError:
             pass
         return objects
 
+    def get_value_class(self, node: xml_utils.LxmlElement) -> type[ContainerBase]:
+        """Return the container class for node, based on its xsi:type."""
+        node_type_str = node.get(QN_TYPE)
+        if node_type_str is None:
+            return self.value_class
+        return self._cls_getter(text_to_qname(node_type_str, node.nsmap))
+
     def update_xml_value(self, instance: Any, node: xml_utils.LxmlElement):
         """Write value to node."""
         try:
@@ -1611,3 +1650,135 @@ class DateOfBirthProperty(_ElementBase):
     def _mk_datestring(date_object: isoduration.XsdDateInformation | None) -> str:
         """Create isoduration string."""
         return str(date_object) if date_object is not None else ''
+
+
+class PropertyTable:
+    """Precomputed properties of a class, based on the _props lists in its class hierarchy.
+
+    Properties of base classes come first.
+    The plans are tuples of the bound init / serialize / deserialize methods of the properties,
+    creating, parsing and serializing an instance only needs to call them one after the other.
+    is_time_dependent is True if serialization writes the current time, e.g. ClockState/@DateAndTime.
+    mutable_local_var_names are the instance variables that can hold mutable values, see copy_mutable_values.
+    """
+
+    __slots__ = ('deserializer_plan', 'init_plan', 'is_time_dependent', 'mutable_local_var_names', 'names',
+                 'properties', 'serializer_plan')
+
+    def __init__(self, cls: type):
+        properties = []
+        for klass in reversed(inspect.getmro(cls)):
+            names = klass.__dict__.get('_props')
+            if names is None:  # this checks only current class, not parent
+                continue
+            for name in names:
+                obj = getattr(klass, name)
+                if obj is not None:
+                    properties.append((name, obj))
+        self.properties: tuple[tuple[str, _XmlStructureBaseProperty], ...] = tuple(properties)
+        self.names: tuple[str, ...] = tuple(name for name, _ in properties)
+        # values of attributes and text elements are immutable (str, int, Decimal, ...), all others can be mutable
+        self.mutable_local_var_names: tuple[str, ...] = tuple(
+            prop._local_var_name for _, prop in properties  # noqa: SLF001
+            if isinstance(prop, _AttributeListBase)
+            or not isinstance(prop, (_AttributeBase, NodeTextProperty, NodeTextQNameProperty)))
+        self.init_plan = tuple(prop.init_instance_data for _, prop in properties)
+        self.serializer_plan = tuple(prop.update_xml_value for _, prop in properties)
+        self.deserializer_plan = tuple(prop.update_from_node for _, prop in properties)
+        self.is_time_dependent = any(isinstance(prop, CurrentTimestampAttributeProperty) for _, prop in properties)
+
+
+def get_property_table(cls: type) -> PropertyTable:
+    """Return the PropertyTable of cls, it is created on first use."""
+    try:
+        return cls.__dict__['_property_table']
+    except KeyError:
+        table = PropertyTable(cls)
+        cls._property_table = table
+        return table
+
+
+_IMMUTABLE_TYPES = (str, int, float, Decimal, enum.Enum, etree.QName, type(None))
+
+
+def shallow_copy(obj: Any) -> Any:
+    """Return a shallow copy of obj, same result as copy.copy for objects without __slots__, but faster."""
+    cls = obj.__class__
+    copied = cls.__new__(cls)
+    copied.__dict__.update(obj.__dict__)
+    return copied
+
+
+def copy_mutable_values(obj: Any):
+    """Replace the mutable property values of obj (e.g. a MetricValue) by copies, immutable values are shared.
+
+    Applied to a shallow copy of an object, the copy no longer shares any mutable data with the original.
+    """
+    instance_data = obj.__dict__
+    for name in get_property_table(obj.__class__).mutable_local_var_names:
+        value = instance_data.get(name)
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            instance_data[name] = _copy_mutable(value)
+
+
+def _copy_mutable(value: Any) -> Any:
+    if isinstance(value, list):
+        # lists are homogeneous, e.g. a list of Decimal samples or a list of annotations
+        if value and not isinstance(value[0], _IMMUTABLE_TYPES):
+            return [_copy_mutable(element) for element in value]
+        return list(value)
+    if '_property_table' in value.__class__.__dict__ or hasattr(value.__class__, '_props'):
+        copied = shallow_copy(value)
+        copied.__dict__.pop('_frozen', None)
+        copy_mutable_values(copied)
+        return copied
+    return copy.deepcopy(value)
+
+
+def _raise_frozen(self: list, *args: Any, **kwargs: Any):  # noqa: ARG001
+    raise ApiUsageError('list is frozen, modify a copy of it')
+
+
+class _FrozenList(list):
+    """A list that can not be modified, copies of it are normal lists."""
+
+    __slots__ = ()
+    append = extend = insert = remove = pop = clear = sort = reverse = _raise_frozen
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _raise_frozen
+
+    def __reduce_ex__(self, protocol: int) -> tuple:
+        return list, (list(self),)
+
+
+def freeze_values(obj: Any):
+    """Make the mutable property values of obj read-only, recursively.
+
+    Nested objects (e.g. a MetricValue) are replaced by frozen copies, lists by lists that can not be modified
+    and numpy sample arrays by read-only views. Use copy_mutable_values on a shallow copy to get writable
+    values again.
+    """
+    instance_data = obj.__dict__
+    for name in get_property_table(obj.__class__).mutable_local_var_names:
+        value = instance_data.get(name)
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            instance_data[name] = _freeze(value)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        if value and not isinstance(value[0], _IMMUTABLE_TYPES):
+            return _FrozenList(_freeze(element) for element in value)
+        return value if isinstance(value, _FrozenList) else _FrozenList(value)
+    if '_property_table' in value.__class__.__dict__ or hasattr(value.__class__, '_props'):
+        if value.__dict__.get('_frozen', False):
+            return value
+        # values can be shared (e.g. default values of properties), therefore a copy is frozen
+        frozen = shallow_copy(value)
+        frozen.__dict__['_frozen'] = True
+        freeze_values(frozen)
+        return frozen
+    if hasattr(value, 'flags'):  # numpy array
+        frozen = value.view()
+        frozen.flags.writeable = False
+        return frozen
+    return value
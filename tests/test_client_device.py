@@ -39,6 +39,7 @@ from sdc11073.consumer.subscription import ClientSubscriptionManagerReferencePar
 from sdc11073.dispatch import RequestDispatcher
 from sdc11073.httpserver import compression
 from sdc11073.httpserver.httpserverimpl import HttpServerThreadBase
+from sdc11073.httpserver.httpserverimpl_async import AsyncioHttpServerThread
 from sdc11073.location import SdcLocation
 from sdc11073.mdib import ConsumerMdib, statecontainers
 from sdc11073.namespaces import default_ns_helper
@@ -966,7 +967,8 @@ class TestClientSomeDevice(unittest.TestCase):
         )
         self.assertTrue(_coded_value_comparator(patient_context_state_container.CoreData.Race, st.CoreData.Race))
         self.assertEqual(patient_context_state_container.CoreData.DateOfBirth, st.CoreData.DateOfBirth)
-        self.assertEqual(patient_context_state_container.BindingMdibVersion, self.sdc_device.mdib.mdib_version)
+        # the transaction increments the mdib version once, the mdib can already have a newer version
+        self.assertEqual(patient_context_state_container.BindingMdibVersion, tr_mdib_version + 1)
         self.assertEqual(patient_context_state_container.UnbindingMdibVersion, None)
 
         # test update of same patient
@@ -1493,6 +1495,48 @@ class TestClientSomeDevice(unittest.TestCase):
         self.assertEqual(len(cl_mdib.states.objects), len(self.sdc_device.mdib.states.objects))
         self.assertEqual(len(cl_mdib.context_states.objects), len(self.sdc_device.mdib.context_states.objects))
 
+    def test_differential_reload(self):
+        """Verify that reload_all(differential=True) only applies the differences and keeps unchanged containers."""
+        cl_mdib = ConsumerMdib(self.sdc_client)
+        cl_mdib.init_mdib()
+        # waveforms are updated all the time, do not use them
+        metric_states = [s for s in cl_mdib.states.objects
+                         if s.is_metric_state and not s.is_realtime_sample_array_metric_state]
+        removed_state = metric_states[0]
+        unchanged_state = metric_states[1]
+        changed_descriptor = cl_mdib.descriptions.handle.get_one(metric_states[2].DescriptorHandle)
+        unchanged_descriptor = cl_mdib.descriptions.handle.get_one(unchanged_state.DescriptorHandle)
+        # modify the consumer mdib locally
+        cl_mdib.states.remove_object(removed_state)
+        changed_descriptor.DescriptorVersion += 100
+        cl_mdib.descriptions.update_object(changed_descriptor)
+        bogus_descriptor = copy.copy(unchanged_descriptor)
+        bogus_descriptor.Handle = 'bogus_handle'
+        cl_mdib.descriptions.add_object(bogus_descriptor)
+
+        cl_mdib.reload_all(differential=True)
+        self.assertTrue(cl_mdib.is_initialized)
+        dev_mdib = self.sdc_device.mdib
+        self.assertEqual(cl_mdib.sequence_id, dev_mdib.sequence_id)
+        self.assertEqual(len(cl_mdib.descriptions.objects), len(dev_mdib.descriptions.objects))
+        self.assertEqual(len(cl_mdib.states.objects), len(dev_mdib.states.objects))
+        self.assertEqual(len(cl_mdib.context_states.objects), len(dev_mdib.context_states.objects))
+        self.assertIsNone(cl_mdib.descriptions.handle.get_one('bogus_handle', allow_none=True))
+        self.assertEqual(['bogus_handle'], list(cl_mdib.deleted_descriptors_by_handle))
+        # changed descriptor is updated in place, unchanged containers are kept
+        self.assertIs(changed_descriptor, cl_mdib.descriptions.handle.get_one(changed_descriptor.Handle))
+        self.assertEqual(dev_mdib.descriptions.handle.get_one(changed_descriptor.Handle).DescriptorVersion,
+                         changed_descriptor.DescriptorVersion)
+        self.assertEqual([changed_descriptor.Handle], list(cl_mdib.updated_descriptors_by_handle))
+        self.assertIs(unchanged_descriptor, cl_mdib.descriptions.handle.get_one(unchanged_descriptor.Handle))
+        self.assertIs(unchanged_state, cl_mdib.states.descriptor_handle.get_one(unchanged_state.DescriptorHandle))
+        # the removed state is new again
+        self.assertEqual([removed_state.DescriptorHandle], list(cl_mdib.metrics_by_handle))
+        for dev_descriptor in dev_mdib.descriptions.objects:
+            cl_descriptor = cl_mdib.descriptions.handle.get_one(dev_descriptor.Handle)
+            self.assertEqual(dev_descriptor.DescriptorVersion, cl_descriptor.DescriptorVersion)
+            self.assertEqual(dev_descriptor.parent_handle, cl_descriptor.parent_handle)
+
     def test_descriptor_lookup(self):
         """Verify that descriptor lookup works on client mdib."""
         mdib = ConsumerMdib(self.sdc_client)
@@ -1696,6 +1740,71 @@ class TestClientSomeDeviceChunked(unittest.TestCase):
         runtest_basic_connect(self, self.sdc_client)
 
 
+class TestClientSomeDeviceAsyncioHttpServer(unittest.TestCase):
+    """Provider and consumer use the asyncio http server."""
+
+    def setUp(self):
+        loghelper.basic_logging_setup()
+        self.logger = loghelper.get_logger_adapter('sdc.test')
+        self.logger.info('############### setUp %s ... ##############', self._testMethodName)
+        self.wsd = WSDiscovery('127.0.0.1')
+        self.wsd.start()
+        provider_components = provider_components_async_factory()
+        provider_components.http_server_class = AsyncioHttpServerThread
+        self.sdc_device = SomeDevice.from_mdib_file(
+            self.wsd,
+            None,
+            mdib_70041,
+            log_prefix=f'{self._testMethodName}: ',
+            components=provider_components,
+            chunk_size=512,
+        )
+        self.sdc_device.start_all(periodic_reports_interval=1.0)
+        self._loc_validators = [pm_types.InstanceIdentifier('Validator', extension_string='System')]
+        self.sdc_device.set_location(utils.random_location(), self._loc_validators)
+        provide_realtime_data(self.sdc_device)
+
+        time.sleep(0.5)  # allow full init of devices
+        consumer_components = default_components_factory()
+        consumer_components.http_server_class = AsyncioHttpServerThread
+        x_addr = self.sdc_device.get_xaddrs()
+        self.sdc_client = SdcConsumer(
+            x_addr[0],
+            sdc_definitions=self.sdc_device.mdib.sdc_definitions,
+            ssl_context_container=None,
+            validate=CLIENT_VALIDATE,
+            components=consumer_components,
+            log_prefix='<Final> ',
+        )
+        self.sdc_client.start_all()
+
+        time.sleep(1)
+        self.logger.info('############### setUp %s done ##############', self._testMethodName)
+        self.log_watcher = loghelper.LogWatcher(logging.getLogger('sdc'), level=logging.ERROR)
+
+    def tearDown(self):
+        self.logger.info('############### tearDown %s ... ##############', self._testMethodName)
+        self.log_watcher.setPaused(True)
+        self.sdc_client.stop_all()
+        self.sdc_device.stop_all()
+        self.wsd.stop()
+        try:
+            self.log_watcher.check()
+        except loghelper.LogWatchError as ex:
+            sys.stderr.write(repr(ex))
+            raise
+        self.logger.info('############### tearDown %s done ##############', self._testMethodName)
+
+    def test_basic_connect(self):
+        runtest_basic_connect(self, self.sdc_client)
+        self.assertIsInstance(self.sdc_device._http_server, AsyncioHttpServerThread)
+
+    def test_metric_reports(self):
+        runtest_metric_reports(self, self.sdc_device, self.sdc_client, self.logger)
+        stats = self.sdc_client._http_server.get_stats()
+        self.assertGreater(sum(histogram.count for histogram in stats.latencies.values()), 0)
+
+
 class TestClientSomeDeviceReferenceParametersDispatch(unittest.TestCase):
     def setUp(self):
         loghelper.basic_logging_setup()
@@ -2,18 +2,26 @@
 
 import logging
 import sys
+import threading
 import unittest
+from array import array
+from multiprocessing import shared_memory
+from unittest import mock
 
 from lxml import etree
 from tutorial.codedvaluecomparator import _coded_value_comparator
 
 from sdc11073 import definitions_sdc, loghelper
 from sdc11073.consumer.consumerimpl import SdcConsumer
-from sdc11073.mdib.consumermdib import ConsumerMdib, ConsumerMdibState
+from sdc11073.mdib.consumermdib import ConsumerMdib, ConsumerMdibState, ConsumerRtBuffer
+from sdc11073.mdib.consumermdibxtra import ConsumerMdibMethods
 from sdc11073.mdib.descriptorcontainers import RealTimeSampleArrayMetricDescriptorContainer
 from sdc11073.mdib.statecontainers import RealTimeSampleArrayMetricStateContainer
+from sdc11073.mdib.waveformpool import WaveformProcessPool, decode_waveform_stream, read_decoded_waveform_stream
 from sdc11073.namespaces import default_ns_helper as ns_hlp
 from sdc11073.xml_types import pm_types
+from sdc11073.xml_types.lazy_reports import LazyStatesReport
+from sdc11073.xml_types.xml_structure import DecimalListAttributeProperty
 
 DEV_ADDRESS = 'http://127.0.0.1:10000'
 CLIENT_VALIDATE = True
@@ -221,3 +229,163 @@ class TestClientWaveform(unittest.TestCase):
         for handle in HANDLES:
             rt_buffer = client_mdib.rt_buffers[handle]
             self.assertEqual(rt_buffer._max_samples, len(rt_buffer.rt_data))
+
+    def test_stream_handling_parsed_reports(self):
+        """Same as test_stream_handling, but reports are completely parsed instead of lazy."""
+        before = ConsumerMdibMethods.LAZY_REPORTS
+        ConsumerMdibMethods.LAZY_REPORTS = False
+        try:
+            self.test_stream_handling()
+        finally:
+            ConsumerMdibMethods.LAZY_REPORTS = before  # reset flag
+
+    def test_state_handle_filter(self):
+        """Verify that only states that match the handle filter are parsed and updated."""
+        cl = self.sdc_client
+        client_mdib = ConsumerMdib(cl)
+        client_mdib._state = ConsumerMdibState.initialized  # fake it, because we do not call init_mdib()
+        client_mdib.MDIB_VERSION_CHECK_DISABLED = True
+        for handle in HANDLES:
+            element = etree.Element('Metric', attrib={'Handle': handle, 'DescriptorVersion': '2'})
+            descr = RealTimeSampleArrayMetricDescriptorContainer.from_node(element, None)
+            client_mdib.descriptions.add_object(descr)
+            state = RealTimeSampleArrayMetricStateContainer(descr)
+            state.StateVersion = 41
+            client_mdib.states.add_object(state)
+        client_mdib.set_state_handle_filter([HANDLES[1]])
+
+        received_message_data = cl.msg_reader.read_received_message(_mk_wf_report(1467596359152, 2, 42).encode('utf-8'))
+        report = LazyStatesReport(cl.sdc_definitions.data_model.msg_types.WaveformStream,
+                                  received_message_data.p_msg.msg_node)
+        self.assertEqual(list(HANDLES), [st.DescriptorHandle for st in report.states()])
+        self.assertEqual([42, 42, 42], [st.StateVersion for st in report.states()])
+        client_mdib.process_incoming_waveform_states(received_message_data.mdib_version_group, report)
+        self.assertEqual([HANDLES[1]], [st.DescriptorHandle for st in report.parsed_containers()])
+        self.assertEqual([HANDLES[1]], list(client_mdib.rt_buffers))
+        self.assertEqual(42, client_mdib.states.descriptor_handle.get_one(HANDLES[1]).StateVersion)
+        for handle in (HANDLES[0], HANDLES[2]):
+            self.assertEqual(41, client_mdib.states.descriptor_handle.get_one(handle).StateVersion)
+
+        # a state with the same state version is not parsed
+        received_message_data = cl.msg_reader.read_received_message(_mk_wf_report(1467596359152, 2, 42).encode('utf-8'))
+        report = LazyStatesReport(cl.sdc_definitions.data_model.msg_types.WaveformStream,
+                                  received_message_data.p_msg.msg_node)
+        client_mdib.process_incoming_waveform_states(received_message_data.mdib_version_group, report)
+        self.assertEqual([], report.parsed_containers())
+
+        client_mdib.set_state_handle_filter(None)
+        received_message_data = cl.msg_reader.read_received_message(_mk_wf_report(1467596359152, 3, 42).encode('utf-8'))
+        client_mdib.process_incoming_waveform_states(
+            received_message_data.mdib_version_group,
+            LazyStatesReport(cl.sdc_definitions.data_model.msg_types.WaveformStream,
+                             received_message_data.p_msg.msg_node))
+        self.assertEqual(sorted(HANDLES), sorted(client_mdib.rt_buffers))
+
+    def test_stream_handling_compact_samples(self):
+        """Same as test_stream_handling, but samples are read as compact sample arrays."""
+        before = DecimalListAttributeProperty.USE_COMPACT_SAMPLES
+        DecimalListAttributeProperty.USE_COMPACT_SAMPLES = True
+        try:
+            self.test_stream_handling()
+        finally:
+            DecimalListAttributeProperty.USE_COMPACT_SAMPLES = before  # reset flag
+
+    def test_process_pool(self):
+        """Verify that waveform streams decoded in a process pool are processed in the order of mdib versions."""
+        cl = self.sdc_client
+        wf_stream_class = cl.sdc_definitions.data_model.msg_types.WaveformStream
+        decoded = decode_waveform_stream(_mk_wf_report(1467596359152, 2, 42).encode('utf-8'))
+        self.assertEqual(tuple(len(SAMPLES[handle]) for handle in HANDLES), decoded.sample_counts)
+        self.assertNotIn(b'Samples=', decoded.report_xml)
+        states = read_decoded_waveform_stream(wf_stream_class, decoded)
+        self.assertEqual(list(HANDLES), [st.DescriptorHandle for st in states])
+        for state in states:
+            self.assertEqual(list(SAMPLES[state.DescriptorHandle]), list(state.MetricValue.Samples))
+        self.assertEqual(1, len(states[1].MetricValue.Annotation))
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=decoded.shm_name)
+        # shared memory is also released if the report cannot be read
+        decoded = decode_waveform_stream(_mk_wf_report(1467596359152, 2, 42).encode('utf-8'))
+        with mock.patch('sdc11073.mdib.waveformpool.LazyStatesReport', side_effect=ValueError):
+            self.assertRaises(ValueError, read_decoded_waveform_stream, wf_stream_class, decoded)
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=decoded.shm_name)
+
+        client_mdib = ConsumerMdib(cl)
+        client_mdib._xtra.bind_to_client_observables()
+        client_mdib._state = ConsumerMdibState.initialized  # fake it, because we do not call init_mdib()
+        client_mdib.mdib_version = 1
+        for handle in HANDLES:
+            element = etree.Element('Metric', attrib={'Handle': handle, 'DescriptorVersion': '2'})
+            descr = RealTimeSampleArrayMetricDescriptorContainer.from_node(element, None)
+            client_mdib.descriptions.add_object(descr)
+            state = RealTimeSampleArrayMetricStateContainer(descr)
+            state.StateVersion = 41
+            client_mdib.states.add_object(state)
+        pool = WaveformProcessPool(max_workers=2)
+        self.addCleanup(pool.shutdown)
+        handler_threads = set()
+        on_decoded_waveform_report = client_mdib.xtra._on_decoded_waveform_report
+
+        def _on_decoded_waveform_report(*args):  # noqa: ANN002
+            handler_threads.add(threading.current_thread().name)
+            on_decoded_waveform_report(*args)
+
+        with mock.patch.object(client_mdib.xtra, '_on_decoded_waveform_report', _on_decoded_waveform_report):
+            client_mdib.xtra.set_waveform_pool(pool)
+        report_count = 10
+        for i in range(report_count):
+            received_message_data = cl.msg_reader.read_received_message(
+                _mk_wf_report(1467596359152 + 100 * i, 2 + i, 42 + i).encode('utf-8'))
+            cl._on_notification(received_message_data)
+        self.assertTrue(client_mdib.xtra.flush_waveform_pool(timeout=30))
+        self.assertEqual({'wf_pipeline'}, handler_threads)  # not the result handling thread of the pool
+        self.assertEqual(1 + report_count, client_mdib.mdib_version)
+        for handle in HANDLES:
+            self.assertEqual(41 + report_count, client_mdib.states.descriptor_handle.get_one(handle).StateVersion)
+            rt_buffer = client_mdib.rt_buffers[handle]
+            self.assertEqual(len(SAMPLES[handle]) * report_count, len(rt_buffer))
+            self.assertEqual(list(SAMPLES[handle]), rt_buffer.window().values[:len(SAMPLES[handle])].tolist())
+        pipeline = client_mdib.xtra._waveform_pipeline
+        client_mdib.xtra.set_waveform_pool(None)
+        pipeline._thread.join(timeout=5)
+        self.assertFalse(pipeline._thread.is_alive())
+
+
+class TestConsumerRtBuffer(unittest.TestCase):
+    def test_ring_buffer(self):
+        """Verify wrap around, windows and annotations of ConsumerRtBuffer."""
+        rt_buffer = ConsumerRtBuffer(sample_period=0.1, max_samples=10)
+        self.assertEqual(0, len(rt_buffer))
+        self.assertIsNone(rt_buffer.last_determination_time)
+        vld = pm_types.MeasurementValidity.VALID
+        qst = pm_types.MeasurementValidity.QUESTIONABLE
+        rt_buffer.add_samples([0, 1, 2, 3, 4, 5], 100.0, vld, {1: ['a1'], 5: ['a5']})
+        rt_buffer.add_samples(array('d', [6, 7, 8, 9, 10, 11, 12]), 100.6, qst, {0: ['a6'], 4: ['a10']})
+        self.assertEqual(10, len(rt_buffer))
+        self.assertAlmostEqual(101.2, rt_buffer.last_determination_time)
+
+        window = rt_buffer.window()
+        self.assertEqual(list(range(3, 13)), window.values.tolist())
+        for i, determination_time in enumerate(window.determination_times):
+            self.assertAlmostEqual(100.3 + i * 0.1, determination_time)
+        self.assertEqual(vld, window.validity(2))
+        self.assertEqual(qst, window.validity(3))
+        self.assertEqual({2: ['a5'], 3: ['a6'], 7: ['a10']}, window.annotations)
+        self.assertEqual([5, 6, 10], list(rt_buffer._annotations))  # annotation of overwritten sample is removed
+
+        window = rt_buffer.window(3)
+        self.assertEqual([10.0, 11.0, 12.0], window.values.tolist())
+        self.assertEqual({0: ['a10']}, window.annotations)
+        window = rt_buffer.window_since(100.95)
+        self.assertEqual([10.0, 11.0, 12.0], window.values.tolist())
+
+        # more samples than buffer size
+        rt_buffer.add_samples(list(range(20, 45)), 200.0, vld)
+        self.assertEqual(list(range(35, 45)), rt_buffer.window().values.tolist())
+        self.assertEqual({}, rt_buffer._annotations)
+
+        rt_containers = rt_buffer.read_rt_data()
+        self.assertEqual(10, len(rt_containers))
+        self.assertEqual(44.0, rt_containers[-1].value)
+        self.assertAlmostEqual(202.4, rt_containers[-1].determination_time)
+        self.assertEqual(0, len(rt_buffer))
+        self.assertEqual(0, len(rt_buffer.window_last_seconds(10)))
@@ -308,3 +308,30 @@ def test_client_subscription_manager_reference_params_find_and_unsubscribe_all()
 
     rd = RequestData({}, '/', 'peer', b'', msg)
     assert mgr_ref._find_subscription(rd, 'x') is sub_ref
+
+
+def test_consumer_subscription_manager_state_filter():
+    sdc = SdcV1Definitions
+    mf = MessageFactory(sdc, None, logger=None, validate=False)
+    mr = MessageReader(sdc, None, logger=None, validate=False)
+    fake = FakeSoapClient(mf, mr)
+    mgr = ConsumerSubscriptionManager(
+        mr,
+        mf,
+        sdc.data_model,
+        _make_get_soap_client(fake),
+        notification_url='http://localhost:8080/notify',
+        end_to_url='http://localhost:8080/end',
+        fixed_renew_interval=None,
+        log_prefix='t',
+    )
+    filter_type = _filter_type('http://a/b/Action1')
+    state_filter = evt.StateFilter()
+    state_filter.Handles = ['h1', 'h2']
+    sub = mgr.mk_subscription(_hosted(), filter_type, state_filter)
+    assert filter_type.Dialect is None  # filter of caller is not changed
+    sub.subscribe(expires=5)
+    sent_filter = evt.Subscribe.from_node(fake.last_subscribe_payload).Filter
+    assert sent_filter.text == 'http://a/b/Action1'
+    assert sent_filter.Dialect == evt.STATE_FILTER_DIALECT
+    assert sent_filter.get_state_filter().Handles == ['h1', 'h2']
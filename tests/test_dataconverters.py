@@ -1,6 +1,7 @@
 """Unit tests for dataconverters module."""
 
 import unittest
+from array import array
 from decimal import Decimal
 
 from sdc11073.xml_types import dataconverters
@@ -31,6 +32,56 @@ class TestDataConverters(unittest.TestCase):
         finally:
             dataconverters.DecimalConverter.USE_DECIMAL_TYPE = before  # reset flag
 
+    def test_sample_list_converter(self):
+        converter = dataconverters.SampleListConverter()
+        xml_value = '1 -2.5 12.3456 123.46 0.1234 0'
+        expected = [1.0, -2.5, 12.3456, 123.46, 0.1234, 0.0]
+        before = dataconverters.SampleListConverter.USE_NUMPY
+        try:
+            for use_numpy in {False, before}:
+                dataconverters.SampleListConverter.USE_NUMPY = use_numpy
+                samples = converter.list_to_py(xml_value)
+                self.assertIsInstance(samples, dataconverters.SAMPLE_ARRAY_TYPES)
+                self.assertEqual(expected, list(samples))
+                self.assertEqual(0, len(converter.list_to_py('')))
+                converter.check_valid(samples)
+                # floats are rounded like DecimalConverter does it
+                self.assertEqual('1 -2.5 12.35 123.5 0.123 0', converter.list_to_xml(samples))
+                self.assertEqual(' '.join(dataconverters.DecimalConverter.to_xml(v) for v in expected),
+                                 converter.list_to_xml(samples))
+                # no exponent form in xml
+                self.assertEqual(dataconverters.DecimalConverter.to_xml(1e20),
+                                 converter.list_to_xml(converter.mk_sample_array([1e20])))
+                self.assertTrue(converter.values_equal(samples, [Decimal(str(v)) for v in expected]))
+                self.assertFalse(converter.values_equal(samples, expected[:-1]))
+                self.assertFalse(converter.values_equal(samples, None))
+        finally:
+            dataconverters.SampleListConverter.USE_NUMPY = before  # reset flag
+        # lists of Decimal are handled like ListConverter(DecimalConverter) does it
+        self.assertEqual('1 2.5', converter.list_to_xml([Decimal(1), Decimal('2.50')]))
+        self.assertRaises(ValueError, converter.check_valid, (1.0, 2.0))
+        converter.check_valid(array('d', expected))
+
+    def test_sample_list_converter_rounding(self):
+        """Verify that sample arrays are rounded like DecimalConverter, also half-way and negative values."""
+        converter = dataconverters.SampleListConverter()
+        values = [0.0005, 0.0025, -0.0005, -0.0025, 0.0625, -0.0625, 0.015, 2.675, -2.675, 1.0005,
+                  12.345, -12.345, 10.005, 99.995, -99.995, 100.05, -100.05, 250.25, -250.25, 1234.55]
+        values.extend(i / 2000 for i in range(-4000, 4001))  # many half-way values with 3 decimals
+        values.extend(i / 200 for i in range(-20000, 20001, 7))  # half-way values with 2 and 1 decimals
+        expected = ' '.join(dataconverters.DecimalConverter.to_xml(v) for v in values)
+        before = dataconverters.SampleListConverter.USE_NUMPY
+        try:
+            for use_numpy in {False, before}:
+                dataconverters.SampleListConverter.USE_NUMPY = use_numpy
+                samples = converter.mk_sample_array(values)
+                self.assertEqual(expected, converter.list_to_xml(samples))
+                self.assertEqual('0.001 0.003 -0.001', converter.list_to_xml(converter.mk_sample_array(values[:3])))
+                # no negative zero
+                self.assertEqual('0 0 0', converter.list_to_xml(converter.mk_sample_array([-0.0001, -0.0, 0.0])))
+        finally:
+            dataconverters.SampleListConverter.USE_NUMPY = before  # reset flag
+
     def test_timestamp_converter(self):
         self.assertEqual(dataconverters.TimestampConverter.to_py('10000'), 10)
         self.assertEqual(dataconverters.TimestampConverter.to_py('10001'), 10.001)
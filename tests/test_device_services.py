@@ -1,6 +1,7 @@
 """Test device services."""
 
 import unittest
+from decimal import Decimal
 
 from lxml import etree
 
@@ -101,9 +102,25 @@ class TestDeviceServices(unittest.TestCase):
             self.sdc_device.msg_factory.serialize_message(get_env),
         )
         response = get_service._on_get_mdib(request)
-        msg_node = response.p_msg.payload_element
+        received_response = self.msg_reader.read_received_message(response.serialize())
+        msg_node = received_response.p_msg.msg_node
         self.assertEqual(msg_node.attrib['MdibVersion'], str(self.sdc_device.mdib.mdib_version))
         self.assertEqual(msg_node.attrib['SequenceId'], str(self.sdc_device.mdib.sequence_id))
+        self.assertEqual(received_response.p_msg.header_info_block.RelatesTo.text,
+                         request.message_data.p_msg.header_info_block.MessageID)
+
+        # a second request at the same mdib version gets the same serialized body
+        second_response = get_service._on_get_mdib(request)
+        self.assertIs(response.body, second_response.body)
+        # after a change of the mdib the body is created again
+        with self.sdc_device.mdib.metric_state_transaction() as mgr:
+            state = mgr.get_state('0x34F0434A')
+            state.mk_metric_value()
+            state.MetricValue.Value = Decimal(42)
+        third_response = get_service._on_get_mdib(request)
+        self.assertIsNot(response.body, third_response.body)
+        msg_node = self.msg_reader.read_received_message(third_response.serialize()).p_msg.msg_node
+        self.assertEqual(msg_node.attrib['MdibVersion'], str(self.sdc_device.mdib.mdib_version))
 
     def test_get_md_state(self):
         get_service = self.sdc_device.hosted_services.get_service
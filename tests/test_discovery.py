@@ -12,9 +12,16 @@ import uuid
 from unittest import mock
 from urllib.parse import urlparse, urlsplit
 
+from lxml import etree
+
 from sdc11073 import loghelper, wsdiscovery
-from sdc11073.wsdiscovery.wsdimpl import MatchBy, match_scope
-from sdc11073.xml_types.wsd_types import ScopesType
+from sdc11073.location import SdcLocation
+from sdc11073.wsdiscovery.networkingthread import get_message_id
+from sdc11073.wsdiscovery.service import Service
+from sdc11073.wsdiscovery.serviceregistry import RemoteServiceRegistry
+from sdc11073.wsdiscovery.wsdimpl import ADDRESS_ALL, MatchBy, _mk_wsd_soap_message, filter_services, match_scope
+from sdc11073.xml_types.addressing_types import HeaderInformationBlock
+from sdc11073.xml_types.wsd_types import ProbeMatchesType, ResolveType, ScopesType
 from tests import utils
 
 test_log = logging.getLogger('unittest')
@@ -378,6 +385,79 @@ class TestDiscovery(unittest.TestCase):
         self.assertTrue(match_scope(my_scope, longer, match_by), msg='short scope matches longer scope')
         self.assertFalse(match_scope(longer, my_scope, match_by), msg='long scope shall not match short scope')
 
+    def test_remote_service_registry(self):
+        """Verify that lookups in the registry return the same services as filtering all services."""
+        def _mk_scopes(*texts: str, match_by: str | None = None) -> ScopesType:
+            scopes = ScopesType(match_by=match_by)
+            scopes.text.extend(texts)
+            return scopes
+
+        type_a = etree.QName('http://example.com/a', 'TypeA')
+        type_b = etree.QName('http://example.com/b', 'TypeB')
+        locations = [SdcLocation(fac='HOSP1', poc='CU1', bed='Bed1'),
+                     SdcLocation(fac='HOSP1', poc='CU1', bed='Bed2'),
+                     SdcLocation(fac='HOSP1', poc='CU2', bed='Bed1'),
+                     SdcLocation(fac='HOSP2', poc='CU1', bed='Bed1')]
+        services = []
+        for i, location in enumerate(locations * 2):
+            scopes = _mk_scopes(location.scope_string, f'http://example.com/dept{i % 3}/sub%2F{i % 2}')
+            types = [type_a, type_b] if i % 2 else [type_a]
+            services.append(Service(types, scopes, [f'http://127.0.0.1:{10000 + i}'], uuid.uuid4().urn, '1'))
+        services.append(Service(None, None, [], uuid.uuid4().urn, '1'))
+        registry = RemoteServiceRegistry()
+        for service in services:
+            registry.add(service)
+        self.assertEqual(len(services), len(registry))
+        self.assertEqual([s.epr for s in services], list(registry))
+
+        scope_queries = [None,
+                         _mk_scopes('http://example.com/dept1'),
+                         _mk_scopes('http://EXAMPLE.com/dept1/sub%2F1', 'http://example.com/dept1'),
+                         _mk_scopes('http://example.com/dept1/sub/1'),
+                         _mk_scopes('http://example.com/dept1/sub%2F1', match_by=MatchBy.strcmp),
+                         _mk_scopes('http://example.com/dept1/', match_by=MatchBy.strcmp),
+                         _mk_scopes('http://example.com/dept1', match_by='unknown'),
+                         _mk_scopes(SdcLocation(fac='HOSP1').scope_string)]
+        for types in (None, [], [type_a], [type_b], [type_a, type_b]):
+            # filter_services fails for services without types if types are given
+            candidates = [s for s in services if s.types is not None or not types]
+            for scopes in scope_queries:
+                expected = filter_services(candidates, types, scopes)
+                if scopes is None:
+                    found = registry.find(types)
+                else:
+                    found = registry.find(types, wsdiscovery.wsdimpl._parse_scopes(scopes), scopes.MatchBy)
+                self.assertEqual(expected, found, msg=f'{types} {scopes}')
+        for location in (*locations, SdcLocation(fac='HOSP1'), SdcLocation(fac='HOSP1', bed='Bed1'),
+                         SdcLocation(fac='HOSP3'), SdcLocation(fac='HOSP1', bldng='B1')):
+            self.assertEqual(location.filter_services_inside(services), registry.find_in_location(location))
+            self.assertEqual(location.filter_services_inside(services[1::2]),
+                             registry.find_in_location(location, [type_b]))
+
+        # modified service is re-indexed, removed service is no longer found
+        services[0].scopes = _mk_scopes('http://example.com/moved')
+        registry.add(services[0])
+        self.assertEqual([services[0]], registry.find(None, wsdiscovery.wsdimpl._parse_scopes(services[0].scopes)))
+        self.assertNotIn(services[0], registry.find_in_location(locations[0]))
+        registry.remove(services[1].epr)
+        self.assertNotIn(services[1].epr, registry)
+        self.assertEqual([services[5]], registry.find_in_location(locations[1]))
+
+        # ttl and max_size
+        with mock.patch('sdc11073.wsdiscovery.serviceregistry.time.monotonic') as monotonic:
+            monotonic.return_value = 100.0
+            registry = RemoteServiceRegistry(ttl=10, max_size=3)
+            for service in services[:4]:
+                registry.add(service)
+                monotonic.return_value += 1
+            self.assertEqual(services[1:4], registry.services())  # oldest was removed
+            registry.add(services[1])  # update
+            monotonic.return_value = 112.5
+            self.assertEqual([services[1], services[3]], registry.services())
+            monotonic.return_value = 114.5
+            self.assertEqual([], registry.find([type_a]))
+            self.assertEqual(0, len(registry))
+
     def test_publish_many_services_late_started_client(self):
         test_log.info('starting service...')
         self.wsd_service.start()
@@ -559,3 +639,68 @@ class TestNetworkingThread(unittest.TestCase):
             self.wsd_client._networking_thread._send_msg(mock.MagicMock(), socket_mock)
         self.assertEqual(len(cm.output), 1)
         self.assertTrue(cm.output[0].startswith('ERROR:wsd_client:exception during sending'))
+
+    def test_duplicate_suppression(self):
+        """Verify that repeated datagrams are dropped before validation and that they are counted."""
+
+        def mk_resolve_datagram() -> bytes:
+            payload = ResolveType()
+            payload.EndpointReference.Address = uuid.uuid4().urn
+            inf = HeaderInformationBlock(action=payload.action, addr_to=ADDRESS_ALL)
+            return _mk_wsd_soap_message(inf, payload).serialize()
+
+        first, second = mk_resolve_datagram(), mk_resolve_datagram()
+        self.assertTrue(get_message_id(first).startswith('urn:uuid:'))
+        self.assertIsNone(get_message_id(b'<a/>'))
+        self.wsd_client.start()
+        networking_thread = self.wsd_client._networking_thread
+        addr = ('127.0.0.1', 12345)
+        with mock.patch.object(self.wsd_client, 'handle_received_message') as handler, \
+                mock.patch('sdc11073.wsdiscovery.networkingthread.message_reader.read_received_message',
+                           wraps=wsdiscovery.networkingthread.message_reader.read_received_message) as reader:
+            for data in (first, first, b'no xml at all', second, first, second):
+                networking_thread._add_to_recv_queue(addr, data)
+            for _ in range(50):
+                if self.wsd_client.get_receive_stats().received == 6:
+                    break
+                time.sleep(0.1)
+            time.sleep(0.1)
+        self.assertEqual(2, handler.call_count)
+        self.assertEqual(2, reader.call_count)
+        stats = self.wsd_client.get_receive_stats()
+        self.assertEqual(6, stats.received)
+        self.assertEqual(3, stats.duplicates)
+        self.assertEqual(1, stats.invalid)
+
+    def test_cached_match_bodies(self):
+        """Verify that ProbeMatches and ResolveMatches bodies are serialized once per service version."""
+        self.wsd_client.start()
+        epr = uuid.uuid4().urn
+        self.wsd_client.publish_service(epr, types=[utils.random_qname()], scopes=utils.random_scope(),
+                                         x_addrs=[f'http://localhost:8080/{uuid.uuid4()}'])
+        service = self.wsd_client._local_services[epr]
+        addr = ('127.0.0.1', 12345)
+        reader = wsdiscovery.networkingthread.message_reader
+        with mock.patch.object(self.wsd_client._networking_thread, 'add_outbound_message') as add_outbound_message:
+            self.wsd_client._send_probe_match([service], uuid.uuid4().urn, addr)
+            self.wsd_client._send_probe_match([service], uuid.uuid4().urn, addr)
+            self.wsd_client._send_resolve_match(service, uuid.uuid4().urn, addr)
+            service.scopes.text.append('http://example.com/new_scope')
+            self.wsd_client._send_probe_match([service], uuid.uuid4().urn, addr)
+        messages = [call.args[0] for call in add_outbound_message.call_args_list]
+        self.assertIs(messages[0].body, messages[1].body)
+        self.assertIsNot(messages[0].body, messages[3].body)
+        self.assertNotEqual(messages[0].header_info_block.MessageID, messages[1].header_info_block.MessageID)
+        for message in messages:
+            received_message = reader.read_received_message(message.serialize(), validate=True)
+            self.assertEqual(message.header_info_block.RelatesTo, received_message.p_msg.header_info_block.RelatesTo)
+        probe_matches = ProbeMatchesType.from_node(
+            reader.read_received_message(messages[3].serialize()).p_msg.msg_node)
+        self.assertIn('http://example.com/new_scope', probe_matches.ProbeMatch[0].Scopes.text)
+
+        # repetitions of a message are serialized once
+        outgoing_message = wsdiscovery.networkingthread.OutgoingMessage(messages[0], addr[0], addr[1])
+        self.assertIs(outgoing_message.data, outgoing_message.data)
+
+        self.wsd_client.clear_service(epr)
+        self.assertEqual({}, self.wsd_client._match_bodies)
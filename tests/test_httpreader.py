@@ -0,0 +1,112 @@
+"""Tests for reading http bodies."""
+
+import io
+import tracemalloc
+import unittest
+import zlib
+from types import SimpleNamespace
+from unittest import mock
+
+from sdc11073.httpserver import compression
+from sdc11073.httpserver.httpreader import (
+    READ_BUFFER_SIZE,
+    DechunkError,
+    DecompressError,
+    HTTPReader,
+    MessageTooLargeError,
+    mk_chunks,
+)
+
+BODY = b''.join(b'<Sample Index="%d" Value="%f"/>' % (i, i / 7) for i in range(20000))  # larger than a read buffer
+
+
+def _mk_request(body: bytes, headers: dict) -> SimpleNamespace:
+    return SimpleNamespace(rfile=io.BufferedReader(io.BytesIO(body)), headers=headers)
+
+
+class _Response:
+    """Minimal http.client.HTTPResponse replacement, de-chunking is done by HTTPResponse itself."""
+
+    def __init__(self, body: bytes, headers: dict):
+        self._stream = io.BytesIO(body)
+        self._headers = headers
+
+    def getheader(self, name: str) -> str | None:
+        return self._headers.get(name)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def readinto(self, buffer) -> int:  # noqa: ANN001
+        return self._stream.readinto(buffer)
+
+
+class TestHTTPReader(unittest.TestCase):
+    def test_content_length(self):
+        request = _mk_request(BODY + b'next request', {'content-length': str(len(BODY))})
+        self.assertEqual(BODY, HTTPReader.read_request_body(request))
+        self.assertEqual(b'next request', request.rfile.read())
+        self.assertIsNone(HTTPReader.read_request_body(_mk_request(b'', {})))
+
+    def test_chunked(self):
+        self.assertGreater(len(BODY), READ_BUFFER_SIZE)
+        request = _mk_request(mk_chunks(BODY, chunk_size=100000) + b'next', {'transfer-encoding': 'chunked'})
+        self.assertEqual(BODY, HTTPReader.read_request_body(request))
+        self.assertEqual(b'next', request.rfile.read())
+        self.assertEqual(BODY, HTTPReader._read_dechunk(io.BytesIO(mk_chunks(BODY))))
+
+        self.assertRaises(DechunkError, HTTPReader.read_request_body,
+                          _mk_request(mk_chunks(BODY)[:-50], {'transfer-encoding': 'chunked'}))
+        self.assertRaises(DechunkError, HTTPReader.read_request_body,
+                          _mk_request(b'xyz\r\n', {'transfer-encoding': 'chunked'}))
+
+    def test_compressed(self):
+        for encoding in compression.CompressionHandler.available_encodings:
+            compressed = compression.CompressionHandler.compress_payload(encoding, BODY)
+            headers = {'transfer-encoding': 'chunked', 'content-encoding': encoding}
+            self.assertEqual(BODY, HTTPReader.read_request_body(_mk_request(mk_chunks(compressed, 4000), headers)))
+            headers = {'content-length': str(len(compressed)), 'content-encoding': encoding}
+            self.assertEqual(BODY, HTTPReader.read_request_body(_mk_request(compressed, headers)))
+            self.assertEqual(BODY, HTTPReader.read_response_body(_Response(compressed, headers)))
+            self.assertEqual(BODY, HTTPReader.decompress_body(encoding, compressed))
+            # truncated compressed data
+            headers = {'content-length': str(len(compressed) - 10), 'content-encoding': encoding}
+            self.assertRaises(DecompressError, HTTPReader.read_request_body, _mk_request(compressed[:-10], headers))
+            # invalid compressed data
+            headers = {'content-length': str(len(BODY)), 'content-encoding': encoding}
+            self.assertRaises(DecompressError, HTTPReader.read_request_body, _mk_request(BODY, headers))
+
+        headers = {'content-length': '3', 'content-encoding': 'gzip'}
+        self.assertRaises(DecompressError, HTTPReader.read_request_body, _mk_request(b'abc', headers), ['lz4'])
+
+    def test_response(self):
+        self.assertEqual(BODY, HTTPReader.read_response_body(_Response(BODY, {'content-length': str(len(BODY))})))
+        self.assertEqual(BODY, HTTPReader.read_response_body(_Response(BODY, {'transfer-encoding': 'chunked'})))
+
+    def test_max_message_size(self):
+        compressed = compression.CompressionHandler.compress_payload('gzip', BODY)
+        with mock.patch.object(HTTPReader, 'MAX_MESSAGE_SIZE', len(BODY) - 1):
+            self.assertRaises(MessageTooLargeError, HTTPReader.read_request_body,
+                              _mk_request(BODY, {'content-length': str(len(BODY))}))
+            self.assertRaises(MessageTooLargeError, HTTPReader.read_request_body,
+                              _mk_request(mk_chunks(BODY), {'transfer-encoding': 'chunked'}))
+            # compressed body is small, but decompressed body is too large
+            request = _mk_request(compressed, {'content-length': str(len(compressed)), 'content-encoding': 'gzip'})
+            self.assertRaises(MessageTooLargeError, HTTPReader.read_request_body, request)
+            self.assertRaises(MessageTooLargeError, HTTPReader.read_response_body,
+                              _Response(BODY, {'transfer-encoding': 'chunked'}))
+            # memory is bounded by the max. size and not by the size of a decompressed piece
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            zeros = b'\0' * 1000000
+            bomb = b''.join(compressor.compress(zeros) for _ in range(50)) + compressor.flush()
+            request = _mk_request(bomb, {'content-length': str(len(bomb)), 'content-encoding': 'gzip'})
+            tracemalloc.start()
+            try:
+                self.assertRaises(MessageTooLargeError, HTTPReader.read_request_body, request)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, 5 * len(BODY))
+        with mock.patch.object(HTTPReader, 'MAX_MESSAGE_SIZE', len(BODY)):
+            self.assertEqual(BODY, HTTPReader.read_request_body(
+                _mk_request(mk_chunks(BODY), {'transfer-encoding': 'chunked'})))
@@ -0,0 +1,115 @@
+"""Tests for the http server."""
+
+import http.client
+import logging
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sdc11073.httpserver.httpserverimpl import HttpServerThreadBase
+from sdc11073.httpserver.httpserverimpl_async import AsyncioHttpServerThread
+
+
+class _EchoComponent:
+    """Replaces a MessageConverterMiddleware, returns the request body."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+
+    def do_post(self, headers, path, peer_name, request_bytes):  # noqa: ANN001, ARG002
+        time.sleep(self.delay)
+        return 200, 'OK', request_bytes
+
+
+class _PoolHttpServerThread(HttpServerThreadBase):
+    WORKER_POOL_SIZE = 2
+    ACCEPT_BACKLOG = 20
+    KEEP_ALIVE_TIMEOUT = 0.5
+
+
+class TestHttpServer(unittest.TestCase):
+    def setUp(self):
+        self.http_server = _PoolHttpServerThread('127.0.0.1', None, [], logging.getLogger('sdc.test_httpsrv'))
+        self.http_server.start()
+        self.assertTrue(self.http_server.started_evt.wait(timeout=10))
+        self.http_server.dispatcher.register_instance('echo', _EchoComponent(0.1))
+
+    def tearDown(self):
+        self.http_server.stop()
+
+    def _post(self, body: bytes) -> bytes:
+        connection = http.client.HTTPConnection('127.0.0.1', self.http_server.server_port, timeout=10)
+        try:
+            connection.request('POST', '/echo/x', body=body)
+            return connection.getresponse().read()
+        finally:
+            connection.close()
+
+    def test_worker_pool(self):
+        bodies = [f'request {i}'.encode() for i in range(6)]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(self._post, bodies))
+        self.assertEqual(bodies, responses)
+        workers = [t for t in threading.enumerate() if t.name.startswith('HttpWorker')]
+        self.assertEqual(2, len(workers))
+        stats = self.http_server.get_stats()
+        self.assertEqual(0, stats.queued_connections)
+        histogram = stats.latencies['/echo/x']
+        self.assertEqual(6, histogram.count)
+        self.assertEqual(6, sum(histogram.counts))
+        self.assertGreaterEqual(histogram.max, 0.1)
+
+    def test_keep_alive_timeout(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.http_server.server_port, timeout=10)
+        connection.request('POST', '/echo/x', body=b'first')
+        self.assertEqual(b'first', connection.getresponse().read())
+        self.assertEqual(1, self.http_server.get_stats().active_connections)
+        time.sleep(1)
+        # the idle connection was closed by the server, the worker is free again
+        self.assertEqual(0, self.http_server.get_stats().active_connections)
+        self.assertEqual(0, len(self.http_server.httpd.connections))
+        connection.close()
+
+
+class _ChunkedAsyncioHttpServerThread(AsyncioHttpServerThread):
+    EXECUTOR_WORKERS = 2
+
+
+class TestAsyncioHttpServer(unittest.TestCase):
+    def setUp(self):
+        self.http_server = _ChunkedAsyncioHttpServerThread('127.0.0.1', None, ['gzip'],
+                                                           logging.getLogger('sdc.test_httpsrv'), chunk_size=4)
+        self.http_server.start()
+        self.assertTrue(self.http_server.started_evt.wait(timeout=10))
+        self.http_server.dispatcher.register_instance('echo', _EchoComponent(0.1))
+
+    def tearDown(self):
+        self.http_server.stop()
+
+    def _post(self, body: bytes) -> bytes:
+        connection = http.client.HTTPConnection('127.0.0.1', self.http_server.server_port, timeout=10)
+        try:
+            connection.request('POST', '/echo/x', body=body)
+            response = connection.getresponse()
+            self.assertEqual('chunked', response.getheader('Transfer-Encoding'))
+            return response.read()
+        finally:
+            connection.close()
+
+    def test_echo(self):
+        bodies = [f'request {i}'.encode() for i in range(6)]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(self._post, bodies))
+        self.assertEqual(bodies, responses)
+        stats = self.http_server.get_stats()
+        self.assertEqual(0, stats.queued_connections)
+        histogram = stats.latencies['/echo/x']
+        self.assertEqual(6, histogram.count)
+        self.assertGreaterEqual(histogram.max, 0.1)
+
+    def test_invalid_path(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.http_server.server_port, timeout=10)
+        connection.request('POST', '/unknown/x', body=b'x')
+        self.assertEqual(404, connection.getresponse().status)
+        connection.close()
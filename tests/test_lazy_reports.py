@@ -0,0 +1,66 @@
+"""Tests for lazy state reports."""
+
+import pathlib
+import unittest
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.mdib import ProviderMdib
+from sdc11073.provider.porttypes.stateeventserviceimpl import fill_episodic_report_body
+from sdc11073.xml_types.lazy_reports import LazyState, LazyStatesReport, get_lazy_states
+
+mdib_file = pathlib.Path(__file__).parent.joinpath('70041_MDIB_Final.xml')
+
+
+class TestLazyReports(unittest.TestCase):
+    def setUp(self):
+        self.mdib = ProviderMdib.from_mdib_file(str(mdib_file), SdcV1Definitions)
+        self.msg_types = self.mdib.data_model.msg_types
+        ns_helper = self.mdib.data_model.ns_helper
+        self.ns_map = ns_helper.partial_map(ns_helper.PM, ns_helper.MSG, ns_helper.XSI, ns_helper.EXT)
+        self.metric_states = [s for s in self.mdib.states.objects if s.is_metric_state]
+
+    def _mk_report_node(self, report_class: type, states: list):
+        report = report_class()
+        report.set_mdib_version_group(self.mdib.mdib_version_group)
+        fill_episodic_report_body(report, states)
+        return report.as_etree_node(report.NODETYPE, self.ns_map)
+
+    def test_metric_report(self):
+        node = self._mk_report_node(self.msg_types.EpisodicMetricReport, self.metric_states)
+        lazy_report = LazyStatesReport(self.msg_types.EpisodicMetricReport, node)
+        self.assertEqual(self.mdib.mdib_version, lazy_report.MdibVersion)
+        self.assertEqual(self.mdib.sequence_id, lazy_report.SequenceId)
+        report = lazy_report.to_report()
+        self.assertEqual([p.SourceMds for p in report.ReportPart], [p.SourceMds for p in lazy_report.ReportPart])
+
+        states = lazy_report.states()
+        self.assertEqual(len(self.metric_states), len(states))
+        expected = [(s.DescriptorHandle, s.StateVersion) for p in report.ReportPart for s in p.values_list]
+        self.assertEqual(expected, [(s.DescriptorHandle, s.StateVersion) for s in states])
+        self.assertFalse(any(s.is_parsed for s in states))
+
+        # only accessed states are parsed, with the class of their xsi:type
+        self.assertEqual([], lazy_report.parsed_containers())
+        container = states[1].container
+        self.assertIs(container, states[1].container)
+        self.assertEqual([container], lazy_report.parsed_containers())
+        original = self.mdib.states.descriptor_handle.get_one(container.DescriptorHandle)
+        self.assertIs(original.__class__, container.__class__)
+        self.assertEqual(original.DescriptorVersion, container.DescriptorVersion)
+
+    def test_context_report(self):
+        context_states = list(self.mdib.context_states.objects)
+        node = self._mk_report_node(self.msg_types.EpisodicContextReport, context_states)
+        lazy_report = LazyStatesReport(self.msg_types.EpisodicContextReport, node)
+        self.assertEqual(sorted(s.Handle for s in context_states), sorted(s.Handle for s in lazy_report.states()))
+
+    def test_get_lazy_states(self):
+        states = get_lazy_states(self.metric_states)
+        self.assertTrue(all(s.is_parsed for s in states))
+        self.assertEqual(self.metric_states, [s.container for s in states])
+        self.assertIs(states[0], get_lazy_states(states)[0])
+        report_class = self.msg_types.EpisodicMetricReport
+        report = report_class.from_node(self._mk_report_node(report_class, self.metric_states))
+        self.assertEqual([s.DescriptorHandle for s in self.metric_states],
+                         [s.DescriptorHandle for s in get_lazy_states(report)])
+        self.assertIsInstance(get_lazy_states(report)[0], LazyState)
@@ -2,18 +2,30 @@
 
 import unittest
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 
 from lxml import etree
 
-from sdc11073 import definitions_sdc
-from sdc11073.exceptions import ApiUsageError
+from sdc11073 import definitions_sdc, loghelper
+from sdc11073.exceptions import ApiUsageError, ValidationError
 from sdc11073.mdib import ProviderMdib
+from sdc11073.mdib.containerbase import ContainerBase
+from sdc11073.namespaces import NamespaceHelper
+from sdc11073.pysoap.msgreader import MessageReader
+from sdc11073.xml_types import msg_qnames as msg
 from sdc11073.xml_types import pm_qnames as pm
 
 MDIB_FOLDER = Path(__file__).parent
 MDIB_TWO_MDS_PATH = MDIB_FOLDER / 'mdib_two_mds.xml'
 MDIB_TNS_PATH = MDIB_FOLDER / 'mdib_tns.xml'
+MDIB_MULTI_PATH = MDIB_FOLDER / '70041_MDIB_multi.xml'
+
+
+def _to_xml(container: ContainerBase, ns_helper: NamespaceHelper) -> bytes:
+    node = container.mk_node(pm.State, ns_helper)
+    etree.cleanup_namespaces(node)  # extension nodes can differ in unused namespace declarations
+    return etree.tostring(node)
 
 
 class TestMdib(unittest.TestCase):
@@ -27,6 +39,38 @@ class TestMdib(unittest.TestCase):
         self.assertTrue(device_mdib_container is not None)
 
 
+    def test_streaming_reader(self):
+        """Verify that the streaming reader returns the same containers as reading the complete tree."""
+        definitions = definitions_sdc.SdcV1Definitions
+        reader = MessageReader(definitions, None, loghelper.get_logger_adapter('sdc.test'))
+        xml_text = MDIB_MULTI_PATH.read_bytes()  # a GetMdibResponse without states
+        expected = reader.read_get_mdib_payload(reader.read_xml_text(xml_text)[0])
+        for source in (xml_text, MDIB_MULTI_PATH, MDIB_MULTI_PATH.open('rb')):
+            containers = list(reader.iter_mdib_containers(source))
+            self.assertTrue(all(c.node is None for c in containers))
+            self.assertEqual(len(expected[0]), len(containers))
+
+        mdib = ProviderMdib.from_mdib_file(MDIB_MULTI_PATH, protocol_definition=definitions)
+        mdib_node, version_group = mdib.reconstruct_mdib_with_context_states()
+        response_node = etree.Element(msg.GetMdibResponse, MdibVersion=str(version_group.mdib_version),
+                                      SequenceId=version_group.sequence_id)
+        response_node.append(mdib_node)
+        xml_text = etree.tostring(response_node)  # with states
+        expected = reader.read_get_mdib_payload(reader.read_xml_text(xml_text)[0])
+        descriptors, states = reader.read_mdib_xml(xml_text)
+        ns_helper = definitions.data_model.ns_helper
+        for expected_containers, containers in zip(expected, (descriptors, states), strict=True):
+            self.assertGreater(len(containers), 0)
+            for expected_container, container in zip(expected_containers, containers, strict=True):
+                self.assertIs(expected_container.__class__, container.__class__)
+                if container.is_descriptor_container:
+                    self.assertEqual(expected_container.parent_handle, container.parent_handle)
+                self.assertEqual(_to_xml(expected_container, ns_helper), _to_xml(container, ns_helper))
+
+        invalid_text = xml_text.replace(b'MdibVersion=', b'Foo="1" MdibVersion=', 1)
+        with self.assertRaises(ValidationError):
+            reader.read_mdib_xml(invalid_text)
+
 class TestMdibTransaction(unittest.TestCase):
     def setUp(self):
         self.mdib = ProviderMdib.from_mdib_file(MDIB_TWO_MDS_PATH, protocol_definition=definitions_sdc.SdcV1Definitions)
@@ -62,6 +106,41 @@ class TestMdibTransaction(unittest.TestCase):
         self.assertIsNone(descr)
         self.assertIsNone(state)
 
+    def test_descriptor_tree(self):
+        """Verify that the descriptor tree follows descriptor transactions."""
+        tree = self.mdib.descriptions.tree
+        self.assertEqual(['mds0', 'mds_1'], sorted(d.Handle for d in tree.children(None)))
+        self.assertEqual(('ch0.vmd0', 'vmd0', 'mds0'), tree.ancestors('numeric.ch0.vmd0'))
+        self.assertEqual('mds0', tree.mds_handle('numeric.ch0.vmd0'))
+        self.assertEqual('mds0', tree.mds_handle('mds0'))
+        self.assertIsNone(tree.mds_handle('unknown'))
+        # children are in schema order: AlertSystem, Sco, SystemContext, Clock, ..., Vmd
+        children = [child.tag for child in tree.child_descriptors('mds0')]
+        self.assertEqual([pm.AlertSystem, pm.Sco, pm.SystemContext, pm.Clock], children[:4])
+        self.assertEqual(pm.Vmd, children[-1])
+        expected = [d.Handle for d in self.mdib.descriptions.objects if tree.mds_handle(d.Handle) == 'mds0']
+        subtree = self.mdib.get_all_descriptors_in_subtree(self.mdib.descriptions.handle.get_one('mds0'))
+        self.assertEqual(sorted(expected), sorted(d.Handle for d in subtree))
+        self.assertEqual('mds0', subtree[-1].Handle)
+
+        with self.mdib.descriptor_transaction() as mgr:
+            parent_descriptor = self.mdib.descriptions.handle.get_one('ch0.vmd0')
+            descriptor_container = self.mdib.data_model.mk_descriptor_container(
+                pm.NumericMetricDescriptor,
+                handle='testHandle',
+                parent_descriptor=parent_descriptor,
+            )
+            mgr.add_descriptor(descriptor_container)
+        self.assertEqual('testHandle', tree.children('ch0.vmd0')[-1].Handle)
+        self.assertEqual(('ch0.vmd0', 'vmd0', 'mds0'), tree.ancestors('testHandle'))
+        self.assertEqual('mds0', self.mdib.descriptions.handle.get_one('testHandle').source_mds)
+
+        with self.mdib.descriptor_transaction() as mgr:
+            mgr.remove_descriptor('vmd0')
+        self.assertNotIn('vmd0', [d.Handle for d in tree.children('mds0')])
+        self.assertIsNone(tree.mds_handle('testHandle'))
+        self.assertEqual([], tree.children('ch0.vmd0'))
+
     def test_create_descriptor_without_state(self):
         with self.mdib.descriptor_transaction() as mgr:  # now without state
             parent_descriptor = self.mdib.descriptions.handle.get_one('ch0.vmd0')
@@ -98,6 +177,34 @@ class TestMdibTransaction(unittest.TestCase):
             self.assertEqual(state.DescriptorHandle, 'numeric.ch0.vmd0')
             self.assertRaises(ApiUsageError, mgr.get_state, 'ch0.vmd0')
 
+    def test_reconstruct_mdib_cached_nodes(self):
+        """Verify that cached container nodes are reused only as long as the container versions are unchanged."""
+        ProviderMdib.CACHE_CONTAINER_NODES = False
+        try:
+            uncached_node, _ = self.mdib.reconstruct_mdib_with_context_states()
+        finally:
+            del ProviderMdib.CACHE_CONTAINER_NODES
+        first_node, _ = self.mdib.reconstruct_mdib_with_context_states()
+        second_node, _ = self.mdib.reconstruct_mdib_with_context_states()
+        for node in (uncached_node, first_node, second_node):
+            for clock_state_node in node.xpath('//*[@DateAndTime]'):  # current time, never cached
+                del clock_state_node.attrib['DateAndTime']
+        self.assertEqual(etree.tostring(uncached_node), etree.tostring(first_node))
+        self.assertEqual(etree.tostring(first_node), etree.tostring(second_node))
+
+        with self.mdib.metric_state_transaction() as mgr:
+            state = mgr.get_state('numeric.ch0.vmd0')
+            state.MetricValue.Value = Decimal(42)
+        with self.mdib.descriptor_transaction() as mgr:
+            descriptor = mgr.get_descriptor('numeric.ch0.vmd0')
+            descriptor.Resolution = Decimal('0.5')
+        mdib_node, _ = self.mdib.reconstruct_mdib_with_context_states()
+        state_node = mdib_node.xpath('//*[@DescriptorHandle="numeric.ch0.vmd0"]')[0]
+        self.assertEqual('42', state_node.find(pm.MetricValue).get('Value'))
+        descriptor_node = mdib_node.xpath('//*[@Handle="numeric.ch0.vmd0"]')[0]
+        self.assertEqual('0.5', descriptor_node.get('Resolution'))
+        self.assertEqual(descriptor_node.get('DescriptorVersion'), state_node.get('DescriptorVersion'))
+
     def test_activate_operation_argument(self):
         """Test that pm:ActivateOperationDescriptor/pm:argument/pm:Arg is handled correctly.
 
@@ -191,13 +298,14 @@ class TestMdibTransaction(unittest.TestCase):
             # so that it can be validated by xml schema validator
             mdib_text = test_data.mdib_text.encode('utf-8')
             mdib_container = ProviderMdib.from_string(mdib_text)
-            mdib_node, _ = mdib_container.reconstruct_mdib_with_context_states()
-            arg_nodes = mdib_node.xpath(
-                '//*/pm:Arg',
-                namespaces={'pm': 'http://standards.ieee.org/downloads/11073/11073-10207-2017/participant'},
-            )
-            arg_node = arg_nodes[0]
-            prefix = arg_node.text.split(':')[0]
-            self.assertTrue(prefix in arg_node.nsmap)
-            self.assertEqual(test_data.expected_qname.namespace, arg_node.nsmap[prefix])
-            self.assertEqual(test_data.expected_qname.localname, arg_node.text.split(':')[1])
+            for _ in range(2):  # second reconstruction uses cached container nodes
+                mdib_node, _ = mdib_container.reconstruct_mdib_with_context_states()
+                arg_nodes = mdib_node.xpath(
+                    '//*/pm:Arg',
+                    namespaces={'pm': 'http://standards.ieee.org/downloads/11073/11073-10207-2017/participant'},
+                )
+                arg_node = arg_nodes[0]
+                prefix = arg_node.text.split(':')[0]
+                self.assertTrue(prefix in arg_node.nsmap)
+                self.assertEqual(test_data.expected_qname.namespace, arg_node.nsmap[prefix])
+                self.assertEqual(test_data.expected_qname.localname, arg_node.text.split(':')[1])
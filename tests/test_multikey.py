@@ -0,0 +1,52 @@
+"""Tests for multikey module."""
+
+import unittest
+
+from sdc11073 import multikey
+
+
+class Person:
+    def __init__(self, first_name: str, last_name: str, nick_names: list[str]):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.nick_names = nick_names
+
+
+class TestMultiKeyLookup(unittest.TestCase):
+    def setUp(self):
+        self.lookup = multikey.MultiKeyLookup()
+        self.lookup.add_index('first_name', multikey.UIndexDefinition(lambda obj: obj.first_name))
+        self.lookup.add_index('last_name', multikey.IndexDefinition(lambda obj: obj.last_name))
+        self.lookup.add_index('nick_names', multikey.IndexDefinition1n(lambda obj: obj.nick_names))
+        self.peter = Person('Peter', 'Miller', ['Pete'])
+        self.john = Person('John', 'Miller', ['Jo', 'Johnny'])
+        self.agnes = Person('Agnes', 'Miller', [])
+        self.lookup.add_objects([self.peter, self.john, self.agnes])
+
+    def test_get_returns_lists_in_insertion_order(self):
+        self.assertEqual([self.peter, self.john, self.agnes], self.lookup.last_name.get('Miller'))
+        self.assertEqual([self.peter, self.john, self.agnes], self.lookup.last_name['Miller'])
+        self.assertEqual([[self.peter, self.john, self.agnes]], self.lookup.last_name.values())
+        self.assertEqual([('Miller', [self.peter, self.john, self.agnes])], self.lookup.last_name.items())
+        self.assertIs(self.john, self.lookup.nick_names.get_one('Johnny'))
+        self.assertIs(self.john, self.lookup.first_name.get_one('John'))
+        self.assertIsNone(self.lookup.last_name.get('Myers'))
+        self.assertEqual([], self.lookup.last_name.get('Myers', []))
+        self.assertRaises(KeyError, self.lookup.first_name.mk_keys, Person('John', 'Myers', []))
+
+    def test_remove_and_update(self):
+        self.lookup.remove_object(self.john)
+        self.assertEqual([self.peter, self.agnes], self.lookup.last_name.get('Miller'))
+        self.assertNotIn('Jo', self.lookup.nick_names)
+        self.assertNotIn('John', self.lookup.first_name)
+
+        self.peter.last_name = 'Myers'
+        self.agnes.nick_names = ['Aggie']
+        self.lookup.update_objects([self.peter, self.agnes])
+        self.assertEqual([self.agnes], self.lookup.last_name.get('Miller'))
+        self.assertEqual([self.peter], self.lookup.last_name.get('Myers'))
+        self.assertIs(self.agnes, self.lookup.nick_names.get_one('Aggie'))
+
+        self.lookup.remove_objects([self.peter, self.agnes])
+        self.assertEqual(0, len(self.lookup.last_name))
+        self.assertEqual(0, len(self.lookup.objects))
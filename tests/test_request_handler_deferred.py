@@ -0,0 +1,131 @@
+"""Tests for the lanes of DispatchKeyRegistryDeferred."""
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from sdc11073.consumer.request_handler_deferred import (
+    DispatchKeyRegistryDeferred,
+    DispatchLane,
+    EmptyResponse,
+)
+from sdc11073.dispatch import DispatchKey
+from sdc11073.exceptions import ApiUsageError
+from sdc11073.flowcontrol import BackpressurePolicy
+from sdc11073.xml_types.actions import Actions
+
+
+class ActionClassDispatcher(DispatchKeyRegistryDeferred):
+    LANES = (
+        DispatchLane('waveform', frozenset({Actions.Waveform}), 100, BackpressurePolicy.DROP_OLDEST),
+        DispatchLane('metric', frozenset({Actions.EpisodicMetricReport})),
+        DispatchLane('default', frozenset()),
+    )
+
+
+def _mk_request(action: str) -> SimpleNamespace:
+    return SimpleNamespace(message_data=SimpleNamespace(action=action, q_name=None), path_elements=[])
+
+
+class TestDispatchKeyRegistryDeferred(unittest.TestCase):
+    def _register(self, dispatcher: DispatchKeyRegistryDeferred, action: str, handler):
+        dispatcher.register_post_handler(DispatchKey(action, None), handler)
+
+    def test_single_lane(self):
+        dispatcher = DispatchKeyRegistryDeferred('test')
+        handled = []
+        done = threading.Event()
+
+        def handler(request):
+            handled.append(request)
+            if len(handled) == 3:
+                done.set()
+
+        self._register(dispatcher, Actions.Waveform, handler)
+        self._register(dispatcher, Actions.EpisodicMetricReport, handler)
+        requests = [_mk_request(Actions.Waveform), _mk_request(Actions.EpisodicMetricReport),
+                    _mk_request(Actions.Waveform)]
+        for request in requests:
+            self.assertIsInstance(dispatcher.on_post(request), EmptyResponse)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(requests, handled)
+        stats = dispatcher.get_stats()
+        self.assertEqual(['default'], list(stats))
+        self.assertEqual(3, stats['default'].processing_times.count)
+        # stats are snapshots
+        self._register(dispatcher, Actions.EpisodicAlertReport, lambda _: done.set())
+        done.clear()
+        dispatcher.on_post(_mk_request(Actions.EpisodicAlertReport))
+        self.assertTrue(done.wait(5))
+        for _ in range(50):
+            if dispatcher.get_stats()['default'].processing_times.count == 4:
+                break
+            time.sleep(0.1)
+        self.assertEqual(4, dispatcher.get_stats()['default'].processing_times.count)
+        self.assertEqual(3, stats['default'].processing_times.count)
+
+    def test_lanes_are_independent(self):
+        """Verify that a blocked metric handler does not delay waveforms."""
+        dispatcher = ActionClassDispatcher('test')
+        release_metric = threading.Event()
+        metric_started = threading.Event()
+        waveforms = []
+        waveform_done = threading.Event()
+
+        def on_metric(_):
+            metric_started.set()
+            release_metric.wait(5)
+
+        def on_waveform(request):
+            waveforms.append(request)
+            if len(waveforms) == 2:
+                waveform_done.set()
+
+        self._register(dispatcher, Actions.EpisodicMetricReport, on_metric)
+        self._register(dispatcher, Actions.Waveform, on_waveform)
+        dispatcher.on_post(_mk_request(Actions.EpisodicMetricReport))
+        self.assertTrue(metric_started.wait(5))
+        dispatcher.on_post(_mk_request(Actions.EpisodicMetricReport))
+        dispatcher.on_post(_mk_request(Actions.Waveform))
+        dispatcher.on_post(_mk_request(Actions.Waveform))
+        self.assertTrue(waveform_done.wait(5))
+        stats = dispatcher.get_stats()
+        self.assertEqual(1, stats['metric'].queue_depth)
+        self.assertEqual(2, stats['waveform'].processing_times.count)
+        release_metric.set()
+
+    def test_drop_oldest(self):
+        lanes = (DispatchLane('waveform', frozenset({Actions.Waveform}), 2, BackpressurePolicy.DROP_OLDEST),
+                 DispatchLane('default', frozenset()))
+        dispatcher = type('Dispatcher', (DispatchKeyRegistryDeferred,), {'LANES': lanes})('test')
+        release = threading.Event()
+        handled = []
+
+        def on_waveform(request):
+            release.wait(5)
+            handled.append(request)
+
+        self._register(dispatcher, Actions.Waveform, on_waveform)
+        requests = [_mk_request(Actions.Waveform) for _ in range(5)]
+        dispatcher.on_post(requests[0])
+        for _ in range(50):  # wait until the worker has taken the first request
+            if dispatcher.get_stats()['waveform'].queue_depth == 0:
+                break
+            time.sleep(0.1)
+        for request in requests[1:]:
+            dispatcher.on_post(request)
+        stats = dispatcher.get_stats()['waveform']
+        self.assertEqual(2, stats.queue_depth)
+        self.assertEqual(2, stats.dropped_requests)
+        release.set()
+        for _ in range(50):
+            if len(handled) == 3:
+                break
+            time.sleep(0.1)
+        self.assertEqual([requests[0], requests[3], requests[4]], handled)
+
+    def test_invalid_lanes(self):
+        lanes = (DispatchLane('waveform', frozenset({Actions.Waveform})),)
+        dispatcher_class = type('Dispatcher', (DispatchKeyRegistryDeferred,), {'LANES': lanes})
+        self.assertRaises(ApiUsageError, dispatcher_class, 'test')
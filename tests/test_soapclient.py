@@ -1,5 +1,9 @@
 """Test SoapClient - e.g. error handling."""
+import socket
+import threading
+import time
 from http.client import HTTPException, NotConnected
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import TestCase, mock
 
 from sdc11073.definitions_sdc import SdcV1Definitions
@@ -118,3 +122,93 @@ class TestSoapClient(TestCase):
         created_message.serialize.assert_called_once_with(request_manipulator=request_manipulator, validate=False)
         self.assertTrue(request_manipulator.manipulate_string.called)
         self.assertEqual(return_value, request_manipulator.manipulate_string.return_value)
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    delay = 0.3
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object):
+        pass
+
+
+class PooledSoapClient(SoapClient):
+    MAX_CONNECTIONS = 3
+
+
+class TestSoapClientConnectionPool(TestCase):
+    """Test the connection pool of SoapClient with a local http server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger = get_logger_adapter('test')
+        self.soap_client = PooledSoapClient(
+            netloc=f'127.0.0.1:{self.server.server_address[1]}',
+            socket_timeout=10,
+            logger=logger,
+            ssl_context=None,
+            sdc_definitions=SdcV1Definitions,
+            msg_reader=MessageReader(SdcV1Definitions, None, logger, validate=False),
+        )
+
+    def tearDown(self):
+        self.soap_client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get_parallel(self, count: int) -> list[bytes]:
+        results = [None] * count
+
+        def get(index: int):
+            results[index] = self.soap_client.get_from_url(f'/path{index}', msg='')
+
+        threads = [threading.Thread(target=get, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_parallel_requests(self):
+        self.soap_client.connect()
+        start = time.monotonic()
+        results = self._get_parallel(6)
+        duration = time.monotonic() - start
+        self.assertEqual([f'/path{i}'.encode() for i in range(6)], results)
+        # 6 requests on 3 connections take 2 rounds, sequential requests would take 6 rounds
+        self.assertLess(duration, 4 * _SlowHandler.delay)
+        stats = self.soap_client.get_stats()
+        self.assertEqual(3, stats.open_connections)
+        self.assertEqual(3, stats.idle_connections)
+        self.assertEqual(0, stats.connections_in_use)
+        self.assertEqual(2, stats.created_connections)
+        self.assertEqual(4, stats.reused_connections)  # first connection in both rounds, new ones in second round
+
+        self.soap_client.close()
+        self.assertTrue(self.soap_client.is_closed())
+        self.assertEqual(0, self.soap_client.get_stats().open_connections)
+        self.assertRaises(NotConnected, self.soap_client._acquire_connection)
+
+    def test_idle_eviction_and_health_check(self):
+        self.soap_client.connect()
+        self._get_parallel(3)
+        with mock.patch.object(PooledSoapClient, 'IDLE_TIMEOUT', 0):
+            self._get_parallel(2)
+        stats = self.soap_client.get_stats()
+        self.assertGreaterEqual(stats.evicted_connections, 1)
+        self.assertLessEqual(stats.open_connections, 2)
+
+        # an idle connection that was closed by the peer is readable, the client detects it and connects again.
+        self.soap_client._http_connection.sock.shutdown(socket.SHUT_RD)
+        self.assertEqual(b'/again', self.soap_client.get_from_url('/again', msg=''))
+        self.assertEqual(1, self.soap_client.get_stats().failed_health_checks)
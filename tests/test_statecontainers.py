@@ -670,3 +670,20 @@ class TestStateContainers(unittest.TestCase):
         state2.update_from_other_container(state)
         self.assertEqual(len(state2.AllowedRange), 2)
         self.assertEqual(state.AllowedRange, state2.AllowedRange)
+
+    def test_property_table(self):
+        """Verify that the property table is created once per class and contains the base class properties."""
+        state = sc.NumericMetricStateContainer(descriptor_container=self.descr)
+        properties = state.sorted_container_properties()
+        self.assertIs(properties, sc.NumericMetricStateContainer(self.descr).sorted_container_properties())
+        self.assertIs(cp.get_property_table(sc.NumericMetricStateContainer),
+                      sc.NumericMetricStateContainer.__dict__['_property_table'])
+        self.assertEqual('Extension', properties[0][0])
+        self.assertIn('MetricValue', [name for name, _ in properties])
+        base_properties = sc.AbstractMetricStateContainer(self.descr).sorted_container_properties()
+        self.assertNotIn('MetricValue', [name for name, _ in base_properties])
+        self.assertEqual(base_properties, properties[:len(base_properties)])
+        table = cp.get_property_table(sc.NumericMetricStateContainer)
+        self.assertEqual(len(properties), len(table.init_plan))
+        self.assertEqual(len(properties), len(table.serializer_plan))
+        self.assertEqual(len(properties), len(table.deserializer_plan))
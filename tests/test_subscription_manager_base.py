@@ -4,25 +4,34 @@ from __future__ import annotations
 
 import http.client
 import socket
+import threading
+import time
 from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 from lxml import etree
 
+from sdc11073 import observableproperties
 from sdc11073.definitions_sdc import SdcV1Definitions
 from sdc11073.dispatch.request import RequestData
+from sdc11073.flowcontrol import BackpressurePolicy
+from sdc11073.httpserver.compression import CompressionHandler
 from sdc11073.namespaces import EventingActions
+from sdc11073.provider.notificationdelivery import NotificationDeliveryEngine
+from sdc11073.provider.subscriptionmgr import ActionBasedSubscriptionsManager, BicepsSubscription
 from sdc11073.provider.subscriptionmgr_base import (
     ActionBasedSubscription,
+    ReportStateFilter,
     RoundTripData,
     SubscriptionsManagerBase,
     _mk_dispatch_identifier,
 )
-from sdc11073.pysoap.msgfactory import MessageFactory
+from sdc11073.pysoap.msgfactory import MessageFactory, SerializedBody, SplicedMessage
 from sdc11073.pysoap.msgreader import MessageReader
 from sdc11073.pysoap.soapclient import HTTPReturnCodeError
 from sdc11073.xml_types import eventing_types as evt
+from sdc11073.xml_types.actions import Actions
 from sdc11073.xml_types.addressing_types import HeaderInformationBlock
 
 
@@ -35,6 +44,16 @@ class DummySoapClientPool:
         return None
 
 
+class RecordingSoapClient:
+    roundtrip_time = observableproperties.ObservableProperty()
+
+    def __init__(self):
+        self.messages = []
+
+    def post_message_to(self, _path: str, message, msg: str = ''):  # noqa: ANN001, ARG002
+        self.messages.append(message)
+
+
 @pytest.fixture
 def soap_client_pool() -> mock.MagicMock:
     mocked_soap_client = mock.MagicMock()
@@ -291,3 +310,279 @@ def test_end_to_url_is_none_when_end_to_address_is_none(soap_client_pool: mock.M
     soap_client_pool.get_soap_client.return_value.post_message_to.assert_called_once_with(
         '/notify', mock.ANY, msg='send_notification_end_message'
     )
+
+
+def _mk_biceps_subscription(msg_factory: MessageFactory, soap_client_pool: mock.MagicMock,
+                            notify_to: str, filter_: str = 'http://x/y/Act',
+                            state_filter: evt.StateFilter | None = None) -> BicepsSubscription:
+    subscribe = evt.Subscribe()
+    subscribe.set_filter(filter_)
+    if state_filter is not None:
+        subscribe.Filter.set_state_filter(state_filter)
+    subscribe.Delivery.NotifyTo.Address = notify_to
+    ref_param = etree.Element('{http://x/y}Ref')
+    ref_param.text = notify_to
+    subscribe.Delivery.NotifyTo.ReferenceParameters = [ref_param]
+    subscription = BicepsSubscription(
+        mgr=None,
+        subscribe_request=subscribe,
+        accepted_encodings=[],
+        base_urls=[],
+        max_subscription_duration=60,
+        soap_client_pool=soap_client_pool,
+        msg_factory=msg_factory,
+        log_prefix='t',
+    )
+    subscription.set_reference_parameter()
+    return subscription
+
+
+def test_send_to_subscribers_serializes_body_once(soap_client_pool: mock.MagicMock):
+    soap_client = RecordingSoapClient()
+    soap_client_pool.get_soap_client.return_value = soap_client
+    sdc = SdcV1Definitions
+    msg_factory = MessageFactory(sdc, None, logger=None, validate=False)
+    msg_reader = MessageReader(sdc, None, logger=None, validate=False)
+    mgr = ActionBasedSubscriptionsManager(sdc, msg_factory, soap_client_pool, log_prefix='t')
+    subscriptions = [_mk_biceps_subscription(msg_factory, soap_client_pool, f'http://127.0.0.1:900{i}/notify')
+                     for i in range(3)]
+    for subscription in subscriptions:
+        mgr._subscriptions.add_object(subscription)
+    body_node = etree.Element('{http://x/y}Report', nsmap={'y': 'http://x/y'})
+    etree.SubElement(body_node, '{http://x/y}Data').text = 'a & b'
+
+    with mock.patch.object(msg_factory, 'serialize_body', wraps=msg_factory.serialize_body) as serialize_body:
+        mgr.send_to_subscribers(body_node, 'http://x/y/Act', None)
+    serialize_body.assert_called_once()
+
+    assert len(soap_client.messages) == len(subscriptions)
+    message_ids = set()
+    addresses = set()
+    for message in soap_client.messages:
+        assert isinstance(message, SplicedMessage)
+        received = msg_reader.read_received_message(message.serialize(), validate=False)
+        assert received.action == 'http://x/y/Act'
+        ref_params = received.p_msg.header_info_block.reference_parameters
+        assert [r.text for r in ref_params] == [received.p_msg.header_info_block.To]
+        assert received.p_msg.msg_node.tag == body_node.tag
+        assert received.p_msg.msg_node.find('{http://x/y}Data').text == 'a & b'
+        message_ids.add(received.p_msg.header_info_block.MessageID)
+        addresses.add(received.p_msg.header_info_block.To)
+    assert len(message_ids) == len(subscriptions)
+    assert addresses == {s.notify_to_address for s in subscriptions}
+    mgr.stop_all(send_subscription_end=False)
+
+
+_METRIC_REPORT = b"""<msg:EpisodicMetricReport MdibVersion="5"
+ xmlns:msg="http://standards.ieee.org/downloads/11073/11073-10207-2017/message"
+ xmlns:pm="http://standards.ieee.org/downloads/11073/11073-10207-2017/participant"
+ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <msg:ReportPart>
+    <msg:SourceMds>mds0</msg:SourceMds>
+    <msg:MetricState xsi:type="pm:NumericMetricState" DescriptorHandle="num1" StateVersion="1"/>
+    <msg:MetricState xsi:type="pm:StringMetricState" DescriptorHandle="str1" StateVersion="1"/>
+  </msg:ReportPart>
+  <msg:ReportPart>
+    <msg:SourceMds>mds1</msg:SourceMds>
+    <msg:MetricState xsi:type="pm:NumericMetricState" DescriptorHandle="num2" StateVersion="1"/>
+  </msg:ReportPart>
+</msg:EpisodicMetricReport>"""
+
+
+def _state_filter(handles: list[str] | None = None, node_types: list[str] | None = None) -> evt.StateFilter:
+    state_filter = evt.StateFilter()
+    state_filter.Handles = handles or []
+    state_filter.NodeTypes = node_types or []
+    return state_filter
+
+
+def test_send_to_subscribers_with_state_filter(soap_client_pool: mock.MagicMock):
+    """Verify that subscribers with a state filter get only their states, equal filters share one body."""
+    soap_client = RecordingSoapClient()
+    soap_client_pool.get_soap_client.return_value = soap_client
+    sdc = SdcV1Definitions
+    msg_factory = MessageFactory(sdc, None, logger=None, validate=False)
+    msg_reader = MessageReader(sdc, None, logger=None, validate=False)
+    mgr = ActionBasedSubscriptionsManager(sdc, msg_factory, soap_client_pool, log_prefix='t')
+    action = Actions.EpisodicMetricReport
+    state_filters = {'all': None,
+                     'num1': _state_filter(['num1']),
+                     'num1_again': _state_filter(['num1']),
+                     'numeric': _state_filter(node_types=['NumericMetricState']),
+                     'other': _state_filter(['other'])}
+    for name, state_filter in state_filters.items():
+        subscription = _mk_biceps_subscription(msg_factory, soap_client_pool, f'http://127.0.0.1:9000/{name}',
+                                               action, state_filter)
+        mgr._subscriptions.add_object(subscription)
+    body_node = etree.fromstring(_METRIC_REPORT)
+
+    with mock.patch.object(msg_factory, 'serialize_body', wraps=msg_factory.serialize_body) as serialize_body:
+        mgr.send_to_subscribers(body_node, action, None)
+    assert serialize_body.call_count == 3  # complete report, num1 and numeric
+
+    received_handles = {}
+    for message in soap_client.messages:
+        received = msg_reader.read_received_message(message.serialize(), validate=False)
+        name = received.p_msg.header_info_block.To.split('/')[-1]
+        report_parts = received.p_msg.msg_node.findall(sdc.data_model.ns_helper.MSG.tag('ReportPart'))
+        received_handles[name] = [[state.get('DescriptorHandle') for state in part if state.get('DescriptorHandle')]
+                                  for part in report_parts]
+    assert received_handles == {'all': [['num1', 'str1'], ['num2']],
+                                'num1': [['num1']],
+                                'num1_again': [['num1']],
+                                'numeric': [['num1'], ['num2']]}
+    assert len(list(body_node.iter())) == 8  # original report is unchanged
+
+    # the state filter applies only to state reports
+    soap_client.messages.clear()
+    subscription = _mk_biceps_subscription(msg_factory, soap_client_pool, 'http://127.0.0.1:9000/x',
+                                           EventingActions.SubscriptionEnd, _state_filter(['other']))
+    mgr._subscriptions.add_object(subscription)
+    mgr.send_to_subscribers(body_node, EventingActions.SubscriptionEnd, None)
+    assert len(soap_client.messages) == 1
+
+
+def test_state_filter_in_subscribe_request():
+    subscribe = evt.Subscribe()
+    subscribe.set_filter('a b')
+    subscribe.Filter.set_state_filter(_state_filter(['h1', 'h2'], ['AlertConditionState']))
+    node = subscribe.as_etree_node(subscribe.NODETYPE, {})
+    parsed = evt.Subscribe.from_node(node)
+    assert parsed.Filter.text == 'a b'
+    assert parsed.Filter.Dialect == evt.STATE_FILTER_DIALECT
+    state_filter = ReportStateFilter.from_filter_type(parsed.Filter)
+    assert state_filter == ReportStateFilter(frozenset(('h1', 'h2')), frozenset(('AlertConditionState',)))
+    subscribe.set_filter('a b')
+    assert ReportStateFilter.from_filter_type(subscribe.Filter) is None
+
+
+@pytest.mark.parametrize('encoding', CompressionHandler.available_encodings)
+def test_spliced_message_compression(encoding: str):
+    msg_factory = MessageFactory(SdcV1Definitions, None, logger=None, validate=True)
+    body_node = etree.Element('{http://x/y}Report')
+    body_node.text = 'x' * 1000
+    body = msg_factory.serialize_body(body_node, validate=False)
+    assert isinstance(body, SerializedBody)
+    template = msg_factory.mk_envelope_template('http://127.0.0.1:9000/notify', [])
+    message_1 = template.mk_message('http://x/y/Act', body)
+    message_2 = template.mk_message('http://x/y/Act', body)
+    for message in (message_1, message_2):
+        compressed = message.compress(encoding)
+        assert CompressionHandler.decompress_payload(encoding, compressed) == message.serialize()
+
+
+class _QueuedSubscriptionsManager(ActionBasedSubscriptionsManager):
+    DELIVERY_WORKERS = 2
+    DELIVERY_QUEUE_SIZE = 3
+
+
+class _SlowSoapClient(RecordingSoapClient):
+    def __init__(self, delay: float, release: threading.Event | None = None):
+        super().__init__()
+        self._delay = delay
+        self._release = release
+
+    def post_message_to(self, _path: str, message, msg: str = ''):  # noqa: ANN001
+        if self._release is not None:
+            self._release.wait(5)
+        time.sleep(self._delay)
+        super().post_message_to(_path, message, msg)
+
+
+def _action_of(message: SplicedMessage) -> str:
+    return etree.fromstring(message.serialize()).find('.//{http://www.w3.org/2005/08/addressing}Action').text
+
+
+def test_queued_delivery_keeps_order_and_does_not_block(soap_client_pool: mock.MagicMock):
+    release = threading.Event()
+    slow_client = _SlowSoapClient(0, release)
+    fast_client = _SlowSoapClient(0)
+    soap_client_pool.get_soap_client.side_effect = (
+        lambda netloc, *_: slow_client if netloc.endswith('9000') else fast_client
+    )
+    sdc = SdcV1Definitions
+    msg_factory = MessageFactory(sdc, None, logger=None, validate=False)
+    mgr = _QueuedSubscriptionsManager(sdc, msg_factory, soap_client_pool, log_prefix='t')
+    actions = [f'http://x/y/Act{i}' for i in range(6)]
+    slow_subscription = _mk_biceps_subscription(msg_factory, soap_client_pool, 'http://127.0.0.1:9000/notify',
+                                                ' '.join(actions))
+    fast_subscription = _mk_biceps_subscription(msg_factory, soap_client_pool, 'http://127.0.0.1:9001/notify',
+                                                ' '.join(actions))
+    mgr._subscriptions.add_object(slow_subscription)
+    mgr._subscriptions.add_object(fast_subscription)
+
+    for i, action in enumerate(actions):
+        mgr.send_to_subscribers(etree.Element('{http://x/y}Report'), action, None)
+        # the blocked subscriber does not delay the other one
+        for _ in range(50):
+            if len(fast_client.messages) == i + 1:
+                break
+            time.sleep(0.1)
+    assert [_action_of(m) for m in fast_client.messages] == actions
+    assert slow_client.messages == []
+    # first report is already taken by a worker, queue size is 3, the oldest of the others were dropped
+    stats = slow_subscription.get_delivery_stats()
+    assert stats.queue_depth == 3
+    assert stats.dropped_notifications == 2
+    release.set()
+    for _ in range(50):
+        if len(slow_client.messages) == 4:
+            break
+        time.sleep(0.1)
+    assert [_action_of(m) for m in slow_client.messages] == [actions[i] for i in (0, 3, 4, 5)]
+    all_stats = mgr.get_subscription_delivery_stats()
+    fast_stats = all_stats[(fast_subscription.notify_to_address, tuple(fast_subscription.short_filter_names()))]
+    assert fast_stats.latency.max is not None
+    mgr.stop_all(send_subscription_end=False)
+
+
+class _DeliverySubscription:
+    """The members of a subscription that NotificationDeliveryEngine uses."""
+
+    def __init__(self):
+        self.queue_depth = 0
+        self.dropped_notifications = 0
+        self.is_valid = True
+
+    def is_closed(self) -> bool:
+        return False
+
+    def add_delivery_latency(self, _latency: float):
+        pass
+
+
+def test_blocked_producers_keep_queue_of_subscription():
+    """Verify that a producer blocked by BLOCK policy uses the queue that another producer created meanwhile."""
+    sent = []
+    engine = NotificationDeliveryEngine(lambda _subscription, body, _action: sent.append(body), 1, 1,
+                                        BackpressurePolicy.BLOCK, mock.MagicMock())
+    engine._executor.shutdown()
+    pending = []  # workers are run by the test in a controlled order
+    engine._executor = SimpleNamespace(submit=lambda func, *args: pending.append((func, args)),
+                                       shutdown=lambda **_: None)
+    subscription = _DeliverySubscription()
+    engine.enqueue(subscription, 'b1', 'act')
+    producer = threading.Thread(target=engine.enqueue, args=(subscription, 'b2', 'act'))
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive()  # blocked, queue is full
+
+    with engine._cond:  # the blocked producer can not continue before the second producer has enqueued
+        func, args = pending.pop(0)
+        func(*args)  # sends b1 and removes the empty queue
+        engine.enqueue(subscription, 'b3', 'act')
+    producer.join(0.2)
+    assert producer.is_alive()  # blocked again, queue of b3 is full
+    assert len(pending) == 1
+
+    func, args = pending.pop(0)
+    func(*args)
+    producer.join(5)
+    assert not producer.is_alive()
+    assert len(pending) == 1
+    func, args = pending.pop(0)
+    func(*args)
+    assert sent == ['b1', 'b3', 'b2']
+    assert pending == []
+    assert engine.queued_notifications_count() == 0
+    engine.stop()
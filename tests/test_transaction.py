@@ -3,13 +3,18 @@
 It tests classic transactions and entity transactions.
 """
 import pathlib
+import threading
+import time
 import unittest
+from decimal import Decimal
 
+from sdc11073 import observableproperties
 from sdc11073.definitions_sdc import SdcV1Definitions
 from sdc11073.exceptions import ApiUsageError
 from sdc11073.mdib.providermdib import ProviderMdib
 from sdc11073.mdib.statecontainers import NumericMetricStateContainer
 from sdc11073.mdib.transactions import mk_transaction
+from sdc11073.mdib.transactionsprotocol import TransactionType
 from sdc11073.xml_types import pm_qnames, pm_types
 
 mdib_file = str(pathlib.Path(__file__).parent.joinpath('mdib_tns.xml'))
@@ -266,6 +271,83 @@ class TestTransactions(unittest.TestCase):
         for state in transaction_result.all_states():
             self.assertEqual(state.DescriptorVersion, current_descriptors[state.DescriptorHandle].DescriptorVersion)
 
+    def test_publish_outside_lock(self):
+        """Verify that observers are called after the mdib lock is released, in the order of the commits.
+
+        - a slow observer does not block readers of the mdib
+        - the transaction result contains the mdib version group of its commit
+        - lock hold times are recorded per transaction type
+        """
+        metric_handle = self._mdib.descriptions.NODETYPE.get(pm_qnames.NumericMetricDescriptor)[0].Handle
+        published = []
+        observer_running = threading.Event()
+        lock_is_free = []
+
+        def on_transaction(transaction_result):
+            published.append(transaction_result.mdib_version_group.mdib_version)
+            if len(published) == 1:
+                observer_running.set()
+                time.sleep(0.5)
+
+        def update_metric():
+            with self._mdib.metric_state_transaction() as mgr:
+                mgr.get_state(metric_handle)
+
+        observableproperties.bind(self._mdib, transaction=on_transaction)
+        mdib_version = self._mdib.mdib_version
+        thread = threading.Thread(target=update_metric)
+        thread.start()
+        self.assertTrue(observer_running.wait(timeout=5))
+        # the first transaction is still published, but the mdib is not locked
+        lock_is_free.append(self._mdib.mdib_lock.acquire(timeout=0.1))
+        self._mdib.mdib_lock.release()
+        update_metric()  # commits immediately, is published after the first transaction
+        thread.join()
+        self.assertEqual([True], lock_is_free)
+        self.assertEqual([mdib_version + 1, mdib_version + 2], published)
+        hold_time = self._mdib.get_lock_hold_times()[TransactionType.metric]
+        self.assertEqual(2, hold_time.count)
+        self.assertLess(hold_time.max, 0.5)
+
+    def test_frozen_states(self):
+        """Verify that committed states are frozen and shared, and that copies do not modify them.
+
+        - mdib table and transaction result reference the same frozen state
+        - a frozen state and its MetricValue can not be modified
+        - a state in a new transaction is a writable copy with its own MetricValue
+        - entities do not share mutable data with the mdib
+        """
+        metric_handle = self._mdib.descriptions.NODETYPE.get(pm_qnames.NumericMetricDescriptor)[0].Handle
+        with self._mdib.metric_state_transaction() as mgr:
+            state = mgr.get_state(metric_handle)
+            state.MetricValue = pm_types.NumericMetricValue()
+            state.MetricValue.Value = Decimal(1)
+        mdib_state = self._mdib.states.descriptor_handle.get_one(metric_handle)
+        self.assertIs(mdib_state, self._mdib.transaction.metric_updates[0])
+        self.assertTrue(mdib_state.is_frozen)
+        self.assertRaises(ApiUsageError, setattr, mdib_state, 'ActivationState', pm_types.ComponentActivation.OFF)
+        self.assertRaises(ApiUsageError, setattr, mdib_state.MetricValue, 'Value', Decimal(99))
+        self.assertRaises(ApiUsageError, mdib_state.MetricValue.Annotation.append, pm_types.Annotation(
+            pm_types.CodedValue('a')))
+        self.assertEqual(Decimal(1), mdib_state.MetricValue.Value)
+
+        with self._mdib.metric_state_transaction() as mgr:
+            state = mgr.get_state(metric_handle)
+            self.assertFalse(state.is_frozen)
+            self.assertIsNot(mdib_state.MetricValue, state.MetricValue)
+            state.MetricValue.Value = Decimal(2)
+            state.MetricValue.Annotation.append(pm_types.Annotation(pm_types.CodedValue('a')))
+        self.assertEqual(Decimal(1), mdib_state.MetricValue.Value)
+        self.assertEqual(Decimal(2), self._mdib.states.descriptor_handle.get_one(metric_handle).MetricValue.Value)
+
+        entity = self._mdib.entities.by_handle(metric_handle)
+        self.assertIs(entity.descriptor, entity.state.descriptor_container)
+        entity.state.MetricValue.Value = Decimal(3)
+        self.assertEqual(Decimal(2), self._mdib.states.descriptor_handle.get_one(metric_handle).MetricValue.Value)
+        with self._mdib.metric_state_transaction() as mgr:
+            mgr.write_entity(entity)
+        entity.state.MetricValue.Value = Decimal(4)
+        self.assertEqual(Decimal(3), self._mdib.states.descriptor_handle.get_one(metric_handle).MetricValue.Value)
 
 
 class TestEntityTransactions(unittest.TestCase):
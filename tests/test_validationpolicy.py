@@ -0,0 +1,80 @@
+"""Tests for the validation policy of MessageReader and MessageFactory."""
+
+import logging
+import unittest
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.exceptions import ValidationError
+from sdc11073.loghelper import LoggerAdapter
+from sdc11073.pysoap.msgfactory import MessageFactory
+from sdc11073.pysoap.msgreader import MessageReader
+from sdc11073.pysoap.validationpolicy import ValidationPolicy
+from sdc11073.xml_types import msg_types
+from sdc11073.xml_types.addressing_types import HeaderInformationBlock
+
+
+class TestValidationPolicy(unittest.TestCase):
+    def test_first_n_and_sampling(self):
+        policy = ValidationPolicy(first_n=3, sample_percentage=25)
+        decisions = [policy.should_validate('a') for _ in range(11)]
+        self.assertEqual([True, True, True, False, False, False, True, False, False, False, True], decisions)
+        # counters are per action
+        self.assertTrue(policy.should_validate('b'))
+        self.assertEqual(11, policy.get_stats()['a'].messages)
+
+    def test_unknown_actions(self):
+        policy = ValidationPolicy(first_n=0, sample_percentage=0, known_actions=['a'])
+        self.assertFalse(policy.should_validate('a'))
+        self.assertTrue(policy.should_validate('b'))
+        self.assertTrue(policy.should_validate(None))
+        self.assertRaises(ValueError, ValidationPolicy, sample_percentage=101)
+
+    def test_durations(self):
+        policy = ValidationPolicy()
+        policy.add_duration('a', 0.25)
+        policy.add_duration('a', 0.75)
+        stats = policy.get_stats()['a']
+        self.assertEqual(2, stats.validated)
+        self.assertEqual(0.75, stats.max_duration)
+        self.assertEqual(0.5, stats.avg_duration)
+
+
+class TestMessageValidation(unittest.TestCase):
+    def setUp(self):
+        logger = LoggerAdapter(logging.getLogger('sdc.test_validation'))
+        self.msg_factory = MessageFactory(SdcV1Definitions, None, logger)
+        self.policy = ValidationPolicy(first_n=1, sample_percentage=0,
+                                       known_actions=[msg_types.GetMdib.action])
+        self.msg_reader = MessageReader(SdcV1Definitions, None, logger, validate=self.policy)
+
+    def _mk_message(self, action: str, request_id: str) -> bytes:
+        payload = msg_types.GetMdib()
+        header_info = HeaderInformationBlock(action=action, addr_to='urn:uuid:abc')
+        message = self.msg_factory.mk_soap_message(header_info, payload)
+        message.p_msg.payload_element.set('Unknown', request_id)  # makes the message invalid
+        return message.serialize(validate=False)
+
+    def test_sampled_validation(self):
+        action = msg_types.GetMdib.action
+        self.assertRaises(ValidationError, self.msg_reader.read_received_message, self._mk_message(action, '1'))
+        # the first message was validated, the following ones are not
+        received = self.msg_reader.read_received_message(self._mk_message(action, '2'))
+        self.assertEqual(action, received.action)
+        # unknown actions are always validated
+        for i in range(3):
+            self.assertRaises(ValidationError, self.msg_reader.read_received_message,
+                              self._mk_message('urn:unknown', str(i)))
+        stats = self.policy.get_stats()
+        self.assertEqual(2, stats[action].messages)
+        self.assertEqual(1, stats[action].validated)
+        self.assertEqual(3, stats['urn:unknown'].validated)
+        self.assertGreater(stats['urn:unknown'].duration, 0)
+
+    def test_factory_validates_payload(self):
+        payload = msg_types.GetMdib()
+        header_info = HeaderInformationBlock(action=msg_types.GetMdib.action, addr_to='urn:uuid:abc')
+        message = self.msg_factory.mk_soap_message(header_info, payload)
+        message.p_msg.payload_element.set('Unknown', 'x')
+        self.assertRaises(ValidationError, message.serialize)
+        stats = self.msg_factory.validation_policy.get_stats()
+        self.assertEqual(1, stats[msg_types.GetMdib.action].validated)
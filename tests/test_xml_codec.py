@@ -0,0 +1,73 @@
+"""Tests for compiled xml codecs."""
+
+import pathlib
+import unittest
+from unittest import mock
+
+from lxml import etree
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.mdib import ProviderMdib
+from sdc11073.provider.porttypes.stateeventserviceimpl import fill_episodic_report_body
+from sdc11073.xml_types import pm_types, xml_codec
+
+mdib_file = pathlib.Path(__file__).parent.joinpath('70041_MDIB_Final.xml')
+
+
+class TestXmlCodec(unittest.TestCase):
+    def setUp(self):
+        self.mdib = ProviderMdib.from_mdib_file(str(mdib_file), SdcV1Definitions)
+        self.ns_helper = self.mdib.data_model.ns_helper
+        # ClockState writes the current time
+        patcher = mock.patch('sdc11073.xml_types.xml_structure.time.time', return_value=1700000000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        xml_codec.USE_COMPILED_CODECS = False
+
+    def _serialize(self, containers: list, use_codecs: bool) -> list[bytes]:
+        xml_codec.USE_COMPILED_CODECS = use_codecs
+        tag = self.ns_helper.PM.tag('Container')
+        return [etree.tostring(c.mk_node(tag, self.ns_helper, set_xsi_type=True)) for c in containers]
+
+    def test_containers(self):
+        """Verify that codecs write and read the same xml as the generic property walk."""
+        containers = list(self.mdib.descriptions.objects) + list(self.mdib.states.objects)
+        containers.extend(self.mdib.context_states.objects)
+        expected = self._serialize(containers, use_codecs=False)
+        self.assertEqual(expected, self._serialize(containers, use_codecs=True))
+
+        tag = self.ns_helper.PM.tag('Container')
+        nodes = [c.mk_node(tag, self.ns_helper, set_xsi_type=True) for c in containers]
+        parsed = []
+        for container, node in zip(containers, nodes, strict=True):
+            copied = container.mk_copy()
+            copied.update_from_node(node)
+            parsed.append(copied)
+        self.assertEqual(expected, self._serialize(parsed, use_codecs=False))
+
+    def test_report(self):
+        """Verify nested pm types in a report."""
+        msg_types = self.mdib.sdc_definitions.data_model.msg_types
+        report = msg_types.EpisodicMetricReport()
+        report.set_mdib_version_group(self.mdib.mdib_version_group)
+        fill_episodic_report_body(report, [s for s in self.mdib.states.objects if s.is_metric_state])
+        ns_map = self.ns_helper.partial_map(self.ns_helper.PM, self.ns_helper.MSG, self.ns_helper.XSI)
+        name = self.ns_helper.MSG.tag('EpisodicMetricReport')
+        expected = etree.tostring(report.as_etree_node(name, ns_map))
+        xml_codec.USE_COMPILED_CODECS = True
+        node = report.as_etree_node(name, ns_map)
+        self.assertEqual(expected, etree.tostring(node))
+        parsed = msg_types.EpisodicMetricReport.from_node(node)
+        xml_codec.USE_COMPILED_CODECS = False
+        self.assertEqual(expected, etree.tostring(parsed.as_etree_node(name, ns_map)))
+
+    def test_mandatory_value(self):
+        xml_codec.USE_COMPILED_CODECS = True
+        coded_value = pm_types.CodedValue('123')
+        coded_value.Code = None
+        with self.assertRaises(ValueError) as ctx:
+            coded_value.as_etree_node(pm_types.CodedValue.NODETYPE, {})
+        self.assertIn('CodedValue.Code', str(ctx.exception))
+        self.assertIn('raise ValueError', xml_codec.get_codec(pm_types.CodedValue).emit_source)
@@ -0,0 +1,75 @@
+"""Benchmark: creation, copy and node round trip of common state containers.
+
+Compares the per-class cached property tables with rebuilding the property table on every call
+(which was the behavior before property tables were cached).
+
+Usage: python tools/benchmarks/container_properties.py [--loops 5000]
+"""
+import argparse
+import pathlib
+import time
+from unittest import mock
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.mdib import ProviderMdib
+from sdc11073.xml_types import xml_structure
+
+MDIB_FILE = pathlib.Path(__file__).parents[2] / 'tests' / 'mdib_tns.xml'
+STATE_CLASSES = ('NumericMetricStateContainer',
+                 'AlertConditionStateContainer',
+                 'AlertSignalStateContainer',
+                 'PatientContextStateContainer',
+                 'LocationContextStateContainer')
+
+
+def get_sample_states(mdib: ProviderMdib) -> dict:
+    states = {}
+    for state in list(mdib.states.objects) + list(mdib.context_states.objects):
+        states.setdefault(state.__class__.__name__, state)
+    return {name: states[name] for name in STATE_CLASSES}
+
+
+def measure(func, loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return (time.perf_counter() - start) / loops
+
+
+def run(state, ns_helper, loops: int) -> tuple[float, float, float]:
+    cls = state.__class__
+    descriptor = state.descriptor_container
+
+    def round_trip():
+        cls.from_node(state.mk_state_node(ns_helper.PM.tag('State'), ns_helper), descriptor)
+
+    def copy():
+        cls(descriptor).update_from_other_container(state)
+
+    create = measure(lambda: cls(descriptor), loops)
+    return create, measure(copy, loops), measure(round_trip, loops)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loops', type=int, default=5000)
+    args = parser.parse_args()
+    mdib = ProviderMdib.from_mdib_file(MDIB_FILE, SdcV1Definitions)
+    ns_helper = mdib.data_model.ns_helper
+    states = get_sample_states(mdib)
+    print(f'{"state class":<32} {"mode":<9} {"create us":>10} {"copy us":>9} {"round trip us":>14}')
+    for name, state in states.items():
+        for mode in ('uncached', 'cached'):
+            if mode == 'uncached':
+                # build a new table on every call, like sorted_container_properties did before
+                with mock.patch('sdc11073.mdib.containerbase.get_property_table', xml_structure.PropertyTable), \
+                        mock.patch('sdc11073.xml_types.basetypes.get_property_table', xml_structure.PropertyTable):
+                    result = run(state, ns_helper, args.loops)
+            else:
+                result = run(state, ns_helper, args.loops)
+            create, copy, round_trip = (r * 1e6 for r in result)
+            print(f'{name:<32} {mode:<9} {create:>10.1f} {copy:>9.1f} {round_trip:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: peak memory and duration of reading http bodies with HTTPReader.
+
+Reads a body of the given size (an xml text) with content-length, chunked and gzip compressed + chunked
+transfer, and reports the duration and the peak of allocated memory (tracemalloc) relative to the body size.
+The stream itself is not counted. For comparison, 'join' reads all chunks into a list, joins them and
+decompresses the joined body in one call (how bodies were read before the streaming reader).
+
+Usage: python tools/benchmarks/http_body_reader.py [--size-mb 20] [--chunk-size 65536] [--loops 3]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from sdc11073.httpserver.compression import CompressionHandler
+from sdc11073.httpserver.httpreader import HTTPReader, mk_chunks
+
+
+def mk_body(size: int) -> bytes:
+    sample = b'<msg:State DescriptorHandle="rtsa_%06d"><pm:MetricValue Samples="1.5 2.5 3.5 4.5"/></msg:State>'
+    count = size // len(sample % 0) + 1
+    return b''.join(sample % (i % 1000000) for i in range(count))[:size]
+
+
+def read_joined(stream: io.BufferedReader, encoding: str | None) -> bytes:
+    """Read chunks into a list, join them and decompress the complete body."""
+    body = []
+    while True:
+        chunk_len = int(stream.readline().strip(), 16)
+        body.append(stream.read(chunk_len))
+        stream.read(2)
+        if chunk_len == 0:
+            break
+    data = b''.join(body)
+    if encoding:
+        data = CompressionHandler.decompress_payload(encoding, data)
+    return data
+
+
+def measure(func, loops: int) -> tuple[float, int]:
+    """Return the best duration of loops runs, and the peak of allocated memory of a traced run."""
+    durations = []
+    for _ in range(loops):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return min(durations), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--loops', type=int, default=3)
+    args = parser.parse_args()
+    body = mk_body(int(args.size_mb * 1024 * 1024))
+    compressed = CompressionHandler.compress_payload('gzip', body)
+    data = {
+        'content-length': (body, {'content-length': str(len(body))}, None),
+        'chunked': (mk_chunks(body, args.chunk_size), {'transfer-encoding': 'chunked'}, None),
+        'gzip chunked': (mk_chunks(compressed, args.chunk_size),
+                         {'transfer-encoding': 'chunked', 'content-encoding': 'gzip'}, 'gzip'),
+    }
+    print(f'body size {len(body) / 1e6:.1f} MB, gzip compressed {len(compressed) / 1e6:.1f} MB')
+    print(f'{"transfer":<16} {"reader":<8} {"ms":>8} {"peak MB":>8} {"peak / body":>12}')
+    for name, (raw, headers, encoding) in data.items():
+        def read_streaming(raw=raw, headers=headers):
+            request = SimpleNamespace(rfile=io.BufferedReader(io.BytesIO(raw)), headers=headers)
+            return HTTPReader.read_request_body(request)
+
+        readers = {'stream': read_streaming}
+        if headers.get('transfer-encoding'):
+            readers['join'] = lambda raw=raw, encoding=encoding: read_joined(io.BufferedReader(io.BytesIO(raw)),
+                                                                              encoding)
+        for reader_name, func in readers.items():
+            if func() != body:
+                raise RuntimeError(f'{name} {reader_name}: wrong body')
+            duration, peak = measure(func, args.loops)
+            print(f'{name:<16} {reader_name:<8} {duration * 1e3:>8.1f} {peak / 1e6:>8.1f} {peak / len(body):>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
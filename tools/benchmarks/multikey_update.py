@@ -0,0 +1,86 @@
+"""Benchmark: update_objects and remove_objects on a states lookup with many states.
+
+All states have the same NODETYPE, therefore the NODETYPE index has a single bucket with all states.
+Compares the buckets of multikey.IndexDefinition with plain list buckets (the implementation before).
+
+Usage: python tools/benchmarks/multikey_update.py [--states 10000] [--updates 1000]
+"""
+import argparse
+import random
+import time
+from typing import Any
+
+from sdc11073 import multikey
+from sdc11073.mdib.descriptorcontainers import NumericMetricDescriptorContainer
+from sdc11073.mdib.mdibbase import StatesLookup
+from sdc11073.mdib.statecontainers import NumericMetricStateContainer
+
+
+class ListIndexDefinition(multikey.IndexDefinition):
+    """Index with list buckets and linear removal."""
+
+    def get(self, key: Any, default: Any = None) -> list[Any] | None:
+        return dict.get(self, key, default)
+
+    def mk_keys(self, obj: Any) -> list[Any] | None:
+        key = self._get_key_func(obj)
+        if not self._index_none_values and key is None:
+            return None
+        bucket = dict.get(self, key)
+        if bucket is None:
+            dict.__setitem__(self, key, [obj])
+        else:
+            bucket.append(obj)
+        return [key]
+
+    def rm_key(self, key: Any, obj: Any):
+        bucket = dict.get(self, key)
+        if bucket is not None:
+            bucket.remove(obj)
+            if len(bucket) == 0:
+                dict.__delitem__(self, key)
+
+
+def mk_lookup(states: list, legacy: bool) -> multikey.MultiKeyLookup:
+    if legacy:
+        lookup = multikey.MultiKeyLookup()
+        lookup.add_index('descriptor_handle', multikey.UIndexDefinition(lambda obj: obj.DescriptorHandle))
+        lookup.add_index('NODETYPE', ListIndexDefinition(lambda obj: obj.NODETYPE, index_none_values=False))
+    else:
+        lookup = StatesLookup()
+    lookup.add_objects(states)
+    return lookup
+
+
+def run(states: list, updated: list, legacy: bool) -> tuple[float, float]:
+    lookup = mk_lookup(states, legacy)
+    start = time.perf_counter()
+    lookup.update_objects(updated)
+    update_duration = time.perf_counter() - start
+    start = time.perf_counter()
+    lookup.remove_objects(updated)
+    remove_duration = time.perf_counter() - start
+    assert len(lookup.NODETYPE.get(NumericMetricStateContainer.NODETYPE)) == len(states) - len(updated)
+    return update_duration, remove_duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--states', type=int, default=10000)
+    parser.add_argument('--updates', type=int, default=1000)
+    args = parser.parse_args()
+    states = []
+    for i in range(args.states):
+        descriptor = NumericMetricDescriptorContainer(f'metric_{i}', 'channel')
+        states.append(NumericMetricStateContainer(descriptor))
+    updated = random.Random(42).sample(states, args.updates)
+    print(f'{args.states} states, update and remove {args.updates} of them')
+    print(f'{"buckets":<8} {"update_objects ms":>18} {"remove_objects ms":>18}')
+    for legacy in (True, False):
+        update_duration, remove_duration = run(states, updated, legacy)
+        name = 'list' if legacy else 'indexed'
+        print(f'{name:<8} {update_duration * 1000:>18.1f} {remove_duration * 1000:>18.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: cost of sending one notification to n subscribers.
+
+Compares the classic path (every subscription validates and serializes the whole message)
+with the serialize-once fan-out of ActionBasedSubscriptionsManager.
+No network is involved, the soap client only serializes and optionally compresses the message.
+
+Usage: python tools/benchmarks/notification_fanout.py [--encoding gzip] [--loops 20]
+"""
+import argparse
+import pathlib
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from lxml import etree
+
+from sdc11073 import loghelper, observableproperties
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.httpserver.compression import CompressionHandler
+from sdc11073.mdib import ProviderMdib
+from sdc11073.provider.porttypes.stateeventserviceimpl import fill_episodic_report_body
+from sdc11073.provider.subscriptionmgr import BicepsSubscription, ReferenceParamSubscriptionsManager
+from sdc11073.pysoap.msgfactory import MessageFactory, SplicedMessage
+from sdc11073.pysoap.soapclient import SoapClient
+from sdc11073.xml_types import eventing_types as evt
+
+MDIB_FILE = pathlib.Path(__file__).parents[2] / 'tests' / '70041_MDIB_Final.xml'
+
+
+class SerializingSoapClient:
+    """Does the cpu work of SoapClient.post_message_to, but does not send anything."""
+
+    roundtrip_time = observableproperties.ObservableProperty()
+
+    def __init__(self, encoding: str | None):
+        self._encoding = encoding
+
+    def post_message_to(self, _path, message, msg=''):  # noqa: ARG002
+        data = SoapClient._prepare_message(message, None, True)  # noqa: SLF001
+        if self._encoding:
+            if isinstance(data, SplicedMessage):
+                data.compress(self._encoding)
+            else:
+                CompressionHandler.compress_payload(self._encoding, data)
+
+
+def mk_report(mdib: ProviderMdib):
+    report = mdib.sdc_definitions.data_model.msg_types.EpisodicMetricReport()
+    report.set_mdib_version_group(mdib.mdib_version_group)
+    fill_episodic_report_body(report, [s for s in mdib.states.objects if s.is_metric_state])
+    return report
+
+
+def mk_manager(subscriber_count: int, encoding: str | None, serialize_once: bool):
+    logger = loghelper.get_logger_adapter('benchmark')
+    msg_factory = MessageFactory(SdcV1Definitions, None, logger=logger, validate=True)
+    soap_client_pool = mock.MagicMock()
+    soap_client_pool.get_soap_client.return_value = SerializingSoapClient(encoding)
+    mgr = ReferenceParamSubscriptionsManager(SdcV1Definitions, msg_factory, soap_client_pool, log_prefix='bench')
+    mgr.SERIALIZE_BODY_ONCE = serialize_once
+    mgr.set_base_urls([SimpleNamespace(scheme='http', netloc='127.0.0.1:9000', path='bench')])
+    for i in range(subscriber_count):
+        subscribe = evt.Subscribe()
+        subscribe.set_filter('http://bench/EpisodicMetricReport')
+        subscribe.Delivery.NotifyTo.Address = f'http://127.0.0.1:{10000 + i}/notify'
+        subscription = BicepsSubscription(mgr, subscribe, [], mgr.base_urls, 3600, soap_client_pool,
+                                          msg_factory=msg_factory, log_prefix='bench')
+        subscription.set_reference_parameter()
+        mgr._subscriptions.add_object(subscription)  # noqa: SLF001
+    return mgr
+
+
+def run(subscriber_count: int, encoding: str | None, serialize_once: bool, loops: int, report) -> float:
+    mgr = mk_manager(subscriber_count, encoding, serialize_once)
+    action = 'http://bench/EpisodicMetricReport'
+    mgr.send_to_subscribers(report, action, None)  # warm up, creates envelope templates
+    start = time.perf_counter()
+    for _ in range(loops):
+        mgr.send_to_subscribers(report, action, None)
+    duration = (time.perf_counter() - start) / loops
+    mgr.stop_all(send_subscription_end=False)
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--encoding', default=None, choices=CompressionHandler.available_encodings)
+    parser.add_argument('--loops', type=int, default=20)
+    args = parser.parse_args()
+    mdib = ProviderMdib.from_mdib_file(MDIB_FILE, SdcV1Definitions)
+    report = mk_report(mdib)
+    body_size = len(etree.tostring(report.as_etree_node(report.NODETYPE, {})))
+    print(f'report body size = {body_size} bytes, encoding = {args.encoding}')
+    print(f'{"subscribers":>11} {"classic ms":>11} {"once ms":>9} {"speedup":>8}')
+    for subscriber_count in (1, 2, 5, 10, 20, 50):
+        classic = run(subscriber_count, args.encoding, False, args.loops, report)
+        once = run(subscriber_count, args.encoding, True, args.loops, report)
+        print(f'{subscriber_count:>11} {classic * 1000:>11.2f} {once * 1000:>9.2f} {classic / once:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
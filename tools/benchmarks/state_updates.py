@@ -0,0 +1,60 @@
+"""Benchmark: metric state updates in transactions, with and without entities.
+
+Every committed state is frozen and shared by the mdib, the transaction result and the periodic reports,
+only get_state / write_entity make a (writable) copy of a state.
+
+Usage: python tools/benchmarks/state_updates.py [--loops 200]
+"""
+import argparse
+import pathlib
+import time
+from decimal import Decimal
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.mdib import ProviderMdib
+from sdc11073.xml_types import pm_qnames, pm_types
+
+MDIB_FILE = pathlib.Path(__file__).parents[2] / 'tests' / '70041_MDIB_Final.xml'
+
+
+def update_states(mdib: ProviderMdib, handles: list[str], value: int):
+    with mdib.metric_state_transaction() as mgr:
+        for handle in handles:
+            state = mgr.get_state(handle)
+            if state.MetricValue is None:
+                state.MetricValue = pm_types.NumericMetricValue()
+            state.MetricValue.Value = Decimal(value)
+
+
+def update_entities(mdib: ProviderMdib, handles: list[str], value: int):
+    entities = [mdib.entities.by_handle(handle) for handle in handles]
+    for entity in entities:
+        if entity.state.MetricValue is None:
+            entity.state.MetricValue = pm_types.NumericMetricValue()
+        entity.state.MetricValue.Value = Decimal(value)
+    with mdib.metric_state_transaction() as mgr:
+        for entity in entities:
+            mgr.write_entity(entity)
+
+
+def measure(func, mdib: ProviderMdib, handles: list[str], loops: int) -> float:
+    func(mdib, handles, 0)  # warm up
+    start = time.perf_counter()
+    for i in range(loops):
+        func(mdib, handles, i)
+    return (time.perf_counter() - start) / loops / len(handles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loops', type=int, default=200)
+    args = parser.parse_args()
+    mdib = ProviderMdib.from_mdib_file(MDIB_FILE, SdcV1Definitions)
+    handles = [d.Handle for d in mdib.descriptions.NODETYPE.get(pm_qnames.NumericMetricDescriptor)]
+    print(f'{len(handles)} numeric metrics')
+    print(f'get_state:    {measure(update_states, mdib, handles, args.loops) * 1e6:6.1f} us per state update')
+    print(f'write_entity: {measure(update_entities, mdib, handles, args.loops) * 1e6:6.1f} us per state update')
+
+
+if __name__ == '__main__':
+    main()
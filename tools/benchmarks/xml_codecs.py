@@ -0,0 +1,93 @@
+"""Benchmark: compiled xml codecs compared with the generic property walk.
+
+Serializes and parses episodic reports that contain all states of an mdib, and the mdib description,
+once with the generic property walk and once with compiled codecs (xml_codec.USE_COMPILED_CODECS).
+Both must produce the same xml, the current time (written by ClockState) is fixed for the comparison.
+
+Usage: python tools/benchmarks/xml_codecs.py [--mdib pat/PlugathonMdibV2.xml] [--loops 50]
+"""
+import argparse
+import pathlib
+import timeit
+from unittest import mock
+
+from lxml import etree
+
+from sdc11073.definitions_sdc import SdcV1Definitions
+from sdc11073.mdib import ProviderMdib
+from sdc11073.provider.porttypes.stateeventserviceimpl import fill_episodic_report_body
+from sdc11073.xml_types import xml_codec
+
+MDIB_FILE = pathlib.Path(__file__).parents[2] / 'pat' / 'PlugathonMdibV2.xml'
+
+
+def mk_reports(mdib: ProviderMdib) -> dict:
+    msg_types = mdib.sdc_definitions.data_model.msg_types
+    reports = {}
+    for name, report_class, is_selected in (
+            ('metric report', msg_types.EpisodicMetricReport, lambda s: s.is_metric_state),
+            ('alert report', msg_types.EpisodicAlertReport, lambda s: s.is_alert_state),
+            ('component report', msg_types.EpisodicComponentReport, lambda s: s.is_component_state)):
+        report = report_class()
+        report.set_mdib_version_group(mdib.mdib_version_group)
+        fill_episodic_report_body(report, [s for s in mdib.states.objects if is_selected(s)])
+        reports[name] = report
+    return reports
+
+
+def measure(func, loops: int) -> float:
+    # best of 5 runs, less sensitive to other load on the machine
+    return min(timeit.repeat(func, number=loops, repeat=5)) / loops
+
+
+def run_report(report, ns_helper, loops: int) -> tuple[bytes, float, float]:
+    ns_map = ns_helper.partial_map(ns_helper.PM, ns_helper.MSG, ns_helper.XSI, ns_helper.EXT)
+    name = ns_helper.MSG.tag(report.NODETYPE.localname)
+    node = report.as_etree_node(name, ns_map)
+    emit = measure(lambda: report.as_etree_node(name, ns_map), loops)
+    parse = measure(lambda: report.__class__.from_node(node), loops)
+    return etree.tostring(node), emit, parse
+
+
+def run_descriptors(mdib: ProviderMdib, loops: int) -> tuple[bytes, float, float]:
+    ns_helper = mdib.data_model.ns_helper
+    tag = ns_helper.PM.tag('Descriptor')
+    descriptors = list(mdib.descriptions.objects)
+    nodes = [d.mk_node(tag, ns_helper, set_xsi_type=True) for d in descriptors]
+    emit = measure(lambda: [d.mk_node(tag, ns_helper, set_xsi_type=True) for d in descriptors], loops)
+    parse = measure(lambda: [d.__class__.from_node(n) for d, n in zip(descriptors, nodes)], loops)
+    return b''.join(etree.tostring(n) for n in nodes), emit, parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mdib', type=pathlib.Path, default=MDIB_FILE)
+    parser.add_argument('--loops', type=int, default=50)
+    args = parser.parse_args()
+    with mock.patch('sdc11073.xml_types.xml_structure.time.time', return_value=1700000000.0):
+        run(args)
+
+
+def run(args: argparse.Namespace):
+    mdib = ProviderMdib.from_mdib_file(args.mdib, SdcV1Definitions)
+    ns_helper = mdib.data_model.ns_helper
+    reports = mk_reports(mdib)
+    print(f'{"document":<18} {"mode":<9} {"emit ms":>8} {"parse ms":>9}')
+    for name in (*reports, 'descriptors'):
+        results = {}
+        for use_codecs in (False, True):
+            xml_codec.USE_COMPILED_CODECS = use_codecs
+            if name == 'descriptors':
+                results[use_codecs] = run_descriptors(mdib, args.loops)
+            else:
+                results[use_codecs] = run_report(reports[name], ns_helper, args.loops)
+        xml_codec.USE_COMPILED_CODECS = False
+        for use_codecs, (_, emit, parse) in results.items():
+            mode = 'codec' if use_codecs else 'generic'
+            print(f'{name:<18} {mode:<9} {emit * 1e3:>8.2f} {parse * 1e3:>9.2f}')
+        if results[False][0] != results[True][0]:
+            print(f'{name}: codec xml differs from generic xml!')
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,8 @@ from typing import TYPE_CHECKING, Any
 
 from sdc11073 import loghelper
 from sdc11073.intervaltimer import IntervalTimer
+from sdc11073.xml_types.dataconverters import SampleListConverter
+from sdc11073.xml_types.xml_structure import DecimalListAttributeProperty
 from tutorial.productandroles.waveformprovider.realtimesamples import Annotator, RtSampleArray
 from tutorial.productandroles.waveformprovider.waveformgenerators import TriangleGenerator
 
@@ -250,9 +252,12 @@ class GenericWaveformProvider:
         """Update waveforms state from waveform generator (if available)."""
         wf_generator = self._waveform_generators.get(state.DescriptorHandle)
         if wf_generator:
-            ctxt = Context(prec=10)
             rt_sample_array = wf_generator.get_next_sample_array()
-            samples = [ctxt.create_decimal(s) for s in rt_sample_array.samples]
+            if DecimalListAttributeProperty.USE_COMPACT_SAMPLES:
+                samples = SampleListConverter.mk_sample_array(rt_sample_array.samples)
+            else:
+                ctxt = Context(prec=10)
+                samples = [ctxt.create_decimal(s) for s in rt_sample_array.samples]
             if state.MetricValue is None:
                 state.mk_metric_value()
             state.MetricValue.Samples = samples